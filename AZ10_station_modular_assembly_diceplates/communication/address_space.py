@@ -0,0 +1,89 @@
+""" Address space of the OPC UA server as data
+
+The folders, types, objects, variables and methods of a station are defined by a dict, see ADDRESS_SPACE in
+communication.server:
+
+    'folders'       names of the folders in the Objects folder
+    'types'         (name, namespace index or None: the namespace of the station, variables of the type:
+                    (name, default value[, variant type]))
+    'objects'       (folder, name, type, values of the type's variables)
+    'variables'     (folder, name, value[, variant type]), the variables and the objects' variables are read-only
+    'methods'       (folder, name, method of the owner which handles the call, input arguments, output arguments),
+                    an argument is a variant type or (name, data type, description or None)
+"""
+
+import time
+import logging
+import collections
+from opcua import ua
+
+_logger = logging.getLogger("AddressSpace")
+
+
+def _variant_type(name):
+    return getattr(ua.VariantType, name) if name is not None else None
+
+
+def _argument(argument):
+    if isinstance(argument, str):
+        return _variant_type(argument)
+    name, data_type, description = argument
+    ua_argument = ua.Argument()
+    ua_argument.Name = name
+    ua_argument.DataType = ua.NodeId(getattr(ua.ObjectIds, data_type))
+    ua_argument.ValueRank = -1
+    ua_argument.ArrayDimensions = []
+    if description is not None:
+        ua_argument.Description = ua.LocalizedText(description)
+    return ua_argument
+
+
+def build(server, idx, definition, owner):
+    """ Creates the nodes of the definition, returns the folders and the types """
+    folders = collections.OrderedDict()
+    for folder_name in definition['folders']:
+        folders[folder_name] = server.nodes.objects.add_folder(idx, folder_name)
+
+    types = collections.OrderedDict()
+    for type_name, namespace, variables in definition['types']:
+        object_type = server.nodes.base_object_type.add_object_type(idx if namespace is None else namespace,
+                                                                    type_name)
+        for variable in variables:
+            object_type.add_variable(idx, variable[0], variable[1],
+                                     _variant_type(variable[2] if len(variable) > 2 else None)
+                                     ).set_modelling_rule(True)
+        types[type_name] = object_type
+
+    for folder_name, object_name, type_name, values in definition['objects']:
+        ua_object = folders[folder_name].add_object(idx, object_name, types[type_name])
+        object_variables = ua_object.get_variables()
+        for object_variable, value in zip(object_variables, values):
+            object_variable.set_value(value)
+        for object_variable in object_variables:
+            object_variable.set_read_only()
+
+    for variable in definition['variables']:
+        folder_name, variable_name, value = variable[:3]
+        folders[folder_name].add_variable(idx, variable_name, value,
+                                          _variant_type(variable[3] if len(variable) > 3 else None)).set_read_only()
+
+    for folder_name, method_name, callback, inargs, outargs in definition['methods']:
+        folders[folder_name].add_method(idx, method_name, getattr(owner, callback),
+                                        [_argument(argument) for argument in inargs],
+                                        [_argument(argument) for argument in outargs])
+
+    return list(folders.values()) + list(types.values())
+
+
+def method_arguments(definition, folder_name):
+    """ Name -> number of input arguments of the methods in a folder """
+    return dict((method_name, len(inargs)) for folder, method_name, callback, inargs, outargs in definition['methods']
+                if folder == folder_name)
+
+
+def load(server, idx, definition, owner, name="station", logger=None):
+    """ Builds the address space of the definition and logs the time it took """
+    logger = logger if logger is not None else _logger
+    started = time.perf_counter()
+    build(server, idx, definition, owner)
+    logger.info("%s : address space built in %.3f s", name, time.perf_counter() - started)
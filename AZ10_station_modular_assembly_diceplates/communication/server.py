@@ -1,9 +1,62 @@
 from opcua import ua, uamethod, Server
 from communication import events
+from communication.ua_writer import get_default_writer
+from communication.pubsub import positional
+from communication import address_space
+from activeobjects.station.job_batch import JobBatch, parse_jobs
 import logging
 import os,signal
 
 
+# Address space of the station, built by communication.address_space
+# as long as this definition doesn't change
+ADDRESS_SPACE = {
+    'folders': (
+        "ModelManagement", "StateMachine", "Identification", "StationService", "Sensor", "Actor", "Monitoring",
+        "Maintenance",
+    ),
+    'types': (
+        ("SensorType", None, (("Name", ""), ("Id", ""), ("State", ""), ("Value", True))),
+        ("ActorType", 0, (("Name", ""), ("Id", ""), ("State", ""), ("Value", ""))),
+    ),
+    'objects': (
+        ("Sensor", "InteractionSensor1", "SensorType",
+         ("SensorButtonProductionDone", "-SF1", "notInitialized", False)),
+        ("Sensor", "InteractionSensor2", "SensorType",
+         ("SensorButtonProductionError", "-SF2", "notInitialized", False)),
+        ("Actor", "StatusLed", "ActorType", ("RgbLed", "-PF1", "noInitializationNeeded", "off")),
+    ),
+    'variables': (
+        ("ModelManagement", "StationVersionOpcuaModel", "0.1"),
+        ("ModelManagement", "StationVersionInternal", "0.1"),
+        ("StateMachine", "StationState", "not initialized"),
+        ("StateMachine", "StationErrorCode", 0, "Byte"),
+        ("StateMachine", "StationErrorDescription", "no error"),
+        ("StateMachine", "StationSafetyState", "noSafetySwitchAvailable"),
+        ("StateMachine", "StationMessageCode", 0, "Byte"),
+        ("StateMachine", "StationMessageDescription", "null"),
+        ("Identification", "StationName", "StationModularMontageWuerfelPlatten"),
+        ("Identification", "StationId", "-AZ10"),
+        ("StationService", "JobBatchResult", "Idle"),
+        ("Maintenance", "InitServiceState", "NotInitialized"),
+        ("Maintenance", "AssembleServiceState", "NotInitialized"),
+    ),
+    'methods': (
+        ("StationService", "ServiceAssembleDiceHalvesAndPlates", "ServiceAssembleDiceHalvesAndPlates", (),
+         ("Int64",)),
+        ("StationService", "ServiceAutoInitializeStation", "serviceAutoInitializeStation", (), ("Int64",)),
+        ("StationService", "ServiceAckAllErrors", "serviceAckAllErrors", (), ("Int64",)),
+        ("StationService", "ServiceShutdownStationNow", "serviceShutdownStationNow", (), ("Int64",)),
+        ("StationService", "SubmitJobBatch", "submitJobBatch",
+         (("Jobs", "String", "JSON list of the jobs: [[service, argument, ...], ...]"),), ("Int64",)),
+        ("Maintenance", "maintenanceLedOn", "maintenanceLedOn", ("String",), ("Int64",)),
+        ("Maintenance", "maintenanceLedOff", "maintenanceLedOff", (), ("Int64",)),
+        ("Maintenance", "maintenanceBlinkerOn", "maintenanceBlinkerOn", ("String",), ("Int64",)),
+        ("Maintenance", "maintenanceBlinkerOff", "maintenanceBlinkerOff", (), ("Int64",)),
+    ),
+}
+
+
 class UAServer(object):
     def __init__(self, station_app, endpoint=None, name=None, uri=None):
 
@@ -38,108 +91,26 @@ class UAServer(object):
         self.do_assemble_event = events.StationEvent(eventID=events.StationEvents.Assemble, sender=self.name)
 
 
-        # creating folders:
-        folder_model_development = self._server.nodes.objects.add_folder(idx, "ModelManagement")
-        folder_state_machine = self._server.nodes.objects.add_folder(idx, "StateMachine")
-        folder_ident = self._server.nodes.objects.add_folder(idx, "Identification")
-        folder_station_service = self._server.nodes.objects.add_folder(idx, "StationService")
-        folder_sensor = self._server.nodes.objects.add_folder(idx, "Sensor")
-        folder_actor = self._server.nodes.objects.add_folder(idx, "Actor")
-        folder_monitor = self._server.nodes.objects.add_folder(idx, "Monitoring")
-
-        folder_maintenance = self._server.nodes.objects.add_folder(idx, "Maintenance")
-
-
-
-
-        # creating types:
-
-        sensor_type = self._server.nodes.base_object_type.add_object_type(idx, "SensorType")
-        sensor_type.add_variable(idx, "Name", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "Id", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "State", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "Value", True).set_modelling_rule(True)
-
-        actor_type = self._server.nodes.base_object_type.add_object_type(0, "ActorType")
-        actor_type.add_variable(idx, "Name", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "Id", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "State", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "Value", "").set_modelling_rule(True)
-
-        # creating objects:
-
-        # Folder Sensor:
-        sensorobject = folder_sensor.add_object(idx, "InteractionSensor1", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorButtonProductionDone")
-        sensorobjects[1].set_value("-SF1")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "InteractionSensor2", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorButtonProductionError")
-        sensorobjects[1].set_value("-SF2")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        # Folder Actor:
-
-        actorobject = folder_actor.add_object(idx, "StatusLed", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("RgbLed")
-        actorobjects[1].set_value("-PF1")
-        actorobjects[2].set_value("noInitializationNeeded")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        # create variables:
-
-        # Folder ModelManagement
-        folder_model_development.add_variable(idx, "StationVersionOpcuaModel", "0.1").set_read_only()
-        folder_model_development.add_variable(idx, "StationVersionInternal", "0.1").set_read_only()
-
-        # Folder StateMachine
-        folder_state_machine.add_variable(idx, "StationState", "not initialized").set_read_only()
-        folder_state_machine.add_variable(idx, "StationErrorCode", 0x0000, ua.VariantType.Byte).set_read_only()
-        folder_state_machine.add_variable(idx, "StationErrorDescription", "no error").set_read_only()
-        folder_state_machine.add_variable(idx, "StationSafetyState",
-                                          "noSafetySwitchAvailable").set_read_only()
-        folder_state_machine.add_variable(idx, "StationMessageCode", 0x0000,
-                                          varianttype=ua.VariantType.Byte).set_read_only()
-        folder_state_machine.add_variable(idx, "StationMessageDescription", "null").set_read_only()
-
-        # Folder Identification
-        folder_ident.add_variable(idx, "StationName", "StationModularMontageWuerfelPlatten").set_read_only()
-        folder_ident.add_variable(idx, "StationId", "-AZ10").set_read_only()
-
-        # Folder Monitor
-        # no monitoring at this station
-
-        # Folder StationService: create methods
-        folder_station_service.add_method(idx, "ServiceAssembleDiceHalvesAndPlates", self.ServiceAssembleDiceHalvesAndPlates, [],[ua.VariantType.Int64])
-        folder_station_service.add_method(idx, "ServiceAutoInitializeStation", self.serviceAutoInitializeStation, [],[ua.VariantType.Int64])
-        folder_station_service.add_method(idx, "ServiceAckAllErrors", self.serviceAckAllErrors, [],[ua.VariantType.Int64])
-        folder_station_service.add_method(idx, "ServiceShutdownStationNow", self.serviceShutdownStationNow, [],[ua.VariantType.Int64])
-
-
-        # Folder Maintenance
-        folder_maintenance.add_variable(idx, "InitServiceState", "NotInitialized").set_read_only()
-        folder_maintenance.add_variable(idx, "AssembleServiceState", "NotInitialized").set_read_only()
-
-        folder_maintenance.add_method(idx, "maintenanceLedOn", self.maintenanceLedOn,
-                                      [ua.VariantType.String], [ua.VariantType.Int64])
-        folder_maintenance.add_method(idx, "maintenanceLedOff", self.maintenanceLedOff,
-                                      [], [ua.VariantType.Int64])
-        folder_maintenance.add_method(idx, "maintenanceBlinkerOn", self.maintenanceBlinkerOn,
-                                      [ua.VariantType.String], [ua.VariantType.Int64])
-        folder_maintenance.add_method(idx, "maintenanceBlinkerOff", self.maintenanceBlinkerOff,
-                                      [], [ua.VariantType.Int64])
+        # creating the address space, see ADDRESS_SPACE:
+        address_space.load(self._server, idx, ADDRESS_SPACE, self, name=self._name, logger=self.logger)
+
+        # job batches of SubmitJobBatch, their progress is published in StationService/JobBatchResult
+        self._idx = idx
+        self._service_node = self._server.nodes.objects.get_child(["{0}:StationService".format(idx)])
+        services = address_space.method_arguments(ADDRESS_SPACE, "StationService")
+        del services["SubmitJobBatch"]
+        # the services which run the station -> their service active object, which has to be Ready when a batch is
+        # submitted, None: the service has no state
+        station_jobs = {
+            "ServiceAssembleDiceHalvesAndPlates": self.station_app.assembleService,
+            "ServiceAutoInitializeStation":       None,
+        }
+        self.job_batch = JobBatch("JobBatch", station=self.station_app.assemblyStation, services=services, call_service=self.call_service,
+                                  station_jobs=station_jobs)
+        self.job_batch_ua_subscriber = UaObjectSubscriber(self._server, self._service_node)
+        self.job_batch.register_subscribers(topic="JobBatchResult", who=self.job_batch_ua_subscriber,
+                                            callback=self.job_batch_ua_subscriber.update)
+        self.job_batch.start()
 
     @property
     def server(self):
@@ -149,6 +120,24 @@ class UAServer(object):
     def name(self):
         return self._name
 
+    def call_service(self, service, arguments):
+        """ Calls a method of the StationService folder like a client, True if the service accepted the call """
+        result = self._service_node.call_method("{0}:{1}".format(self._idx, service), *arguments)
+        return result == ua.status_codes.StatusCodes.Good
+
+    @uamethod
+    def submitJobBatch(self, parent, jobs_text):
+        try:
+            jobs = parse_jobs(jobs_text)
+        except ValueError as error:
+            reason = str(error)
+        else:
+            reason = self.job_batch.submit(jobs)
+        if reason is not None:
+            self.logger.debug("Sender %s : Job batch was refused : %s", self.name, reason)
+            return ua.status_codes.StatusCodes.Bad
+        return ua.status_codes.StatusCodes.Good
+
     @uamethod
     def serviceAutoInitializeStation(self, parent):
         self.station_app.assemblyStation.handle_event(event=self.init_event)
@@ -273,9 +262,10 @@ class UaObjectSubscriber(object):
     Updates the values of the UA Node
     """
 
-    def __init__(self, opcua_server, ua_node):
+    def __init__(self, opcua_server, ua_node, writer=None):
         self.opcua_server = opcua_server
         self.nodes = {}
+        self._writer = writer if writer is not None else get_default_writer()    # None: synchronous writes
         self.b_name = ua_node.get_browse_name().Name
         self._name = self.b_name
 
@@ -299,11 +289,12 @@ class UaObjectSubscriber(object):
         else:
             self.nodes[attr].set_value(getattr(self, attr))
 
-    def update(self, *args, **kwargs):
-        kwargs = kwargs
-        if "topic" not in kwargs or "value" not in kwargs:
-            raise ValueError("OPCUA server : Bad argument")
-        self.nodes[kwargs["topic"]].set_value(kwargs["value"])
+    @positional
+    def update(self, topic, value, sender=None):
+        if self._writer is not None:
+            self._writer.write(self.nodes[topic], value)
+        else:
+            self.nodes[topic].set_value(value)
 
 
 
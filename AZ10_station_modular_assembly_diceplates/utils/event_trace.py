@@ -0,0 +1,281 @@
+""" Recording and replay of the events of the active objects
+
+A trace is a binary file: the TRACE_MAGIC header followed by records of a fixed RECORD_HEADER and a pickled
+payload. Two kinds of records are written:
+
+    CALL        an event method of an actor was enqueued, e.g. handle_event(event=...),
+                payload: (actor name, method name, args, kwargs)
+    PUBLISH     a publisher has published a message, payload: (publisher name, kwargs)
+
+Every record carries the thread it was produced in: calls from the threads of the active objects are
+reactions of the actor graph, calls from the timer wheel are timeouts, all other calls (RevPi input edges,
+OPC UA methods, the connection monitor) are inputs of the station. Replaying the inputs of a trace into
+a fresh actor graph reproduces the run without hardware.
+
+    python3 -m utils.event_trace trace.bin                  prints a trace
+    python3 -m utils.event_trace replay trace.bin [speed]   replays the inputs into the station on the
+                                                            simulated RevPi process image, see replay_station
+"""
+
+import sys
+import time
+import struct
+import pickle
+import threading
+import logging
+
+TRACE_MAGIC = b'EDUTRC01'
+# kind, source, monotonic time stamp, length of the payload
+RECORD_HEADER = struct.Struct('<BBdI')
+
+CALL = 1
+PUBLISH = 2
+
+SOURCE_INPUT = 0        # a thread outside the actor graph
+SOURCE_ACTOR = 1        # a thread of an active object or of an actor scheduler
+SOURCE_TIMER = 2        # the timer wheel of the monitoring timers
+
+recorder = None         # the installed trace recorder, None: tracing is disabled
+
+
+def install(trace_recorder):
+    """ Installs the recorder which gets the calls of all actors and publishers. None disables tracing. """
+    global recorder
+    recorder = trace_recorder
+
+
+def thread_source():
+    return getattr(threading.current_thread(), 'trace_source', SOURCE_INPUT)
+
+
+class TraceRecord(object):
+    __slots__ = ('kind', 'source', 'timestamp', 'name', 'method', 'args', 'kwargs')
+
+    def __init__(self, kind, source, timestamp, name, method, args, kwargs):
+        self.kind = kind
+        self.source = source
+        self.timestamp = timestamp
+        self.name = name            # actor or publisher name
+        self.method = method        # event method of a CALL, None for PUBLISH
+        self.args = args
+        self.kwargs = kwargs
+
+    @property
+    def topic(self):
+        return self.kwargs.get("topic")
+
+    @property
+    def value(self):
+        return self.kwargs.get("value")
+
+    @property
+    def sender(self):
+        if "sender" in self.kwargs:
+            return self.kwargs["sender"]
+        event = self.kwargs.get("event")
+        return getattr(event, "sender", None)
+
+    def __repr__(self):
+        source = {SOURCE_INPUT: "input", SOURCE_ACTOR: "actor", SOURCE_TIMER: "timer"}.get(self.source, self.source)
+        if self.kind == PUBLISH:
+            return "%.6f %-5s publish %s %s" % (self.timestamp, source, self.name, self.kwargs)
+        return "%.6f %-5s %s.%s %s %s" % (self.timestamp, source, self.name, self.method, self.args, self.kwargs)
+
+
+class TraceRecorder(object):
+    """ Appends the records to a trace file, the records are serialized in the recording thread """
+
+    def __init__(self, path, buffer_size=1 << 16):
+        self._path = path
+        self._file = open(path, 'wb', buffering=buffer_size)
+        self._file.write(TRACE_MAGIC)
+        self._lock = threading.Lock()
+        self.records = 0
+        self.failed = 0
+        self.logger = logging.getLogger("TraceRecorder")
+
+    @property
+    def path(self):
+        return self._path
+
+    def record_call(self, actor_name, method_name, args, kwargs):
+        self._write(CALL, (actor_name, method_name, args, kwargs))
+
+    def record_publish(self, publisher_name, kwargs):
+        self._write(PUBLISH, (publisher_name, kwargs))
+
+    def _write(self, kind, payload):
+        timestamp = time.monotonic()
+        try:
+            data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # e.g. a callback as an argument, the trace must not break the station
+            self.failed += 1
+            return
+        header = RECORD_HEADER.pack(kind, thread_source(), timestamp, len(data))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(header)
+            self._file.write(data)
+            self.records += 1
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self.logger.info("%s : %s records were written, %s could not be serialized.",
+                         self._path, self.records, self.failed)
+
+
+def read_trace(path):
+    """ Yields the records of a trace file. A record cut off at the end of the file is ignored. """
+    with open(path, 'rb') as trace_file:
+        if trace_file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+            raise ValueError("{0} is not an event trace".format(path))
+        while True:
+            header = trace_file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            kind, source, timestamp, length = RECORD_HEADER.unpack(header)
+            data = trace_file.read(length)
+            if len(data) < length:
+                return
+            payload = pickle.loads(data)
+            if kind == CALL:
+                name, method, args, kwargs = payload
+            else:
+                name, kwargs = payload
+                method, args = None, ()
+            yield TraceRecord(kind, source, timestamp, name, method, args, kwargs)
+
+
+class TraceReplayer(object):
+    """ Feeds the inputs of a trace into an actor graph.
+
+    actors maps the actor names of the trace to the actors of the graph (e.g. the Carriage, the
+    StorageRack, the services and the station of a StationApp built on a simulated RevPi). By default
+    only the inputs are replayed, the graph produces its reactions and timeouts itself. speed scales the
+    recorded time between the inputs, None replays as fast as possible.
+
+    The input edges of a sensor are written to its input object instead, if inputs maps the sensor's name to
+    it and edges maps the eventID of the edge to the input value: the driver calls the registered edge
+    functions and the process image stays consistent with the events, e.g. for an update of the sensor.
+    """
+
+    def __init__(self, actors, sources=(SOURCE_INPUT,), speed=None, inputs=None, edges=None):
+        self.actors = actors
+        self.sources = sources
+        self.speed = speed
+        self.inputs = inputs or dict()      # actor name -> input object of the RevPi driver
+        self.edges = edges or dict()        # eventID of an input edge -> value of the input
+        self.replayed = 0
+        self.skipped = 0
+        self.unknown = dict()       # actor name -> number of records without an actor
+        self.logger = logging.getLogger("TraceReplayer")
+
+    def replay(self, records):
+        started = time.monotonic()
+        first_timestamp = None
+        for record in records:
+            if record.kind != CALL or record.source not in self.sources:
+                self.skipped += 1
+                continue
+            actor = self.actors.get(record.name)
+            if actor is None:
+                self.unknown[record.name] = self.unknown.get(record.name, 0) + 1
+                continue
+
+            if self.speed:
+                if first_timestamp is None:
+                    first_timestamp = record.timestamp
+                delay = (record.timestamp - first_timestamp) / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+            if not self._write_input(record):
+                getattr(actor, record.method)(*record.args, **record.kwargs)
+            self.replayed += 1
+
+        if self.unknown:
+            self.logger.warning("Records of unknown actors were skipped: %s", self.unknown)
+        return time.monotonic() - started
+
+    def _write_input(self, record):
+        inputobj = self.inputs.get(record.name)
+        if inputobj is None:
+            return False
+        eventID = getattr(record.kwargs.get("event"), "eventID", None)
+        if eventID not in self.edges:
+            return False
+        inputobj.value = self.edges[eventID]
+        return True
+
+    def replay_file(self, path):
+        return self.replay(read_trace(path))
+
+
+def after_start(records):
+    """ Drops the calls made while the station was built, a new station makes them itself. The active
+        objects are started at the end of the build, the first record of an actor marks the start. """
+    started = False
+    for record in records:
+        started = started or record.source != SOURCE_INPUT
+        if started:
+            yield record
+
+
+def replay_station(path, speed=1.0, settle=2.0, record=None):
+    """ Replays the inputs of a trace into a StationApp on the simulated RevPi process image.
+
+    The trace is the only source of inputs: the physics models of SIMULATION_CONFIG only set the initial
+    process image, the script is switched off and the input edges of the trace are written to the simulated
+    inputs. The monitoring timers run in wall clock time, a speed above the recorded one can let timeouts of
+    the station expire later than in the recording. record is the file of a trace of the replay, e.g. to
+    compare it with the recorded one. AZ3 has no simulated process image (utils/revpi_sim.py), its traces
+    can only be replayed into actors with TraceReplayer.
+    """
+    import config
+    from utils import revpi_sim
+
+    config.SIMULATION_CONFIG['enabled'] = True
+    config.RUNTIME_CONFIG['eventTrace'] = record
+    import main as station
+    from communication import events
+
+    revpi_sim.set_default_simulation(dict(config.SIMULATION_CONFIG, script=[]))
+    app = station.StationApp(config.STATION_CONFIG['stationName'])
+    del app.revpiioDriver.models[:]
+
+    actors = {actor.name: actor for actor in vars(app).values()
+              if hasattr(actor, 'handle_event') and isinstance(getattr(actor, 'name', None), str)}
+    inputs = {name: actor.inputobj for name, actor in actors.items() if hasattr(actor, 'inputobj')}
+    edges = {events.SimpleSensorInputEvents.PosEdge: True, events.SimpleSensorInputEvents.NegEdge: False}
+    replayer = TraceReplayer(actors, speed=speed, inputs=inputs, edges=edges)
+
+    state = app.server.nodes.objects.get_child(["2:StateMachine", "2:StationState"])
+    app.revpiioDriver.mainloop(blocking=False)
+    try:
+        duration = replayer.replay(after_start(read_trace(path)))
+        time.sleep(settle)
+        print("{0} inputs were replayed in {1:.1f} s, {2} records were skipped, the station is {3}.".format(
+            replayer.replayed, duration, replayer.skipped, state.get_value()))
+        if replayer.unknown:
+            print("Records of unknown actors: {0}".format(replayer.unknown))
+    finally:
+        app.revpiioDriver.exit()
+        app.shutdown()
+
+
+if __name__ == '__main__':
+    if sys.argv[1] == 'replay':
+        replay_station(sys.argv[2], speed=float(sys.argv[3]) if len(sys.argv) > 3 else 1.0)
+    else:
+        for trace_record in read_trace(sys.argv[1]):
+            print(trace_record)
@@ -0,0 +1,314 @@
+""" Simulated RevPi process image
+
+A drop-in for the parts of revpimodio2 the stations use, to run a station on a workstation without hardware:
+
+    from utils import revpi_sim as revpimodio2
+    revpimodio2.set_default_simulation(config.SIMULATION_CONFIG)
+    driver = revpimodio2.RevPiModIO(autorefresh=True)
+
+    driver.io['input1'].value, driver.io.input1.get_value(), driver.io.output4.set_value(True)
+    driver.io.input1.reg_event(callback, edge=revpimodio2.RISING)
+    driver.mainloop(blocking=False), driver.exitsignal, driver.handlesignalend(cleanup), driver.exit()
+
+The IOs are created on first access: names like InputValue_1, OutputValue_1 and PWM_R are analog (0), all
+others are digital (False). The mainloop thread advances the simulated time by one cycle time per cycle,
+steps the physics models (motor driven axes with position sensors, force ramps), applies the scripted input
+changes and calls the registered callbacks of the inputs which have changed, like the real event system.
+speed is the number of simulated seconds per second, None runs the cycles as fast as possible. The
+monitoring timers of the station keep running in wall clock time.
+
+Without the mainloop thread, run_for(seconds) steps the simulation synchronously, e.g. in a benchmark.
+"""
+
+import time
+import signal
+import threading
+import logging
+
+# edge constants of revpimodio2
+RISING = 31
+FALLING = 32
+BOTH = 33
+
+ANALOG_PREFIXES = ('InputValue', 'OutputValue', 'PWM', 'AnalogInput', 'AnalogOutput')
+
+_default_simulation = None
+
+
+def set_default_simulation(simulation_config):
+    """ RevPiModIO objects created after this call are built from the given simulation config, see
+        SIMULATION_CONFIG of the stations. None: no physics models, all inputs keep their values. """
+    global _default_simulation
+    _default_simulation = simulation_config
+
+
+class SimIO(object):
+    """ One value of the process image """
+
+    def __init__(self, name, value):
+        self._name = name
+        self._value = value
+        self._callbacks = []        # (func, edge)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, new_value):
+        self._value = new_value
+
+    def get_value(self):
+        return self._value
+
+    def set_value(self, value):
+        self._value = value
+
+    def reg_event(self, func, delay=0, edge=BOTH, as_thread=False, prefire=False):
+        """ func(ioname, iovalue) is called in the mainloop thread on the given edge. delay and as_thread are
+            not simulated. """
+        if not callable(func):
+            raise ValueError("The event function must be callable")
+        if (func, edge) in self._callbacks:
+            raise RuntimeError("The function is already registered for {0}".format(self._name))
+        self._callbacks.append((func, edge))
+        if prefire and self._value:
+            func(self._name, self._value)
+
+    def unreg_event(self, func=None, edge=None):
+        self._callbacks = [(f, e) for f, e in self._callbacks
+                           if not ((func is None or f == func) and (edge is None or e == edge))]
+
+    def _fire(self, old_value):
+        if not self._callbacks:
+            return
+        rising = bool(self._value) and not bool(old_value)
+        falling = bool(old_value) and not bool(self._value)
+        for func, edge in self._callbacks:
+            if edge == BOTH or (edge == RISING and rising) or (edge == FALLING and falling):
+                func(self._name, self._value)
+
+    def __bool__(self):
+        return bool(self._value)
+
+    def __repr__(self):
+        return "<SimIO {0}={1}>".format(self._name, self._value)
+
+
+class SimIOList(object):
+    """ io['name'] and io.name access to the IOs, unknown names are created on first access """
+
+    def __init__(self):
+        self._ios = dict()
+
+    def __getitem__(self, name):
+        io = self._ios.get(name)
+        if io is None:
+            io = SimIO(name, 0 if name.startswith(ANALOG_PREFIXES) else False)
+            self._ios[name] = io
+        return io
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self[name]
+
+    def __contains__(self, name):
+        return name in self._ios
+
+    def __iter__(self):
+        return iter(list(self._ios.values()))
+
+
+class LinearAxis(object):
+    """ A carriage or a press moved by a motor between position 0.0 and 1.0.
+
+    forward and backward are the names of the motor outputs which increase and decrease the position,
+    travel_time is the time in seconds for the full length. sensors maps input names to
+    (start, end, value): the input has the value while the position is within [start, end], else the
+    inverted value, e.g. (0.0, 0.02, False) for a normally closed end position sensor.
+    """
+
+    def __init__(self, name, forward, backward, travel_time, position=0.0, sensors=None):
+        self.name = name
+        self.forward = forward
+        self.backward = backward
+        self.speed = 1.0 / travel_time
+        self.position = position
+        self.sensors = sensors if sensors is not None else dict()
+
+    def step(self, io, dt):
+        direction = bool(io[self.forward].value) - bool(io[self.backward].value)
+        if direction:
+            self.position = min(1.0, max(0.0, self.position + direction * self.speed * dt))
+        for input_name, (start, end, value) in self.sensors.items():
+            io[input_name].value = value if start <= self.position <= end else not value
+
+
+class ForceRamp(object):
+    """ Analog force input of an axis: 0 until the position reaches contact, then stiffness per unit of
+        position, limited to maximum """
+
+    def __init__(self, axis, input, contact, stiffness, maximum=None):
+        self.axis = axis
+        self.input = input
+        self.contact = contact
+        self.stiffness = stiffness
+        self.maximum = maximum
+
+    def step(self, io, dt):
+        force = max(0.0, self.axis.position - self.contact) * self.stiffness
+        if self.maximum is not None:
+            force = min(force, self.maximum)
+        io[self.input].value = int(round(force))
+
+
+class RevPiModIO(object):
+    """ Simulated revpimodio2.RevPiModIO """
+
+    def __init__(self, autorefresh=False, monitoring=False, syncoutputs=True, simulation=None, **kwargs):
+        self.io = SimIOList()
+        self.core = SimIOList()
+        self.exitsignal = threading.Event()
+        self._cycletime = 20            # ms, the default of revpimodio2
+        self._thread = None
+        self._cleanupfunc = None
+        self.logger = logging.getLogger("RevPiSim")
+
+        if simulation is None:
+            simulation = _default_simulation if _default_simulation is not None else dict()
+        self.speed = simulation.get('speed', 1.0)
+        self.sim_time = 0.0
+        self.cycles = 0
+
+        for name, value in simulation.get('inputs', dict()).items():
+            self.io[name].value = value
+
+        self.axes = dict()
+        self.models = []
+        for axis in simulation.get('axes', ()):
+            self.add_model(LinearAxis(axis['name'], axis['forward'], axis['backward'], axis['travelTime'],
+                                      position=axis.get('position', 0.0), sensors=axis.get('sensors')))
+        for ramp in simulation.get('forceRamps', ()):
+            self.add_model(ForceRamp(self.axes[ramp['axis']], ramp['input'], ramp['contact'], ramp['stiffness'],
+                                     maximum=ramp.get('maximum')))
+
+        self._script = []               # (simulated time, io name, value), sorted by time
+        for at, name, value in simulation.get('script', ()):
+            self.schedule(at, name, value)
+
+        # the inputs are consistent with the models before the first cycle, like a read process image
+        for model in self.models:
+            model.step(self.io, 0.0)
+        self._snapshot = self._values()
+
+    @property
+    def cycletime(self):
+        return self._cycletime
+
+    @cycletime.setter
+    def cycletime(self, milliseconds):
+        if milliseconds <= 0:
+            raise ValueError("The cycle time must be greater than zero")
+        self._cycletime = milliseconds
+
+    def add_model(self, model):
+        """ A model has a step(io, dt) method which is called every cycle """
+        if isinstance(model, LinearAxis):
+            self.axes[model.name] = model
+        self.models.append(model)
+
+    def schedule(self, at, name, value):
+        """ Sets the IO to the value when the simulated time reaches at seconds """
+        entry = (at, name, value)
+        position = len(self._script)
+        while position and self._script[position - 1][0] > at:
+            position -= 1
+        self._script.insert(position, entry)
+
+    def _values(self):
+        return {io.name: io.value for io in self.io}
+
+    def cycle(self):
+        """ One cycle of the process image: models, script and the events of the changed inputs """
+        dt = self._cycletime / 1000.0
+        self.sim_time += dt
+        self.cycles += 1
+        for model in self.models:
+            model.step(self.io, dt)
+        while self._script and self._script[0][0] <= self.sim_time:
+            at, name, value = self._script.pop(0)
+            self.io[name].value = value
+
+        values = self._values()
+        previous = self._snapshot
+        self._snapshot = values
+        for name, value in values.items():
+            old_value = previous.get(name, value)
+            if value != old_value:
+                try:
+                    self.io[name]._fire(old_value)
+                except Exception:
+                    self.logger.exception("The event function of %s has failed.", name)
+
+    def run_for(self, seconds):
+        """ Runs the cycles of the given simulated time in the calling thread """
+        if self._thread is not None:
+            raise RuntimeError("The mainloop is running")
+        end = self.sim_time + seconds
+        while self.sim_time < end and not self.exitsignal.is_set():
+            self.cycle()
+
+    def mainloop(self, blocking=True):
+        if self._thread is not None:
+            raise RuntimeError("The mainloop is already running")
+        self.exitsignal.clear()
+        if blocking:
+            self._run()
+        else:
+            self._thread = threading.Thread(target=self._run, name="RevPiSimMainloop", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        self.logger.info("Simulated process image: cycle time %s ms, speed %s", self._cycletime, self.speed)
+        next_time = time.monotonic()
+        while not self.exitsignal.is_set():
+            self.cycle()
+            if self.speed:
+                next_time += self._cycletime / 1000.0 / self.speed
+                delay = next_time - time.monotonic()
+                if delay > 0:
+                    self.exitsignal.wait(delay)
+                else:
+                    next_time = time.monotonic()
+
+    def handlesignalend(self, cleanupfunc=None):
+        """ SIGINT and SIGTERM call cleanupfunc and end the mainloop """
+        self._cleanupfunc = cleanupfunc
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self._signal_end)
+            signal.signal(signal.SIGTERM, self._signal_end)
+
+    def _signal_end(self, signum, frame):
+        if self._cleanupfunc is not None:
+            self._cleanupfunc()
+        self.exit()
+
+    def exit(self, full=True):
+        self.exitsignal.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def cleanup(self):
+        self.exit()
+
+    def readprocimg(self, device=None):
+        return True
+
+    def writeprocimg(self, device=None):
+        return True
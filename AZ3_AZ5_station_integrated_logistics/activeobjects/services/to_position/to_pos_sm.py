@@ -1,6 +1,7 @@
 import abc
 from communication import events
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 import config
 
 
@@ -375,6 +376,8 @@ class ToPosStateMachine(object):
 
         self._current_state = self._waitforjob_state
 
+        self._dispatch_table = self._build_dispatch_table()
+
         self._current_service_user = 0
 
     # properties
@@ -433,77 +436,35 @@ class ToPosStateMachine(object):
             self._current_state = state
             self._current_state.enter_action()
 
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._toposition_service.logger)
 
-        self._toposition_service.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:  # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender.lower().find("rfid") != -1:
-                sender = "rfid"
-            elif sender.lower().find("blinker") != -1:
-                sender = "blinker"
-
-            if sender == "rfid":
-                if topic == "Value":
-                    if value:
-                        self._current_state.in_position()
-                    else:
-                        self._current_state.out_of_position()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "StatusNOK":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                    elif value == "Initialized":
-                        pass
-            elif sender == "blinker":
-                if topic == "Value":
-                    if value:
-                        pass
-                    else:
-                        self._current_state.blinking_done()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-            elif topic == "StationState" and value == "Error":
-                self._current_state.error()
+        reader = self._toposition_service.sensorPos.name
+        table.flag(reader, "Value", "in_position", "out_of_position")
+        table.message(reader, "State", "Error", "error")
+        table.message(reader, "State", "StatusNOK", "error")
+        table.message(reader, "State", "NotInitialized", None)
+        table.message(reader, "State", "Initialized", None)
 
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.to_position()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
\ No newline at end of file
+        blinker = self._toposition_service.blinker.name
+        table.flag(blinker, "Value", None, "blinking_done")
+        table.message(blinker, "State", "Error", "error")
+        table.message(blinker, "State", "NotInitialized", "error")
+        table.message(blinker, "State", "Initialized", None)
+
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", ANY, None)
+        table.message(ANY, "StationState", "Error", "error")
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _execute(self, event):
+        self._current_state.to_position()
+        self._current_service_user = event.service_index
+
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
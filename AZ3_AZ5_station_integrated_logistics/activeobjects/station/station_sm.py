@@ -1,6 +1,7 @@
 import abc, time
 from communication import events
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 
 class StationState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Station SM """
@@ -1079,6 +1080,9 @@ class StationStateMachine(object):
 
         self.init_required = False  # to show that an estop has happened and init is needed
 
+        self._done_events = {0: "initialize_done", 1: "service1_done", 2: "service2_done", 3: "service3_done"}
+        self._dispatch_table = self._build_dispatch_table()
+
     # properties
     @property
     def current_state(self):
@@ -1180,83 +1184,53 @@ class StationStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._station.name)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._station.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "RfidReader1" and topic == "State":
-                if value == "StatusNOK":
-                    self._station.posled1.handle_event(event=self.red_event)
-                    self._current_state.estop()
-                else:
-                    self._station.posled1.handle_event(event=self.ledoff_event)
-                    self._current_state.estop_ok()
-
-            elif sender == "RfidReader2" and topic == "State":
-                if value == "StatusNOK":
-                    self._station.posled2.handle_event(event=self.red_event)
-                    self._current_state.estop()
-                else:
-                    self._station.posled2.handle_event(event=self.ledoff_event)
-                    self._current_state.estop_ok()
-
-            elif sender == "RfidReader3" and topic == "State":
-                if value == "StatusNOK":
-                    self._station.posled3.handle_event(event=self.red_event)
-                    self._current_state.estop()
-                else:
-                    self._station.posled3.handle_event(event=self.ledoff_event)
-                    self._current_state.estop_ok()
-
-        except KeyError:
-            event = kwargs["event"]
-
-            if event.eventID == events.StationInputEvents.Initialize:  # this a part of the service generic interface
-                self._current_state.initialize()
-            elif event.eventID == events.StationInputEvents.ToPosition1:
-                self._current_state.service1()
-            elif event.eventID == events.StationInputEvents.ToPosition2:
-                self._current_state.service2()
-            elif event.eventID == events.StationInputEvents.ToPosition3:
-                self._current_state.service3()
-            elif event.eventID == events.StationInputEvents.Ack:
-                self._current_state.acknowledge()
-                self.ack_error()
-                self.ack_message()
-            elif event.eventID == events.StationInputEvents.Done:
-                if event.service_index == 0:
-                    self._current_state.initialize_done()
-                elif event.service_index == 1:
-                    self._current_state.service1_done()
-                elif event.service_index == 2:
-                    self._current_state.service2_done()
-                elif event.service_index == 3:
-                    self._current_state.service3_done()
-                elif event.service_index == 4:
-                    pass
-                elif event.service_index == 5:
-                    pass
-                elif event.service_index == 6:
-                    pass
-
-            elif event.eventID == events.StationInputEvents.Error:
-                if event.init_required:
-                    self.init_required = True
-                self._current_state.error()
-
-            elif event.eventID == events.StationInputEvents.NoConn:
-                self._current_state.noconn()
-            elif event.eventID == events.StationInputEvents.ConnOk:
-                self._current_state.conn_ok()
-
-            elif event.eventID == events.StationInputEvents.NoEvent:
-                self._station.logger.debug("Empty event : %s", event)
-            else:
-                self._station.logger.debug("Unknown event : %s", event)
-
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._station.logger)
+
+        # a reader which isn't ok stops the station like an emergency stop, its position LED shows the state
+        for reader, posled in (("RfidReader1", self._station.posled1),
+                               ("RfidReader2", self._station.posled2),
+                               ("RfidReader3", self._station.posled3)):
+            table.message(reader, "State", "StatusNOK", self._reader_state(posled, self.red_event, "estop"))
+            table.message(reader, "State", ANY, self._reader_state(posled, self.ledoff_event, "estop_ok"))
+
+        table.event(events.StationInputEvents.Initialize, "initialize")   # this a part of the service generic interface
+        table.event(events.StationInputEvents.ToPosition1, "service1")
+        table.event(events.StationInputEvents.ToPosition2, "service2")
+        table.event(events.StationInputEvents.ToPosition3, "service3")
+        table.event(events.StationInputEvents.Ack, self._acknowledge)
+        table.event(events.StationInputEvents.Done, self._service_done)
+        table.event(events.StationInputEvents.Error, self._error)
+        table.event(events.StationInputEvents.NoConn, "noconn")
+        table.event(events.StationInputEvents.ConnOk, "conn_ok")
+        table.event(events.StationInputEvents.NoEvent, self._no_event)
+        return table
+
+    def _reader_state(self, posled, led_event, entry):
+        def reader_state(value):
+            posled.handle_event(event=led_event)
+            getattr(self._current_state, entry)()
+        reader_state.__name__ = entry
+        return reader_state
+
+    def _acknowledge(self, event):
+        self._current_state.acknowledge()
+        self.ack_error()
+        self.ack_message()
+
+    def _service_done(self, event):
+        # service index -> done event of the state, the services 4 to 6 are not used
+        done = self._done_events.get(event.service_index)
+        if done is not None:
+            getattr(self._current_state, done)()
+
+    def _error(self, event):
+        if event.init_required:
+            self.init_required = True
+        self._current_state.error()
+
+    def _no_event(self, event):
+        self._station.logger.debug("Empty event : %s", event)
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
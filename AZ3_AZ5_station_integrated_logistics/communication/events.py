@@ -1,8 +1,58 @@
+""" Events of the active objects
 
+The string constants of the *Events classes are interned into EventIDs when the classes are created: equal
+strings get the same small int in all classes (e.g. every Ack), so the IDs compare as ints and still print as
+their strings. The event classes share their ID class and keep their attributes in __slots__.
+"""
+
+_event_names = []           # event ID -> string
+_event_ids = dict()         # string -> event ID
+
+
+class EventID(int):
+    """ Interned event ID, prints as the string it was interned from """
+    __slots__ = ()
+
+    def __str__(self):
+        return _event_names[self]
+
+    __repr__ = __str__
+
+    def __reduce__(self):
+        # pickled as the string (e.g. an event trace), the numbers depend on the order of the interning
+        return intern_event_id, (_event_names[self],)
+
+
+def intern_event_id(name):
+    """ The EventID of a string """
+    event_id = _event_ids.get(name)
+    if event_id is None:
+        event_id = EventID(len(_event_names))
+        _event_names.append(name)
+        _event_ids[name] = event_id
+    return event_id
+
+
+class EventIDsMeta(type):
+    """ Interns the string constants of an event ID class, the IDs are read-only afterwards """
+
+    def __new__(mcs, name, bases, namespace):
+        for key, value in list(namespace.items()):
+            if not key.startswith('_') and isinstance(value, str):
+                namespace[key] = intern_event_id(value)
+        return super(EventIDsMeta, mcs).__new__(mcs, name, bases, namespace)
+
+    def __setattr__(cls, key, value):
+        raise AttributeError("The event IDs of {0} are read-only".format(cls.__name__))
+
+
+class EventIDs(object, metaclass=EventIDsMeta):
+    """ Base class of the event ID classes """
 
 
 class SimpleEventBaseClass(object):
     """ Simple event class """
+    __slots__ = ('eventID', 'sender')
 
     def __init__(self, eventID, sender):
         self.eventID = eventID
@@ -11,26 +61,8 @@ class SimpleEventBaseClass(object):
     def __repr__(self):
         return str(self.eventID) + ',' + str(self.sender)
 
-    @property
-    def eventID(self):
-        return self._eventID
-
-    @eventID.setter
-    def eventID(self, new_eventID):
-        # perform some checking
-        self._eventID = new_eventID
 
-    @property
-    def sender(self):
-        return self._sender
-
-    @sender.setter
-    def sender(self, new_sender):
-        # perform some checking
-        self._sender = new_sender
-
-
-class BaseInputEvents(object):
+class BaseInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     Ack = 'ack'
@@ -41,21 +73,11 @@ class BaseInputEvents(object):
 
 class BaseInputEvent(SimpleEventBaseClass):
     """ Base events class """
-
-    def __init__(self, eventID, sender):
-        super(BaseInputEvent, self).__init__(eventID, sender)
-        self._eventIDs = BaseInputEvents()
-        print("An event object {0}:{1} was created.".format(self.sender, self.__class__.__name__))
-
-    def __del__(self):
-        print("An event object {0}:{1} was deleted.".format(self.sender, self.__class__.__name__))
-
-    @property
-    def eventIDs(self):
-        return self._eventIDs
+    __slots__ = ()
+    eventIDs = BaseInputEvents
 
 
-class SimpleSensorInputEvents(object):
+class SimpleSensorInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     NegEdge = 'neg_edge'
@@ -68,21 +90,11 @@ class SimpleSensorInputEvents(object):
 
 class SimpleSensorInputEvent(SimpleEventBaseClass):
     """ Presence sensor events class """
+    __slots__ = ()
+    eventIDs = SimpleSensorInputEvents
 
-    def __init__(self, eventID, sender):
-        super(SimpleSensorInputEvent, self).__init__(eventID, sender)
-        self._eventIDs = SimpleSensorInputEvents()
-        print("An event object {0}:{1} was created.".format(self.sender, self.__class__.__name__))
-
-    def __del__(self):
-        print("An event object {0}:{1} was deleted.".format(self.sender, self.__class__.__name__))
 
-    @property
-    def eventIDs(self):
-        return self._eventIDs
-
-
-class ComplexSensorEvents(object):
+class ComplexSensorEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     NegEdge = 'neg_edge'
@@ -98,21 +110,11 @@ class ComplexSensorEvents(object):
 
 class ComplexSensorEvent(SimpleEventBaseClass):
     """ Complex sensor events class """
+    __slots__ = ()
+    eventIDs = ComplexSensorEvents
 
-    def __init__(self, eventID, sender):
-        super(ComplexSensorEvent, self).__init__(eventID, sender)
-        self._eventIDs = ComplexSensorEvents()
-        print("An event object {0}:{1} was created.".format(self.sender, self.__class__.__name__))
 
-    def __del__(self):
-        print("An event object {0}:{1} was deleted.".format(self.sender, self.__class__.__name__))
-
-    @property
-    def eventIDs(self):
-        return self._eventIDs
-
-
-class SimpleLEDInputEvents(object):
+class SimpleLEDInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     LedOn = 'led_on'
@@ -125,17 +127,11 @@ class SimpleLEDInputEvents(object):
 
 class SimpleLEDInputEvent(SimpleEventBaseClass):
     """ Simple LED events class """
-
-    def __init__(self, eventID, sender):
-        super(SimpleLEDInputEvent, self).__init__(eventID, sender)
-        self._eventIDs = SimpleLEDInputEvents()
-
-    @property
-    def eventIDs(self):
-        return self._eventIDs
+    __slots__ = ()
+    eventIDs = SimpleLEDInputEvents
 
 
-class RGBLEDInputEvents(object):
+class RGBLEDInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     Red = 'red'
@@ -152,21 +148,12 @@ class RGBLEDInputEvents(object):
 
 class RGBLEDInputEvent(SimpleEventBaseClass):
     """ RGB LED events class """
+    eventIDs = RGBLEDInputEvents
 
     def __init__(self, eventID, sender, parameters_list=None):
         super(RGBLEDInputEvent, self).__init__(eventID, sender)
-        self._eventIDs = RGBLEDInputEvents()
         self.rgb_colors = dict()
         self.parameters_list = parameters_list
-        print("An event object {0}:{1} was created.".format(self.sender, self.__class__.__name__))
-
-    def __del__(self):
-        print("An event object {0}:{1} was deleted.".format(self.sender, self.__class__.__name__))
-
-
-    @property
-    def eventIDs(self):
-        return self._eventIDs
 
     @property
     def parameters_list(self):
@@ -198,7 +185,7 @@ class RGBLEDInputEvent(SimpleEventBaseClass):
         self._parameters_list = new_parameters_list
 
 
-class BlinkerEvents(object):
+class BlinkerEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     Start = 'start'
@@ -212,10 +199,10 @@ class BlinkerEvents(object):
 
 class BlinkerEvent(SimpleEventBaseClass):
     """ Blinker event class """
+    eventIDs = BlinkerEvents
 
     def __init__(self, eventID, sender, parameters_list=None):
         super(BlinkerEvent, self).__init__(eventID, sender)
-        self._eventIDs = BlinkerEvents()
         self._blinker_parameters = dict()
         self.parameters_list = parameters_list
 
@@ -229,10 +216,6 @@ class BlinkerEvent(SimpleEventBaseClass):
                + ', offtime:' + str(self._blinker_parameters["offtime"]) \
                + ', blinks:' + str(self._blinker_parameters["blinks"])
 
-    @property
-    def eventIDs(self):
-        return self._eventIDs
-
     @property
     def parameters_list(self):
         return self._parameters_list
@@ -260,6 +243,7 @@ class BlinkerEvent(SimpleEventBaseClass):
 
 class ServiceEventBaseClass(object):
     """ Service events base class """
+    __slots__ = ('eventID', 'sender', 'service_index', '_parameters_list')
 
     def __init__(self, eventID, sender, service_index=None, parameters_list=None):
         self.eventID = eventID
@@ -270,37 +254,10 @@ class ServiceEventBaseClass(object):
     def __repr__(self):
         return str(self.eventID) + ',' + str(self.sender) + ',' + str(self.service_index) + ',' + str(self.parameters_list)
 
-    @property
-    def eventID(self):
-        return self._eventID
-
-    @property
-    def sender(self):
-        return self._sender
-
-    @property
-    def service_index(self):
-        return self._service_index
-
     @property
     def parameters_list(self):
         return self._parameters_list
 
-    @service_index.setter
-    def service_index(self, new_service_index):
-        # perform some checking
-        self._service_index = new_service_index
-
-    @eventID.setter
-    def eventID(self, new_eventID):
-        # perform some checking
-        self._eventID = new_eventID
-
-    @sender.setter
-    def sender(self, new_sender):
-        # perform some checking
-        self._sender = new_sender
-
     @parameters_list.setter
     def parameters_list(self, new_parameters_list):
         # perform some checking
@@ -310,7 +267,7 @@ class ServiceEventBaseClass(object):
             raise ValueError('parameters_list attribute should be a list')
 
 
-class GenericServiceEvents(object):
+class GenericServiceEvents(EventIDs):
     NoEvent = 'none'
     Execute = 'execute'
     Cancel = 'cancel'
@@ -322,15 +279,11 @@ class GenericServiceEvents(object):
 
 class GenericServiceEvent(ServiceEventBaseClass):
     """ Generic service events class """
+    eventIDs = GenericServiceEvents
 
     def __init__(self, eventID, sender, service_index=None, parameters_list=None):
         super(GenericServiceEvent, self).__init__(eventID, sender, service_index, parameters_list)
-        self._eventIDs = GenericServiceEvents()
         self.init_required = False
-        print("An event object {0}:{1} was created.".format(self.sender, self.__class__.__name__))
-
-    def __del__(self):
-        print("An event object {0}:{1} was deleted.".format(self.sender, self.__class__.__name__))
 
     def __repr__(self):
         return str(self.eventID) + ',' + str(self.sender) + ', init is required:' + str(self.init_required)
@@ -358,7 +311,7 @@ class GenericServiceEvent(ServiceEventBaseClass):
         self._parameters_list = new_parameters_list
 
 
-class StationInputEvents(object):
+class StationInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     ToPosition1 = 'toPosition1'
@@ -374,15 +327,5 @@ class StationInputEvents(object):
 
 class StationInputEvent(ServiceEventBaseClass):
     """ Generic service events class """
-
-    def __init__(self, eventID, sender, service_index=None, parameters_list=None):
-        super(StationInputEvent, self).__init__(eventID, sender, service_index, parameters_list)
-        self._eventIDs = StationInputEvents()
-        print("An event object {0}:{1} was created.".format(self.sender, self.__class__.__name__))
-
-    def __del__(self):
-        print("An event object {0}:{1} was deleted.".format(self.sender, self.__class__.__name__))
-
-    @property
-    def eventIDs(self):
-        return self._eventIDs
+    __slots__ = ()
+    eventIDs = StationInputEvents
@@ -1,9 +1,68 @@
 from opcua import ua, uamethod, Server
 from communication import events
+from communication.ua_writer import get_default_writer
+from communication.pubsub import positional
+from communication import address_space
+from activeobjects.station.job_batch import JobBatch, parse_jobs
 # from utils.logger import Logger
 import logging
 import os,signal
 
+# Address space of the station, built by communication.address_space
+# as long as this definition doesn't change
+ADDRESS_SPACE = {
+    'folders': (
+        "ModelManagement", "StateMachine", "Identification", "StationService", "Sensor", "Actor", "Monitoring",
+        "Maintenance",
+    ),
+    'types': (
+        ("SensorType", None, (("Name", ""), ("Id", ""), ("State", ""), ("Value", True))),
+        ("ActorType", 0, (("Name", ""), ("Id", ""), ("State", ""), ("Value", ""))),
+    ),
+    'objects': (
+        ("Sensor", "RfidReader1", "SensorType", ("RfidReader1", "-BG1", "notInitialized", "0")),
+        ("Sensor", "RfidReader2", "SensorType", ("RfidReader2", "-BG2", "notInitialized", "0")),
+        ("Sensor", "RfidReader3", "SensorType", ("RfidReader3", "-BG3", "notInitialized", "0")),
+        ("Actor", "LedStrip1", "ActorType", ("LedStrip1", "-PF1", "notInitialized", "off")),
+        ("Actor", "LedStrip2", "ActorType", ("LedStrip2", "-PF2", "notInitialized", "off")),
+        ("Actor", "LedStrip3", "ActorType", ("LedStrip3", "-PF3", "notInitialized", "off")),
+        ("Actor", "StatusLed", "ActorType", ("RgbLed", "-PF4", "notInitialized", "off")),
+    ),
+    'variables': (
+        ("ModelManagement", "StationVersionOpcuaModel", "0.1"),
+        ("ModelManagement", "StationVersionInternal", "0.1"),
+        ("StateMachine", "StationState", "initializing"),
+        ("StateMachine", "StationErrorCode", "null"),
+        ("StateMachine", "StationErrorDescription", "null"),
+        ("StateMachine", "StationMessageCode", "null"),
+        ("StateMachine", "StationMessageDescription", "null"),
+        ("StateMachine", "StationSafetyState", "noSafetySwitchAvailable"),
+        ("Identification", "StationName", "StationIntegriertLogistik"),
+        ("Identification", "StationId", "-AZ3"),
+        ("StationService", "JobBatchResult", "Idle"),
+        ("Maintenance", "StationStateMaintenance", "Starting"),
+        ("Maintenance", "InitServiceState", "NotInitialized"),
+        ("Maintenance", "ToPosition1ServiceState", "WaitForJob"),
+        ("Maintenance", "ToPosition2ServiceState", "WaitForJob"),
+        ("Maintenance", "ToPosition3ServiceState", "WaitForJob"),
+    ),
+    'methods': (
+        ("StationService", "ServiceDriveToPosition", "serviceDriveToPosition", (
+            ("Position", "UInt32", "Position (1,2,3) regarding station 1-3 from left to right"),
+         ), ("Int64",)),
+        ("StationService", "ServiceAutoInitializeStation", "serviceAutoInitializeStation", (), ("Int64",)),
+        ("StationService", "ServiceAckAllErrors", "serviceAckAllErrors", (), ("Int64",)),
+        ("StationService", "ServiceShutdownStationNow", "serviceShutdownStationNow", (), ("Int64",)),
+        ("StationService", "SubmitJobBatch", "submitJobBatch",
+         (("Jobs", "String", "JSON list of the jobs: [[service, argument, ...], ...]"),), ("Int64",)),
+        ("Maintenance", "maintenanceLedOn", "maintenanceLedOn", ("String",), ("Int64",)),
+        ("Maintenance", "maintenanceLedOff", "maintenanceLedOff", (), ("Int64",)),
+        ("Maintenance", "maintenanceBlinkerOn", "maintenanceBlinkerOn", ("String",), ("Int64",)),
+        ("Maintenance", "maintenanceBlinkerOff", "maintenanceBlinkerOff", (), ("Int64",)),
+    ),
+}
+
+
 class UAServer(object):
     def __init__(self, station, revpiobj, endpoint=None, name=None, uri=None):
 
@@ -48,148 +107,26 @@ class UAServer(object):
         self.topos_events = {1: self.topos1_event, 2: self.topos2_event,3: self.topos3_event}
 
 
-        # creating folders:
-        folder_model_development = self._server.nodes.objects.add_folder(idx, "ModelManagement")
-        folder_state_machine = self._server.nodes.objects.add_folder(idx, "StateMachine")
-        folder_ident = self._server.nodes.objects.add_folder(idx, "Identification")
-        folder_station_service = self._server.nodes.objects.add_folder(idx, "StationService")
-        folder_sensor = self._server.nodes.objects.add_folder(idx, "Sensor")
-        folder_actor = self._server.nodes.objects.add_folder(idx, "Actor")
-        # folder_monitor = self._server.nodes.objects.add_folder(idx, "Monitoring")
-        folder_maintenance = self._server.nodes.objects.add_folder(idx, "Maintenance")
-
-        # creating types:
-        sensor_type = self._server.nodes.base_object_type.add_object_type(idx, "SensorType")
-        sensor_type.add_variable(idx, "Name", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "Id", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "State", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "Value", True).set_modelling_rule(True)
-
-        actor_type = self._server.nodes.base_object_type.add_object_type(0, "ActorType")
-        actor_type.add_variable(idx, "Name", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "Id", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "State", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "Value", "").set_modelling_rule(True)
-
-        # creating objects:
-
-        # Folder Sensor:
-        sensorobject = folder_sensor.add_object(idx, "RfidReader1", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("RfidReader1")
-        sensorobjects[1].set_value("-BG1")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value("0")
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "RfidReader2", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("RfidReader2")
-        sensorobjects[1].set_value("-BG2")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value("0")
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "RfidReader3", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("RfidReader3")
-        sensorobjects[1].set_value("-BG3")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value("0")
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        # Folder Actor:
-        actorobject = folder_actor.add_object(idx, "LedStrip1", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStrip1")
-        actorobjects[1].set_value("-PF1")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "LedStrip2", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStrip2")
-        actorobjects[1].set_value("-PF2")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "LedStrip3", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStrip3")
-        actorobjects[1].set_value("-PF3")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "StatusLed", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("RgbLed")
-        actorobjects[1].set_value("-PF4")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        # create variables:
-
-        # Folder ModelManagement
-        folder_model_development.add_variable(idx, "StationVersionOpcuaModel", "0.1").set_read_only()
-        folder_model_development.add_variable(idx, "StationVersionInternal", "0.1").set_read_only()
-
-        # Folder StateMachine
-        folder_state_machine.add_variable(idx, "StationState", "initializing").set_read_only()
-        folder_state_machine.add_variable(idx, "StationErrorCode", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationErrorDescription", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationMessageCode", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationMessageDescription", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationSafetyState",
-                                          "noSafetySwitchAvailable").set_read_only()
-
-        # Folder Identification
-        folder_ident.add_variable(idx, "StationName", "StationIntegriertLogistik").set_read_only()
-        folder_ident.add_variable(idx, "StationId", "-AZ3").set_read_only()
-
-        # Folder Maintenance
-        folder_maintenance.add_variable(idx, "StationStateMaintenance", "Starting").set_read_only()
-        folder_maintenance.add_variable(idx, "InitServiceState", "NotInitialized").set_read_only()
-        folder_maintenance.add_variable(idx, "ToPosition1ServiceState", "WaitForJob").set_read_only()
-        folder_maintenance.add_variable(idx, "ToPosition2ServiceState", "WaitForJob").set_read_only()
-        folder_maintenance.add_variable(idx, "ToPosition3ServiceState", "WaitForJob").set_read_only()
-
-        # Folder Monitor
-        # no monitoring at this station
-
-        # Folder StationService: create methods
-        target_position = ua.Argument()
-        target_position.Name = "Position"
-        target_position.DataType = ua.NodeId(ua.ObjectIds.UInt32)
-        target_position.ValueRank = -1
-        target_position.ArrayDimensions = []
-        target_position.Description = ua.LocalizedText("Position (1,2,3) regarding station 1-3 from left to right")
-        folder_station_service.add_method(idx, "ServiceDriveToPosition", self.serviceDriveToPosition, [target_position], [ua.VariantType.Int64])
-
-
-        folder_station_service.add_method(idx, "ServiceAutoInitializeStation", self.serviceAutoInitializeStation, [],[ua.VariantType.Int64])
-        folder_station_service.add_method(idx, "ServiceAckAllErrors", self.serviceAckAllErrors, [],[ua.VariantType.Int64])
-        folder_station_service.add_method(idx, "ServiceShutdownStationNow", self.serviceShutdownStationNow, [],[ua.VariantType.Int64])
-
-        folder_maintenance.add_method(idx, "maintenanceLedOn", self.maintenanceLedOn,
-                                      [ua.VariantType.String], [ua.VariantType.Int64])
-        folder_maintenance.add_method(idx, "maintenanceLedOff", self.maintenanceLedOff,
-                                      [], [ua.VariantType.Int64])
-        folder_maintenance.add_method(idx, "maintenanceBlinkerOn", self.maintenanceBlinkerOn,
-                                      [ua.VariantType.String], [ua.VariantType.Int64])
-        folder_maintenance.add_method(idx, "maintenanceBlinkerOff", self.maintenanceBlinkerOff,
-                                      [], [ua.VariantType.Int64])
-
+        # creating the address space, see ADDRESS_SPACE:
+        address_space.load(self._server, idx, ADDRESS_SPACE, self, name=self._name, logger=self.logger)
+
+        # job batches of SubmitJobBatch, their progress is published in StationService/JobBatchResult
+        self._idx = idx
+        self._service_node = self._server.nodes.objects.get_child(["{0}:StationService".format(idx)])
+        services = address_space.method_arguments(ADDRESS_SPACE, "StationService")
+        del services["SubmitJobBatch"]
+        # the services which run the station -> their service active object, which has to be Ready when a batch is
+        # submitted, None: the service has no state
+        station_jobs = {
+            "ServiceDriveToPosition":       None,
+            "ServiceAutoInitializeStation": None,
+        }
+        self.job_batch = JobBatch("JobBatch", station=self._station, services=services, call_service=self.call_service,
+                                  station_jobs=station_jobs)
+        self.job_batch_ua_subscriber = UaObjectSubscriber(self._server, self._service_node)
+        self.job_batch.register_subscribers(topic="JobBatchResult", who=self.job_batch_ua_subscriber,
+                                            callback=self.job_batch_ua_subscriber.update)
+        self.job_batch.start()
 
     @property
     def server(self):
@@ -199,6 +136,24 @@ class UAServer(object):
     def name(self):
         return self._name
 
+    def call_service(self, service, arguments):
+        """ Calls a method of the StationService folder like a client, True if the service accepted the call """
+        result = self._service_node.call_method("{0}:{1}".format(self._idx, service), *arguments)
+        return result == ua.status_codes.StatusCodes.Good
+
+    @uamethod
+    def submitJobBatch(self, parent, jobs_text):
+        try:
+            jobs = parse_jobs(jobs_text)
+        except ValueError as error:
+            reason = str(error)
+        else:
+            reason = self.job_batch.submit(jobs)
+        if reason is not None:
+            self.logger.debug("Sender %s : Job batch was refused : %s", self.name, reason)
+            return ua.status_codes.StatusCodes.Bad
+        return ua.status_codes.StatusCodes.Good
+
     @uamethod
     def serviceAutoInitializeStation(self, parent):
         self._station.handle_event(event=self.init_event)
@@ -320,9 +275,10 @@ class UaObjectSubscriber(object):
     Updates the values of the UA Node
     """
 
-    def __init__(self, opcua_server, ua_node):
+    def __init__(self, opcua_server, ua_node, writer=None):
         self.opcua_server = opcua_server
         self.nodes = {}
+        self._writer = writer if writer is not None else get_default_writer()    # None: synchronous writes
         self.b_name = ua_node.get_browse_name().Name
         self._name = self.b_name
 
@@ -346,11 +302,12 @@ class UaObjectSubscriber(object):
         else:
             self.nodes[attr].set_value(getattr(self, attr))
 
-    def update(self, *args, **kwargs):
-        kwargs = kwargs
-        if "topic" not in kwargs or "value" not in kwargs:
-            raise ValueError("OPCUA server : Bad argument")
-        self.nodes[kwargs["topic"]].set_value(kwargs["value"])
+    @positional
+    def update(self, topic, value, sender=None):
+        if self._writer is not None:
+            self._writer.write(self.nodes[topic], value)
+        else:
+            self.nodes[topic].set_value(value)
 
 
 
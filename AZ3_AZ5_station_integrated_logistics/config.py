@@ -1,6 +1,6 @@
 SERVER_CONFIG = {
     'uri': 'http://basicstation.edukitv2.smartfactorykl.de',
-    'servername': 'AZ5_OPCUA_Server'
+    'servername': 'AZ5_OPCUA_Server',
 }
 
 STATION_CONFIG = {
@@ -12,10 +12,43 @@ STATION_CONFIG = {
 }
 
 DATABASE_CONFIG = {
+    'backend': 'mongodb',               # endpoint registry: 'mongodb' or 'sqlite' (a local stand-in without a database server)
     'database_url': 'mongodb://192.168.1.123:27017',
     'database_name': 'myapp',
     'database_collection': 'opcua_servers',
-    'check_connection_address': 'http://192.168.1.123:3000',
-    #''check_connection_address': 'http://216.58.192.142',  # a url to check the internet connection (is needed for mongodb)
-    'check_connection_timeout': 5
-}
\ No newline at end of file
+    'sqlite_path': 'endpoint_registry.sqlite',  # database file of the sqlite backend, relative to the station
+    'connect_timeout': 5,               # seconds until a registration attempt fails
+    'retry_delay': 1.0,                 # seconds until a failed registration is retried, doubles with every retry
+    'max_retry_delay': 60.0,            # maximum delay between the retries in seconds
+}
+
+NETWORK_CONFIG = {
+    'interfaces': ('eth0',),        # monitored network interfaces, the connection is alive while one of them is up
+    'linkEvents': True,             # True: link notifications of the kernel (rtnetlink), False: the links are polled
+    'linkPollInterval': 1.0,        # poll interval of the links in seconds, without link notifications
+    'linkDebounce': 0.05,           # seconds a changed link has to be stable until the station is notified
+}
+
+NFC_CONFIG = {
+    'readerPositions': {},          # PC/SC reader name -> position, e.g. {'ACS ACR122U PICC Interface 00 00': 1}
+    'readerNumberField': 4,         # other readers: position = 1 + the number at this field of the reader name
+}
+
+RUNTIME_CONFIG = {
+    'actorRuntime': 'thread',       # 'thread': one thread per active object, 'pool': a shared pool of worker threads,
+                                    # 'asyncio': one event loop for active objects and connection monitor
+    'actorWorkerThreads': 2,        # number of worker threads of the 'pool' runtime
+    'uaWriteWindow': 0.05,          # coalescing window of the OPC UA node writes in seconds, None: synchronous writes
+    'uaWriteMaxPending': 1000,      # nodes waiting for the OPC UA writer, updates of further nodes are dropped
+    'eventTrace': None,             # file of the event trace recording, None: no recording, replay without
+                                    # hardware: python3 -m utils.event_trace replay <file>
+    'actorStats': False,            # mailbox statistics of the active objects in the OPC UA Monitoring folder
+    'actorStatsInterval': 1.0,      # update interval of the published mailbox statistics in seconds
+}
+
+LOGGING_CONFIG = {
+    'asyncLogging': True,           # the handlers of logging.json run in a listener thread, logging never blocks
+    'logQueueSize': 10000,          # queued log records, further records are dropped and counted
+    'logSampling': {},              # logger name -> n: only every n-th DEBUG record is logged, e.g. {'Press': 10}
+    'binaryLog': None,              # file of the compact binary log (python3 -m utils.binary_log), None: no binary log
+}
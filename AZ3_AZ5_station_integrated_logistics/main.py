@@ -1,5 +1,11 @@
 import definitions
 from communication.server import UAServer, UaObjectSubscriber
+from activeobjects.actor import ActorScheduler, AsyncioScheduler, set_default_scheduler
+from communication.ua_writer import UaWriteBehind, set_default_writer
+from utils import event_trace
+from utils import actor_stats
+from utils import log_pipeline
+from communication.ua_monitoring import UaActorMonitor
 from activeobjects.sensors.nfc_sensor import NFCSensor
 from activeobjects.actuators.rgb_led import RGB_LED
 from activeobjects.actuators.blinker import Blinker
@@ -9,9 +15,9 @@ from activeobjects.services.initialization.init_service import InitService
 from activeobjects.services.interface import ServiceInterface
 from activeobjects.services.to_position.to_pos import ToPosService
 
-from utils.nfc_observer import PosReaderObserver, PosObserver
-from smartcard.ReaderMonitoring import ReaderMonitor, ReaderObserver
-from smartcard.CardMonitoring import CardMonitor, CardObserver
+from utils.nfc_observer import ReaderRegistry, PosReaderObserver, PosObserver
+from smartcard.ReaderMonitoring import ReaderMonitor
+from smartcard.CardMonitoring import CardMonitor
 
 import revpimodio2
 
@@ -19,14 +25,23 @@ import config
 import logging.config
 import json
 import socket
-from communication.server_publisher import ServerPublisher
+from communication.server_publisher import ServerPublisher, create_backend
 from communication import events, conn_monitor, network_util
+import time
 
 
 with open(definitions.LOGCONFIG_PATH, 'r') as logging_config_file:
     config_dict = json.load(logging_config_file)
 logging.config.dictConfig(config_dict)
 
+# the log handlers run in a listener thread, logging never blocks an active object
+if config.LOGGING_CONFIG['asyncLogging']:
+    log_listener = log_pipeline.install(queue_size=config.LOGGING_CONFIG['logQueueSize'],
+                                        sampling=config.LOGGING_CONFIG['logSampling'],
+                                        binary_log=config.LOGGING_CONFIG['binaryLog'])
+else:
+    log_listener = None
+
 
 class StationApp(object):
     """ Main application for the station """
@@ -35,6 +50,37 @@ class StationApp(object):
         self._name = name
         self.logger = logging.getLogger(self._name)
 
+        # active objects runtime: one thread per active object, a shared pool of worker threads or one event loop
+        self.actorRuntime = config.RUNTIME_CONFIG['actorRuntime']
+        if self.actorRuntime == 'pool':
+            self.actorScheduler = ActorScheduler(name='ActorScheduler',
+                                                 workers=config.RUNTIME_CONFIG['actorWorkerThreads'])
+        elif self.actorRuntime == 'asyncio':
+            self.actorScheduler = AsyncioScheduler(name='ActorLoop')
+        else:
+            self.actorScheduler = None
+
+        if self.actorScheduler is not None:
+            self.actorScheduler.start()
+            set_default_scheduler(self.actorScheduler)
+
+        # OPC UA nodes are written behind the publishers: unchanged values are dropped, bursts are coalesced
+        if config.RUNTIME_CONFIG['uaWriteWindow'] is not None:
+            self.uaWriter = UaWriteBehind(name='UaWriter', window=config.RUNTIME_CONFIG['uaWriteWindow'],
+                                          max_pending=config.RUNTIME_CONFIG['uaWriteMaxPending'])
+            self.uaWriter.start()
+        else:
+            self.uaWriter = None
+        set_default_writer(self.uaWriter)
+
+        # optional recording of the events of all active objects, e.g. to replay an incident without hardware
+        if config.RUNTIME_CONFIG['eventTrace'] is not None:
+            event_trace.install(event_trace.TraceRecorder(config.RUNTIME_CONFIG['eventTrace']))
+
+        # optional mailbox statistics of all active objects, published in the Monitoring folder
+        if config.RUNTIME_CONFIG['actorStats']:
+            actor_stats.install(actor_stats.StatsCollector())
+
         self.logger.debug("Building a RevPi driver...")
 
         self.revpiioDriver = revpimodio2.RevPiModIO(autorefresh=True)
@@ -42,31 +88,32 @@ class StationApp(object):
         self.connMonitor = conn_monitor.ConnMonitor(name='ConnMonitor',
                                                     logger=self.logger,
                                                     conn_alive_cb=self.conn_alive_event,
-                                                    conn_broken_cb=self.conn_broken_event)
+                                                    conn_broken_cb=self.conn_broken_event,
+                                                    loop=self.actorScheduler if self.actorRuntime == 'asyncio' else None,
+                                                    interval=config.NETWORK_CONFIG['linkPollInterval'],
+                                                    interfaces=config.NETWORK_CONFIG['interfaces'],
+                                                    debounce=config.NETWORK_CONFIG['linkDebounce'],
+                                                    link_events=config.NETWORK_CONFIG['linkEvents'])
 
         self.logger.debug("Buiding the station's active objects...")
 
         # building events ---------------------------------------------------------------
-        self.nfc_posedge = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.PosEdge,
-                                                        sender="RfidMonitor")
-        self.nfc_negedge = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.NegEdge,
-                                                        sender="RfidMonitor")
-        self.nfc_nok = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.StatusNOK,
-                                                        sender="RfidMonitor")
-        self.nfc_ok = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.StatusOK,
-                                                 sender="RfidMonitor")
         self.noconn_event = events.StationInputEvent(eventID=events.StationInputEvents.NoConn,
                                                 sender='ConnMonitor')
         self.connok_event = events.StationInputEvent(eventID=events.StationInputEvents.ConnOk,
                                                 sender='ConnMonitor')
 
         # build nfc monitor -------------------------------------------------------------
+        # the registry maps the reader names to the positions and hands the edges to the position sensors
+        self.readerRegistry = ReaderRegistry(positions=config.NFC_CONFIG['readerPositions'],
+                                             number_field=config.NFC_CONFIG['readerNumberField'],
+                                             logger=self.logger)
         self.readermonitor = ReaderMonitor()
-        self.posreaderobserver = PosReaderObserver(station_app=self)
+        self.posreaderobserver = PosReaderObserver(self.readerRegistry)
         self.readermonitor.addObserver(self.posreaderobserver)
 
         self.cardmonitor = CardMonitor()
-        self.posObserver = PosObserver(station_app=self)
+        self.posObserver = PosObserver(self.readerRegistry)
         self.cardmonitor.addObserver(self.posObserver)
 
         # sensors -----------------------------------------------------------------------
@@ -95,6 +142,9 @@ class StationApp(object):
                                          reader_monitor=self.posreaderobserver,
                                          auto_init=False)
 
+        for position, positionSensor in enumerate((self.positionSensor1, self.positionSensor2, self.positionSensor3), 1):
+            self.readerRegistry.register(position, positionSensor)
+
         # actuators (LEDs) ---------------------------------------------------------------
         self.PF1led_adapter = BlinkerLedAdapter(hw_output_red=self.revpiioDriver.io['PWM_PF1_R'],
                                                 hw_output_green=self.revpiioDriver.io['PWM_PF1_G'],
@@ -273,13 +323,14 @@ class StationApp(object):
 
 
         self.logger.debug("Building an OPCUA server: %s ", servername)
+        started = time.perf_counter()
         self.server = UAServer(endpoint=endpoint, name=servername, uri=uri, station=self.logisticStation, revpiobj=self).server
+        self.logger.info("OPCUA server %s built in %.3f s", servername, time.perf_counter() - started)
 
-        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger)
-        if self.server_publisher.check_connection():
-            self.server_publisher.publish()
-        else:
-            self.logger.info("No connection to the database. OPCUA server was not registered.")
+        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger,
+                                                backend=create_backend(config.DATABASE_CONFIG, definitions.ROOT_DIR))
+        # registers the server in the background, the station doesn't wait for the database
+        self.server_publisher.start()
 
         # setting pub-sub system ---------------------------------------------------------
         self.logger.info("Setting events pub-sub system...")
@@ -656,6 +707,14 @@ class StationApp(object):
         # starting everything ------------------------------------------------------------
         self.server.start()
         self.logger.info("OPCUA server %s at %s has started", servername, endpoint)
+
+        if actor_stats.collector is not None:
+            self.actorMonitor = UaActorMonitor('ActorMonitor', self.server.nodes.objects.get_child(["2:Monitoring"]),
+                                               actor_stats.collector,
+                                               interval=config.RUNTIME_CONFIG['actorStatsInterval'])
+            self.actorMonitor.start()
+        else:
+            self.actorMonitor = None
         self.connMonitor.start()
 
     '''def get_ip(self):
@@ -707,56 +766,25 @@ class StationApp(object):
         self.cardmonitor.deleteObserver(self.posObserver)
         self.logisticStation.stop()
         self.connMonitor.stop()
-
+        self.server_publisher.stop()
+
+        if self.actorMonitor is not None:
+            self.actorMonitor.stop()
+            for stats in actor_stats.collector.bottlenecks():
+                self.logger.info("Actor statistics: %s", stats)
+        if self.uaWriter is not None:
+            self.uaWriter.stop()
         self.server.stop()
 
-    def nfc_pos1_posedge(self):
-        if self.positionSensor1 is not None:
-            self.positionSensor1.handle_event(event=self.nfc_posedge)
-
-    def nfc_pos1_negedge(self):
-        if self.positionSensor1 is not None:
-            self.positionSensor1.handle_event(event=self.nfc_negedge)
-
-    def nfc_pos1_ok(self):
-        if self.positionSensor1 is not None:
-            self.positionSensor1.handle_event(event=self.nfc_ok)
-
-    def nfc_pos1_nok(self):
-        if self.positionSensor1 is not None:
-            self.positionSensor1.handle_event(event=self.nfc_nok)
-
-    def nfc_pos2_posedge(self):
-        if self.positionSensor2 is not None:
-            self.positionSensor2.handle_event(event=self.nfc_posedge)
-
-    def nfc_pos2_negedge(self):
-        if self.positionSensor2 is not None:
-            self.positionSensor2.handle_event(event=self.nfc_negedge)
-
-    def nfc_pos2_ok(self):
-        if self.positionSensor2 is not None:
-            self.positionSensor2.handle_event(event=self.nfc_ok)
-
-    def nfc_pos2_nok(self):
-        if self.positionSensor2 is not None:
-            self.positionSensor2.handle_event(event=self.nfc_nok)
-
-    def nfc_pos3_posedge(self):
-        if self.positionSensor3 is not None:
-            self.positionSensor3.handle_event(event=self.nfc_posedge)
-
-    def nfc_pos3_negedge(self):
-        if self.positionSensor3 is not None:
-            self.positionSensor3.handle_event(event=self.nfc_negedge)
+        if self.actorScheduler is not None:
+            self.actorScheduler.stop()
 
-    def nfc_pos3_ok(self):
-        if self.positionSensor3 is not None:
-            self.positionSensor3.handle_event(event=self.nfc_ok)
+        if event_trace.recorder is not None:
+            event_trace.recorder.close()
+            event_trace.install(None)
 
-    def nfc_pos3_nok(self):
-        if self.positionSensor3 is not None:
-            self.positionSensor3.handle_event(event=self.nfc_nok)
+        if log_listener is not None:
+            log_listener.stop()
 
     def conn_broken_event(self):
         self.logisticStation.handle_event(event=self.noconn_event)
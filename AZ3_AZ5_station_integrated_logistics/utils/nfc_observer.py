@@ -1,131 +1,162 @@
-
-from smartcard.CardMonitoring import CardMonitor, CardObserver
-from smartcard.ReaderMonitoring import ReaderMonitor, ReaderObserver
-from smartcard.util import toHexString
-from smartcard import Exceptions
-from utils import error_codes
+""" NFC reader and card observers
+
+The ReaderRegistry resolves the PC/SC name of a reader to its position once, when the reader appears, and keeps the
+mapping. The observers of the reader and card monitors only look up the position of the reader name they get and
+hand the edge to the NFC sensor of the position; no smartcard connection is created. A position is 1, 2, ...
+like the hw_input of the NFCSensor, any number of positions can be registered.
+"""
+
+import logging
+import threading
+from smartcard.CardMonitoring import CardObserver
+from smartcard.ReaderMonitoring import ReaderObserver
 from communication import events
 
+
+def reader_position(reader_name, number_field=4):
+    """ Position of a reader from the reader number in its name, e.g. 'ACS ACR122U PICC Interface 01 00' -> 2.
+        None if the name has no number at number_field. """
+    fields = reader_name.split(" ")
+    try:
+        return int(fields[number_field]) + 1
+    except (IndexError, ValueError):
+        return None
+
+
+class ReaderRegistry(object):
+    """ reader name -> position, the readers and cards present at the positions and the sensors of the positions """
+
+    def __init__(self, positions=None, number_field=4, logger=None):
+        self._configured = dict(positions) if positions else dict()     # reader name -> position, from the config
+        self._number_field = number_field
+        self.logger = logger if logger is not None else logging.getLogger("ReaderRegistry")
+
+        self._lock = threading.Lock()
+        self._positions = dict()        # reader name -> position, resolved when the reader has appeared
+        self._sensors = dict()          # position -> NFC sensor
+        self._readers = set()           # positions with a connected reader
+        self._cards = set()             # positions with a card
+
+        self.nfc_posedge = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.PosEdge, sender="RfidMonitor")
+        self.nfc_negedge = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.NegEdge, sender="RfidMonitor")
+        self.nfc_ok = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.StatusOK, sender="RfidMonitor")
+        self.nfc_nok = events.ComplexSensorEvent(eventID=events.ComplexSensorEvents.StatusNOK, sender="RfidMonitor")
+
+    def register(self, position, sensor):
+        """ The edges of the position are handed to sensor.handle_event """
+        with self._lock:
+            self._sensors[position] = sensor
+
+    def _resolve(self, reader_name):
+        position = self._positions.get(reader_name)
+        if position is None:
+            position = self._configured.get(reader_name)
+            if position is None:
+                position = reader_position(reader_name, self._number_field)
+            if position is not None:
+                self._positions[reader_name] = position
+        return position
+
+    def _dispatch(self, position, event):
+        sensor = self._sensors.get(position)
+        if sensor is not None:
+            sensor.handle_event(event=event)
+
+    def reader_added(self, reader_name):
+        with self._lock:
+            position = self._resolve(reader_name)
+            if position is not None:
+                self._readers.add(position)
+        if position is None:
+            self.logger.warning("The reader %s has no position, it is ignored.", reader_name)
+            return
+        self.logger.info("The reader is connected to the position %s", position)
+        self._dispatch(position, self.nfc_ok)
+
+    def reader_removed(self, reader_name):
+        with self._lock:
+            position = self._positions.pop(reader_name, None)
+            if position is not None:
+                self._readers.discard(position)
+                self._cards.discard(position)
+        if position is None:
+            return
+        self.logger.info("The reader at the position %s was disconnected", position)
+        self._dispatch(position, self.nfc_nok)
+
+    def card_added(self, reader_name):
+        with self._lock:
+            position = self._resolve(reader_name)
+            if position is not None:
+                self._cards.add(position)
+        if position is None:
+            return
+        self.logger.info("RFID chip is detected at position %s ", position)
+        self._dispatch(position, self.nfc_posedge)
+
+    def card_removed(self, reader_name):
+        with self._lock:
+            position = self._positions.get(reader_name)
+            if position is not None:
+                self._cards.discard(position)
+        if position is None:
+            return
+        self.logger.info("RFID chip was removed from position %s ", position)
+        self._dispatch(position, self.nfc_negedge)
+
+    def reader_active(self, position):
+        with self._lock:
+            return position in self._readers
+
+    def card_present(self, position):
+        with self._lock:
+            return position in self._cards
+
+    def active_readers(self):
+        with self._lock:
+            return sorted(self._readers)
+
+
 class PosReaderObserver(ReaderObserver):
     """ NFC-reader observer that is notified
         when readers are added/removed from the system
     """
-    def __init__(self, station_app):
-        self._station_app = station_app
-        self.addedreaders = list()
-        self.removedreaders = list()
-        self.activereaders = list()
+    def __init__(self, registry):
+        self._registry = registry
 
     def update(self, observable, actions):
-        (self.addedreaders, self.removedreaders) = actions
-
-        for reader in self.addedreaders:
-            connection = reader.createConnection()
-            reader_name = connection.getReader()
-            reader_number = int(reader_name.split(" ")[4])
-            self.activereaders.append(reader_number)
-            self._station_app.logger.info("The reader is connected to the position  %s ", reader_number)
-
-            if reader_number == 0:
-                self._station_app.nfc_pos1_ok()
-            elif reader_number == 1:
-                self._station_app.nfc_pos2_ok()
-            elif reader_number == 2:
-                self._station_app.nfc_pos3_ok()
-
-        for reader in self.removedreaders:
-            connection = reader.createConnection()
-            reader_name = connection.getReader()
-            reader_number = int(reader_name.split(" ")[4])
-            self._station_app.logger.info("The reader at the position %s was disconnected", reader_number)
-            self.activereaders.remove(reader_number)
-
-            if reader_number == 0:
-                self._station_app.nfc_pos1_nok()
-            elif reader_number == 1:
-                self._station_app.nfc_pos2_nok()
-            elif reader_number == 2:
-                self._station_app.nfc_pos3_nok()
-
-        self._station_app.logger.info("List of the actve rfid readers: %s", self.activereaders)
-
-    def check_reader(self, reader_number, cb_true, cb_false):
+        (addedreaders, removedreaders) = actions
+        for reader in addedreaders:
+            self._registry.reader_added(str(reader))
+        for reader in removedreaders:
+            self._registry.reader_removed(str(reader))
 
-        self._station_app.logger.info("List of the actve rfid readers: %s", self.activereaders)
+        self._registry.logger.info("List of the actve rfid readers: %s", self._registry.active_readers())
 
-        if (reader_number - 1) in self.activereaders:
+    def check_reader(self, reader_number, cb_true, cb_false):
+        if self._registry.reader_active(reader_number):
             cb_true()
         else:
             cb_false()
 
-        # reader_numbers = list()
-        # print("Check reader, added readers:", self.addedreaders)
-        # if self.addedreaders:
-        #     for reader in self.addedreaders:
-        #         connection = reader.createConnection()
-        #         reader_name = connection.getReader()
-        #         reader_number = int(reader_name.split(" ")[4])
-        #         reader_numbers.append(reader_number)
-        #     print("Readers numbers list:,", reader_numbers)
-        #     if (reader_number - 1) in reader_numbers:
-        #         cb_true()
-        #     else:
-        #         cb_false()
-        # else:
-        #     cb_false()
-
 
 class PosObserver(CardObserver):
     """ NFC-card observer that is notified
-        when readers are added/removed from the system
+        when cards are added/removed from the readers
     """
-    def __init__(self, station_app):
-        self._station_app = station_app
-        self.addedcards = None
-        self.removedcards = None
+    def __init__(self, registry):
+        self._registry = registry
 
     def update(self, observable, actions):
-        (self.addedcards, self.removedcards) = actions
-        for card in self.addedcards:
-            connection = card.createConnection()
-            reader_name = connection.getReader()
-            reader_number = int(reader_name.split(" ")[4])
-            self._station_app.logger.info("RFID chip is detected at position %s ", reader_number)
-
-            if reader_number == 0:
-                self._station_app.nfc_pos1_posedge()
-            elif reader_number == 1:
-                self._station_app.nfc_pos2_posedge()
-            elif reader_number == 2:
-                self._station_app.nfc_pos3_posedge()
-
-        for card in self.removedcards:
-            connection = card.createConnection()
-            reader_name = connection.getReader()
-            reader_number = int(reader_name.split(" ")[4])
-            self._station_app.logger.info("RFID chip was removed from position %s ", reader_number)
-
-            if reader_number == 0:
-                self._station_app.nfc_pos1_negedge()
-            elif reader_number == 1:
-                self._station_app.nfc_pos2_negedge()
-            elif reader_number == 2:
-                self._station_app.nfc_pos3_negedge()
+        (addedcards, removedcards) = actions
+        # the card knows the name of its reader, no connection is needed
+        for card in addedcards:
+            self._registry.card_added(card.reader)
+        for card in removedcards:
+            self._registry.card_removed(card.reader)
 
     def check_pos(self, pos_number, cb_true, cb_false):
-        reader_numbers = list()
-        if self.addedcards:
-            for card in self.addedcards:
-                connection = card.createConnection()
-                reader_name = connection.getReader()
-                reader_number = int(reader_name.split(" ")[4])
-                reader_numbers.append(reader_number)
-
-            if (pos_number-1) in reader_numbers:
-                cb_true()
-            else:
-                cb_false()
+        if self._registry.card_present(pos_number):
+            cb_true()
         else:
             cb_false()
-
-
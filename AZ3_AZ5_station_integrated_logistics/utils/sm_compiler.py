@@ -0,0 +1,354 @@
+""" Compiler of declarative state machine models
+
+A model is a plain dict, e.g. the template state machine (see utils/template_sm.py):
+
+    TEMPLATE_MODEL = {
+        'name': 'TemplateStateMachine',
+        'initial': 'State1',
+        'events': ('toState1', 'toState2', 'toStateA', 'toStateB'),
+        'states': {
+            'State1': {'transitions': {'toState2': 'State2'}},
+            'State2': {'initial': 'SubStateA',
+                       'transitions': {'toState1': 'State1'}},
+            'SubStateA': {'parent': 'State2',
+                          'transitions': {'toStateB': 'SubStateB'}},
+            'SubStateB': {'parent': 'State2',
+                          'enter': ('start_timer',), 'exit': ('stop_timer',),
+                          'transitions': {'toStateA': ('SubStateA', 'reset_counter')}},
+        },
+    }
+
+A transition is the name of the target state, a tuple (target, action, ...) or (None, action, ...) for an
+internal transition which only executes the actions. Actions, enter and exit actions are names of methods
+of the state machine class, which is derived from the compiled class:
+
+    class TemplateStateMachine(compile_state_machine(TEMPLATE_MODEL)):
+        def start_timer(self): ...
+
+Events which are not handled by a substate are handled by its enclosing state. The compiler resolves this
+once, so firing an event is a single dict lookup, events without a transition in the current state
+don't call any method and don't log anything. The simple sensors (NOSensorSM, NCSensorSM, see
+activeobjects/sensors/simple_sensor_sm.py) are compiled state machines.
+"""
+
+import logging
+
+
+class StateMachineModelError(ValueError):
+    """ The model of a state machine is inconsistent """
+    def __init__(self, name, problems):
+        super(StateMachineModelError, self).__init__("%s : %s" % (name, "; ".join(problems)))
+        self.problems = problems
+
+
+class Transition(object):
+    """ A compiled transition """
+    __slots__ = ('event', 'source', 'target', 'actions', 'paths')
+
+    def __init__(self, event, source, target, actions):
+        self.event = event
+        self.source = source        # the state which has declared the transition
+        self.target = target        # leaf state after the transition, None for internal transitions
+        self.actions = actions
+        self.paths = dict()         # current leaf state -> (states to be exited, states to be entered)
+
+
+def _parse_transition(value):
+    if value is None or isinstance(value, str):
+        return value, ()
+    return value[0], tuple(value[1:])
+
+
+def _ancestors(states, name):
+    """ The state itself and all its enclosing states, innermost first """
+    path = []
+    while name is not None:
+        path.append(name)
+        name = states[name].get('parent')
+    return path
+
+
+def _initial_leaf(states, name):
+    """ A transition to a composite state ends in its initial substate """
+    while states[name].get('initial') is not None:
+        name = states[name]['initial']
+    return name
+
+
+def validate_model(model):
+    """ Returns (errors, warnings) of the model.
+        Errors make the model unusable, warnings are unreachable states and unhandled events. """
+    errors = []
+    warnings = []
+    states = model.get('states', {})
+    events = set(model.get('events', ()))
+
+    if model.get('initial') not in states:
+        errors.append("the initial state %r is not defined" % model.get('initial'))
+
+    for name, state in states.items():
+        parent = state.get('parent')
+        if parent is not None and parent not in states:
+            errors.append("the parent %r of the state %s is not defined" % (parent, name))
+        initial = state.get('initial')
+        if initial is not None and (initial not in states or states[initial].get('parent') != name):
+            errors.append("the initial state %r of the state %s is not its substate" % (initial, name))
+        for event, value in state.get('transitions', {}).items():
+            if event not in events:
+                errors.append("the event %r of the state %s is not declared" % (event, name))
+            target, _ = _parse_transition(value)
+            if target is not None and target not in states:
+                errors.append("the target %r of the event %s in the state %s is not defined" % (target, event, name))
+
+    for name, state in states.items():
+        children = [child for child, child_state in states.items() if child_state.get('parent') == name]
+        if children and state.get('initial') is None:
+            errors.append("the composite state %s has no initial substate" % name)
+        # a cycle of parents would hang the compiler
+        seen = set()
+        while name is not None and name in states:
+            if name in seen:
+                errors.append("the state %s is its own parent" % name)
+                break
+            seen.add(name)
+            name = states[name].get('parent')
+
+    if errors:
+        return errors, warnings
+
+    # reachability: the initial state and the targets of the transitions of the reachable states
+    reachable = set()
+    pending = [_initial_leaf(states, model['initial'])]
+    while pending:
+        leaf = pending.pop()
+        path = _ancestors(states, leaf)
+        if leaf in reachable:
+            continue
+        reachable.update(path)
+        for name in path:
+            for value in states[name].get('transitions', {}).values():
+                target, _ = _parse_transition(value)
+                if target is not None:
+                    pending.append(_initial_leaf(states, target))
+
+    for name in sorted(set(states) - reachable):
+        warnings.append("the state %s is unreachable" % name)
+
+    handled = set()
+    for state in states.values():
+        handled.update(state.get('transitions', {}))
+    for event in sorted(events - handled):
+        warnings.append("the event %s is not handled in any state" % event)
+
+    return errors, warnings
+
+
+class CompiledState(object):
+    """ Base class of the generated state classes """
+    def __init__(self, context_sm, name, super_sm=None):
+        self._context_sm = context_sm
+        self._name = name
+        self._super_sm = super_sm   # super or enclosing state
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def super_sm(self):
+        return self._super_sm
+
+    @property
+    def isSubstate(self):
+        return self._super_sm is not None
+
+
+def _make_event_method(event):
+    def event_method(self):
+        self._context_sm.fire(event)
+    event_method.__name__ = event
+    return event_method
+
+
+def _make_noop_method(event):
+    def event_method(self):
+        pass
+    event_method.__name__ = event
+    return event_method
+
+
+class CompiledStateMachine(object):
+    """ Base class of the compiled state machines """
+    _model_name = None
+    _initial = None
+    _parents = {}           # state -> enclosing state
+    _state_classes = {}     # state -> generated state class
+    _tables = {}            # leaf state -> {event: Transition}
+    _enter_actions = {}     # state -> names of the enter actions
+    _exit_actions = {}
+    _checked_classes = set()
+
+    def __init__(self, logger=None):
+        self._name = self.__class__.__name__
+        self._logger = logger if logger is not None else logging.getLogger(self._name)
+        self._check_actions()
+
+        self._states = dict()
+        for name in self._state_classes:
+            self._create_state(name)
+
+        self._current_state = None
+        self._table = None
+        enter_path = []
+        name = self._initial
+        while name is not None:
+            enter_path.insert(0, name)
+            name = self._parents[name]
+        for name in enter_path:
+            self._enter(name)
+        self._set_leaf(self._initial)
+
+    def _check_actions(self):
+        cls = self.__class__
+        if cls in CompiledStateMachine._checked_classes:
+            return
+        names = set()
+        for actions in list(self._enter_actions.values()) + list(self._exit_actions.values()):
+            names.update(actions)
+        for table in self._tables.values():
+            for transition in table.values():
+                names.update(transition.actions)
+        missing = sorted(name for name in names if not callable(getattr(self, name, None)))
+        if missing:
+            raise StateMachineModelError(self._model_name, ["the action %s is not implemented" % name for name in missing])
+        CompiledStateMachine._checked_classes.add(cls)
+
+    def _create_state(self, name):
+        if name in self._states:
+            return self._states[name]
+        parent = self._parents[name]
+        super_sm = self._create_state(parent) if parent is not None else None
+        state = self._state_classes[name](self, name, super_sm=super_sm)
+        self._states[name] = state
+        return state
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def current_state(self):
+        return self._current_state
+
+    def state(self, name):
+        return self._states[name]
+
+    def handles(self, event):
+        """ True if the event causes a transition or an action in the current state """
+        return event in self._table
+
+    def fire(self, event):
+        """ Fires the event in the current state. Returns False if it is not handled there. """
+        transition = self._table.get(event)
+        if transition is None:
+            return False
+
+        if transition.target is None:
+            for action in transition.actions:
+                getattr(self, action)()
+            return True
+
+        exit_path, enter_path = transition.paths[self._current_state.name]
+        self._logger.debug("%s event in %s state : switching to state %s",
+                           event, self._current_state.name, transition.target)
+        for name in exit_path:
+            self._exit(name)
+        for action in transition.actions:
+            getattr(self, action)()
+        for name in enter_path:
+            self._enter(name)
+        self._set_leaf(transition.target)
+        return True
+
+    def _set_leaf(self, name):
+        self._current_state = self._states[name]
+        self._table = self._tables[name]
+
+    def _enter(self, name):
+        for action in self._enter_actions[name]:
+            getattr(self, action)()
+
+    def _exit(self, name):
+        for action in self._exit_actions[name]:
+            getattr(self, action)()
+
+
+def compile_state_machine(model, strict=True, logger=None):
+    """ Compiles the model into a state machine class.
+        Raises StateMachineModelError if the model has errors, or warnings in the strict mode. """
+    name = model.get('name', 'CompiledStateMachine')
+    errors, warnings = validate_model(model)
+    if strict:
+        errors = errors + warnings
+    if errors:
+        raise StateMachineModelError(name, errors)
+    if warnings:
+        logger = logger if logger is not None else logging.getLogger(name)
+        for warning in warnings:
+            logger.warning("%s : %s", name, warning)
+
+    states = model['states']
+    events = tuple(model['events'])
+    parents = {state: states[state].get('parent') for state in states}
+
+    # base class of the states: every event is a no-op
+    base_namespace = {event: _make_noop_method(event) for event in events}
+    base_class = type(name + "State", (CompiledState,), base_namespace)
+
+    # transitions declared by the states
+    declared = dict()
+    for state_name, state in states.items():
+        declared[state_name] = dict()
+        for event, value in state.get('transitions', {}).items():
+            target, actions = _parse_transition(value)
+            leaf = _initial_leaf(states, target) if target is not None else None
+            declared[state_name][event] = Transition(event, state_name, leaf, actions)
+
+    # the dispatch table of a leaf state includes the transitions of its enclosing states
+    tables = dict()
+    state_classes = dict()
+    for state_name in states:
+        table = dict()
+        for ancestor in reversed(_ancestors(states, state_name)):
+            table.update(declared[ancestor])
+        namespace = {event: _make_event_method(event) for event in table}
+        state_classes[state_name] = type(state_name, (base_class,), namespace)
+        if states[state_name].get('initial') is None:
+            tables[state_name] = table
+
+    # exit and enter paths of every transition, per leaf state it can be fired in.
+    # The states enclosing both the declaring state and the target are neither exited nor entered.
+    for state_name, transitions in declared.items():
+        for event, transition in transitions.items():
+            if transition.target is None:
+                continue
+            target, _ = _parse_transition(states[state_name]['transitions'][event])
+            domain = set(_ancestors(states, state_name)[1:]) & set(_ancestors(states, target)[1:])
+            enter_path = tuple(reversed([name for name in _ancestors(states, transition.target)
+                                         if name not in domain]))
+            for leaf, table in tables.items():
+                if table.get(event) is transition:
+                    exit_path = tuple(name for name in _ancestors(states, leaf) if name not in domain)
+                    transition.paths[leaf] = (exit_path, enter_path)
+
+    namespace = {
+        '_model_name': name,
+        '_initial': _initial_leaf(states, model['initial']),
+        '_parents': parents,
+        '_state_classes': state_classes,
+        '_tables': tables,
+        '_enter_actions': {state: tuple(states[state].get('enter', ())) for state in states},
+        '_exit_actions': {state: tuple(states[state].get('exit', ())) for state in states},
+        'events': events,
+    }
+    return type(name, (CompiledStateMachine,), namespace)
@@ -1,37 +1,338 @@
 import queue
 import threading
+import collections
+import asyncio
 from functools import wraps
 import logging
+from utils import event_trace
+from utils import actor_stats
+
+
+_default_scheduler = None
 
 
 def event_decorator(method):
     """Decorator to enqueue method calls in Actor instances. """
     @wraps(method)
     def enqueue_call(self, *args, **kwargs):
+        if event_trace.recorder is not None:
+            event_trace.recorder.record_call(self.name, method.__name__, args, kwargs)
+        if self._stats is not None:
+            self._stats.enqueue()
         args = list(args)
         args.insert(0, self)
         self._commands.put((method, args, kwargs))
     return enqueue_call
 
 
+def set_default_scheduler(scheduler):
+    """ Actors created after this call are multiplexed onto the given scheduler.
+        None restores the default behaviour: one thread per actor. """
+    global _default_scheduler
+    _default_scheduler = scheduler
+
+
+def get_default_scheduler():
+    return _default_scheduler
+
+
+class ActorScheduler(object):
+    """ A small fixed pool of worker threads shared by the mailboxes of many actors. """
+
+    def __init__(self, name="ActorScheduler", workers=2, batch_size=16):
+        if workers < 1:
+            raise ValueError("An actor scheduler needs at least one worker thread")
+        self._name = name
+        self._workers_num = workers
+        self._batch_size = batch_size
+        self._ready = queue.Queue()      # mailboxes with pending commands
+        self._workers = []
+        self.logger = logging.getLogger(name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def workers(self):
+        return tuple(self._workers)
+
+    def start(self):
+        for index in range(self._workers_num):
+            worker = threading.Thread(target=self._work,
+                                      name="{0}-{1}".format(self._name, index),
+                                      daemon=True)
+            worker.trace_source = event_trace.SOURCE_ACTOR
+            self._workers.append(worker)
+            worker.start()
+        self.logger.info("%s has been started with %s worker threads.", self._name, self._workers_num)
+
+    def stop(self):
+        for _ in self._workers:
+            self._ready.put(None)
+        self.logger.info("%s has been stopped.", self._name)
+
+    def create_mailbox(self, actor):
+        return Mailbox(actor, self)
+
+    def schedule(self, mailbox):
+        self._ready.put(mailbox)
+
+    def _work(self):
+        while True:
+            mailbox = self._ready.get()
+            if mailbox is None:
+                break
+            mailbox.run_batch(self._batch_size)
+
+
+class Mailbox(object):
+    """ Queue-like mailbox of an actor, whose commands are executed by an ActorScheduler.
+        A mailbox is handed to the scheduler at most once at a time, so the commands
+        of one actor are never executed concurrently and keep their order. """
+
+    def __init__(self, actor, scheduler):
+        self._actor = actor
+        self._scheduler = scheduler
+        self._messages = collections.deque()
+        self._lock = threading.Lock()
+        self._active = False        # set when the actor is started
+        self._scheduled = False     # set while the mailbox waits in or is run by the scheduler
+        self._failed = False
+
+    @property
+    def active(self):
+        return self._active and not self._failed
+
+    def put(self, item):
+        with self._lock:
+            self._messages.append(item)
+            if self._scheduled or not self._active:
+                return
+            self._scheduled = True
+        self._scheduler.schedule(self)
+
+    def qsize(self):
+        return len(self._messages)
+
+    def empty(self):
+        return not self._messages
+
+    def activate(self):
+        with self._lock:
+            self._active = True
+            if self._scheduled or not self._messages:
+                return
+            self._scheduled = True
+        self._scheduler.schedule(self)
+
+    def deactivate(self):
+        with self._lock:
+            self._active = False
+
+    def run_batch(self, batch_size):
+        for _ in range(batch_size):
+            with self._lock:
+                if not self._messages or not self._active:
+                    self._scheduled = False
+                    return
+                cmd, args, kwargs = self._messages.popleft()
+            try:
+                if self._actor._stats is None:
+                    cmd(*args, **kwargs)
+                else:
+                    self._actor._stats.execute(cmd, args, kwargs)
+            except Exception:
+                # the same as a dying actor thread: the actor doesn't process any command anymore
+                logging.getLogger(self._actor.name).exception("Unhandled exception, the actor has stopped.")
+                self._failed = True
+                self.deactivate()
+            if self._actor._must_stop:
+                self.deactivate()
+
+        # batch is exhausted, give the other actors a chance and queue up again
+        with self._lock:
+            if not self._messages or not self._active:
+                self._scheduled = False
+                return
+        self._scheduler.schedule(self)
+
+
+class AsyncioScheduler(object):
+    """ Runs every actor as an asyncio task consuming its own asyncio.Queue.
+        All tasks share one event loop in one thread, which can also host periodic jobs
+        (e.g. the connection monitor) so that all station logic is scheduled deterministically. """
+
+    def __init__(self, name="ActorLoop", lag_probe_interval=1.0):
+        self._name = name
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.trace_source = event_trace.SOURCE_ACTOR
+        self._lag_probe_interval = lag_probe_interval
+        self._loop_lag = 0.0
+        self._max_loop_lag = 0.0
+        self.logger = logging.getLogger(name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def loop(self):
+        return self._loop
+
+    @property
+    def loop_lag(self):
+        """ Delay of the last lag probe in seconds: how late the loop picks up a ready callback. """
+        return self._loop_lag
+
+    @property
+    def max_loop_lag(self):
+        return self._max_loop_lag
+
+    def in_loop_thread(self):
+        return threading.current_thread() is self._thread
+
+    def start(self):
+        self._thread.start()
+        if self._lag_probe_interval:
+            self.call_periodic(self._lag_probe_interval, None)
+        self.logger.info("%s has been started.", self._name)
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.logger.info("%s has been stopped.", self._name)
+
+    def create_mailbox(self, actor):
+        return AsyncMailbox(actor, self)
+
+    def call_soon(self, callback, *args):
+        if self.in_loop_thread():
+            self._loop.call_soon(callback, *args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def run_coroutine(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def call_periodic(self, interval, callback, *args):
+        """ Calls callback(*args) every interval seconds in the loop thread. Returns a future to cancel it. """
+        return self.run_coroutine(self._periodic(interval, callback, *args))
+
+    async def _periodic(self, interval, callback, *args):
+        while True:
+            expected = self._loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = self._loop.time() - expected
+            self._loop_lag = lag
+            if lag > self._max_loop_lag:
+                self._max_loop_lag = lag
+            if callback is not None:
+                try:
+                    callback(*args)
+                except Exception:
+                    self.logger.exception("%s : periodic job %s has failed.", self._name, callback)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+
+class AsyncMailbox(object):
+    """ Queue-like mailbox of an actor, consumed by an asyncio task of an AsyncioScheduler.
+        The actors are created in the main thread, but the asyncio.Queue is bound to the loop it is
+        created in (before Python 3.10), so it is created by the consuming task in the loop thread.
+        Commands put before are kept in a deque, both are only touched in the loop thread. """
+
+    def __init__(self, actor, scheduler):
+        self._actor = actor
+        self._scheduler = scheduler
+        self._pending = collections.deque()     # commands put before the queue was created
+        self._queue = None
+        self._task = None
+
+    @property
+    def active(self):
+        return self._task is not None and not self._task.done()
+
+    def put(self, item):
+        self._scheduler.call_soon(self._put, item)
+
+    def qsize(self):
+        if self._queue is None:
+            return len(self._pending)
+        return self._queue.qsize()
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def activate(self):
+        self._task = self._scheduler.run_coroutine(self._consume())
+
+    def deactivate(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _put(self, item):
+        if self._queue is None:
+            self._pending.append(item)
+        else:
+            self._queue.put_nowait(item)
+
+    async def _consume(self):
+        self._queue = asyncio.Queue()
+        while self._pending:
+            self._queue.put_nowait(self._pending.popleft())
+        while not self._actor._must_stop:
+            cmd, args, kwargs = await self._queue.get()
+            try:
+                if self._actor._stats is None:
+                    cmd(*args, **kwargs)
+                else:
+                    self._actor._stats.execute(cmd, args, kwargs)
+            except Exception:
+                logging.getLogger(self._actor.name).exception("Unhandled exception, the actor has stopped.")
+                raise
+
+
 class Actor(threading.Thread):
     """A simple implementation of the active object design pattern."""
+    trace_source = event_trace.SOURCE_ACTOR     # calls from the actor's thread are reactions of the actor graph
 
     def __init__(self, name):
         threading.Thread.__init__(self, name=name, daemon=True)
-        self._commands = queue.Queue()
+        self._scheduler = _default_scheduler
+        if self._scheduler is None:
+            self._commands = queue.Queue()
+        else:
+            self._commands = self._scheduler.create_mailbox(self)
+        # mailbox statistics, None: not measured
+        self._stats = actor_stats.collector.register(name) if actor_stats.collector is not None else None
         self._must_stop = False
 
     @event_decorator
     def stop(self):
         self._must_stop = True
 
-    def run(self):
-        while not self._must_stop:
-            cmd, args, kwargs = self._commands.get()
-            cmd(*args, **kwargs)
-
-
+    def start(self):
+        if self._scheduler is None:
+            threading.Thread.start(self)
+        else:
+            self._commands.activate()
 
+    def is_alive(self):
+        if self._scheduler is None:
+            return threading.Thread.is_alive(self)
+        return self._commands.active
 
+    @property
+    def stats(self):
+        return self._stats
 
+    def run(self):
+        while not self._must_stop:
+            cmd, args, kwargs = self._commands.get()
+            if self._stats is None:
+                cmd(*args, **kwargs)
+            else:
+                self._stats.execute(cmd, args, kwargs)
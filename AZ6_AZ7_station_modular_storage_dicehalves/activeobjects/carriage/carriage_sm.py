@@ -2,6 +2,7 @@ import abc
 from communication import events
 from utils.monitoring_timer import MonitoringTimer
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable
 import config
 
 class CarriageState(metaclass=abc.ABCMeta):
@@ -124,8 +125,8 @@ class NotInitialized(CarriageState):
         return self._super_sm
 
     def enter_action(self):
-        self._carriage.publisher.publish(topic="State", value="NotInitialized", sender=self._carriage.name)
-        self._carriage.publisher.publish(topic="CarriageState", value="NotInitialized", sender=self._carriage.name)
+        self._carriage.publisher.publish_many([("State", "NotInitialized"),
+                                               ("CarriageState", "NotInitialized")], sender=self._carriage.name)
 
     def initialize(self):
         self._carriage.logger.debug("%s event in %s state", self.initialize.__name__, self.name)
@@ -202,8 +203,8 @@ class Initialization(CarriageState):
 
     def enter_action(self):
         self._carriage.logger.debug("Entering the %s state", self.name)
-        self._carriage.publisher.publish(topic="State", value="Initializing", sender=self._carriage.name)
-        self._carriage.publisher.publish(topic="CarriageState", value="Initializing", sender=self._carriage.name)
+        self._carriage.publisher.publish_many([("State", "Initializing"),
+                                               ("CarriageState", "Initializing")], sender=self._carriage.name)
 
         # stop monitoring timers if they are alive
         if self._carriage_sm.movetofront_timeout_timer.timer_alive():
@@ -837,8 +838,8 @@ class EverythingIsInitialized(CarriageState):
 
     def enter_action(self):
         self._carriage.logger.debug("Entering the %s state", self.name)
-        self._carriage.publisher.publish(topic="State", value="Initialized", sender=self._carriage.name)
-        self._carriage.publisher.publish(topic="CarriageState", value="Initialized", sender=self._carriage.name)
+        self._carriage.publisher.publish_many([("State", "Initialized"),
+                                               ("CarriageState", "Initialized")], sender=self._carriage.name)
 
         self._carriage_sm.set_state(self._carriage_sm.outofposition_state)
 
@@ -917,8 +918,8 @@ class CheckCarriagePosition(CarriageState):
 
     def enter_action(self):
         self._carriage.logger.debug("Entering the %s state", self.name)
-        self._carriage.publisher.publish(topic="State", value="CheckCarriagePosition", sender=self._carriage.name)
-        self._carriage.publisher.publish(topic="CarriageState", value="CheckCarriagePosition", sender=self._carriage.name)
+        self._carriage.publisher.publish_many([("State", "CheckCarriagePosition"),
+                                               ("CarriageState", "CheckCarriagePosition")], sender=self._carriage.name)
 
         # stop monitoring timers if they are alive
         if self._carriage_sm.movetofront_timeout_timer.timer_alive():
@@ -1741,6 +1742,8 @@ class CarriageStateMachine(object):
         self.motor_rotccw_event = events.SimpleMotorInputEvent(eventID=events.SimpleMotorInputEvents.RotateCCW,
                                                               sender=self._carriage.name)
 
+        self._dispatch_table = self._build_dispatch_table()
+
         # state objects
         self._notinit_state = NotInitialized(self, carriage)        # rack's states instances
         self._initialization_state = Initialization(self, carriage)
@@ -1892,107 +1895,39 @@ class CarriageStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._carriage.name)
 
-    def dispatch(self, *args, **kwargs):
-        self._carriage.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "SensorCarriagePosBack":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.rack_sensor_posedge()
-                    else:
-                        self._current_state.rack_sensor_negedge()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "Initialized":
-                        self._current_state.rack_sensor_init()
-
-            elif sender == "SensorCarriagePosFront":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.front_sensor_posedge()
-                    else:
-                        self._current_state.front_sensor_negedge()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "Initialized":
-                        self._current_state.front_sensor_init()
-
-            elif sender == "MotorCarriage":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.motor_on()
-                    else:
-                        self._current_state.motor_off()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "Estop":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "Initialized":
-                        self._current_state.motor_init()
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState" and value == "Error":
-                    self._current_state.error()
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._carriage.logger)
+
+        for sensor, on_posedge, on_negedge, on_init in (
+                ("SensorCarriagePosBack", "rack_sensor_posedge", "rack_sensor_negedge", "rack_sensor_init"),
+                ("SensorCarriagePosFront", "front_sensor_posedge", "front_sensor_negedge", "front_sensor_init")):
+            table.flag(sensor, "Value", on_posedge, on_negedge)
+            table.message(sensor, "State", "Error", "error")
+            table.message(sensor, "State", "NotInitialized", None)
+            table.message(sensor, "State", "Initialized", on_init)
+
+        table.flag("MotorCarriage", "Value", "motor_on", "motor_off")
+        table.message("MotorCarriage", "State", "Error", "error")
+        table.message("MotorCarriage", "State", "Estop", "error")
+        table.message("MotorCarriage", "State", "NotInitialized", None)
+        table.message("MotorCarriage", "State", "Initialized", "motor_init")
+
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", "error")
+
+        table.event(events.CarriageEvents.Initialize, "initialize")   # this a part of the service generic interface
+        table.event(events.CarriageEvents.Ack, "acknowledge")
+        table.event(events.CarriageEvents.MoveToFrontPos, "move_to_front")
+        table.event(events.CarriageEvents.MoveToRackPos, "move_to_rack")
+        table.event(events.CarriageEvents.Stop, "stop")
+        table.event(events.CarriageEvents.Error, "error")
+        table.event(events.CarriageEvents.TimeoutToRackPos, self._timeout)
+        table.event(events.CarriageEvents.TimeoutToFrontPos, self._timeout)
+        table.event(events.CarriageEvents.Update, "update")
+        return table
+
+    def _timeout(self, event):
+        self._current_state.timeout(event=event)
 
-
-        except KeyError:
-            try:
-                event = kwargs["event"]
-
-                eventID = event.eventID
-                sender = event.sender
-
-                if eventID == self._carriage.carriage_events.eventIDs.Initialize:  # this a part of the service generic interface
-                    self._current_state.initialize()
-                elif eventID == self._carriage.carriage_events.eventIDs.Ack:
-                    self._current_state.acknowledge()
-                elif eventID == self._carriage.carriage_events.eventIDs.MoveToFrontPos:
-                    self._current_state.move_to_front()
-                elif eventID == self._carriage.carriage_events.eventIDs.MoveToRackPos:
-                    self._current_state.move_to_rack()
-                elif eventID == self._carriage.carriage_events.eventIDs.Stop:
-                    self._current_state.stop()
-                elif eventID == self._carriage.carriage_events.eventIDs.Error:
-                    self._current_state.error()
-                elif (eventID == self._carriage.carriage_events.eventIDs.TimeoutToRackPos) \
-                        or (eventID == self._carriage.carriage_events.eventIDs.TimeoutToFrontPos) :
-                    self._current_state.timeout(event=event)
-                elif eventID == self._carriage.carriage_events.eventIDs.Update:
-                    self._current_state.update()
-                else:
-                    self._carriage.logger.debug("Unknown event : %s", event)
-            except KeyError:
-                self._carriage.logger.debug("Unknown event : %s", kwargs)
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -2,6 +2,7 @@ import abc
 from communication import events
 from threading import Timer
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable
 from utils.monitoring_timer import MonitoringTimer
 import config
 
@@ -91,8 +92,8 @@ class NotInitialized(RackState):
 
     def enter_action(self):
         self._rack.rackState = "NotInitialized"
-        self._rack.publisher.publish(topic="State", value="NotInitialized", sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value=self._rack.rackState, sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", "NotInitialized"),
+                                           ("RackState", self._rack.rackState)], sender=self._rack.name)
 
     def initialize(self):
         self._rack.logger.debug("%s event in %s state", self.initialize.__name__, self.name)
@@ -155,8 +156,8 @@ class Initialization(RackState):
     def enter_action(self):
         self._rack.logger.debug("Entering the %s state", self.name)
         self._rack.rackState = "Initializing"
-        self._rack.publisher.publish(topic="State", value="Initializing", sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value=self._rack.rackState, sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", "Initializing"),
+                                           ("RackState", self._rack.rackState)], sender=self._rack.name)
 
         # self._rack.dicehalfs_number = 0
         self._rack_sm.init_active = True
@@ -417,8 +418,8 @@ class InitSubState_AllInit(RackState):
     def enter_action(self):
         self._rack.logger.debug("Entering the %s state", self.name)
         self._rack.rackState = "Initialized"
-        self._rack.publisher.publish(topic="State", value="Initialized", sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value=self._rack.rackState, sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", "Initialized"),
+                                           ("RackState", self._rack.rackState)], sender=self._rack.name)
         self._rack_sm.set_state(self._rack_sm.unknownpos_state)
 
     def initialize(self):
@@ -482,8 +483,8 @@ class UnknownPosition(RackState):
     def enter_action(self):
         self._rack.logger.debug("Entering the %s state", self.name)
         self._rack.rackState = "UpdatingSensors"
-        self._rack.publisher.publish(topic="State", value="UpdatingSensors", sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value=self._rack.rackState, sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", "UpdatingSensors"),
+                                           ("RackState", self._rack.rackState)], sender=self._rack.name)
 
         # create Update event to check sensors' current states
         self._rack.rackSensorTop.handle_event(event=self._rack_sm.sensor_update_event)
@@ -555,8 +556,8 @@ class RackEmpty(RackState):
     def enter_action(self):
         self._rack.logger.debug("Entering the %s state", self.name)
         self._rack.rackState = "RackEmpty"
-        self._rack.publisher.publish(topic="State", value="RackEmpty", sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value=self._rack.rackState, sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", "RackEmpty"),
+                                           ("RackState", self._rack.rackState)], sender=self._rack.name)
 
         self._rack.dicehalfs_number = 0
 
@@ -629,8 +630,8 @@ class RackFilling(RackState):
 
     def enter_action(self):
         self._rack.rackState = "RackFilling"
-        self._rack.publisher.publish(topic="State", value="RackFilling", sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value=self._rack.rackState, sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", "RackFilling"),
+                                           ("RackState", self._rack.rackState)], sender=self._rack.name)
 
         if self._rack.dicehalfs_number == 0:
             self._rack.inc_dicehalfs()
@@ -805,8 +806,8 @@ class RackFull(RackState):
 
     def enter_action(self):
         self._rack.rackState = "RackFull"
-        self._rack.publisher.publish(topic="State", value="RackFull", sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value=self._rack.rackState, sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", "RackFull"),
+                                           ("RackState", self._rack.rackState)], sender=self._rack.name)
 
         # test functionality :
         if self._rack_sm.init_active:
@@ -887,8 +888,8 @@ class Error(RackState):
 
     def enter_action(self):
         self._rack.rackState = "Error"
-        self._rack.publisher.publish(topic="State", value=self._rack.rackState, sender=self._rack.name)
-        self._rack.publisher.publish(topic="RackState", value="Error", sender=self._rack.name)
+        self._rack.publisher.publish_many([("State", self._rack.rackState),
+                                           ("RackState", "Error")], sender=self._rack.name)
 
         self._rack_sm.init_active = False
 
@@ -955,6 +956,8 @@ class RackStateMachine(object):
                                                                  sender=self._rack.name)
         self.timeout_event = events.RackEvent(eventID=events.RackEvents.Timeout, sender=self._rack.name)
 
+        self._dispatch_table = self._build_dispatch_table()
+
 # rack's states instances
         self._notinit_state = NotInitialized(self, self._rack)
         self._initialization_state = Initialization(self, self._rack)
@@ -1071,92 +1074,36 @@ class RackStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._rack.name)
 
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._rack.logger)
+
+        for sensor, on_posedge, on_negedge, on_init in (
+                ("SensorFillLevelPosTop", "postop_on", "postop_off", "postop_init"),
+                ("SensorFillLevelPosBottom", "posbottom_on", "posbottom_off", "posbottom_init")):
+            table.flag(sensor, "Value", on_posedge, on_negedge)
+            table.message(sensor, "State", "Error", "error")
+            table.message(sensor, "State", "NotInitialized", None)
+            table.message(sensor, "State", "Initialized", on_init)
+
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", "error")
+
+        table.event(events.RackEvents.Initialize, "initialize")   # this a part of the service generic interface
+        table.event(events.RackEvents.Ack, "acknowledge")
+        table.event(events.RackEvents.SetRack, self._set_rack)
+        table.event(events.RackEvents.DecRack, self._dec_rack)
+        table.event(events.RackEvents.Error, "error")
+        table.event(events.RackEvents.Timeout, "timeout")
+        table.event(events.RackEvents.Update, "update")
+        return table
+
+    def _set_rack(self, event):
+        self._current_state.set_rack(new_dicehalfs_number=event.dicehalfs_number)
+
+    def _dec_rack(self, event):
+        self._rack.dec_dicehalfs()
+
     def dispatch(self, *args, **kwargs):
-        self._rack.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "SensorFillLevelPosTop":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.postop_on()
-                    else:
-                        self._current_state.postop_off()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "Initialized":
-                        self._current_state.postop_init()
-
-            elif sender == "SensorFillLevelPosBottom":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.posbottom_on()
-                    else:
-                        self._current_state.posbottom_off()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "Initialized":
-                        self._current_state.posbottom_init()
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState" and value == "Error":
-                    self._current_state.error()
-
-        except KeyError:
-
-            try:
-                event = kwargs["event"]
-
-                eventID = event.eventID
-                sender = event.sender
-
-                if eventID == self._rack.rack_events.eventIDs.Initialize:  # this a part of the service generic interface
-                    self._current_state.initialize()
-                elif eventID == self._rack.rack_events.eventIDs.Ack:
-                    self._current_state.acknowledge()
-                elif eventID == self._rack.rack_events.eventIDs.SetRack:
-
-                    self._current_state.set_rack(new_dicehalfs_number=event.dicehalfs_number)
-                    # self._rack.dicehalfs_number = event.dicehalfs_number
-
-                elif eventID == self._rack.rack_events.eventIDs.DecRack:
-
-                    self._rack.dec_dicehalfs()
-
-                elif eventID == self._rack.rack_events.eventIDs.Error:
-                    self._current_state.error()
-                elif eventID == self._rack.rack_events.eventIDs.Timeout:
-                    self._current_state.timeout()
-                elif eventID == self._rack.rack_events.eventIDs.Update:
-                    self._current_state.update()
-                else:
-                    self._rack.logger.debug("Unknown event : %s", event)
-
-            except KeyError:
-                self._rack.logger.debug("Unknown event : %s", kwargs)
+        self._dispatch_table.dispatch(kwargs)
 
 
@@ -24,6 +24,9 @@ class SafetySwitch(Actor):
         self.publisher = Publisher(self.topics, logger=self.logger,  name=name)           # publisher's instance
 
         self.input_events = events.SimpleSensorInputEvent(events.SimpleSensorInputEvents.NoEvent, self._name)
+        # the edge events are sent again and again, they are never changed
+        self.posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge, sender=self._name)
+        self.negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge, sender=self._name)
 
         self.inputobj = inputobj  # reference to the revpi driver input object
 
@@ -78,13 +81,11 @@ class SafetySwitch(Actor):
 
     def _inputpos_cb(self):
         """ Fire an event PosEdge if the actual input's value is true"""
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge, sender=self.name)
-        self.handle_event(event=posedge_event)
+        self.handle_event(event=self.posedge_event)
 
     def _inputneg_cb(self):
         """ Fire an event NegEdge if the actual input's value is false"""
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge, sender=self.name)
-        self.handle_event(event=negedge_event)
+        self.handle_event(event=self.negedge_event)
 
     @event_decorator
     def handle_event(self, *args, **kwargs):
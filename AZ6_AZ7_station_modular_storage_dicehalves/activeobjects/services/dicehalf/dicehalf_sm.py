@@ -5,6 +5,7 @@ import config
 from utils import error_codes
 from utils import message_codes
 from utils.monitoring_timer import MonitoringTimer
+from utils.dispatch_table import DispatchTable, ANY
 
 class ProvideDicehalfState(metaclass=abc.ABCMeta):
     """ Abstract State class for a ProvideHalfDice Service SM """
@@ -749,6 +750,8 @@ class ProvideDicehalfStateMachine(object):
                                                         sender=self._providehalfdice.name)
 
 
+        self._dispatch_table = self._build_dispatch_table()
+
         self._waitforjob_state = WaitForJob(self, self._providehalfdice)
         self._emptyrack_state = EmptyRack(self, self._providehalfdice)
         self._dispatchoccupied_state = DispatchOccupied(self, self._providehalfdice)
@@ -849,97 +852,40 @@ class ProvideDicehalfStateMachine(object):
         self.init_required = True
         self.dispatch(event=self.timeout_event)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._providehalfdice.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "StorageRack":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        # self._current_state.error()
-                        pass
-                    elif value == "RackEmpty":
-                        self._current_state.rack_is_empty()
-                    elif value == "RackFilling":
-                        self._current_state.rack_not_empty()
-                    elif value == "RackFull":
-                        self._current_state.rack_not_empty()
-
-            elif sender == "Carriage":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        # self._current_state.error()
-                        pass
-                    elif value == "OutOfPosition":
-                        pass
-                    elif value == "AtFrontPosition":
-                        self._current_state.carriage_is_atfront()
-                    elif value == "AtRackPosition":
-                        self._current_state.carriage_is_atrack()
-
-            elif sender == "SensorCarriageOccupied":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.dispatch_occupied()
-                    else:
-                        self._current_state.dispatch_empty()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        # self._current_state.error()
-                        pass
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState" and value == "Error":
-                    self._current_state.error()
-
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.start_service()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._providehalfdice.logger)
+
+        table.message("StorageRack", "Value", ANY, None)
+        table.message("StorageRack", "State", "Error", "error")
+        table.message("StorageRack", "State", "NotInitialized", None)
+        table.message("StorageRack", "State", "RackEmpty", "rack_is_empty")
+        table.message("StorageRack", "State", "RackFilling", "rack_not_empty")
+        table.message("StorageRack", "State", "RackFull", "rack_not_empty")
+
+        table.message("Carriage", "Value", ANY, None)
+        table.message("Carriage", "State", "Error", "error")
+        table.message("Carriage", "State", "NotInitialized", None)
+        table.message("Carriage", "State", "OutOfPosition", None)
+        table.message("Carriage", "State", "AtFrontPosition", "carriage_is_atfront")
+        table.message("Carriage", "State", "AtRackPosition", "carriage_is_atrack")
+
+        table.flag("SensorCarriageOccupied", "Value", "dispatch_occupied", "dispatch_empty")
+        table.message("SensorCarriageOccupied", "State", "Error", "error")
+        table.message("SensorCarriageOccupied", "State", "NotInitialized", None)
+        table.message("SensorCarriageOccupied", "State", "Initialized", None)
+
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", "error")
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _execute(self, event):
+        self._current_state.start_service()
+        self._current_service_user = event.service_index
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -3,6 +3,7 @@ from communication import events
 from threading import Timer
 from utils import error_codes, message_codes
 from utils.monitoring_timer import MonitoringTimer
+from utils.dispatch_table import DispatchTable, ANY
 
 class HomingState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Homing Service SM """
@@ -697,6 +698,7 @@ class HomingServiceStateMachine(object):
         self.carriage_stop_event = events.CarriageEvent(eventID=events.CarriageEvents.Stop, sender=self._homingservice.name)
         self.timeout_event = events.GenericServiceEvent(eventID=events.GenericServiceEvents.Timeout, sender=self._homingservice.name)
 
+        self._dispatch_table = self._build_dispatch_table()
 
         self._notreferenced_state = NotReferenced(self, self._homingservice)
         self._carriagehoming_state = CarriageHoming(self, self._homingservice)
@@ -795,96 +797,43 @@ class HomingServiceStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._homingservice.name)
 
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._homingservice.logger)
 
-        self._homingservice.logger.debug("%s has received a message: %s", self.name, kwargs)
+        table.message("StorageRack", "Value", ANY, None)
+        table.message("StorageRack", "State", "Error", "error")
+        table.message("StorageRack", "State", "NotInitialized", None)
+        table.message("StorageRack", "State", "RackEmpty", "rack_is_empty")
+        table.message("StorageRack", "State", "RackFilling", "rack_is_filling")
+        table.message("StorageRack", "State", "RackFull", "rack_is_full")
 
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "StorageRack":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "RackEmpty":
-                        self._current_state.rack_is_empty()
-                    elif value == "RackFilling":
-                        self._current_state.rack_is_filling()
-                    elif value == "RackFull":
-                        self._current_state.rack_is_full()
-
-            elif sender == "Carriage":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "OutOfPosition":
-                        self._current_state.carriage_is_outofpos()
-                    elif value == "AtFrontPosition":
-                        self._current_state.carriage_is_atfront()
-                    elif value == "AtRackPosition":
-                        self._current_state.carriage_is_atrack()
-
-            elif sender == "SensorCarriageOccupied":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.dispatch_occupied()
-                    else:
-                        self._current_state.dispatch_empty()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState" and value == "Error":
-                    self._current_state.error()
+        table.message("Carriage", "Value", ANY, None)
+        table.message("Carriage", "State", "Error", "error")
+        table.message("Carriage", "State", "NotInitialized", None)
+        table.message("Carriage", "State", "OutOfPosition", "carriage_is_outofpos")
+        table.message("Carriage", "State", "AtFrontPosition", "carriage_is_atfront")
+        table.message("Carriage", "State", "AtRackPosition", "carriage_is_atrack")
 
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.reference()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._homingservice.logger.debug("Cancel service was not implemented for the %s service", self._homingservice.name)
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+        table.flag("SensorCarriageOccupied", "Value", "dispatch_occupied", "dispatch_empty")
+        table.message("SensorCarriageOccupied", "State", "Error", "error")
+        table.message("SensorCarriageOccupied", "State", "NotInitialized", None)
+        table.message("SensorCarriageOccupied", "State", "Initialized", None)
+
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", "error")
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, self._cancel)
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _execute(self, event):
+        self._current_state.reference()
+        self._current_service_user = event.service_index
+
+    def _cancel(self, event):
+        self._homingservice.logger.debug("Cancel service was not implemented for the %s service", self._homingservice.name)
+
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
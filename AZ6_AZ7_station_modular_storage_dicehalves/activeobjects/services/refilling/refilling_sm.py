@@ -3,6 +3,7 @@ from communication import events
 from threading import Timer
 from utils import error_codes, message_codes
 from utils.monitoring_timer import MonitoringTimer
+from utils.dispatch_table import DispatchTable, ANY
 
 class RackRefillingState(metaclass=abc.ABCMeta):
     """ Abstract State class for a RackRefillingState Service SM """
@@ -251,6 +252,8 @@ class RackRefillingStateMachine(object):
         self.timeout_event = events.GenericServiceEvent(eventID=events.GenericServiceEvents.Timeout,
                                                         sender=self._rackrefilling_service.name)
 
+        self._dispatch_table = self._build_dispatch_table()
+
         self._waitforjob_state = WaitForJob(self, self._rackrefilling_service)
         self._rackrefilling_state = RackRefilling(self, self._rackrefilling_service)
         self._error_state = Error(self, self._rackrefilling_service)
@@ -320,89 +323,35 @@ class RackRefillingStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._rackrefilling_service.name)
 
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._rackrefilling_service.logger)
 
-        self._rackrefilling_service.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:            #  events comming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "StorageRack":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        # self._current_state.error()
-                        pass
-                    elif value == "RackEmpty":
-                        pass
-                    elif value == "RackFilling":
-                        pass
-                    elif value == "RackFull":
-                        self._current_state.rack_is_full()
-
-            elif sender == "Carriage":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "OutOfPosition":
-                        pass
-                    elif value == "AtFrontPosition":
-                        pass
-                    elif value == "AtRackPosition":
-                        self._current_state.carriage_is_atrack()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        pass
-                        # self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState" and value == "Error":
-                    self._current_state.error()
+        table.message("StorageRack", "Value", ANY, None)
+        table.message("StorageRack", "State", "Error", "error")
+        table.message("StorageRack", "State", "NotInitialized", None)
+        table.message("StorageRack", "State", "RackEmpty", None)
+        table.message("StorageRack", "State", "RackFilling", None)
+        table.message("StorageRack", "State", "RackFull", "rack_is_full")
 
-        except KeyError:
-            event = kwargs["event"]
+        table.message("Carriage", "Value", ANY, None)
+        table.message("Carriage", "State", "Error", "error")
+        table.message("Carriage", "State", "NotInitialized", None)
+        table.message("Carriage", "State", "OutOfPosition", None)
+        table.message("Carriage", "State", "AtFrontPosition", None)
+        table.message("Carriage", "State", "AtRackPosition", "carriage_is_atrack")
 
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", "error")
 
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.start_service()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
 
+    def _execute(self, event):
+        self._current_state.start_service()
+        self._current_service_user = event.service_index
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -1,6 +1,7 @@
 import abc, time
 from communication import events
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 
 class StationState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Station SM """
@@ -238,8 +239,8 @@ class NotInitialized(StationState):
     def enter_action(self):
         self._station.stationState = "Standby"
         self._station.logger.debug("Entering the %s state", self.name)
-        self._station.publisher.publish(topic="StationState", value=self._station.stationState, sender=self._station.name)
-        self._station.publisher.publish(topic='StationStateMaintenance', value="NotInitialized", sender=self._station.name)
+        self._station.publisher.publish_many([("StationState", self._station.stationState),
+                                              ('StationStateMaintenance', "NotInitialized")], sender=self._station.name)
 
 
         # stop blinking
@@ -933,8 +934,8 @@ class Estop(StationState):
     def enter_action(self):
         self._station.stationState = "Error"
         self._station.logger.debug("Entering the %s state", self.name)
-        self._station.publisher.publish(topic="StationState", value=self._station.stationState , sender=self._station.name)
-        self._station.publisher.publish(topic="StationSafetyState", value="safetySwitchActivated", sender=self._station.name)
+        self._station.publisher.publish_many([("StationState", self._station.stationState),
+                                              ("StationSafetyState", "safetySwitchActivated")], sender=self._station.name)
         self._station.publisher.publish(topic='StationStateMaintenance', value="Error : E-Stop",
                                         sender=self._station.name)
 
@@ -1165,6 +1166,9 @@ class StationStateMachine(object):
 
         self.init_required = False #  to show that an estop has happened and init is needed
 
+        self._done_events = {0: "initialize_done", 1: "service1_done", 2: "service2_done", 3: "service3_done"}
+        self._dispatch_table = self._build_dispatch_table()
+
     # properties
     @property
     def current_state(self):
@@ -1270,99 +1274,69 @@ class StationStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._station.name)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._station.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "SafetySwitch":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.estop()
-                    else:
-                        self._current_state.estop_ok()
-
-            elif topic == "State":
-                if value == "Error":
-                    self._current_state.error()
-                elif value == "ErrorWithInit":
-                    self.init_required = True
-                    self._current_state.error()
-                elif value == "NotInitialized":
-                    pass
-                    # self._current_state.error()
-                elif value == "Initialized":
-                    pass
-
-
-        except KeyError:
-            event = kwargs["event"]
-
-            if event.eventID == self._station.input_events.eventIDs.Initialize:  # this a part of the service generic interface
-                self._current_state.initialize()
-            elif event.eventID == self._station.input_events.eventIDs.Homing:
-                self._current_state.service1()
-            elif event.eventID == self._station.input_events.eventIDs.ProvideDicehalf:
-                self._current_state.service2()
-            elif event.eventID == self._station.input_events.eventIDs.RefillRack:
-                self._current_state.service3()
-            elif event.eventID == self._station.input_events.eventIDs.Ack:
-                self.ack_error()
-                self.ack_message()
-                self._current_state.acknowledge()
-            elif event.eventID == self._station.input_events.eventIDs.Done:
-                if event.service_index == 0:
-                    self._current_state.initialize_done()
-                elif event.service_index == 1:
-                    self._current_state.service1_done()
-                elif event.service_index == 2:
-                    self._current_state.service2_done()
-                elif event.service_index == 3:
-                    self._current_state.service3_done()
-                elif event.service_index == 4:
-                    pass
-                elif event.service_index == 5:
-                    pass
-                elif event.service_index == 6:
-                    pass
-            elif event.eventID == self._station.input_events.eventIDs.CancelService:
-                self._current_state.service_cancel()
-
-            elif event.eventID == self._station.input_events.eventIDs.MaintenanceMotorCW:
-                maintenance_event = events.SimpleMotorInputEvent(events.SimpleMotorInputEvents.RotateCW, sender=self.name)
-                self._station.motor.handle_event(event=maintenance_event)
-            elif event.eventID == self._station.input_events.eventIDs.MaintenanceMotorCCW:
-                maintenance_event = events.SimpleMotorInputEvent(events.SimpleMotorInputEvents.RotateCCW, sender=self.name)
-                self._station.motor.handle_event(event=maintenance_event)
-            elif event.eventID == self._station.input_events.eventIDs.MaintenanceMotorStop:
-                maintenance_event = events.SimpleMotorInputEvent(events.SimpleMotorInputEvents.Stop, sender=self.name)
-                self._station.motor.handle_event(event=maintenance_event)
-            elif event.eventID == self._station.input_events.eventIDs.MaintenanceCarriageToRack:
-                maintenance_event = events.CarriageEvent(events.CarriageEvents.MoveToRackPos, sender=self.name)
-                self._station.carriage.handle_event(event=maintenance_event)
-            elif event.eventID == self._station.input_events.eventIDs.MaintenanceCarriageToFront:
-                maintenance_event = events.CarriageEvent(events.CarriageEvents.MoveToFrontPos, sender=self.name)
-                self._station.carriage.handle_event(event=maintenance_event)
-            elif event.eventID == self._station.input_events.eventIDs.MaintenanceCarriageStop:
-                maintenance_event = events.CarriageEvent(events.CarriageEvents.Stop, sender=self.name)
-                self._station.carriage.handle_event(event=maintenance_event)
-
-
-            elif event.eventID == self._station.input_events.eventIDs.Error:
-                if event.init_required:
-                    self.init_required = True
-                self._current_state.error()
-
-            elif event.eventID == self._station.input_events.eventIDs.NoConn:
-                self._current_state.noconn()
-            elif event.eventID == self._station.input_events.eventIDs.ConnOk:
-                self._current_state.conn_ok()
-            else:
-                self._station.logger.debug("Unknown event : %s", event)
-
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._station.logger)
+        eventIDs = self._station.input_events.eventIDs
+
+        table.flag("SafetySwitch", "Value", "estop", "estop_ok")
+        table.message("SafetySwitch", "State", ANY, None)
+
+        table.message(ANY, "State", "Error", "error")
+        table.message(ANY, "State", "ErrorWithInit", self._error_with_init)
+        table.message(ANY, "State", "NotInitialized", None)
+        table.message(ANY, "State", "Initialized", None)
+
+        table.event(eventIDs.Initialize, "initialize")   # this a part of the service generic interface
+        table.event(eventIDs.Homing, "service1")
+        table.event(eventIDs.ProvideDicehalf, "service2")
+        table.event(eventIDs.RefillRack, "service3")
+        table.event(eventIDs.Ack, self._acknowledge)
+        table.event(eventIDs.Done, self._service_done)
+        table.event(eventIDs.CancelService, "service_cancel")
+
+        table.event(eventIDs.MaintenanceMotorCW, self._maintenance(
+            self._station.motor, events.SimpleMotorInputEvent, events.SimpleMotorInputEvents.RotateCW))
+        table.event(eventIDs.MaintenanceMotorCCW, self._maintenance(
+            self._station.motor, events.SimpleMotorInputEvent, events.SimpleMotorInputEvents.RotateCCW))
+        table.event(eventIDs.MaintenanceMotorStop, self._maintenance(
+            self._station.motor, events.SimpleMotorInputEvent, events.SimpleMotorInputEvents.Stop))
+        table.event(eventIDs.MaintenanceCarriageToRack, self._maintenance(
+            self._station.carriage, events.CarriageEvent, events.CarriageEvents.MoveToRackPos))
+        table.event(eventIDs.MaintenanceCarriageToFront, self._maintenance(
+            self._station.carriage, events.CarriageEvent, events.CarriageEvents.MoveToFrontPos))
+        table.event(eventIDs.MaintenanceCarriageStop, self._maintenance(
+            self._station.carriage, events.CarriageEvent, events.CarriageEvents.Stop))
+
+        table.event(eventIDs.Error, self._error)
+        table.event(eventIDs.NoConn, "noconn")
+        table.event(eventIDs.ConnOk, "conn_ok")
+        return table
+
+    def _error_with_init(self, value):
+        self.init_required = True
+        self._current_state.error()
+
+    def _acknowledge(self, event):
+        self.ack_error()
+        self.ack_message()
+        self._current_state.acknowledge()
+
+    def _service_done(self, event):
+        # service index -> done event of the state, the services 4 to 6 are not used
+        done = self._done_events.get(event.service_index)
+        if done is not None:
+            getattr(self._current_state, done)()
+
+    def _maintenance(self, device, event_class, eventID):
+        def send(event):
+            device.handle_event(event=event_class(eventID, sender=self.name))
+        send.__name__ = "maintenance_" + str(eventID)
+        return send
+
+    def _error(self, event):
+        if event.init_required:
+            self.init_required = True
+        self._current_state.error()
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -0,0 +1,208 @@
+""" Compact binary log sink
+
+A log file is the LOG_MAGIC header followed by records. Strings which repeat (logger names, thread names,
+message templates) are written once as a STRING record and referenced by their id afterwards. A LOG record
+keeps the template and the arguments of the message, it is formatted when the file is read:
+
+    STRING      kind, string id, length, utf-8
+    LOG         kind, created, level, logger id, thread id, template id, number of arguments, flags,
+                arguments (type tag + value), the exception text if FLAG_EXCEPTION is set
+
+    python3 -m utils.binary_log station.log.bin      prints a log file
+"""
+
+import os
+import sys
+import struct
+import logging
+import time
+
+LOG_MAGIC = b'EDULOG01'
+
+STRING = 1
+LOG = 2
+
+FLAG_EXCEPTION = 0x1
+
+KIND = struct.Struct('<B')
+STRING_HEADER = struct.Struct('<HH')                # string id, length
+LOG_HEADER = struct.Struct('<dBHHHBB')              # created, level, logger, thread, template, arguments, flags
+LENGTH = struct.Struct('<H')
+INT = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+
+MAX_STRING = 0xffff
+
+
+def _encode(text):
+    data = text.encode('utf-8', 'replace')
+    return data[:MAX_STRING]
+
+
+class BinaryLogHandler(logging.Handler):
+    """ Writes the records in the binary format. The file is opened with the first record. """
+
+    def __init__(self, filename, buffer_size=1 << 16, level=logging.NOTSET):
+        logging.Handler.__init__(self, level)
+        self.filename = filename
+        self._buffer_size = buffer_size
+        self._file = None
+        self._strings = dict()      # string -> id
+
+    def _string_id(self, text):
+        string_id = self._strings.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings[text] = string_id
+            data = _encode(text)
+            self._file.write(KIND.pack(STRING) + STRING_HEADER.pack(string_id, len(data)) + data)
+        return string_id
+
+    def _argument(self, arg):
+        if isinstance(arg, bool):
+            return b'b' + (b'\x01' if arg else b'\x00')
+        if isinstance(arg, int) and -(1 << 63) <= arg < (1 << 63):
+            return b'i' + INT.pack(arg)
+        if isinstance(arg, float):
+            return b'f' + FLOAT.pack(arg)
+        data = _encode(arg if isinstance(arg, str) else repr(arg))
+        return b's' + LENGTH.pack(len(data)) + data
+
+    def emit(self, record):
+        try:
+            if self._file is None:
+                new_file = not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+                self._file = open(self.filename, 'ab', buffering=self._buffer_size)
+                if new_file:
+                    self._file.write(LOG_MAGIC)
+                self._strings.clear()
+
+            args = record.args
+            if getattr(record, 'template', None) is not None:
+                # queued by the log pipeline, the message is formatted, the template and the arguments are kept
+                template, args = record.template, record.template_args[:255]
+            elif isinstance(args, dict):
+                # logger.debug("%(a)s", {'a': 1}) : keep the formatted message
+                template, args = record.getMessage(), ()
+            else:
+                template, args = str(record.msg), tuple(args or ())[:255]
+            if len(self._strings) > MAX_STRING - 3:
+                # e.g. messages without templates, the ids of a record must come from one table
+                self._strings.clear()
+            flags = 0
+            exception = None
+            if record.exc_text:
+                # formatted before the record was queued by the log pipeline
+                flags |= FLAG_EXCEPTION
+                exception = record.exc_text
+            elif record.exc_info:
+                flags |= FLAG_EXCEPTION
+                exception = self.formatter.formatException(record.exc_info) if self.formatter else \
+                    logging.Formatter().formatException(record.exc_info)
+
+            header = LOG_HEADER.pack(record.created, record.levelno, self._string_id(record.name),
+                                     self._string_id(record.threadName or ""), self._string_id(template),
+                                     len(args), flags)
+            parts = [KIND.pack(LOG), header]
+            parts.extend(self._argument(arg) for arg in args)
+            if exception is not None:
+                data = _encode(exception)
+                parts.append(LENGTH.pack(len(data)) + data)
+            self._file.write(b''.join(parts))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        logging.Handler.close(self)
+
+
+class LogEntry(object):
+    __slots__ = ('created', 'level', 'name', 'thread', 'template', 'args', 'exception')
+
+    def __init__(self, created, level, name, thread, template, args, exception):
+        self.created = created
+        self.level = level
+        self.name = name
+        self.thread = thread
+        self.template = template
+        self.args = args
+        self.exception = exception
+
+    @property
+    def message(self):
+        if not self.args:
+            return self.template
+        try:
+            return self.template % self.args
+        except (TypeError, ValueError):
+            return "{0} {1}".format(self.template, self.args)
+
+    def __str__(self):
+        text = "%s,%03d %-12s %-8s %s" % (time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created)),
+                                          (self.created % 1) * 1000, self.name,
+                                          logging.getLevelName(self.level), self.message)
+        if self.exception:
+            text += "\n" + self.exception
+        return text
+
+
+def read_binary_log(path):
+    """ Yields the entries of a binary log file. A record cut off at the end of the file ends the log. """
+    with open(path, 'rb') as log_file:
+        data = log_file.read()
+    if not data.startswith(LOG_MAGIC):
+        raise ValueError("{0} is not a binary log".format(path))
+
+    strings = dict()
+    position = len(LOG_MAGIC)
+
+    def read(size):
+        nonlocal position
+        if position + size > len(data):
+            raise EOFError
+        chunk = data[position:position + size]
+        position += size
+        return chunk
+
+    def read_string():
+        length, = LENGTH.unpack(read(LENGTH.size))
+        return read(length).decode('utf-8', 'replace')
+
+    while position < len(data):
+        try:
+            kind, = KIND.unpack(read(KIND.size))
+            if kind == STRING:
+                string_id, length = STRING_HEADER.unpack(read(STRING_HEADER.size))
+                strings[string_id] = read(length).decode('utf-8', 'replace')
+                continue
+            if kind != LOG:
+                raise ValueError("{0}: unknown record kind {1} at {2}".format(path, kind, position - 1))
+            created, level, name, thread, template, count, flags = LOG_HEADER.unpack(read(LOG_HEADER.size))
+            args = []
+            for _ in range(count):
+                tag = read(1)
+                if tag == b'i':
+                    args.append(INT.unpack(read(INT.size))[0])
+                elif tag == b'f':
+                    args.append(FLOAT.unpack(read(FLOAT.size))[0])
+                elif tag == b'b':
+                    args.append(read(1) == b'\x01')
+                else:
+                    args.append(read_string())
+            exception = read_string() if flags & FLAG_EXCEPTION else None
+        except EOFError:
+            return
+        yield LogEntry(created, level, strings.get(name, "?"), strings.get(thread, "?"),
+                       strings.get(template, "?"), tuple(args), exception)
+
+
+if __name__ == '__main__':
+    for log_entry in read_binary_log(sys.argv[1]):
+        print(log_entry)
@@ -0,0 +1,210 @@
+""" Non-blocking log pipeline
+
+install() moves the handlers configured by logging.json (and the optional binary log) behind a bounded
+queue: the logging thread only enqueues the record, a listener thread writes it. A full queue drops the
+record instead of blocking an actor thread, the drops are counted and reported. Like QueueHandler, the
+message and the exception text are formatted before the record is queued, the arguments could be
+changed by the time the listener runs.
+
+Every record passes one QueueLogHandler, the one of the root logger or of a logger which doesn't
+propagate; the listener calls the handlers of the record's logger and of its parents, as logging does.
+A SamplingFilter of the queue handlers passes only every n-th DEBUG record of the configured loggers
+(and their children), e.g. {'Press': 10} for the messages of the press state machine.
+"""
+
+import copy
+import queue
+import threading
+import atexit
+import logging
+from utils.binary_log import BinaryLogHandler
+
+# arguments of a message which the binary log can keep next to the formatted message
+_IMMUTABLE_ARGUMENTS = (str, int, float, bool, type(None))
+
+
+class SamplingFilter(logging.Filter):
+    """ Passes every n-th record up to max_level of the loggers in rates (logger name -> n) """
+
+    def __init__(self, rates, max_level=logging.DEBUG):
+        logging.Filter.__init__(self)
+        self.rates = dict(rates)
+        self.max_level = max_level
+        self._counters = dict()     # logger name -> records seen
+        self._rate_cache = dict()   # logger name -> n of the logger or of its nearest configured parent
+        self.dropped = 0
+
+    def _rate(self, name):
+        rate = self._rate_cache.get(name)
+        if rate is None:
+            rate = 1
+            parent = name
+            while parent:
+                if parent in self.rates:
+                    rate = self.rates[parent]
+                    break
+                parent = parent.rpartition('.')[0]
+            self._rate_cache[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        rate = self._rate(record.name)
+        if rate <= 1:
+            return True
+        count = self._counters.get(record.name, 0)
+        self._counters[record.name] = count + 1
+        if count % rate:
+            self.dropped += 1
+            return False
+        return True
+
+
+class QueueLogHandler(logging.Handler):
+    """ Hands the records to the listener """
+
+    def __init__(self, listener):
+        logging.Handler.__init__(self)
+        self.listener = listener
+
+    def prepare(self, record):
+        """ A copy of the record without references to the arguments and the exception, see
+            logging.handlers.QueueHandler.prepare """
+        record = copy.copy(record)
+        args = record.args
+        if args and isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGUMENTS) for arg in args):
+            # the binary log stores the template and the arguments instead of the message
+            record.template = str(record.msg)
+            record.template_args = args
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        self.listener.enqueue(self.prepare(record))
+
+    def handle(self, record):
+        # no handler lock: the queue is thread safe and emit never blocks
+        if self.filter(record):
+            self.emit(record)
+        return record
+
+
+class LogListener(object):
+    """ Thread which runs the handlers of the queued records """
+
+    def __init__(self, name="LogListener", queue_size=10000):
+        self._name = name
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._installed = dict()    # logger -> original handlers
+        self._targets = dict()      # logger name -> handlers of the logger and its parents, in the listener
+        self.dropped = 0            # records dropped because the queue was full
+        self._reported = 0
+
+    @property
+    def name(self):
+        return self._name
+
+    def enqueue(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def install(self, loggers, sampling=None):
+        """ Moves the handlers of the loggers behind the queue. The root logger and the loggers which don't
+            propagate get the queue handler, the other loggers propagate their records to it. """
+        handler = QueueLogHandler(self)
+        if sampling is not None:
+            handler.addFilter(sampling)
+        root = logging.getLogger()
+        for logger in loggers:
+            if logger is root or not logger.propagate:
+                # also without handlers: the records of its children stop there
+                self._installed[logger] = list(logger.handlers)
+                logger.handlers = [handler]
+            elif logger.handlers:
+                self._installed[logger] = list(logger.handlers)
+                logger.handlers = []
+
+    def _handlers(self, name):
+        """ The original handlers which logging calls for a record of the logger """
+        targets = self._targets.get(name)
+        if targets is None:
+            targets = []
+            logger = logging.getLogger(name) if name != "root" else logging.getLogger()
+            while logger is not None:
+                targets.extend(self._installed.get(logger, logger.handlers))
+                if not logger.propagate:
+                    break
+                logger = logger.parent
+            if not targets and logging.lastResort is not None:
+                targets.append(logging.lastResort)
+            self._targets[name] = targets
+        return targets
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Writes the queued records and restores the synchronous handlers """
+        if self._thread is None:
+            return
+        handlers = []
+        for logger, targets in self._installed.items():
+            logger.handlers = targets
+            handlers.extend(targets)
+        self._installed = dict()
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        for handler in handlers:
+            handler.flush()
+        self._report_drops(logging.getLogger().handlers)
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                break
+            targets = self._handlers(record.name)
+            self._report_drops(targets)
+            for handler in targets:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+
+    def _report_drops(self, targets):
+        if self.dropped == self._reported:
+            return
+        dropped = self.dropped - self._reported
+        self._reported = self.dropped
+        record = logging.LogRecord(self._name, logging.WARNING, __file__, 0,
+                                   "%s log records were dropped, the log queue was full.", (dropped,), None)
+        for handler in targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def install(queue_size=10000, sampling=None, binary_log=None):
+    """ Puts the configured handlers of all loggers behind a LogListener and starts it. sampling maps logger
+        names to n, only every n-th DEBUG record of these loggers is logged. binary_log is the file of an
+        additional BinaryLogHandler of the root logger, None: no binary log. Returns the listener. """
+    root = logging.getLogger()
+    if binary_log is not None:
+        root.addHandler(BinaryLogHandler(binary_log))
+
+    sampling_filter = SamplingFilter(sampling) if sampling else None
+    listener = LogListener(queue_size=queue_size)
+    loggers = [root] + [logger for logger in logging.Logger.manager.loggerDict.values()
+                        if isinstance(logger, logging.Logger)]
+    listener.install(loggers, sampling_filter)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
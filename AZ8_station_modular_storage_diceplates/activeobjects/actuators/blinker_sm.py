@@ -90,8 +90,8 @@ class Initialized(BlinkerState):
         return self._name
 
     def enter_action(self):
-        self._blinker.publisher.publish(topic="State", value="Initialized", sender=self._blinker.name)
-        self._blinker.publisher.publish(topic="Value", value=False, sender=self._blinker.name)
+        self._blinker.publisher.publish_many([("State", "Initialized"),
+                                              ("Value", False)], sender=self._blinker.name)
         self._blinker.shutter_open()
         self._blinker_sm.reset_blinks_counter()
 
@@ -136,8 +136,8 @@ class ShutterOpen(BlinkerState):
         return self._name
 
     def enter_action(self):
-        self._blinker.publisher.publish(topic="State", value="ShutterOpen", sender=self._blinker.name)
-        self._blinker.publisher.publish(topic="Value", value=True, sender=self._blinker.name)
+        self._blinker.publisher.publish_many([("State", "ShutterOpen"),
+                                              ("Value", True)], sender=self._blinker.name)
 
         self._blinker_sm.shutteropen_timer = Timer(self._blinker_sm.shutteropen_time,
                                                     self._blinker_sm.timeout_handler)
@@ -182,8 +182,8 @@ class ShutterClose(BlinkerState):
         return self._name
 
     def enter_action(self):
-        self._blinker.publisher.publish(topic="State", value="ShutterClose", sender=self._blinker.name)
-        self._blinker.publisher.publish(topic="Value", value=True, sender=self._blinker.name)
+        self._blinker.publisher.publish_many([("State", "ShutterClose"),
+                                              ("Value", True)], sender=self._blinker.name)
 
         self._blinker_sm.shutterclose_timer = Timer(self._blinker_sm.shutterclose_time,
                                                     self._blinker_sm.timeout_handler)
@@ -234,8 +234,8 @@ class Error(BlinkerState):
         return self._name
 
     def enter_action(self):
-        self._blinker.publisher.publish(topic="State", value="Error", sender=self._blinker.name)
-        self._blinker.publisher.publish(topic="Value", value=False, sender=self._blinker.name)
+        self._blinker.publisher.publish_many([("State", "Error"),
+                                              ("Value", False)], sender=self._blinker.name)
         self._blinker.shutter_open()
 
     def initialize(self):
@@ -3,6 +3,7 @@ from communication import events
 from threading import Timer
 from utils import error_codes, message_codes
 from utils.monitoring_timer import MonitoringTimer
+from utils.dispatch_table import DispatchTable, ANY
 
 class ProvideDicePlateState(metaclass=abc.ABCMeta):
     """ Abstract State class for a ProvideDicePlate Service SM """
@@ -296,6 +297,8 @@ class ProvideDicePlateStateMachine(object):
         self._current_service_user = 0
         self._current_state = self._waitforjob_state
 
+        self._dispatch_table = self._build_dispatch_table()
+
     # properties
     @property
     def current_state(self):
@@ -371,56 +374,37 @@ class ProvideDicePlateStateMachine(object):
                                                    sender=self._providediceplateservice.name)
         self.dispatch(event=timeout_event)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._providediceplateservice.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-						
-			# tbd: sender = StorageRack 1 - 6- check if necessary or replaceable with generic interface	
-            else:
-			
-                if topic == "State": # Check if changeable with event
-				
-                    if value == "MaterialWithdrawalDone":
-                        # Use parameter 1 (diceplate symbol) at list position 0 and reduce the value by one, to address the corresponding storagerack.
-                        self._storagerackposition = int(self._parameters_list[0]) - 1
-                        if sender == (self._storageracklist[self._storagerackposition].name):
-                            self._current_state.material_withdrawal_done()
-                    elif value == "Error":
-                        self._current_state.error()
-                    else:
-                        pass
-
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._providediceplateservice.logger)
+
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "State", ANY, None)
+
+        # the storage racks report the end of the withdrawal with their state
+        for rack in self._storageracklist:
+            table.message(rack.name, "State", "MaterialWithdrawalDone", self._rack_done(rack, "material_withdrawal_done"))
+        table.message(ANY, "State", "Error", "error")
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        # if the service has already succeeded, switch the state machine to "WaitForJob"
+        table.event(events.GenericServiceEvents.Done, "material_withdrawal_done")   # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _execute(self, event):
+        self._current_state.start_service(parameters_list=event.parameters_list)
+        self._current_service_user = event.service_index
+
+    def _rack_done(self, rack, entry):
+        """ Entry for the state of a storage rack, only the rack of the current job, which is addressed by the
+            parameter 1 (diceplate symbol) of the service, finishes the job """
+        def done(value):
+            self._storagerackposition = int(self._parameters_list[0]) - 1
+            if rack.name == self._storageracklist[self._storagerackposition].name:
+                getattr(self._current_state, entry)()
+        done.__name__ = entry
+        return done
 
-			# Events from GenericServiceEvents
-			
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.start_service(parameters_list=event.parameters_list)
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-			# If service has already succeeded, switch the state machine to "WaitForJob"
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                self._current_state.material_withdrawal_done()
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -2,6 +2,7 @@ import abc
 from communication import events
 from utils import error_codes, message_codes
 from utils.monitoring_timer import MonitoringTimer
+from utils.dispatch_table import DispatchTable, ANY
 
 class InitializationState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Init Service SM """
@@ -290,6 +291,8 @@ class InitServiceStateMachine(object):
 			
         self._current_service_user = 0
         self._current_state = self._notinitialized_state
+
+        self._dispatch_table = self._build_dispatch_table()
 		
         self.set_state(self._current_state)
 		
@@ -360,49 +363,25 @@ class InitServiceStateMachine(object):
                                                    sender=self._initservice.name)
         self.dispatch(event=timeout_event)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._initservice.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if topic == "Value":
-                pass
-
-			# Note: During ProvideMaterialService a state-event will be set from storagerack
-            elif topic == "State":
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._initservice.logger)
 
-                if value == "Error":
-                    self._current_state.error()
-                elif value == "Initialized":
-                    self._current_state.device_is_initialized()
+        # the init service doesn't care about the sender, a storage rack sets its state during the
+        # ProvideMaterial service, too
+        table.message(ANY, "Value", ANY, None)
+        table.message(ANY, "State", "Error", "error")
+        table.message(ANY, "State", "Initialized", "device_is_initialized")
+        table.flag(ANY, "Ack", "acknowledge", None)
 
-            elif topic == "Ack":
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, None)
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
 
-                if value:
-                    self._current_state.acknowledge()
-                else:
-                    pass
-
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.initialize()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                pass
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+    def _execute(self, event):
+        self._current_state.initialize()
+        self._current_service_user = event.service_index
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
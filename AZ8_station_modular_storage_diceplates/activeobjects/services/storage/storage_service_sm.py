@@ -2,6 +2,7 @@ import abc
 from communication import events
 from utils import error_codes, message_codes
 from utils.monitoring_timer import MonitoringTimer
+from utils.dispatch_table import DispatchTable, ANY
 
 class StorageDicePlateState(metaclass=abc.ABCMeta):
     """ Abstract State class for a ResetDicePlate Service SM """
@@ -333,6 +334,8 @@ class StorageDicePlateStateMachine(object):
         self._current_service_user = 0
         self._current_state = self._waitforjob_state
 
+        self._dispatch_table = self._build_dispatch_table()
+
     # properties
     @property
     def current_state(self):
@@ -407,61 +410,40 @@ class StorageDicePlateStateMachine(object):
                                                    sender=self._storagediceplateservice.name)
         self.dispatch(event=timeout_event)			
 			
-    def dispatch(self, *args, **kwargs):
-
-        self._storagediceplateservice.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-		
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-						
-			# tbd: sender = StorageRack 1 - 6- check if necessary or replaceable with generic interface	
-            else:
-			
-                if topic == "State": # Check if changeable with event
-				
-                    if value == "MaterialRefillDone":
-                        self._storagerackposition = int(self._parameters_list[0]) - 1
-                        if sender == (self._storageracklist[self._storagerackposition].name):
-                            self._current_state.material_refill_done()
-                    elif value == "MaterialResetDone":
-                        self._storagerackposition = int(self._parameters_list[0]) - 1
-                        if sender == (self._storageracklist[self._storagerackposition].name):
-                            self._current_state.material_reset_done()
-                    elif value == "Error":
-                        self._current_state.error()
-                    else:
-                        pass
-
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                if event.service_process == "refill":
-                    self._current_state.material_refill(parameters_list=event.parameters_list)
-                elif event.service_process == "reset":
-                    self._current_state.material_reset(parameters_list=event.parameters_list)
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                pass
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._storagediceplateservice.logger)
+
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "State", ANY, None)
+
+        # the storage racks report the end of the refill or the reset with their state
+        for rack in self._storageracklist:
+            table.message(rack.name, "State", "MaterialRefillDone", self._rack_done(rack, "material_refill_done"))
+            table.message(rack.name, "State", "MaterialResetDone", self._rack_done(rack, "material_reset_done"))
+        table.message(ANY, "State", "Error", "error")
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, None)
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _execute(self, event):
+        if event.service_process == events.StorageStationInputEvents.RefillMaterial:
+            self._current_state.material_refill(parameters_list=event.parameters_list)
+        elif event.service_process == events.StorageStationInputEvents.ResetMaterial:
+            self._current_state.material_reset(parameters_list=event.parameters_list)
+        self._current_service_user = event.service_index
+
+    def _rack_done(self, rack, entry):
+        """ Entry for the state of a storage rack, only the rack of the current job, which is addressed by the
+            parameter 1 (diceplate symbol) of the service, finishes the job """
+        def done(value):
+            self._storagerackposition = int(self._parameters_list[0]) - 1
+            if rack.name == self._storageracklist[self._storagerackposition].name:
+                getattr(self._current_state, entry)()
+        done.__name__ = entry
+        return done
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
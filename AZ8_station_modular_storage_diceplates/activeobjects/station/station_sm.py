@@ -1,6 +1,7 @@
 import abc
 from communication import events
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 
 class StationState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Station SM """
@@ -793,8 +794,8 @@ class Estop(StationState):
     def enter_action(self):
         self._station.stationState = "Error"
         self._station.logger.debug("Entering the %s state", self.name)
-        self._station.publisher.publish(topic="StationState", value="Error", sender=self._station.name)
-        self._station.publisher.publish(topic="StationSafetyState", value="safetySwitchActivated", sender=self._station.name)
+        self._station.publisher.publish_many([("StationState", "Error"),
+                                              ("StationSafetyState", "safetySwitchActivated")], sender=self._station.name)
 
         # error red LED color
         error_led_event = events.RGBLEDInputEvent(events.RGBLEDInputEvents.Red, self._station.name)
@@ -1005,6 +1006,9 @@ class StationStateMachine(object):
         self.set_state(self._current_state)
 
         self.init_required = False #  to show that an estop has happened and init is needed		
+
+        self._done_events = {0: "initialize_done", 1: "service1_done", 2: "service2_done", 3: "service3_done"}
+        self._dispatch_table = self._build_dispatch_table()
 		
     # properties
     @property
@@ -1108,85 +1112,45 @@ class StationStateMachine(object):
                                         sender=self._station.name)
 			
 			
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._station.logger)
+        eventIDs = self._station.input_events.eventIDs
+
+        table.flag("SafetySwitch", "Value", "estop", "estop_ok")
+        table.message("SafetySwitch", "State", "Error", "error")
+        table.message("SafetySwitch", "State", "NotInitialized", "error")
+        table.message("SafetySwitch", "State", "Initialized", None)
+
+        table.message(ANY, "State", "Error", "error")
+
+        # events from StorageStationInputEvent, the OPC UA parameters are in its parameters_list
+        table.event(eventIDs.Initialize, "initialize")   # this a part of the service generic interface
+        table.event(eventIDs.ProvideMaterial, self._provide_material)
+        table.event(eventIDs.RefillMaterial, self._storage_service)
+        table.event(eventIDs.ResetMaterial, self._storage_service)
+        table.event(eventIDs.Ack, self._acknowledge)
+        table.event(eventIDs.Done, self._service_done)
+        table.event(eventIDs.Error, "error")
+        table.event(eventIDs.NoConn, "noconn")
+        table.event(eventIDs.ConnOk, "conn_ok")
+        return table
+
+    def _provide_material(self, event):
+        self._current_state.service1(parameters_list=event.parameters_list)
+
+    def _storage_service(self, event):
+        self._current_state.service2(parameters_list=event.parameters_list, service_process=event.eventID)
+
+    def _acknowledge(self, event):
+        self.ack_error()
+        self.ack_message()
+        self._current_state.acknowledge()
+
+    def _service_done(self, event):
+        # service index -> done event of the state, the services 4 to 6 are not used
+        done = self._done_events.get(event.service_index)
+        if done is not None:
+            getattr(self._current_state, done)()
 
-        self._station.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "SafetySwitch":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.estop()
-                    else:
-                        self._current_state.estop_ok()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif topic == "State":
-
-                if value == "Error":
-                    self._current_state.error()
-
-        # Usage of sendername parameter from config-file (AZ8_OPCUA_Server)
-		# Dispatch in objects state machine works like "ActualStateClass.NewStateMethod"
-		# In case of initialization: self._current_state = self._notinitialized_state					
-					
-        except KeyError:
-            event = kwargs["event"]
-			
-			# Events from StorageStationInputEvent
-			
-            if event.eventID == self._station.input_events.eventIDs.Initialize:  # this a part of the service generic interface
-                self._current_state.initialize()
-				
-			# OPCUA parameters list is set in event "StorageStationInputEvent"
-            elif event.eventID == self._station.input_events.eventIDs.ProvideMaterial:
-                self._current_state.service1(parameters_list=event.parameters_list)
-				
-            elif event.eventID == self._station.input_events.eventIDs.RefillMaterial:
-                self._current_state.service2(parameters_list=event.parameters_list, service_process=event.eventID)
-
-            elif event.eventID == self._station.input_events.eventIDs.ResetMaterial:
-                self._current_state.service2(parameters_list=event.parameters_list, service_process=event.eventID)				
-				
-            elif event.eventID == self._station.input_events.eventIDs.Ack:
-                self.ack_error()
-                self.ack_message()
-                self._current_state.acknowledge()
-				
-            elif event.eventID == self._station.input_events.eventIDs.Done:
-                if event.service_index == 0:
-                    self._current_state.initialize_done()
-                elif event.service_index == 1:
-                    self._current_state.service1_done()
-                elif event.service_index == 2:
-                    self._current_state.service2_done()
-                elif event.service_index == 3:
-                    self._current_state.service3_done()
-                elif event.service_index == 4:
-                    pass
-                elif event.service_index == 5:
-                    pass
-                elif event.service_index == 6:
-                    pass
-					
-            elif event.eventID == self._station.input_events.eventIDs.Error:
-                self._current_state.error()
-            elif event.eventID == self._station.input_events.eventIDs.NoConn:
-                self._current_state.noconn()
-            elif event.eventID == self._station.input_events.eventIDs.ConnOk:
-                self._current_state.conn_ok()
-            else:
-                self._station.logger.debug("Unknown event : %s", event)
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
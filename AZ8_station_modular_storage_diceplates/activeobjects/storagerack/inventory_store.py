@@ -0,0 +1,350 @@
+""" Crash-safe inventory of the storage racks
+
+The inventory of all racks is kept in a data directory:
+
+    inventory.snapshot.json     the compacted inventory: the colors and quantities of the racks and the sequence
+                                number of the last journal record it contains, replaced atomically
+    inventory.journal           append-only records of the quantity changes after the snapshot
+
+A journal record has a fixed size of 16 bytes: sequence number, rack index (the rack's position in the snapshot's
+'racks'), the quantity deltas of the three colors and a CRC32. A withdrawal or a refill appends one record instead
+of rewriting a file. A torn record at the end of the journal (power loss during the append) fails the CRC check and
+is cut off at the next start. Every snapshot_interval records, and after a reset of a rack's colors, the snapshot
+is rewritten and the journal truncated. Records which are already in the snapshot (a crash between the snapshot
+and the truncation) are skipped by their sequence number.
+
+A rack which is neither in the snapshot nor in the journal is seeded from <seed_dir>/<rack>.json, the former
+inventory files.
+
+The InventoryIndex of the store maps the colors to the racks and slots which hold them. It is updated with every
+change, the rack of a color and the stock of a color are looked up without visiting the racks. The index is
+published as InventoryByColor (JSON: color -> total and [rack symbol, slot, quantity] of the slots).
+"""
+
+import os
+import json
+import zlib
+import struct
+import logging
+import threading
+from communication.pubsub import Publisher
+
+SNAPSHOT_FILE = 'inventory.snapshot.json'
+JOURNAL_FILE = 'inventory.journal'
+SNAPSHOT_VERSION = 1
+
+RECORD_FIELDS = struct.Struct('<IBx3h')  # sequence, rack index, deltas of color 1-3
+CRC = struct.Struct('<I')               # CRC32 of the fields
+RECORD_SIZE = RECORD_FIELDS.size + CRC.size
+SLOTS = 3
+
+
+def empty_record():
+    record = dict()
+    for slot in range(1, SLOTS + 1):
+        record['PlateColor{0}'.format(slot)] = ""
+        record['PlateColor{0}Quantity'.format(slot)] = 0
+    return record
+
+
+class InventoryIndex(object):
+    """ color -> (rack, slot, quantity) of all racks. A rack can hold any number of slots. """
+
+    def __init__(self):
+        self._slots = dict()        # (rack, slot) -> (color, quantity)
+        self._color_slots = dict()  # (rack, color) -> slots of the rack with the color, in ascending order
+        self._stock = dict()        # color -> {(rack, slot): quantity} of the slots which hold plates
+        self._totals = dict()       # color -> plates of the color in all racks
+
+    def set_slot(self, rack, slot, color, quantity):
+        old_color, old_quantity = self._slots.get((rack, slot), (None, 0))
+        if old_color is not None:
+            self._totals[old_color] -= old_quantity
+            stock = self._stock.get(old_color)
+            if stock is not None:
+                stock.pop((rack, slot), None)
+                if not stock:
+                    del self._stock[old_color]
+            if old_color != color:
+                self._color_slots[(rack, old_color)].remove(slot)
+                if not self._color_slots[(rack, old_color)]:
+                    del self._color_slots[(rack, old_color)]
+        if not color:
+            self._slots.pop((rack, slot), None)
+            return
+        self._slots[(rack, slot)] = (color, quantity)
+        self._totals[color] = self._totals.get(color, 0) + quantity
+        if quantity > 0:
+            self._stock.setdefault(color, dict())[(rack, slot)] = quantity
+        if old_color != color:
+            slots = self._color_slots.setdefault((rack, color), [])
+            slots.append(slot)
+            slots.sort()
+
+    def slot(self, rack, color):
+        """ The first slot of the rack with the color, None if the rack doesn't hold the color """
+        slots = self._color_slots.get((rack, color))
+        return slots[0] if slots else None
+
+    def supplier(self, color):
+        """ (rack, slot, quantity) of a slot which can supply a plate of the color, None if it is out of stock """
+        stock = self._stock.get(color)
+        if not stock:
+            return None
+        (rack, slot), quantity = next(iter(stock.items()))
+        return rack, slot, quantity
+
+    def total(self, color):
+        return self._totals.get(color, 0)
+
+    def entries(self, color):
+        """ (rack, slot, quantity) of all slots with the color """
+        return [(rack, slot, quantity) for (rack, slot), (slot_color, quantity) in self._slots.items()
+                if slot_color == color]
+
+    def colors(self):
+        return list(self._totals)
+
+
+def _fsync_directory(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # e.g. Windows, the directory entry can't be synced
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, data, sync=True):
+    """ Replaces the file by data, a crash leaves either the old or the new file """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        if sync:
+            os.fsync(temp_file.fileno())
+    os.replace(temp_path, path)
+    if sync:
+        _fsync_directory(os.path.dirname(os.path.abspath(path)))
+
+
+class InventoryStore(object):
+    """ Inventory of the storage racks, shared by the racks. The methods can be called from any thread. """
+
+    def __init__(self, directory, seed_dir=None, snapshot_interval=256, sync=True, logger=None):
+        self._directory = directory
+        self._seed_dir = seed_dir
+        self._snapshot_interval = snapshot_interval
+        self._sync = sync
+        self.logger = logger if logger is not None else logging.getLogger("InventoryStore")
+
+        self._lock = threading.Lock()
+        self._racks = []                # rack names, the index of a name is its index in the journal records
+        self._inventory = dict()        # rack -> record (colors and quantities)
+        self._sequence = 0              # sequence number of the last record
+        self._journal_records = 0       # records in the journal since the last snapshot
+        self._journal_fd = None
+        self._symbols = dict()          # rack -> plate symbol, the position of the rack in open()'s racks
+        self.index = InventoryIndex()
+
+        self.topics = ("InventoryByColor",)
+        self.publisher = Publisher(self.topics, logger=self.logger, name="InventoryStore")
+
+    @property
+    def name(self):
+        return "InventoryStore"
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self._directory, SNAPSHOT_FILE)
+
+    @property
+    def journal_path(self):
+        return os.path.join(self._directory, JOURNAL_FILE)
+
+    def open(self, racks):
+        """ Loads the snapshot, replays the journal and seeds the racks which aren't in the inventory yet """
+        with self._lock:
+            os.makedirs(self._directory, exist_ok=True)
+            self._load_snapshot()
+            valid_size = self._replay_journal()
+
+            self._journal_fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            if valid_size < os.fstat(self._journal_fd).st_size:
+                self.logger.warning("Inventory journal %s has a torn record at %s, it is cut off.",
+                                    self.journal_path, valid_size)
+                os.ftruncate(self._journal_fd, valid_size)
+
+            new_racks = [rack for rack in racks if rack not in self._inventory]
+            for rack in new_racks:
+                self._racks.append(rack)
+                self._inventory[rack] = self._seed(rack)
+            if new_racks or not os.path.exists(self.snapshot_path):
+                self._compact()
+
+            self._symbols = dict((rack, str(position + 1)) for position, rack in enumerate(racks))
+            self.index = InventoryIndex()
+            for rack in self._racks:
+                self._index_rack(rack, range(1, SLOTS + 1))
+
+            self.logger.info("Inventory of %s racks loaded from %s (%s journal records).",
+                             len(self._racks), self._directory, self._journal_records)
+
+    def _load_snapshot(self):
+        self._racks = []
+        self._inventory = dict()
+        self._sequence = 0
+        try:
+            with open(self.snapshot_path, 'rb') as snapshot_file:
+                snapshot = json.loads(snapshot_file.read().decode('utf-8'))
+        except FileNotFoundError:
+            return
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError("Unknown inventory snapshot version: {0}".format(snapshot.get('version')))
+        self._sequence = snapshot['sequence']
+        self._racks = list(snapshot['racks'])
+        for rack in self._racks:
+            record = empty_record()
+            record.update(snapshot['inventory'][rack])
+            self._inventory[rack] = record
+
+    def _replay_journal(self):
+        """ Applies the records after the snapshot, returns the size of the valid part of the journal """
+        self._journal_records = 0
+        try:
+            with open(self.journal_path, 'rb') as journal_file:
+                data = journal_file.read()
+        except FileNotFoundError:
+            return 0
+
+        offset = 0
+        while offset + RECORD_SIZE <= len(data):
+            fields = RECORD_FIELDS.unpack_from(data, offset)
+            sequence, rack_index, deltas = fields[0], fields[1], fields[2:]
+            crc, = CRC.unpack_from(data, offset + RECORD_FIELDS.size)
+            if crc != zlib.crc32(data[offset:offset + RECORD_FIELDS.size]) or rack_index >= len(self._racks):
+                break
+            if sequence > self._sequence:
+                if sequence != self._sequence + 1:
+                    # a gap, the records after it can't be trusted
+                    break
+                self._apply(self._racks[rack_index], deltas)
+                self._sequence = sequence
+            self._journal_records += 1
+            offset += RECORD_SIZE
+        return offset
+
+    def _seed(self, rack):
+        record = empty_record()
+        if self._seed_dir is None:
+            return record
+        path = os.path.join(self._seed_dir, rack + '.json')
+        try:
+            with open(path) as seed_file:
+                record.update(json.load(seed_file))
+            self.logger.info("Inventory of %s taken from %s.", rack, path)
+        except FileNotFoundError:
+            self.logger.warning("No inventory of %s, the rack is empty.", rack)
+        return record
+
+    def _apply(self, rack, deltas):
+        record = self._inventory[rack]
+        for slot, delta in enumerate(deltas, 1):
+            record['PlateColor{0}Quantity'.format(slot)] += delta
+
+    def _compact(self):
+        snapshot = {'version': SNAPSHOT_VERSION,
+                    'sequence': self._sequence,
+                    'racks': self._racks,
+                    'inventory': self._inventory}
+        write_atomic(self.snapshot_path, json.dumps(snapshot, indent=4, sort_keys=True).encode('utf-8'), self._sync)
+        os.ftruncate(self._journal_fd, 0)
+        if self._sync:
+            os.fsync(self._journal_fd)
+        self._journal_records = 0
+
+    def _index_rack(self, rack, slots):
+        record = self._inventory[rack]
+        for slot in slots:
+            self.index.set_slot(rack, slot, record['PlateColor{0}'.format(slot)],
+                                record['PlateColor{0}Quantity'.format(slot)])
+
+    def register_subscribers(self, topic, who, callback=None):
+        if topic not in self.topics:
+            raise ValueError("Unknown topic")
+        self.publisher.register(topic, who, callback)
+
+    def publish_index(self):
+        """ Publishes the index as InventoryByColor """
+        self.publisher.publish(topic="InventoryByColor", value=self.index_json(), sender=self.name)
+
+    def index_json(self):
+        with self._lock:
+            inventory = dict()
+            for color in self.index.colors():
+                inventory[color] = {'total': self.index.total(color),
+                                    'racks': sorted([self._symbols.get(rack, rack), slot, quantity]
+                                                    for rack, slot, quantity in self.index.entries(color))}
+        return json.dumps(inventory, sort_keys=True)
+
+    def slot(self, rack, color):
+        """ The slot (1-3) of the color in the rack, None if the rack doesn't hold the color """
+        with self._lock:
+            return self.index.slot(rack, color)
+
+    def find(self, color):
+        """ (rack, plate symbol, slot, quantity) of a rack which can supply the color, None if it is out of stock """
+        with self._lock:
+            supplier = self.index.supplier(color)
+        if supplier is None:
+            return None
+        rack, slot, quantity = supplier
+        return rack, self._symbols.get(rack), slot, quantity
+
+    def stock(self, color):
+        """ The plates of the color in all racks """
+        with self._lock:
+            return self.index.total(color)
+
+    def get(self, rack):
+        """ The record of the rack: PlateColor1-3 and PlateColor1-3Quantity """
+        with self._lock:
+            return dict(self._inventory[rack])
+
+    def add(self, rack, deltas):
+        """ Adds the deltas of the three colors to the quantities of the rack, returns the new record """
+        deltas = tuple(deltas)
+        with self._lock:
+            self._sequence += 1
+            data = RECORD_FIELDS.pack(self._sequence, self._racks.index(rack), *deltas)
+            os.write(self._journal_fd, data + CRC.pack(zlib.crc32(data)))
+            if self._sync:
+                os.fsync(self._journal_fd)
+            self._apply(rack, deltas)
+            self._index_rack(rack, [slot for slot, delta in enumerate(deltas, 1) if delta])
+            self._journal_records += 1
+            if self._journal_records >= self._snapshot_interval:
+                self._compact()
+            record = dict(self._inventory[rack])
+        self.publish_index()
+        return record
+
+    def reset(self, rack, record):
+        """ Replaces the colors and quantities of the rack, written as a new snapshot """
+        with self._lock:
+            new_record = empty_record()
+            new_record.update(record)
+            self._inventory[rack] = new_record
+            self._index_rack(rack, range(1, SLOTS + 1))
+            self._compact()
+        self.publish_index()
+        return dict(new_record)
+
+    def close(self):
+        with self._lock:
+            if self._journal_fd is not None:
+                os.close(self._journal_fd)
+                self._journal_fd = None
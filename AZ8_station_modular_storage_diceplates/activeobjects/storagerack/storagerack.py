@@ -7,7 +7,7 @@ from activeobjects.storagerack.storagerack_sm import RackStateMachine
 
 class StorageRack(Actor):
     """ Rack class class as an active object """
-    def __init__(self, name, station, rgbled, blinker, presencesensor, diceplate_symbol, topics):
+    def __init__(self, name, station, rgbled, blinker, presencesensor, diceplate_symbol, inventory, topics):
         super(StorageRack, self).__init__(name=name)
 
         self._name = name
@@ -33,6 +33,7 @@ class StorageRack(Actor):
         self._presenceSensor = presencesensor  # rack's top sensor ref
         self._rgbLed = rgbled  # rack's bottom sensor ref
         self._blinker = blinker
+        self.inventory = inventory  # the InventoryStore of all racks
 
         self._rackStateMachine = RackStateMachine(self)  # rack's active state machine object
 
@@ -2,9 +2,8 @@ import abc
 from communication import events
 from threading import Timer
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable
 import config
-import json
-import io
 
 class RackState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Rack SM """
@@ -135,14 +134,8 @@ class Initialization(RackState):
         self._rack.logger.debug("Entering the %s state", self.name)
         self._rack.publisher.publish(topic="State", value="Initialized", sender=self._rack.name)
 
-        # Load material storage data into a list from json-file
-        self._storagefilename = ('/home/pi/station_modular_storage_diceplates/activeobjects/storagerack/' + self._rack.name + '.json')
-		
-		# handling if not available
-        with open(self._storagefilename) as data_file:
-            data_loaded = json.load(data_file)
-			
-        data_file.close
+        # Load material storage data of the rack from the inventory
+        data_loaded = self._rack.inventory.get(self._rack.name)
 		
 		# Update material storage data into the active object
         self._rack.diceplate_color1=data_loaded["PlateColor1"]
@@ -153,14 +146,14 @@ class Initialization(RackState):
         self._rack.diceplate_color3_quantity=data_loaded["PlateColor3Quantity"]
 
         # Publish colors 1-3 and the corresponding total quantity to OPCUA-Server
-        self._rack.publisher.publish(topic="PlateColor1", value=self._rack.diceplate_color1, sender=self._rack.name)
-        self._rack.publisher.publish(topic="QuantityOfPlateColor1", value=self._rack.diceplate_color1_quantity, sender=self._rack.name)
-        self._rack.publisher.publish(topic="PlateColor2", value=self._rack.diceplate_color2, sender=self._rack.name)
-        self._rack.publisher.publish(topic="QuantityOfPlateColor2", value=self._rack.diceplate_color2_quantity, sender=self._rack.name)		
-        self._rack.publisher.publish(topic="PlateColor3", value=self._rack.diceplate_color3, sender=self._rack.name)
-        self._rack.publisher.publish(topic="QuantityOfPlateColor3", value=self._rack.diceplate_color3_quantity, sender=self._rack.name)		
+        self._rack.publisher.publish_many([("PlateColor1", self._rack.diceplate_color1),
+                                           ("QuantityOfPlateColor1", self._rack.diceplate_color1_quantity),
+                                           ("PlateColor2", self._rack.diceplate_color2),
+                                           ("QuantityOfPlateColor2", self._rack.diceplate_color2_quantity),
+                                           ("PlateColor3", self._rack.diceplate_color3),
+                                           ("QuantityOfPlateColor3", self._rack.diceplate_color3_quantity)], sender=self._rack.name)
 		
-        self._rack.logger.debug("Material storage data loaded from JSON-File %s", self._storagefilename)
+        self._rack.logger.debug("Material storage data loaded from the inventory")
 		
 	# Publish in same state provides same initialized event
     def initialize(self):
@@ -172,45 +165,19 @@ class Initialization(RackState):
 		# First set the current used parameters list to the service object,
         self._rack_sm.set_parameters(parameters_list)
 		
-        # Check if the requested color is available in the current storageracks
-        if str(self._rack.diceplate_color1) == parameters_list[1]:
-		
-            # Check of diceplate color 1 quantity
-            if (self._rack.diceplate_color1_quantity - 1) >= 0:
-			
-                self._rack.logger.debug("%s event in %s state", self.provide_material.__name__, self.name)
-                self._rack_sm.set_state(self._rack_sm._provide_material_state)
-				
-            else:
-                self._rack_sm.publish_error(error_codes.RackErrorCodes.RackDiceplateNumMinimum)
-                self._rack_sm.set_state(self._rack_sm._error_state)
-				
-        elif str(self._rack.diceplate_color2) == parameters_list[1]:
-		
-            # Check of diceplate color 2 quantity
-            if (self._rack.diceplate_color2_quantity - 1) >= 0:
-				
-                self._rack.logger.debug("%s event in %s state", self.provide_material.__name__, self.name)
-                self._rack_sm.set_state(self._rack_sm._provide_material_state)	
+        # Check if the requested color is available in the current storagerack, the slot comes from the inventory index
+        slot = self._rack.inventory.slot(self._rack.name, parameters_list[1])
+        if slot is None:
+            self._rack_sm.publish_error(error_codes.RackErrorCodes.WrongDiceplateColor)
+            self._rack_sm.set_state(self._rack_sm._error_state)
 
-            else:
-                self._rack_sm.publish_error(error_codes.RackErrorCodes.RackDiceplateNumMinimum)
-                self._rack_sm.set_state(self._rack_sm._error_state)				
-				
-        elif str(self._rack.diceplate_color3) == parameters_list[1]:	
-		
-            # Check of diceplate color 3 quantity
-            if (self._rack.diceplate_color3_quantity - 1) >= 0:
-                	
-                self._rack.logger.debug("%s event in %s state", self.provide_material.__name__, self.name)
-                self._rack_sm.set_state(self._rack_sm._provide_material_state)	
+        # Check of the diceplate quantity of the slot
+        elif (getattr(self._rack, "diceplate_color{0}_quantity".format(slot)) - 1) >= 0:
+            self._rack.logger.debug("%s event in %s state", self.provide_material.__name__, self.name)
+            self._rack_sm.set_state(self._rack_sm._provide_material_state)
 
-            else:
-                self._rack_sm.publish_error(error_codes.RackErrorCodes.RackDiceplateNumMinimum)
-                self._rack_sm.set_state(self._rack_sm._error_state)				
-				
         else:
-            self._rack_sm.publish_error(error_codes.RackErrorCodes.WrongDiceplateColor)
+            self._rack_sm.publish_error(error_codes.RackErrorCodes.RackDiceplateNumMinimum)
             self._rack_sm.set_state(self._rack_sm._error_state)
 
     def movement_in_progress(self, action=None):
@@ -353,55 +320,21 @@ class ProvideMaterial(RackState):
             # Get the actual parameters setting
             self._parameters_list = self._rack_sm.parameters_list()
 		
-            # Check which color has been requested to provide it from the storagerack
-            if str(self._rack.diceplate_color1) == self._parameters_list[1]:	
-			
-                self._rack.logger.debug("Provide color %s diceplate quantity &s with quantity 1", self._parameters_list[1])                
-                self._rack.diceplate_color1_quantity = (self._rack.diceplate_color1_quantity - 1)
-								
-                # Publish total quantity of color 1 to OPCUA-Server
-                self._rack.publisher.publish(topic="QuantityOfPlateColor1", value=self._rack.diceplate_color1_quantity, sender=self._rack.name)
+            # The slot of the requested color comes from the inventory index
+            slot = self._rack.inventory.slot(self._rack.name, self._parameters_list[1])
+            if slot is not None:
 
-            # Check which color has been requested to provide it from the storagerack
-            elif str(self._rack.diceplate_color2) == self._parameters_list[1]:	
-			
-                self._rack.logger.debug("Provide color %s diceplate quantity &s with quantity 1", self._parameters_list[1])                
-                self._rack.diceplate_color2_quantity = (self._rack.diceplate_color2_quantity - 1)
-								
-                # Publish total quantity of color 2 to OPCUA-Server
-                self._rack.publisher.publish(topic="QuantityOfPlateColor2", value=self._rack.diceplate_color2_quantity, sender=self._rack.name)				
+                self._rack.logger.debug("Provide color %s diceplate from slot %s with quantity 1", self._parameters_list[1], slot)
+                deltas = [0, 0, 0]
+                deltas[slot - 1] = -1
 
-            # Check which color has been requested to provide it from the storagerack
-            elif str(self._rack.diceplate_color3) == self._parameters_list[1]:	
-			
-                self._rack.logger.debug("Provide color %s diceplate quantity &s with quantity 1", self._parameters_list[1])                
-                self._rack.diceplate_color3_quantity = (self._rack.diceplate_color3_quantity - 1)
-								
-                # Publish total quantity of color 3 to OPCUA-Server
-                self._rack.publisher.publish(topic="QuantityOfPlateColor3", value=self._rack.diceplate_color3_quantity, sender=self._rack.name)		
-				
-            # Save material storage data into a list for export them into json
-            self._storagedata = {'PlateColor1': self._rack.diceplate_color1,
-                                 'PlateColor1Quantity': self._rack.diceplate_color1_quantity,
-                                 'PlateColor2': self._rack.diceplate_color2,
-                                 'PlateColor2Quantity': self._rack.diceplate_color2_quantity,
-                                 'PlateColor3': self._rack.diceplate_color3,
-                                 'PlateColor3Quantity': self._rack.diceplate_color3_quantity}
-			
-            # Save the storage data in an own storage-rack json-file
-            try:
-                self._to_unicode = unicode
-            except NameError:
-                self._to_unicode = str
-				
-            self._storagefilename = ('/home/pi/station_modular_storage_diceplates/activeobjects/storagerack/' + self._rack.name + '.json')
-			
-            with io.open(self._storagefilename, 'w', encoding='utf8') as outfile:
-                self.datastream = json.dumps(self._storagedata,
-                                             indent=4, sort_keys=True,
-                                             separators=(',', ': '), ensure_ascii=False)
-                outfile.write(self._to_unicode(self.datastream))
-            outfile.close				
+                # Append the withdrawal to the inventory journal
+                record = self._rack.inventory.add(self._rack.name, deltas)
+                quantity = record["PlateColor{0}Quantity".format(slot)]
+                setattr(self._rack, "diceplate_color{0}_quantity".format(slot), quantity)
+
+                # Publish total quantity of the color to OPCUA-Server
+                self._rack.publisher.publish(topic="QuantityOfPlateColor{0}".format(slot), value=quantity, sender=self._rack.name)
 				
 			# Note: Broadcast event to all subscribed objects
             self._rack.publisher.publish(topic="State", value="MaterialWithdrawalDone", sender=self._rack.name)
@@ -495,30 +428,11 @@ class RefillMaterial(RackState):
                 # Publish total quantity of color 3 to OPCUA-Server
                 self._rack.publisher.publish(topic="QuantityOfPlateColor3", value=self._rack.diceplate_color3_quantity, sender=self._rack.name)
 					
-                # Save material storage data into a list for export them into json
-                self._storagedata = {'PlateColor1': self._rack.diceplate_color1,
-                                     'PlateColor1Quantity': self._rack.diceplate_color1_quantity,
-                                     'PlateColor2': self._rack.diceplate_color2,
-                                     'PlateColor2Quantity': self._rack.diceplate_color2_quantity,
-                                     'PlateColor3': self._rack.diceplate_color3,
-                                     'PlateColor3Quantity': self._rack.diceplate_color3_quantity}
-			
-                # Save the storage data in an own storage-rack json-file
-                try:
-                    self._to_unicode = unicode
-                except NameError:
-                    self._to_unicode = str
+                # Append the refill to the inventory journal
+                self._rack.inventory.add(self._rack.name, (int(self._parameters_list[2]), int(self._parameters_list[4]),
+                                                           int(self._parameters_list[6])))
 				
-                self._storagefilename = ('/home/pi/station_modular_storage_diceplates/activeobjects/storagerack/' + self._rack.name + '.json')
-			
-                with io.open(self._storagefilename, 'w', encoding='utf8') as outfile:
-                    self.datastream = json.dumps(self._storagedata,
-                                                 indent=4, sort_keys=True,
-                                                 separators=(',', ': '), ensure_ascii=False)
-                    outfile.write(self._to_unicode(self.datastream))
-                outfile.close
-				
-                self._rack.logger.debug("Material storage data saved into JSON-File %s", self._storagefilename)		
+                self._rack.logger.debug("Material storage data saved into the inventory")		
 
 		    # Refill service has been cancelled
             else:
@@ -642,22 +556,10 @@ class ResetMaterial(RackState):
                                  'PlateColor3': self._rack.diceplate_color3,
                                  'PlateColor3Quantity': self._rack.diceplate_color3_quantity}
 			
-            # Save the storage data in an own storage-rack json-file
-            try:
-                self._to_unicode = unicode
-            except NameError:
-                self._to_unicode = str
-				
-            self._storagefilename = ('/home/pi/station_modular_storage_diceplates/activeobjects/storagerack/' + self._rack.name + '.json')
-			
-            with io.open(self._storagefilename, 'w', encoding='utf8') as outfile:
-                self.datastream = json.dumps(self._storagedata,
-                                             indent=4, sort_keys=True,
-                                             separators=(',', ': '), ensure_ascii=False)
-                outfile.write(self._to_unicode(self.datastream))
-            outfile.close
+            # Save the storage data as a new snapshot of the inventory
+            self._rack.inventory.reset(self._rack.name, self._storagedata)
 				
-            self._rack.logger.debug("Material storage data saved into JSON-File %s", self._storagefilename)		
+            self._rack.logger.debug("Material storage data saved into the inventory")		
 		
 		# Reset service has been cancelled
         else:
@@ -760,6 +662,8 @@ class RackStateMachine(object):
         self._rack = rack
 
         self._current_state = self._notinitialized_state
+
+        self._dispatch_table = self._build_dispatch_table()
         self.set_state(self._current_state)
 
 # properties
@@ -841,68 +745,45 @@ class RackStateMachine(object):
                                      value=message_codes.code_to_text[message_code],
                                      sender=self._rack.name)
 			
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._rack.logger)
 
-        self._rack.logger.debug("%s has received a message: %s", self.name, kwargs)
+        eventIDs = self._rack.input_events.eventIDs
 
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-			
-			# Note: Matches-Function and state
-            if sender == self._rack._presenceSensor.name:
-			    
-                if topic == "Value":
-				
-                    if value:
-                        self._current_state.movement_in_progress(action="Start")
-                    else:
-                        self._current_state.movement_in_progress(action="Finish")
+        # note: matches function and state
+        table.flag(self._rack._presenceSensor.name, "Value", self._movement_started, self._movement_finished)
+        table.flag("InteractionSensor1", "Value", self._movement_confirmed, None)
+        table.flag("InteractionSensor2", "Value", self._movement_canceled, None)
+        table.flag("Station", "Ack", "acknowledge", None)
 
-            elif sender == "InteractionSensor1":
-			
-                if topic == "Value":
-                    if value:
-                        self._current_state.movement_confirmed(action="Finish")
-						
-            elif sender == "InteractionSensor2":
-			
-                if topic == "Value":
-                    if value:
-                        self._current_state.movement_confirmed(action="Cancel")
-						
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-
-        except KeyError:
-            event = kwargs["event"]
-
-            if event.eventID == self._rack.input_events.eventIDs.Initialize:  # this a part of the service generic interface
-                self._current_state.initialize()
-            
-			# Call of provide_material is intended for status initialized
-            elif event.eventID == self._rack.input_events.eventIDs.ProvideMaterial:  
-                self._current_state.provide_material(parameters_list=event.parameters_list)
-				
-            # Call of refill_material is intended for status initialized
-            elif event.eventID == self._rack.input_events.eventIDs.RefillMaterial: 
-                self._current_state.store_material(parameters_list=event.parameters_list, action="Refill")
-				
-            # Call of reset_material is intended for status initialized
-            elif event.eventID == self._rack.input_events.eventIDs.ResetMaterial: 
-                self._current_state.store_material(parameters_list=event.parameters_list, action="Reset")
-				
-            elif event.eventID == self._rack.input_events.eventIDs.Ack:
-                self._current_state.acknowledge()
-				
-            elif event.eventID == self._rack.input_events.eventIDs.Update:
-                self._current_state.update()
-            else:
-                self._station.logger.debug("Unknown event : %s", event)
+        table.event(eventIDs.Initialize, "initialize")   # this a part of the service generic interface
+        # the services are intended for the state Initialized
+        table.event(eventIDs.ProvideMaterial, self._provide_material)
+        table.event(eventIDs.RefillMaterial, self._refill_material)
+        table.event(eventIDs.ResetMaterial, self._reset_material)
+        table.event(eventIDs.Ack, "acknowledge")
+        return table
+
+    def _movement_started(self, value):
+        self._current_state.movement_in_progress(action="Start")
+
+    def _movement_finished(self, value):
+        self._current_state.movement_in_progress(action="Finish")
+
+    def _movement_confirmed(self, value):
+        self._current_state.movement_confirmed(action="Finish")
+
+    def _movement_canceled(self, value):
+        self._current_state.movement_confirmed(action="Cancel")
+
+    def _provide_material(self, event):
+        self._current_state.provide_material(parameters_list=event.parameters_list)
+
+    def _refill_material(self, event):
+        self._current_state.store_material(parameters_list=event.parameters_list, action="Refill")
+
+    def _reset_material(self, event):
+        self._current_state.store_material(parameters_list=event.parameters_list, action="Reset")
+
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -1,38 +1,345 @@
-import threading
+""" Ethernet connection monitor
+
+The link states of the monitored interfaces come from a link source:
+
+    NetlinkLinkSource   kernel link notifications of an rtnetlink socket, a pulled cable is seen at once
+    SysfsLinkSource     polls /sys/class/net/<interface>/operstate, the fallback without rtnetlink
+    FakeLinkSource      test double, the links are set by set_link()
+
+The connection is alive as long as at least one of the interfaces is up. A changed link state has to be stable for
+the debounce time before conn_broken_cb/conn_alive_cb is called.
+"""
+
+import os
 import time
+import queue
+import select
+import socket
+import struct
+import threading
+
+SYSFS_NET = '/sys/class/net'
+
+# rtnetlink, see linux/rtnetlink.h and linux/if_link.h
+RTMGRP_LINK = 0x1
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+NLMSG_HEADER = struct.Struct('=IHHII')      # length, type, flags, sequence, port id
+IFINFO = struct.Struct('=BxHiII')           # family, device type, index, flags, change mask
+RTATTR = struct.Struct('=HH')               # length, type
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IF_OPER_UNKNOWN = 0
+IF_OPER_UP = 6
+IFF_LOWER_UP = 0x10000
+
+
+def read_operstate(interface):
+    """ True if the interface is up, False if it is down or doesn't exist. Drivers without operstate report
+        'unknown', their link is up as far as the kernel knows. """
+    try:
+        with open(os.path.join(SYSFS_NET, interface, 'operstate')) as operstate_file:
+            return operstate_file.read().strip().lower() in ('up', 'unknown')
+    except OSError:
+        return False
+
+
+def _align(length):
+    return (length + 3) & ~3
+
+
+def parse_link_messages(data):
+    """ (interface, up) of the RTM_NEWLINK/RTM_DELLINK messages in a datagram of a rtnetlink socket """
+    links = []
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, message_type, flags, sequence, port_id = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size or offset + length > len(data):
+            break
+        if message_type in (RTM_NEWLINK, RTM_DELLINK):
+            position = offset + NLMSG_HEADER.size
+            family, device_type, index, if_flags, change = IFINFO.unpack_from(data, position)
+            position += IFINFO.size
+            interface, operstate = None, None
+            while position + RTATTR.size <= offset + length:
+                attr_length, attr_type = RTATTR.unpack_from(data, position)
+                if attr_length < RTATTR.size:
+                    break
+                value = data[position + RTATTR.size:position + attr_length]
+                if attr_type == IFLA_IFNAME:
+                    interface = value.split(b'\0', 1)[0].decode('ascii', 'replace')
+                elif attr_type == IFLA_OPERSTATE and value:
+                    operstate = value[0]
+                position += _align(attr_length)
+            if interface is not None:
+                if message_type == RTM_DELLINK:
+                    up = False
+                elif operstate is not None and operstate != IF_OPER_UNKNOWN:
+                    up = operstate == IF_OPER_UP
+                else:
+                    up = bool(if_flags & IFF_LOWER_UP)
+                links.append((interface, up))
+        offset += _align(length)
+    return links
+
+
+class SysfsLinkSource(object):
+    """ Polls the operstate of the interfaces every interval seconds """
+
+    def __init__(self, interfaces, interval=1.0):
+        self._interfaces = tuple(interfaces)
+        self._interval = interval
+        self._states = dict((interface, read_operstate(interface)) for interface in self._interfaces)
+        self._closed = threading.Event()
+
+    def fileno(self):
+        return None
+
+    def read_state(self, interface):
+        return self._states.get(interface, False)
+
+    def read_changes(self, timeout=0.0):
+        """ Waits up to timeout (at most the poll interval) and returns the changed (interface, up) """
+        if timeout > 0:
+            self._closed.wait(min(timeout, self._interval))
+        changes = []
+        for interface in self._interfaces:
+            up = read_operstate(interface)
+            if up != self._states[interface]:
+                self._states[interface] = up
+                changes.append((interface, up))
+        return changes
+
+    def close(self):
+        self._closed.set()
+
+
+class NetlinkLinkSource(object):
+    """ Link notifications of the kernel, raises OSError if there is no rtnetlink """
+
+    def __init__(self, interfaces):
+        self._interfaces = frozenset(interfaces)
+        self._socket = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+        try:
+            self._socket.bind((0, RTMGRP_LINK))
+            self._socket.setblocking(False)
+        except OSError:
+            self._socket.close()
+            raise
+        # the states before the first notification
+        self._states = dict((interface, read_operstate(interface)) for interface in self._interfaces)
+
+    def fileno(self):
+        return self._socket.fileno() if self._socket is not None else None
+
+    def read_state(self, interface):
+        return self._states.get(interface, False)
+
+    def read_changes(self, timeout=0.0):
+        """ Waits up to timeout for notifications and returns the (interface, up) of the monitored interfaces """
+        if self._socket is None:
+            return []
+        if timeout > 0:
+            try:
+                readable, _, _ = select.select([self._socket], [], [], timeout)
+            except (OSError, ValueError):
+                # closed by stop()
+                return []
+            if not readable:
+                return []
+        changes = []
+        while True:
+            try:
+                data = self._socket.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                # e.g. ENOBUFS: notifications were lost, take the current states
+                changes.extend((interface, read_operstate(interface)) for interface in self._interfaces)
+                break
+            changes.extend(link for link in parse_link_messages(data) if link[0] in self._interfaces)
+        for interface, up in changes:
+            self._states[interface] = up
+        return changes
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class FakeLinkSource(object):
+    """ Test double of a link source: set_link() changes a link like a pulled or plugged cable """
+
+    def __init__(self, interfaces, up=True):
+        self._states = dict((interface, up) for interface in interfaces)
+        self._changes = queue.Queue()
+
+    def fileno(self):
+        return None
+
+    def set_link(self, interface, up):
+        self._states[interface] = up
+        self._changes.put((interface, up))
+
+    def read_state(self, interface):
+        return self._states.get(interface, False)
+
+    def read_changes(self, timeout=0.0):
+        changes = []
+        try:
+            changes.append(self._changes.get(timeout=timeout) if timeout > 0 else self._changes.get_nowait())
+            while True:
+                changes.append(self._changes.get_nowait())
+        except queue.Empty:
+            pass
+        return [change for change in changes if change is not None]
+
+    def close(self):
+        self._changes.put(None)
+
+
+def create_link_source(interfaces, interval=1.0, link_events=True, logger=None):
+    """ A NetlinkLinkSource, or a SysfsLinkSource if link_events is False or rtnetlink isn't available """
+    for interface in interfaces:
+        if logger is not None and not os.path.exists(os.path.join(SYSFS_NET, interface)):
+            logger.warning("Network interface %s doesn't exist, its link is down.", interface)
+    if link_events:
+        try:
+            return NetlinkLinkSource(interfaces)
+        except (AttributeError, OSError) as error:
+            if logger is not None:
+                logger.warning("No link notifications (%s), the links are polled every %s s.", error, interval)
+    return SysfsLinkSource(interfaces, interval)
+
 
 class ConnMonitor(threading.Thread):
     """ Ethernet connection monitor ."""
 
-    def __init__(self, name, logger, conn_alive_cb, conn_broken_cb):
+    def __init__(self, name, logger, conn_alive_cb, conn_broken_cb, loop=None, interval=1.0, interfaces=('eth0',),
+                 debounce=0.05, link_events=True, source=None):
         threading.Thread.__init__(self, name=name, daemon=True)
         self._must_stop = False
         self._conn_alive_cb = conn_alive_cb
         self._conn_broken_cb = conn_broken_cb
         self._logger = logger
+        self._interval = interval
+        self._interfaces = tuple(interfaces)
+        self._debounce = debounce
+        self._is_triggered = False
+
+        if source is None:
+            source = create_link_source(self._interfaces, interval, link_events, logger)
+        self._source = source
+        self._links = dict()            # interface -> debounced state
+        self._pending = dict()          # interface -> (new state, time when it is taken)
+
+        self._loop = loop           # an AsyncioScheduler hosting the monitor instead of an own thread
+        self._periodic_job = None
+        self._reader_fd = None
+        self._debounce_handle = None
+
+    @property
+    def connected(self):
+        return not self._is_triggered
+
+    def start(self):
+        for interface in self._interfaces:
+            self._links[interface] = self._source.read_state(interface)
+        if self._loop is None:
+            threading.Thread.start(self)
+        else:
+            self._logger.info("Ethernet connection monitor has been started.")
+            self._report_initial_state()
+            self._reader_fd = self._source.fileno()
+            if self._reader_fd is None:
+                self._periodic_job = self._loop.call_periodic(self._interval, self.check_link)
+            else:
+                self._loop.call_soon(self._loop.loop.add_reader, self._reader_fd, self.check_link)
+
+    def is_alive(self):
+        if self._loop is None:
+            return threading.Thread.is_alive(self)
+        if self._reader_fd is not None:
+            return not self._must_stop
+        return self._periodic_job is not None and not self._periodic_job.done()
 
     def stop(self):
         self._must_stop = True
+        if self._periodic_job is not None:
+            self._periodic_job.cancel()
+        if self._loop is not None:
+            self._loop.call_soon(self._stop_in_loop)
+        else:
+            self._source.close()
         self._logger.info("Ethernet connection monitor has been stopped.")
 
-    def run(self):
-        is_triggered = False
-        self._logger.info("Ethernet connection monitor has been started.")
+    def _stop_in_loop(self):
+        if self._reader_fd is not None:
+            self._loop.loop.remove_reader(self._reader_fd)
+        if self._debounce_handle is not None:
+            self._debounce_handle.cancel()
+        self._source.close()
+
+    def _report_initial_state(self):
         self._conn_alive_cb()
+        if not any(self._links.values()):
+            self._is_triggered = True
+            self._logger.info("Ethernet connection is broken.")
+            self._conn_broken_cb()
 
-        while not self._must_stop:
+    def _take_changes(self, changes, now):
+        for interface, up in changes:
+            if up == self._links.get(interface):
+                # flapped back within the debounce time
+                self._pending.pop(interface, None)
+            elif interface not in self._pending:
+                self._pending[interface] = (up, now + self._debounce)
 
-            with open('/sys/class/net/eth0/operstate') as f:
-                read_data = f.read()
-            if (read_data.strip().lower() == 'down') and not is_triggered:
-                is_triggered = True
-                self._logger.info("Ethernet connection was brocken.")
-                self._conn_broken_cb()
-            elif (read_data.strip().lower() == 'up') and is_triggered:
-                is_triggered = False
-                self._logger.info("Ethernet connection was renewed.")
-                self._conn_alive_cb()
+    def _update(self, now):
+        """ Takes the link states which are stable for the debounce time and calls the callbacks. Returns the time
+            of the next pending state or None. """
+        for interface, (up, due) in list(self._pending.items()):
+            if due <= now:
+                del self._pending[interface]
+                self._links[interface] = up
+                self._logger.debug("Link of %s is %s.", interface, "up" if up else "down")
 
-            f.close()
+        connected = any(self._links.values())
+        if not connected and not self._is_triggered:
+            self._is_triggered = True
+            self._logger.info("Ethernet connection was broken.")
+            self._conn_broken_cb()
+        elif connected and self._is_triggered:
+            self._is_triggered = False
+            self._logger.info("Ethernet connection was renewed.")
+            self._conn_alive_cb()
 
-            time.sleep(1)
\ No newline at end of file
+        if self._pending:
+            return min(due for up, due in self._pending.values())
+        return None
+
+    def check_link(self):
+        """ Takes the link changes without waiting, the job of the event loop """
+        if self._must_stop:
+            return
+        now = time.monotonic()
+        self._take_changes(self._source.read_changes(), now)
+        next_due = self._update(now)
+        if self._debounce_handle is not None:
+            self._debounce_handle.cancel()
+            self._debounce_handle = None
+        if next_due is not None:
+            self._debounce_handle = self._loop.loop.call_later(max(0.0, next_due - now), self.check_link)
+
+    def run(self):
+        self._logger.info("Ethernet connection monitor has been started.")
+        self._report_initial_state()
+
+        next_due = None
+        while not self._must_stop:
+            timeout = self._interval if next_due is None else max(0.0, next_due - time.monotonic())
+            changes = self._source.read_changes(timeout if timeout > 0 else 0.0)
+            now = time.monotonic()
+            self._take_changes(changes, now)
+            next_due = self._update(now)
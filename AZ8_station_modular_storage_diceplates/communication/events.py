@@ -1,56 +1,58 @@
+""" Events of the active objects
 
-class SimpleEventBaseClass(object):
-    """ Simple event class """
+The string constants of the *Events classes are interned into EventIDs when the classes are created: equal
+strings get the same small int in all classes (e.g. every Ack), so the IDs compare as ints and still print as
+their strings. The event classes share their ID class and keep their attributes in __slots__.
+"""
 
-    def __init__(self, eventID, sender):
-        self.eventID = eventID
-        self.sender = sender
+_event_names = []           # event ID -> string
+_event_ids = dict()         # string -> event ID
 
-    def __repr__(self):
-        return str(self.eventID) + ',' + str(self.sender)
 
-    @property
-    def eventID(self):
-        return self._eventID
+class EventID(int):
+    """ Interned event ID, prints as the string it was interned from """
+    __slots__ = ()
 
-    @eventID.setter
-    def eventID(self, new_eventID):
-        # perform some checking
-        self._eventID = new_eventID
+    def __str__(self):
+        return _event_names[self]
 
-    @property
-    def sender(self):
-        return self._sender
+    __repr__ = __str__
 
-    @sender.setter
-    def sender(self, new_sender):
-        # perform some checking
-        self._sender = new_sender
+    def __reduce__(self):
+        # pickled as the string (e.g. an event trace), the numbers depend on the order of the interning
+        return intern_event_id, (_event_names[self],)
 
 
-class BaseInputEvents(object):
-    NoEvent = 'none'
-    Initialize = 'initialize'
-    Ack = 'ack'
-    Error = 'error'
-    Timeout = 'timeout'
-    Update = 'update'
+def intern_event_id(name):
+    """ The EventID of a string """
+    event_id = _event_ids.get(name)
+    if event_id is None:
+        event_id = EventID(len(_event_names))
+        _event_names.append(name)
+        _event_ids[name] = event_id
+    return event_id
 
 
-class BaseInputEvent(SimpleEventBaseClass):
-    """ Base events class """
+class EventIDsMeta(type):
+    """ Interns the string constants of an event ID class, the IDs are read-only afterwards """
 
-    def __init__(self, eventID, sender):
-        super(BaseInputEvent, self).__init__(eventID, sender)
-        self._eventIDs = BaseInputEvents()
+    def __new__(mcs, name, bases, namespace):
+        for key, value in list(namespace.items()):
+            if not key.startswith('_') and isinstance(value, str):
+                namespace[key] = intern_event_id(value)
+        return super(EventIDsMeta, mcs).__new__(mcs, name, bases, namespace)
 
-    @property
-    def eventIDs(self):
-        return self._eventIDs
+    def __setattr__(cls, key, value):
+        raise AttributeError("The event IDs of {0} are read-only".format(cls.__name__))
+
+
+class EventIDs(object, metaclass=EventIDsMeta):
+    """ Base class of the event ID classes """
 
 
 class SimpleEventBaseClass(object):
     """ Simple event class """
+    __slots__ = ('eventID', 'sender')
 
     def __init__(self, eventID, sender):
         self.eventID = eventID
@@ -59,26 +61,23 @@ class SimpleEventBaseClass(object):
     def __repr__(self):
         return str(self.eventID) + ',' + str(self.sender)
 
-    @property
-    def eventID(self):
-        return self._eventID
 
-    @eventID.setter
-    def eventID(self, new_eventID):
-        # perform some checking
-        self._eventID = new_eventID
+class BaseInputEvents(EventIDs):
+    NoEvent = 'none'
+    Initialize = 'initialize'
+    Ack = 'ack'
+    Error = 'error'
+    Timeout = 'timeout'
+    Update = 'update'
 
-    @property
-    def sender(self):
-        return self._sender
 
-    @sender.setter
-    def sender(self, new_sender):
-        # perform some checking
-        self._sender = new_sender
+class BaseInputEvent(SimpleEventBaseClass):
+    """ Base events class """
+    __slots__ = ()
+    eventIDs = BaseInputEvents
 
 
-class RGBLEDInputEvents(object):
+class RGBLEDInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     Red = 'red'
@@ -95,17 +94,11 @@ class RGBLEDInputEvents(object):
 
 class RGBLEDInputEvent(SimpleEventBaseClass):
     """ RGB LED events class """
+    __slots__ = ()
+    eventIDs = RGBLEDInputEvents
 
-    def __init__(self, eventID, sender):
-        super(RGBLEDInputEvent, self).__init__(eventID, sender)
-        self._eventIDs = RGBLEDInputEvents()
 
-    @property
-    def eventIDs(self):
-        return self._eventIDs
-
-
-class BlinkerEvents(object):
+class BlinkerEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     Start = 'start'
@@ -119,10 +112,10 @@ class BlinkerEvents(object):
 
 class BlinkerEvent(SimpleEventBaseClass):
     """ Blinker event class """
+    eventIDs = BlinkerEvents
 
     def __init__(self, eventID, sender, parameters_list=None):
         super(BlinkerEvent, self).__init__(eventID, sender)
-        self._eventIDs = BlinkerEvents()
         self._blinker_parameters = dict()
         self.parameters_list = parameters_list
 
@@ -130,10 +123,6 @@ class BlinkerEvent(SimpleEventBaseClass):
         self._blinker_parameters["offtime"] = 0.5
         self._blinker_parameters["blinks"] = 0
 
-    @property
-    def eventIDs(self):
-        return self._eventIDs
-
     @property
     def parameters_list(self):
         return self._parameters_list
@@ -231,29 +220,18 @@ class InteractionSensorEvent(object):
 
 class ServiceEventBaseClass(object):
     """ Service events base class """
+    __slots__ = ('eventID', 'sender', 'service_index', '_parameters_list', '_service_process')
 
     def __init__(self, eventID, sender, service_index=None, parameters_list=None, service_process=None):
-        self._eventID = eventID
-        self._sender = sender
-        self._service_index = service_index
+        self.eventID = eventID
+        self.sender = sender
+        self.service_index = service_index
         self._parameters_list = parameters_list
         self._service_process = service_process
 		
     def __repr__(self):
         return str(self.eventID) + ',' + str(self.sender) + ',' + str(self.service_index) + ',' + str(self.parameters_list)
 
-    @property
-    def eventID(self):
-        return self._eventID
-
-    @property
-    def sender(self):
-        return self._sender
-
-    @property
-    def service_index(self):
-        return self._service_index
-
     @property
     def parameters_list(self):
         return self._parameters_list
@@ -262,21 +240,6 @@ class ServiceEventBaseClass(object):
     def service_process(self):
         return self._service_process
 		
-    @service_index.setter
-    def service_index(self, new_service_index):
-        # perform some checking
-        self._service_index = new_service_index
-
-    @eventID.setter
-    def eventID(self, new_eventID):
-        # perform some checking
-        self._eventID = new_eventID
-
-    @sender.setter
-    def sender(self, new_sender):
-        # perform some checking
-        self._sender = new_sender
-
     @parameters_list.setter
     def parameters_list(self, new_parameters_list):
         # perform some checking
@@ -286,7 +249,7 @@ class ServiceEventBaseClass(object):
             raise ValueError('parameters_list attribute should be a list')
 
 		
-class GenericServiceEvents(object):
+class GenericServiceEvents(EventIDs):
     NoEvent = 'none'
     Execute = 'execute'
     Cancel = 'cancel'
@@ -297,10 +260,10 @@ class GenericServiceEvents(object):
 
 class GenericServiceEvent(ServiceEventBaseClass):
     """ Generic service events class """
+    eventIDs = GenericServiceEvents
 
     def __init__(self, eventID, sender, service_index=None, parameters_list=None, service_process=None):
         super(GenericServiceEvent, self).__init__(eventID, sender, service_index, parameters_list, service_process)
-        self._eventIDs = GenericServiceEvents()
         self._parameters_list = parameters_list
         self._service_process = service_process
 
@@ -312,7 +275,7 @@ class GenericServiceEvent(ServiceEventBaseClass):
     def service_process(self):
         return self._service_process		
 		
-class StorageStationInputEvents(object):
+class StorageStationInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     Ack = 'ack'
@@ -327,16 +290,12 @@ class StorageStationInputEvents(object):
 
 class StorageStationInputEvent(ServiceEventBaseClass):
     """ Generic service events class """
+    eventIDs = StorageStationInputEvents
 
     def __init__(self, eventID, sender, service_index=None, parameters_list=None):
         super(StorageStationInputEvent, self).__init__(eventID, sender, service_index, parameters_list)
-        self._eventIDs = StorageStationInputEvents()
         self._parameters_list = parameters_list
 		
-    @property
-    def eventIDs(self):
-        return self._eventIDs
-
     @property
     def parameters_list(self):
         return self._parameters_list
@@ -375,7 +334,7 @@ class ServerEvent(object):
         # perform some checking
         self._sender = new_sender
 
-class SimpleSensorInputEvents(object):
+class SimpleSensorInputEvents(EventIDs):
     NoEvent = 'none'
     Initialize = 'initialize'
     NegEdge = 'neg_edge'
@@ -419,12 +378,5 @@ class SimpleLEDEvent(object):
 
 class SimpleSensorInputEvent(SimpleEventBaseClass):
     """ Presence sensor events class """
-
-    def __init__(self, eventID, sender):
-        super(SimpleSensorInputEvent, self).__init__(eventID, sender)
-        self._eventIDs = SimpleSensorInputEvents()
-
-    @property
-    def eventIDs(self):
-        return self._eventIDs
-
+    __slots__ = ()
+    eventIDs = SimpleSensorInputEvents
@@ -1,12 +1,121 @@
 from opcua import ua, uamethod, Server
 from communication import events
+from communication.ua_writer import get_default_writer
+from communication.pubsub import positional
+from communication import address_space
+from activeobjects.station.job_batch import JobBatch, parse_jobs
 import logging
 import os,signal
 
 
 
+# Address space of the station, built by communication.address_space
+# as long as this definition doesn't change
+ADDRESS_SPACE = {
+    'folders': (
+        "ModelManagement", "StateMachine", "Identification", "StationService", "Sensor", "Actor", "Monitoring",
+    ),
+    'types': (
+        ("SensorType", None, (("Name", ""), ("Id", ""), ("State", ""), ("Value", True))),
+        ("ActorType", 0, (("Name", ""), ("Id", ""), ("State", ""), ("Value", ""))),
+        ("MechanicsType", None, (
+            ("Name", ""),
+            ("State", ""),
+            ("PlateSymbol", ""),
+            ("MaxCapacityPlates", 0),
+            ("PlateColor1", ""),
+            ("QuantityOfPlateColor1", 0),
+            ("PlateColor2", ""),
+            ("QuantityOfPlateColor2", 0),
+            ("PlateColor3", ""),
+            ("QuantityOfPlateColor3", 0),
+        )),
+    ),
+    'objects': (
+        ("Sensor", "PresenceSensor1", "SensorType", ("SensorPresenceAtBox1", "-BG1", "notInitialized", False)),
+        ("Sensor", "PresenceSensor2", "SensorType", ("SensorPresenceAtBox2", "-BG2", "notInitialized", False)),
+        ("Sensor", "PresenceSensor3", "SensorType", ("SensorPresenceAtBox3", "-BG3", "notInitialized", False)),
+        ("Sensor", "PresenceSensor4", "SensorType", ("SensorPresenceAtBox4", "-BG4", "notInitialized", False)),
+        ("Sensor", "PresenceSensor5", "SensorType", ("SensorPresenceAtBox5", "-BG5", "notInitialized", False)),
+        ("Sensor", "PresenceSensor6", "SensorType", ("SensorPresenceAtBox6", "-BG6", "notInitialized", False)),
+        ("Sensor", "InteractionSensor1", "SensorType",
+         ("SensorButtonProductionDone", "-SF1", "notInitialized", False)),
+        ("Sensor", "InteractionSensor2", "SensorType",
+         ("SensorButtonProductionError", "-SF2", "notInitialized", False)),
+        ("Actor", "LedStrip1", "ActorType", ("LedStripForPickByLightAtBox1", "-PF1", "notInitialized", "off")),
+        ("Actor", "LedStrip2", "ActorType", ("LedStripForPickByLightAtBox2", "-PF2", "notInitialized", "off")),
+        ("Actor", "LedStrip3", "ActorType", ("LedStripForPickByLightAtBox3", "-PF3", "notInitialized", "off")),
+        ("Actor", "LedStrip4", "ActorType", ("LedStripForPickByLightAtBox4", "-PF4", "notInitialized", "off")),
+        ("Actor", "LedStrip5", "ActorType", ("LedStripForPickByLightAtBox5", "-PF5", "notInitialized", "off")),
+        ("Actor", "LedStrip6", "ActorType", ("LedStripForPickByLightAtBox6", "-PF6", "notInitialized", "off")),
+        ("Actor", "StatusLed", "ActorType", ("RgbLed", "-PF7", "notInitialized", "off")),
+        ("Monitoring", "StorageRack1", "MechanicsType",
+         ("StorageBoxNumber1", "off", "1", 90, "white", 0, "yellow", 0, "red", 0)),
+        ("Monitoring", "StorageRack2", "MechanicsType",
+         ("StorageBoxNumber2", "off", "2", 90, "white", 0, "yellow", 0, "red", 0)),
+        ("Monitoring", "StorageRack3", "MechanicsType",
+         ("StorageBoxNumber3", "off", "3", 90, "white", 0, "yellow", 0, "red", 0)),
+        ("Monitoring", "StorageRack4", "MechanicsType",
+         ("StorageBoxNumber4", "off", "4", 90, "white", 0, "yellow", 0, "red", 0)),
+        ("Monitoring", "StorageRack5", "MechanicsType",
+         ("StorageBoxNumber5", "off", "5", 90, "white", 0, "yellow", 0, "red", 0)),
+        ("Monitoring", "StorageRack6", "MechanicsType",
+         ("StorageBoxNumber6", "off", "6", 90, "white", 0, "yellow", 0, "red", 0)),
+    ),
+    'variables': (
+        ("ModelManagement", "StationVersionOpcuaModel", "0.1"),
+        ("ModelManagement", "StationVersionInternal", "0.1"),
+        ("StateMachine", "StationState", "initializing"),
+        ("StateMachine", "StationErrorCode", "null"),
+        ("StateMachine", "StationErrorDescription", "null"),
+        ("StateMachine", "StationMessageCode", "null"),
+        ("StateMachine", "StationMessageDescription", "null"),
+        ("StateMachine", "StationSafetyState", "noSafetySwitchAvailable"),
+        ("Identification", "StationName", "StationModularLagerWuerfelPlatten"),
+        ("Identification", "StationId", "-AZ8"),
+        ("StationService", "JobBatchResult", "Idle"),
+        ("Monitoring", "InventoryByColor", "{}"),
+    ),
+    'methods': (
+        ("StationService", "ServiceAutoInitializeStation", "serviceAutoInitializeStation", (), ("Int64",)),
+        ("StationService", "ServiceProvideDicePlate", "serviceProvideDicePlate", (
+            ("Plate Symbol", "String", "Plate symbol to provide regarding available StorageBoxes"),
+            ("Plate Color", "String", "Plate color to provide regarding available StorageBoxes"),
+         ), ("Int64",)),
+        ("StationService", "ServiceStorePlatesToStorageBox", "serviceStorePlatesToStorageBox", (
+            ("Target plate symbol", "String", None),
+            ("Plate Color1 to change in Box", "String", None),
+            ("Number of plates of Color1 to change in Box", "UInt32", None),
+            ("Plate Color2 to change in Box", "String", None),
+            ("Number of Plates of Color2 to change in Box", "UInt32", None),
+            ("Plate Color3 to change in Box", "String", None),
+            ("Number of Plates of Color3 to change in Box", "UInt32", None),
+         ), ("Int64",)),
+        ("StationService", "ServiceResetDicePlateAtStorageBox", "serviceResetDicePlateAtStorageBox", (
+            ("Target plate symbol", "String", None),
+            ("Plate Color1 to change in Box", "String", None),
+            ("Number of plates of Color1 to change in Box", "UInt32", None),
+            ("Plate Color2 to change in Box", "String", None),
+            ("Number of Plates of Color2 to change in Box", "UInt32", None),
+            ("Plate Color3 to change in Box", "String", None),
+            ("Number of Plates of Color3 to change in Box", "UInt32", None),
+         ), ("Int64",)),
+        ("StationService", "ServiceAckAllErrors", "serviceAckAllErrors", (), ("Int64",)),
+        ("StationService", "ServiceShutdownStationNow", "serviceShutdownStationNow", (), ("Int64",)),
+        ("StationService", "SubmitJobBatch", "submitJobBatch",
+         (("Jobs", "String", "JSON list of the jobs: [[service, argument, ...], ...]"),), ("Int64",)),
+        ("Monitoring", "FindDicePlateColor", "findDicePlateColor",
+         (("Plate Color", "String", "Plate color to look up in the StorageBoxes"),),
+         (("Plate Symbol", "String", "StorageBox which can provide the color, empty if the color is out of stock"),)),
+        ("Monitoring", "StockOfDicePlateColor", "stockOfDicePlateColor",
+         (("Plate Color", "String", "Plate color to look up in the StorageBoxes"),),
+         (("Quantity", "Int64", "Plates of the color in all StorageBoxes"),)),
+    ),
+}
+
+
 class AZ8UAServer(object):
-    def __init__(self, station, revpiobj, endpoint=None, name=None, uri=None):
+    def __init__(self, station, revpiobj, endpoint=None, name=None, uri=None, inventory=None):
 
         if name is None:
             self._name = "EduKit Test OPC UA Server"
@@ -36,362 +145,37 @@ class AZ8UAServer(object):
 		
         self.revpiobj = revpiobj
 
-        # creating folders:
-
-        folder_model_development = self._server.nodes.objects.add_folder(idx, "ModelManagement")
-        folder_state_machine = self._server.nodes.objects.add_folder(idx, "StateMachine")
-        folder_ident = self._server.nodes.objects.add_folder(idx, "Identification")
-        folder_station_service = self._server.nodes.objects.add_folder(idx, "StationService")
-        folder_sensor = self._server.nodes.objects.add_folder(idx, "Sensor")
-        folder_actor = self._server.nodes.objects.add_folder(idx, "Actor")
-        folder_monitor = self._server.nodes.objects.add_folder(idx, "Monitoring")
-
-        # creating types:
-
-        sensor_type = self._server.nodes.base_object_type.add_object_type(idx, "SensorType")
-        sensor_type.add_variable(idx, "Name", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "Id", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "State", "").set_modelling_rule(True)
-        sensor_type.add_variable(idx, "Value", True).set_modelling_rule(True)
-
-        actor_type = self._server.nodes.base_object_type.add_object_type(0, "ActorType")
-        actor_type.add_variable(idx, "Name", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "Id", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "State", "").set_modelling_rule(True)
-        actor_type.add_variable(idx, "Value", "").set_modelling_rule(True)
-
-        mechanics_type = self._server.nodes.base_object_type.add_object_type(idx, "MechanicsType")
-        mechanics_type.add_variable(idx, "Name", "").set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "State", "").set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "PlateSymbol", "").set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "MaxCapacityPlates", 0).set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "PlateColor1", "").set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "QuantityOfPlateColor1", 0).set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "PlateColor2", "").set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "QuantityOfPlateColor2", 0).set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "PlateColor3", "").set_modelling_rule(True)
-        mechanics_type.add_variable(idx, "QuantityOfPlateColor3", 0).set_modelling_rule(True)
-
-        # creating objects:
-
-        # Folder Sensor:
-        sensorobject = folder_sensor.add_object(idx, "PresenceSensor1", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorPresenceAtBox1")
-        sensorobjects[1].set_value("-BG1")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "PresenceSensor2", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorPresenceAtBox2")
-        sensorobjects[1].set_value("-BG2")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "PresenceSensor3", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorPresenceAtBox3")
-        sensorobjects[1].set_value("-BG3")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "PresenceSensor4", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorPresenceAtBox4")
-        sensorobjects[1].set_value("-BG4")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "PresenceSensor5", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorPresenceAtBox5")
-        sensorobjects[1].set_value("-BG5")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "PresenceSensor6", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorPresenceAtBox6")
-        sensorobjects[1].set_value("-BG6")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "InteractionSensor1", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorButtonProductionDone")
-        sensorobjects[1].set_value("-SF1")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        sensorobject = folder_sensor.add_object(idx, "InteractionSensor2", sensor_type)
-        sensorobjects = sensorobject.get_variables()
-        sensorobjects[0].set_value("SensorButtonProductionError")
-        sensorobjects[1].set_value("-SF2")
-        sensorobjects[2].set_value("notInitialized")
-        sensorobjects[3].set_value(False)
-        for obj in sensorobjects:
-            obj.set_read_only()
-
-        # Folder Actor:
-        actorobject = folder_actor.add_object(idx, "LedStrip1", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStripForPickByLightAtBox1")
-        actorobjects[1].set_value("-PF1")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "LedStrip2", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStripForPickByLightAtBox2")
-        actorobjects[1].set_value("-PF2")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "LedStrip3", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStripForPickByLightAtBox3")
-        actorobjects[1].set_value("-PF3")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "LedStrip4", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStripForPickByLightAtBox4")
-        actorobjects[1].set_value("-PF4")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "LedStrip5", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStripForPickByLightAtBox5")
-        actorobjects[1].set_value("-PF5")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "LedStrip6", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("LedStripForPickByLightAtBox6")
-        actorobjects[1].set_value("-PF6")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-        actorobject = folder_actor.add_object(idx, "StatusLed", actor_type)
-        actorobjects = actorobject.get_variables()
-        actorobjects[0].set_value("RgbLed")
-        actorobjects[1].set_value("-PF7")
-        actorobjects[2].set_value("notInitialized")
-        actorobjects[3].set_value("off")
-        for obj in actorobjects:
-            obj.set_read_only()
-
-
-        # create variables:
-
-        # Folder ModelManagement
-        folder_model_development.add_variable(idx, "StationVersionOpcuaModel", "0.1").set_read_only()
-        folder_model_development.add_variable(idx, "StationVersionInternal", "0.1").set_read_only()
-
-        # Folder StateMachine
-        folder_state_machine.add_variable(idx, "StationState", "initializing").set_read_only()
-        folder_state_machine.add_variable(idx, "StationErrorCode", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationErrorDescription", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationMessageCode", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationMessageDescription", "null").set_read_only()
-        folder_state_machine.add_variable(idx, "StationSafetyState",
-                                               "noSafetySwitchAvailable").set_read_only()
-
-        # Folder Identification
-        folder_ident.add_variable(idx, "StationName", "StationModularLagerWuerfelPlatten").set_read_only()
-        folder_ident.add_variable(idx, "StationId", "-AZ8").set_read_only()
-
-        # Folder Monitor
-        mechanicsobject = folder_monitor.add_object(idx, "StorageRack1", mechanics_type)
-        mechanicsobjects = mechanicsobject.get_variables()
-        mechanicsobjects[0].set_value("StorageBoxNumber1")
-        mechanicsobjects[1].set_value("off")
-        mechanicsobjects[2].set_value("1")
-        mechanicsobjects[3].set_value(90)
-        mechanicsobjects[4].set_value("white")
-        mechanicsobjects[5].set_value(0)
-        mechanicsobjects[6].set_value("yellow")
-        mechanicsobjects[7].set_value(0)
-        mechanicsobjects[8].set_value("red")
-        mechanicsobjects[9].set_value(0)
-        for obj in mechanicsobjects:
-            obj.set_read_only()
-
-        mechanicsobject = folder_monitor.add_object(idx, "StorageRack2", mechanics_type)
-        mechanicsobjects = mechanicsobject.get_variables()
-        mechanicsobjects[0].set_value("StorageBoxNumber2")
-        mechanicsobjects[1].set_value("off")
-        mechanicsobjects[2].set_value("2")
-        mechanicsobjects[3].set_value(90)
-        mechanicsobjects[4].set_value("white")
-        mechanicsobjects[5].set_value(0)
-        mechanicsobjects[6].set_value("yellow")
-        mechanicsobjects[7].set_value(0)
-        mechanicsobjects[8].set_value("red")
-        mechanicsobjects[9].set_value(0)
-        for obj in mechanicsobjects:
-            obj.set_read_only()
-
-        mechanicsobject = folder_monitor.add_object(idx, "StorageRack3", mechanics_type)
-        mechanicsobjects = mechanicsobject.get_variables()
-        mechanicsobjects[0].set_value("StorageBoxNumber3")
-        mechanicsobjects[1].set_value("off")
-        mechanicsobjects[2].set_value("3")
-        mechanicsobjects[3].set_value(90)
-        mechanicsobjects[4].set_value("white")
-        mechanicsobjects[5].set_value(0)
-        mechanicsobjects[6].set_value("yellow")
-        mechanicsobjects[7].set_value(0)
-        mechanicsobjects[8].set_value("red")
-        mechanicsobjects[9].set_value(0)
-        for obj in mechanicsobjects:
-            obj.set_read_only()
-
-        mechanicsobject = folder_monitor.add_object(idx, "StorageRack4", mechanics_type)
-        mechanicsobjects = mechanicsobject.get_variables()
-        mechanicsobjects[0].set_value("StorageBoxNumber4")
-        mechanicsobjects[1].set_value("off")
-        mechanicsobjects[2].set_value("4")
-        mechanicsobjects[3].set_value(90)
-        mechanicsobjects[4].set_value("white")
-        mechanicsobjects[5].set_value(0)
-        mechanicsobjects[6].set_value("yellow")
-        mechanicsobjects[7].set_value(0)
-        mechanicsobjects[8].set_value("red")
-        mechanicsobjects[9].set_value(0)
-        for obj in mechanicsobjects:
-            obj.set_read_only()
-
-        mechanicsobject = folder_monitor.add_object(idx, "StorageRack5", mechanics_type)
-        mechanicsobjects = mechanicsobject.get_variables()
-        mechanicsobjects[0].set_value("StorageBoxNumber5")
-        mechanicsobjects[1].set_value("off")
-        mechanicsobjects[2].set_value("5")
-        mechanicsobjects[3].set_value(90)
-        mechanicsobjects[4].set_value("white")
-        mechanicsobjects[5].set_value(0)
-        mechanicsobjects[6].set_value("yellow")
-        mechanicsobjects[7].set_value(0)
-        mechanicsobjects[8].set_value("red")
-        mechanicsobjects[9].set_value(0)
-        for obj in mechanicsobjects:
-            obj.set_read_only()
-
-        mechanicsobject = folder_monitor.add_object(idx, "StorageRack6", mechanics_type)
-        mechanicsobjects = mechanicsobject.get_variables()
-        mechanicsobjects[0].set_value("StorageBoxNumber6")
-        mechanicsobjects[1].set_value("off")
-        mechanicsobjects[2].set_value("6")
-        mechanicsobjects[3].set_value(90)
-        mechanicsobjects[4].set_value("white")
-        mechanicsobjects[5].set_value(0)
-        mechanicsobjects[6].set_value("yellow")
-        mechanicsobjects[7].set_value(0)
-        mechanicsobjects[8].set_value("red")
-        mechanicsobjects[9].set_value(0)
-        for obj in mechanicsobjects:
-            obj.set_read_only()
-
-
-        # Folder StationService: create methods
-        insymbolProv = ua.Argument()
-        insymbolProv.Name = "Plate Symbol"
-        insymbolProv.DataType = ua.NodeId(ua.ObjectIds.String)
-        insymbolProv.ValueRank = -1
-        insymbolProv.ArrayDimensions = []
-        insymbolProv.Description = ua.LocalizedText("Plate symbol to provide regarding available StorageBoxes")
-        incolorProv = ua.Argument()
-        incolorProv.Name = "Plate Color"
-        incolorProv.DataType = ua.NodeId(ua.ObjectIds.String)
-        incolorProv.ValueRank = -1
-        incolorProv.ArrayDimensions = []
-        incolorProv.Description = ua.LocalizedText("Plate color to provide regarding available StorageBoxes")
-
-        # target of plateSymbol and therefore of box
-        intargetPlateSymbol = ua.Argument()
-        intargetPlateSymbol.Name = "Target plate symbol"
-        intargetPlateSymbol.DataType = ua.NodeId(ua.ObjectIds.String)
-        intargetPlateSymbol.ValueRank = -1
-        intargetPlateSymbol.ArrayDimensions = []
-        #Colorname of plates
-        incolor1 = ua.Argument()
-        incolor1.Name = "Plate Color1 to change in Box"
-        incolor1.DataType = ua.NodeId(ua.ObjectIds.String)
-        incolor1.ValueRank = -1
-        incolor1.ArrayDimensions = []
-        incolor2 = ua.Argument()
-        incolor2.Name = "Plate Color2 to change in Box"
-        incolor2.DataType = ua.NodeId(ua.ObjectIds.String)
-        incolor2.ValueRank = -1
-        incolor2.ArrayDimensions = []
-        incolor3 = ua.Argument()
-        incolor3.Name = "Plate Color3 to change in Box"
-        incolor3.DataType = ua.NodeId(ua.ObjectIds.String)
-        incolor3.ValueRank = -1
-        incolor3.ArrayDimensions = []
-        #Number of plates
-        innumberColor1 = ua.Argument()
-        innumberColor1.Name = "Number of plates of Color1 to change in Box"
-        innumberColor1.DataType = ua.NodeId(ua.ObjectIds.UInt32)
-        innumberColor1.ValueRank = -1
-        innumberColor1.ArrayDimensions = []
-        innumberColor2 = ua.Argument()
-        innumberColor2.Name = "Number of Plates of Color2 to change in Box"
-        innumberColor2.DataType = ua.NodeId(ua.ObjectIds.UInt32)
-        innumberColor2.ValueRank = -1
-        innumberColor2.ArrayDimensions = []
-        innumberColor3 = ua.Argument()
-        innumberColor3.Name = "Number of Plates of Color3 to change in Box"
-        innumberColor3.DataType = ua.NodeId(ua.ObjectIds.UInt32)
-        innumberColor3.ValueRank = -1
-        innumberColor3.ArrayDimensions = []
-
-		# Service index 0: Initialization
-        folder_station_service.add_method(idx,"ServiceAutoInitializeStation", self.serviceAutoInitializeStation,[],[ua.VariantType.Int64])
-		
-		# Service index 1: ProvideDicePlate - Input parameters: symbol and color
-        folder_station_service.add_method(idx, "ServiceProvideDicePlate", self.serviceProvideDicePlate, [insymbolProv, incolorProv],[ua.VariantType.Int64])
-		
-        # Service index 2: StorageDicePlate - Refill
-        folder_station_service.add_method(idx,"ServiceStorePlatesToStorageBox",self.serviceStorePlatesToStorageBox,
-                                          [intargetPlateSymbol, incolor1, innumberColor1, incolor2, innumberColor2, incolor3, innumberColor3],[ua.VariantType.Int64])
-										  
-        # Service index 2: StorageDicePlate - Reset
-        folder_station_service.add_method(idx, "ServiceResetDicePlateAtStorageBox", self.serviceResetDicePlateAtStorageBox,
-                                          [intargetPlateSymbol, incolor1, innumberColor1, incolor2, innumberColor2, incolor3, innumberColor3],[ua.VariantType.Int64])
-
-        folder_station_service.add_method(idx, "ServiceAckAllErrors",self.serviceAckAllErrors,[],[ua.VariantType.Int64])
-        folder_station_service.add_method(idx, "ServiceShutdownStationNow", self.serviceShutdownStationNow,[],[ua.VariantType.Int64])
+        # creating the address space, see ADDRESS_SPACE:
+        address_space.load(self._server, idx, ADDRESS_SPACE, self, name=self._name, logger=self.logger)
+
+        # job batches of SubmitJobBatch, their progress is published in StationService/JobBatchResult
+        self._idx = idx
+        self._service_node = self._server.nodes.objects.get_child(["{0}:StationService".format(idx)])
+        services = address_space.method_arguments(ADDRESS_SPACE, "StationService")
+        del services["SubmitJobBatch"]
+        # the services which run the station -> their service active object, which has to be Ready when a batch is
+        # submitted, None: the service has no state
+        station_jobs = {
+            "ServiceProvideDicePlate":           None,
+            "ServiceStorePlatesToStorageBox":    None,
+            "ServiceResetDicePlateAtStorageBox": None,
+            "ServiceAutoInitializeStation":      None,
+        }
+        self.job_batch = JobBatch("JobBatch", station=self._station, services=services, call_service=self.call_service,
+                                  station_jobs=station_jobs)
+        self.job_batch_ua_subscriber = UaObjectSubscriber(self._server, self._service_node)
+        self.job_batch.register_subscribers(topic="JobBatchResult", who=self.job_batch_ua_subscriber,
+                                            callback=self.job_batch_ua_subscriber.update)
+        self.job_batch.start()
+
+        # inventory index of the racks, published in Monitoring/InventoryByColor
+        self._inventory = inventory
+        if self._inventory is not None:
+            monitoring_node = self._server.nodes.objects.get_child(["{0}:Monitoring".format(idx)])
+            self.inventory_ua_subscriber = UaObjectSubscriber(self._server, monitoring_node)
+            self._inventory.register_subscribers(topic="InventoryByColor", who=self.inventory_ua_subscriber,
+                                                 callback=self.inventory_ua_subscriber.update)
+            self._inventory.publish_index()
 
     @property
     def server(self):
@@ -401,6 +185,36 @@ class AZ8UAServer(object):
     def name(self):
         return self._name
 
+    def call_service(self, service, arguments):
+        """ Calls a method of the StationService folder like a client, True if the service accepted the call """
+        result = self._service_node.call_method("{0}:{1}".format(self._idx, service), *arguments)
+        return result == ua.status_codes.StatusCodes.Good
+
+    @uamethod
+    def submitJobBatch(self, parent, jobs_text):
+        try:
+            jobs = parse_jobs(jobs_text)
+        except ValueError as error:
+            reason = str(error)
+        else:
+            reason = self.job_batch.submit(jobs)
+        if reason is not None:
+            self.logger.debug("Sender %s : Job batch was refused : %s", self.name, reason)
+            return ua.status_codes.StatusCodes.Bad
+        return ua.status_codes.StatusCodes.Good
+
+    @uamethod
+    def findDicePlateColor(self, parent, color):
+        supplier = self._inventory.find(color) if self._inventory is not None else None
+        if supplier is None:
+            return ""
+        rack, symbol, slot, quantity = supplier
+        return symbol
+
+    @uamethod
+    def stockOfDicePlateColor(self, parent, color):
+        return self._inventory.stock(color) if self._inventory is not None else 0
+
 	# The methods in this class are for dispatching the OPCUA-services into active objects. 
 	# Parameter self._name comes from input-parameters (from _init_).
 	
@@ -549,9 +363,10 @@ class UaObjectSubscriber(object):
     Updates the values of the UA Node
     """
 
-    def __init__(self, opcua_server, ua_node):
+    def __init__(self, opcua_server, ua_node, writer=None):
         self.opcua_server = opcua_server
         self.nodes = {}
+        self._writer = writer if writer is not None else get_default_writer()    # None: synchronous writes
         self.b_name = ua_node.get_browse_name().Name
         self._name = self.b_name
 
@@ -575,9 +390,10 @@ class UaObjectSubscriber(object):
         else:
             self.nodes[attr].set_value(getattr(self, attr))
 
-    def update(self, *args, **kwargs):
-        kwargs = kwargs
-        if "topic" not in kwargs or "value" not in kwargs:
-            raise ValueError("OPCUA server : Bad argument")
-        self.nodes[kwargs["topic"]].set_value(kwargs["value"])
+    @positional
+    def update(self, topic, value, sender=None):
+        if self._writer is not None:
+            self._writer.write(self.nodes[topic], value)
+        else:
+            self.nodes[topic].set_value(value)
 
@@ -0,0 +1,79 @@
+import threading
+import logging
+from communication.ua_writer import get_default_writer
+
+
+class UaActorMonitor(object):
+    """ Publishes the mailbox statistics of the actors in the Monitoring folder of the OPC UA server:
+        Monitoring/ActorMailboxes/<actor>/<variable>, times in milliseconds. Actors which are created
+        later get their nodes at the next update. """
+
+    VARIABLES = (
+        ('MailboxDepth', lambda stats: stats.depth),
+        ('PeakMailboxDepth', lambda stats: stats.peak_depth),
+        ('HandledCalls', lambda stats: stats.handled),
+        ('WaitTimeMean', lambda stats: stats.wait_time.mean * 1000.0),
+        ('WaitTimeP99', lambda stats: stats.wait_time.percentile(99) * 1000.0),
+        ('WaitTimeMax', lambda stats: stats.wait_time.max * 1000.0),
+        ('HandlerTimeMean', lambda stats: stats.handler_time.mean * 1000.0),
+        ('HandlerTimeP99', lambda stats: stats.handler_time.percentile(99) * 1000.0),
+        ('HandlerTimeMax', lambda stats: stats.handler_time.max * 1000.0),
+        ('BusyTime', lambda stats: stats.handler_time.total * 1000.0),
+    )
+
+    def __init__(self, name, monitor_folder, collector, idx=2, interval=1.0, writer=None):
+        self._name = name
+        self._idx = idx
+        self._folder = monitor_folder.add_folder(idx, "ActorMailboxes")
+        self._collector = collector
+        self._interval = interval
+        self._writer = writer if writer is not None else get_default_writer()    # None: synchronous writes
+        self._nodes = dict()        # actor name -> list of the variable nodes in the order of VARIABLES
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(name)
+
+    @property
+    def name(self):
+        return self._name
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _add_actor(self, stats):
+        actor_object = self._folder.add_object(self._idx, stats.name)
+        nodes = []
+        for variable_name, getter in self.VARIABLES:
+            # counters are Int64, times Double
+            node = actor_object.add_variable(self._idx, variable_name, getter(stats))
+            node.set_read_only()
+            nodes.append(node)
+        self._nodes[stats.name] = nodes
+        return nodes
+
+    def update(self):
+        for stats in self._collector.actors():
+            nodes = self._nodes.get(stats.name)
+            if nodes is None:
+                nodes = self._add_actor(stats)
+            for node, (variable_name, getter) in zip(nodes, self.VARIABLES):
+                value = getter(stats)
+                if self._writer is not None:
+                    self._writer.write(node, value)
+                else:
+                    node.set_value(value)
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.update()
+            except Exception:
+                self.logger.exception("%s : updating the actor statistics has failed.", self._name)
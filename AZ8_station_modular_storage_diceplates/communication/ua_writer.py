@@ -0,0 +1,164 @@
+import threading
+import logging
+from opcua import ua
+
+
+_default_writer = None
+
+
+def set_default_writer(writer):
+    """ UaObjectSubscribers created after this call write their nodes through the given write-behind writer.
+        None restores the default behaviour: every update is written to the node synchronously. """
+    global _default_writer
+    _default_writer = writer
+
+
+def get_default_writer():
+    return _default_writer
+
+
+class UaWriteBehind(object):
+    """ Write-behind layer between the publishers and the OPC UA address space.
+
+    The publishing actor only puts the value into the pending dict of the writer (a single dict operation,
+    atomic under the GIL) and never waits for a lock, the writer thread or the server. Updates of a node
+    within the coalescing window are merged (the latest value wins), values which don't differ from the
+    value in the address space are dropped, the rest is written in one batch.
+
+    Overflow: at most max_pending nodes wait for the writer. If the server stalls and this is exceeded,
+    updates of further nodes are dropped and counted, updates of pending nodes still replace their value.
+    The counters of the actor side are not locked, they can miss an increment under contention.
+    """
+
+    def __init__(self, name="UaWriter", window=0.05, max_pending=1000):
+        self._name = name
+        self._window = window
+        self._max_pending = max_pending
+        self._pending = dict()      # nodeid -> (node, value), filled by the actors, emptied by the writer
+        self._written = dict()      # nodeid -> last value written to the address space
+        self._flush_lock = threading.Lock()     # taken by the writer only, never by a publishing actor
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(name)
+
+        # statistics
+        self.updates = 0            # values handed to the writer
+        self.writes = 0             # values written to the address space
+        self.deduplicated = 0       # values dropped because the node already had the value
+        self.coalesced = 0          # values overwritten by a newer value within the window
+        self.dropped = 0            # values dropped because max_pending nodes were waiting
+        self.batches = 0
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def window(self):
+        return self._window
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        self.logger.info("%s has been started, coalescing window %s s, max. %s pending nodes.",
+                         self._name, self._window, self._max_pending)
+
+    def stop(self):
+        """ Stops the writer thread after the pending values were flushed """
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self.logger.info("%s has been stopped. Updates: %s, writes: %s, deduplicated: %s, coalesced: %s, "
+                         "dropped: %s, batches: %s", self._name, self.updates, self.writes, self.deduplicated,
+                         self.coalesced, self.dropped, self.batches)
+
+    def write(self, node, value):
+        """ Hands the value of the node to the writer thread, returns immediately """
+        nodeid = node.nodeid
+        pending = self._pending
+        self.updates += 1
+        if nodeid in pending:
+            self.coalesced += 1
+        elif len(pending) >= self._max_pending:
+            self.dropped += 1
+            if self.dropped == 1 or not self.dropped % 1000:
+                self.logger.warning("%s : %s updates were dropped, %s nodes are waiting for the server.",
+                                    self._name, self.dropped, len(pending))
+            return
+        pending[nodeid] = (node, value)
+
+        if self._thread is None:
+            # not started (yet): behave like a synchronous write
+            self.flush()
+        elif not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def flush(self):
+        """ Writes all pending values to the address space in one batch """
+        with self._flush_lock:
+            pending = self._pending
+            batch = []
+            for nodeid in list(pending):
+                # a value published meanwhile is either taken now or stays for the next flush
+                item = pending.pop(nodeid, None)
+                if item is None:
+                    continue
+                node, value = item
+                if nodeid in self._written and self._written[nodeid] == value:
+                    # the value went back to the one in the address space within the window
+                    self.deduplicated += 1
+                    continue
+                self._written[nodeid] = value
+                batch.append((node, value))
+            if batch:
+                self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        params = ua.WriteParameters()
+        for node, value in batch:
+            write_value = ua.WriteValue()
+            write_value.NodeId = node.nodeid
+            write_value.AttributeId = ua.AttributeIds.Value
+            write_value.Value = ua.DataValue(ua.Variant(value))
+            params.NodesToWrite.append(write_value)
+
+        try:
+            # all nodes of the station live in the address space of the same server session
+            results = batch[0][0].server.write(params)
+        except Exception:
+            self.logger.exception("%s : writing a batch of %s values has failed.", self._name, len(batch))
+            self._forget(batch)
+            return
+
+        self.batches += 1
+        for (node, value), result in zip(batch, results):
+            if result.is_good():
+                self.writes += 1
+            else:
+                self.logger.error("%s : writing %s to the node %s has failed : %s", self._name, value, node, result)
+                self._forget([(node, value)])
+
+    def _forget(self, batch):
+        """ Values which couldn't be written must not suppress the next update """
+        for node, value in batch:
+            self._written.pop(node.nodeid, None)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            if self._stop_event.is_set():
+                break
+            # the first update of a burst opens the window, the following ones are merged into it
+            if self._window:
+                self._stop_event.wait(self._window)
+            self._wakeup.clear()
+            self.flush()
@@ -1,31 +1,55 @@
 import definitions
 from communication.server import AZ8UAServer, UaObjectSubscriber
+from activeobjects.actor import ActorScheduler, AsyncioScheduler, set_default_scheduler
+from communication.ua_writer import UaWriteBehind, set_default_writer
+from utils import event_trace
+from utils import actor_stats
+from utils import log_pipeline
+from communication.ua_monitoring import UaActorMonitor
 from activeobjects.sensors.presencesensor import PresenceSensor
 from activeobjects.sensors.interactionsensor import InteractionSensor
 from activeobjects.actuators.rgb_led import RGB_LED
 from activeobjects.actuators.blinker import Blinker
 from activeobjects.actuators.blinker_led_adapter import BlinkerLedAdapter
 from activeobjects.storagerack.storagerack import StorageRack
+from activeobjects.storagerack.inventory_store import InventoryStore
 from activeobjects.station.station import StorageStation
 from activeobjects.services.interface import ServiceInterface
 from activeobjects.services.initialization.init_service import InitService
 from activeobjects.services.diceplate.diceplate import ProvideDicePlateService
 from activeobjects.services.storage.storage_service import StorageDicePlateService
 from communication import events, conn_monitor, network_util
-from communication.server_publisher import ServerPublisher
+from communication.server_publisher import ServerPublisher, create_backend
 
-import revpimodio2
 import config
+
+# on a workstation the station runs on a simulated process image, see SIMULATION_CONFIG
+if config.SIMULATION_CONFIG['enabled']:
+    from utils import revpi_sim as revpimodio2
+    revpimodio2.set_default_simulation(config.SIMULATION_CONFIG)
+else:
+    import revpimodio2
+
 import logging.config
 import json
 import socket
 
 from subprocess import call
+import os
+import time
 
 with open(definitions.LOGCONFIG_PATH, 'r') as logging_config_file:
     config_dict = json.load(logging_config_file)
 logging.config.dictConfig(config_dict)
 
+# the log handlers run in a listener thread, logging never blocks an active object
+if config.LOGGING_CONFIG['asyncLogging']:
+    log_listener = log_pipeline.install(queue_size=config.LOGGING_CONFIG['logQueueSize'],
+                                        sampling=config.LOGGING_CONFIG['logSampling'],
+                                        binary_log=config.LOGGING_CONFIG['binaryLog'])
+else:
+    log_listener = None
+
 try:
     from IPython import embed
 except ImportError:
@@ -46,6 +70,37 @@ class StationApp(object):
         self._name = name
         self.logger = logging.getLogger(self._name)
 
+        # active objects runtime: one thread per active object, a shared pool of worker threads or one event loop
+        self.actorRuntime = config.RUNTIME_CONFIG['actorRuntime']
+        if self.actorRuntime == 'pool':
+            self.actorScheduler = ActorScheduler(name='ActorScheduler',
+                                                 workers=config.RUNTIME_CONFIG['actorWorkerThreads'])
+        elif self.actorRuntime == 'asyncio':
+            self.actorScheduler = AsyncioScheduler(name='ActorLoop')
+        else:
+            self.actorScheduler = None
+
+        if self.actorScheduler is not None:
+            self.actorScheduler.start()
+            set_default_scheduler(self.actorScheduler)
+
+        # OPC UA nodes are written behind the publishers: unchanged values are dropped, bursts are coalesced
+        if config.RUNTIME_CONFIG['uaWriteWindow'] is not None:
+            self.uaWriter = UaWriteBehind(name='UaWriter', window=config.RUNTIME_CONFIG['uaWriteWindow'],
+                                          max_pending=config.RUNTIME_CONFIG['uaWriteMaxPending'])
+            self.uaWriter.start()
+        else:
+            self.uaWriter = None
+        set_default_writer(self.uaWriter)
+
+        # optional recording of the events of all active objects, e.g. to replay an incident without hardware
+        if config.RUNTIME_CONFIG['eventTrace'] is not None:
+            event_trace.install(event_trace.TraceRecorder(config.RUNTIME_CONFIG['eventTrace']))
+
+        # optional mailbox statistics of all active objects, published in the Monitoring folder
+        if config.RUNTIME_CONFIG['actorStats']:
+            actor_stats.install(actor_stats.StatsCollector())
+
         self.logger.debug("Building a RevPi driver...")
 
 		# The sub-methods of class RevPiModIO supports event handling by using the 
@@ -56,7 +111,16 @@ class StationApp(object):
         self.connMonitor = conn_monitor.ConnMonitor(name='ConnMonitor',
                                                     logger=self.logger,
                                                     conn_alive_cb=self.conn_alive_event,
-                                                    conn_broken_cb=self.conn_broken_event)
+                                                    conn_broken_cb=self.conn_broken_event,
+                                                    loop=self.actorScheduler if self.actorRuntime == 'asyncio' else None,
+                                                    interval=config.NETWORK_CONFIG['linkPollInterval'],
+                                                    interfaces=config.NETWORK_CONFIG['interfaces'],
+                                                    debounce=config.NETWORK_CONFIG['linkDebounce'],
+                                                    link_events=config.NETWORK_CONFIG['linkEvents'],
+                                                    # simulated station: the links are up
+                                                    source=conn_monitor.FakeLinkSource(
+                                                        config.NETWORK_CONFIG['interfaces'])
+                                                    if config.SIMULATION_CONFIG['enabled'] else None)
 
 		
         self.logger.debug("Building the station's active objects...")
@@ -227,12 +291,20 @@ class StationApp(object):
                                              blinker=self.blinker,
                                              topics=["StationState", "Ack", "StationErrorCode", "StationErrorDescription", "StationMessageCode", "StationMessageDescription"])
 
+        # inventory of all racks, the journal is replayed once for the six racks
+        self.inventory = InventoryStore(directory=os.path.join(definitions.ROOT_DIR, config.INVENTORY_CONFIG['dataDir']),
+                                        seed_dir=os.path.join(definitions.ROOT_DIR, config.INVENTORY_CONFIG['seedDir']),
+                                        snapshot_interval=config.INVENTORY_CONFIG['snapshotInterval'],
+                                        sync=config.INVENTORY_CONFIG['sync'])
+        self.inventory.open(["StorageRack{0}".format(rack) for rack in range(1, 7)])
+
         self.storageRack1 = StorageRack(name="StorageRack1",
                                         station=self.storageStation,
                                         rgbled=self.storageRack1LED,
                                         blinker=self.storageRack1Blinker,
                                         presencesensor=self.presenceSensor1,
                                         diceplate_symbol=1,
+                                        inventory=self.inventory,
                                         topics=["State", "Value", "PlateColor1", "QuantityOfPlateColor1", "PlateColor2", 
                                                 "QuantityOfPlateColor2", "PlateColor3", "QuantityOfPlateColor3",
 												"StationErrorCode", "StationErrorDescription","StationMessageCode", "StationMessageDescription"])
@@ -243,6 +315,7 @@ class StationApp(object):
                                         blinker=self.storageRack2Blinker,
                                         presencesensor=self.presenceSensor2,
                                         diceplate_symbol=2,
+                                        inventory=self.inventory,
                                         topics=["State", "Value", "PlateColor1", "QuantityOfPlateColor1", "PlateColor2", 
                                                 "QuantityOfPlateColor2", "PlateColor3", "QuantityOfPlateColor3",
 												"StationErrorCode", "StationErrorDescription","StationMessageCode", "StationMessageDescription"])
@@ -253,6 +326,7 @@ class StationApp(object):
                                         blinker=self.storageRack3Blinker,
                                         presencesensor=self.presenceSensor3,
                                         diceplate_symbol=3,
+                                        inventory=self.inventory,
                                         topics=["State", "Value", "PlateColor1", "QuantityOfPlateColor1", "PlateColor2", 
                                                 "QuantityOfPlateColor2", "PlateColor3", "QuantityOfPlateColor3",
 												"StationErrorCode", "StationErrorDescription","StationMessageCode", "StationMessageDescription"])
@@ -263,6 +337,7 @@ class StationApp(object):
                                         blinker=self.storageRack4Blinker,
                                         presencesensor=self.presenceSensor4,
                                         diceplate_symbol=4,
+                                        inventory=self.inventory,
                                         topics=["State", "Value", "PlateColor1", "QuantityOfPlateColor1", "PlateColor2", 
                                                 "QuantityOfPlateColor2", "PlateColor3", "QuantityOfPlateColor3",
 												"StationErrorCode", "StationErrorDescription","StationMessageCode", "StationMessageDescription"])
@@ -273,6 +348,7 @@ class StationApp(object):
                                         blinker=self.storageRack5Blinker,
                                         presencesensor=self.presenceSensor5,
                                         diceplate_symbol=5,
+                                        inventory=self.inventory,
                                         topics=["State", "Value", "PlateColor1", "QuantityOfPlateColor1", "PlateColor2", 
                                                 "QuantityOfPlateColor2", "PlateColor3", "QuantityOfPlateColor3",
 												"StationErrorCode", "StationErrorDescription","StationMessageCode", "StationMessageDescription"])
@@ -283,6 +359,7 @@ class StationApp(object):
                                         blinker=self.storageRack6Blinker,
                                         presencesensor=self.presenceSensor6,
                                         diceplate_symbol=6,
+                                        inventory=self.inventory,
                                         topics=["State", "Value", "PlateColor1", "QuantityOfPlateColor1", "PlateColor2", 
                                                 "QuantityOfPlateColor2", "PlateColor3", "QuantityOfPlateColor3",
 												"StationErrorCode", "StationErrorDescription","StationMessageCode", "StationMessageDescription"])
@@ -469,17 +546,14 @@ class StationApp(object):
         self.logger.debug("Building an OPCUA server: %s ", servername)
 		
 		# NOTE: servername parameter is used in the stations-object state machine
-        self.server = AZ8UAServer(endpoint=endpoint, name=servername, uri=uri, station=self.storageStation, revpiobj=self.revpiioDriver).server
-        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger)
-		
-		#Note: CommentOUT
-        self.server_publisher.publish()
-		
-		#Note: CommentIN
-        #if self.server_publisher.check_connection():
-        #    self.server_publisher.publish()
-        #else:
-        #    self.logger.info("No connection to the database. OPCUA server was not registered.")
+        started = time.perf_counter()
+        self.server = AZ8UAServer(endpoint=endpoint, name=servername, uri=uri, station=self.storageStation, revpiobj=self.revpiioDriver,
+                                  inventory=self.inventory).server
+        self.logger.info("OPCUA server %s built in %.3f s", servername, time.perf_counter() - started)
+        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger,
+                                                backend=create_backend(config.DATABASE_CONFIG, definitions.ROOT_DIR))
+        # registers the server in the background, the station doesn't wait for the database
+        self.server_publisher.start()
 		
         # setting pub-sub system ---------------------------------------------------------
         self.logger.info("Setting events pub-sub system...")
@@ -1296,6 +1370,11 @@ class StationApp(object):
         self.revpiioDriver.handlesignalend(self.shutdown)
 
         self.logger.debug("Registering handlers for inputs events. Start.")
+        # the events of the input edges are sent again and again, they are allocated once and never changed
+        self.posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
+                                                           sender=self._name)
+        self.negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
+                                                           sender=self._name)
 
 		# Register the RevPi DIO-events for single sensor values (condition is boolean):
 		#	Input 1 = StorageAreaSensor #1 (Object in PresenceSensorList[0])
@@ -1333,6 +1412,14 @@ class StationApp(object):
 		
         self.server.start()
         self.logger.info("OPCUA server %s at %s has started", servername, endpoint)
+
+        if actor_stats.collector is not None:
+            self.actorMonitor = UaActorMonitor('ActorMonitor', self.server.nodes.objects.get_child(["2:Monitoring"]),
+                                               actor_stats.collector,
+                                               interval=config.RUNTIME_CONFIG['actorStatsInterval'])
+            self.actorMonitor.start()
+        else:
+            self.actorMonitor = None
         self.connMonitor.start()
         self.logger.info("%s has started", self.connMonitor.name)	
 
@@ -1363,125 +1450,111 @@ class StationApp(object):
         self.statusLED.stop() # in device list
         self.blinker.stop()
         self.storageStation.stop()
+        if self.actorMonitor is not None:
+            self.actorMonitor.stop()
+            for stats in actor_stats.collector.bottlenecks():
+                self.logger.info("Actor statistics: %s", stats)
+        if self.uaWriter is not None:
+            self.uaWriter.stop()
         self.server.stop()
         self.connMonitor.stop()
+        self.server_publisher.stop()
         self.initService.stop()
         self.provideDicePlateService.stop()
         self.storageDicePlateService.stop()
+        self.inventory.close()
         self.revpiioDriver.exit()
 
+        if self.actorScheduler is not None:
+            self.actorScheduler.stop()
+
+        if event_trace.recorder is not None:
+            event_trace.recorder.close()
+            event_trace.install(None)
+
+        if log_listener is not None:
+            log_listener.stop()
+
     # Event handler for presenceSensor1 
 	
     def input1_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.presenceSensor1.handle_event(event=posedge_event)
+        self.presenceSensor1.handle_event(event=self.posedge_event)
 
     def input1_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.presenceSensor1.handle_event(event=negedge_event)
+        self.presenceSensor1.handle_event(event=self.negedge_event)
 	   
     # Event handler for presenceSensor2
 												   
     def input2_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.presenceSensor2.handle_event(event=posedge_event)
+        self.presenceSensor2.handle_event(event=self.posedge_event)
 
     def input2_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.presenceSensor2.handle_event(event=negedge_event)
+        self.presenceSensor2.handle_event(event=self.negedge_event)
 
     # Event handler for presenceSensor3
 												   
     def input3_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.presenceSensor3.handle_event(event=posedge_event)
+        self.presenceSensor3.handle_event(event=self.posedge_event)
 
     def input3_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.presenceSensor3.handle_event(event=negedge_event)
+        self.presenceSensor3.handle_event(event=self.negedge_event)
 
     # Event handler for presenceSensor4
 												   
     def input4_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.presenceSensor4.handle_event(event=posedge_event)
+        self.presenceSensor4.handle_event(event=self.posedge_event)
 
     def input4_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.presenceSensor4.handle_event(event=negedge_event)
+        self.presenceSensor4.handle_event(event=self.negedge_event)
 
     # Event handler for presenceSensor5										   
 												   
     def input5_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.presenceSensor5.handle_event(event=posedge_event)
+        self.presenceSensor5.handle_event(event=self.posedge_event)
 
     def input5_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.presenceSensor5.handle_event(event=negedge_event)
+        self.presenceSensor5.handle_event(event=self.negedge_event)
 
     # Event handler for presenceSensor6									
 										
     def input6_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.presenceSensor6.handle_event(event=posedge_event)
+        self.presenceSensor6.handle_event(event=self.posedge_event)
 
     def input6_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.presenceSensor6.handle_event(event=negedge_event)
+        self.presenceSensor6.handle_event(event=self.negedge_event)
 
 	# For the interaction sensors of the storage station, only the posedge event is needed
     # Event handler for interactionSensor1									
 										
     def input7_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.interactionSensor1.handle_event(event=posedge_event)
+        self.interactionSensor1.handle_event(event=self.posedge_event)
 
     def input7_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.interactionSensor1.handle_event(event=negedge_event)		
+        self.interactionSensor1.handle_event(event=self.negedge_event)		
 		
     # Event handler for interactionSensor2									
 										
     def input8_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.interactionSensor2.handle_event(event=posedge_event)
+        self.interactionSensor2.handle_event(event=self.posedge_event)
 
     def input8_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.interactionSensor2.handle_event(event=negedge_event)
+        self.interactionSensor2.handle_event(event=self.negedge_event)
 
     def conn_broken_event(self):
         noconn_event = events.StorageStationInputEvent(eventID=events.StorageStationInputEvents.NoConn,
@@ -0,0 +1,262 @@
+""" End-to-end latency benchmark: input edge -> OPC UA node update
+
+The station app is built on the simulated process image (see utils.revpi_sim) with the physics models of
+SIMULATION_CONFIG, without its script. The benchmark steps the process image itself: it initializes the
+station via its ServiceAutoInitializeStation method (the sensors don't publish their values before), then
+toggles the inputs of the probes in BENCHMARK_CONFIG and takes the time until the OPC UA variable of the
+probe has the new value, i.e. the whole path
+
+    input callback -> handle_event queue -> state machine -> Publisher.publish -> UaObjectSubscriber.update
+    -> (write-behind layer) -> address space
+
+The node changes are taken from a data change callback of the server's address space, the edges are
+injected with a fixed rate. For every rate p50, p99 and max of the latency, the throughput of node updates
+and the edges without an update (e.g. merged by the coalescing window) are reported.
+
+    python3 -m utils.latency_bench [rate ...]       run from the directory of the station
+"""
+
+import sys
+import math
+import time
+import threading
+import logging
+from opcua import ua
+
+
+def percentile(sorted_values, p):
+    """ Nearest-rank percentile of an ascending list """
+    if not sorted_values:
+        return None
+    rank = max(1, int(math.ceil(p / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class NodeWatch(object):
+    """ Records the value changes of a variable node with their time stamps """
+
+    def __init__(self, server, node):
+        self.server = server
+        self.node = node
+        self.changes = []           # (time.perf_counter(), value)
+        self._last_value = node.get_value()
+        self._condition = threading.Condition()
+        result, self._handle = server.iserver.aspace.add_datachange_callback(node.nodeid, ua.AttributeIds.Value,
+                                                                               self._datachange)
+
+    @property
+    def value(self):
+        return self._last_value
+
+    def _datachange(self, handle, datavalue):
+        now = time.perf_counter()
+        value = datavalue.Value.Value
+        with self._condition:
+            if value == self._last_value:
+                return
+            self._last_value = value
+            self.changes.append((now, value))
+            self._condition.notify_all()
+
+    def wait_for(self, value, timeout):
+        with self._condition:
+            return self._condition.wait_for(lambda: self._last_value == value, timeout)
+
+    def reset(self):
+        with self._condition:
+            self.changes = []
+
+    def close(self):
+        self.server.iserver.aspace.delete_datachange_callback(self._handle)
+
+
+class LatencyProbe(object):
+    """ An input of the process image and the OPC UA variable which follows it """
+
+    def __init__(self, driver, server, input_name, path):
+        self.input_name = input_name
+        self.path = path
+        self.inputobj = driver.io[input_name]
+        self.watch = NodeWatch(server, server.nodes.objects.get_child(["2:" + name for name in path]))
+        self.expected = dict()      # input value -> value of the node
+
+    @property
+    def name(self):
+        return "{0} -> {1}".format(self.input_name, ".".join(self.path))
+
+    def match(self, injections):
+        """ Assigns the node changes to the injected edges in order: a change belongs to the first pending edge
+            before it which expects its value. If edges were merged, this takes the older edge, so the latency is
+            rather over- than underestimated. Returns the latencies and the number of edges without change. """
+        latencies = []
+        missed = 0
+        position = 0
+        for changed, value in self.watch.changes:
+            for index in range(position, len(injections)):
+                injected, expected = injections[index]
+                if injected > changed:
+                    break
+                if expected == value:
+                    latencies.append(changed - injected)
+                    missed += index - position
+                    position = index + 1
+                    break
+        missed += len(injections) - position
+        return latencies, missed
+
+
+class LatencyResult(object):
+
+    def __init__(self, rate, injected, latencies, missed, duration):
+        self.rate = rate
+        self.injected = injected
+        self.latencies = sorted(latencies)
+        self.missed = missed
+        self.duration = duration
+
+    @property
+    def observed(self):
+        return len(self.latencies)
+
+    @property
+    def p50(self):
+        return percentile(self.latencies, 50)
+
+    @property
+    def p99(self):
+        return percentile(self.latencies, 99)
+
+    @property
+    def max(self):
+        return self.latencies[-1] if self.latencies else None
+
+    @property
+    def throughput(self):
+        """ Node updates per second """
+        return self.observed / self.duration if self.duration else 0.0
+
+    def __str__(self):
+        if not self.latencies:
+            return "%8.1f edges/s : no node updates, %s edges" % (self.rate, self.injected)
+        return "%8.1f edges/s : p50 %7.2f ms, p99 %7.2f ms, max %7.2f ms, %8.1f updates/s, %s of %s edges missed" % (
+            self.rate, self.p50 * 1000, self.p99 * 1000, self.max * 1000, self.throughput, self.missed, self.injected)
+
+
+class LatencyBenchmark(object):
+    """ Injects the input edges of the probes into a simulated process image and measures the latency """
+
+    def __init__(self, driver, server, probes, settle=1.0):
+        self.driver = driver            # utils.revpi_sim.RevPiModIO, its mainloop must not run
+        self.server = server            # the opcua server of the station
+        self.probes = [LatencyProbe(driver, server, input_name, path) for input_name, path in probes]
+        self.settle = settle
+        self.logger = logging.getLogger("LatencyBenchmark")
+
+    def initialize(self, timeout=60.0):
+        """ Calls ServiceAutoInitializeStation and steps the process image (the physics models move the axes to
+            their home positions) until StationState is Ready. Raises RuntimeError on a timeout. """
+        objects = self.server.nodes.objects
+        service = objects.get_child(["2:StationService"])
+        state = objects.get_child(["2:StateMachine", "2:StationState"])
+        service.call_method(service.get_child(["2:ServiceAutoInitializeStation"]))
+
+        cycle = self.driver.cycletime / 1000.0
+        pause = cycle / self.driver.speed if self.driver.speed else 0.0
+        deadline = time.monotonic() + timeout
+        while state.get_value() != 'Ready':
+            if time.monotonic() > deadline:
+                raise RuntimeError("The station isn't Ready after {0} s, StationState: {1}".format(
+                    timeout, state.get_value()))
+            self.driver.run_for(cycle)
+            # the monitoring timers of the station run in wall clock time
+            time.sleep(pause)
+        self.logger.info("The station is initialized after %.1f s simulated time.", self.driver.sim_time)
+
+    def _inject(self, probe, value):
+        probe.inputobj.value = value
+        injected = time.perf_counter()
+        # the changed input fires its event functions in this thread
+        self.driver.cycle()
+        return injected
+
+    def calibrate(self):
+        """ Learns the value of the node after a rising and a falling edge of each probe's input. A probe
+            whose node doesn't follow the input is dropped. """
+        for probe in list(self.probes):
+            for value in (not probe.inputobj.value, probe.inputobj.value):
+                self._inject(probe, value)
+                time.sleep(self.settle)
+                probe.expected[value] = probe.watch.value
+            if probe.expected[True] == probe.expected[False]:
+                self.logger.warning("%s : the node doesn't follow the input, the probe is skipped.", probe.name)
+                probe.watch.close()
+                self.probes.remove(probe)
+            else:
+                self.logger.info("%s : %s", probe.name, probe.expected)
+
+    def run(self, rate, edges):
+        """ Injects edges with the given rate (edges per second, round robin over the probes) """
+        if not self.probes:
+            raise ValueError("There is no probe to measure")
+        injections = {probe: [] for probe in self.probes}
+        for probe in self.probes:
+            probe.watch.reset()
+
+        period = 1.0 / rate
+        started = next_time = time.perf_counter()
+        for index in range(edges):
+            probe = self.probes[index % len(self.probes)]
+            value = not probe.inputobj.value
+            injections[probe].append((self._inject(probe, value), probe.expected[value]))
+            next_time += period
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        # let the station drain its queues
+        for probe in self.probes:
+            probe.watch.wait_for(probe.expected[probe.inputobj.value], self.settle)
+        time.sleep(self.settle)
+
+        latencies, missed, last_change = [], 0, started
+        for probe in self.probes:
+            probe_latencies, probe_missed = probe.match(injections[probe])
+            latencies.extend(probe_latencies)
+            missed += probe_missed
+            if probe.watch.changes:
+                last_change = max(last_change, probe.watch.changes[-1][0])
+        return LatencyResult(rate, edges, latencies, missed, last_change - started)
+
+    def close(self):
+        for probe in self.probes:
+            probe.watch.close()
+
+
+def main(rates=None):
+    import config
+    from utils import revpi_sim
+
+    config.SIMULATION_CONFIG['enabled'] = True
+    import main as station
+
+    # the benchmark owns the inputs and steps the process image itself, the physics models are needed to
+    # initialize the station
+    revpi_sim.set_default_simulation(dict(config.SIMULATION_CONFIG, script=[]))
+    app = station.StationApp(config.STATION_CONFIG['stationName'])
+
+    benchmark_config = config.BENCHMARK_CONFIG
+    benchmark = LatencyBenchmark(app.revpiioDriver, app.server, benchmark_config['probes'],
+                                 settle=benchmark_config['settle'])
+    try:
+        benchmark.initialize(benchmark_config['initTimeout'])
+        benchmark.calibrate()
+        print("Probes: " + ", ".join(probe.name for probe in benchmark.probes))
+        for rate in rates or benchmark_config['rates']:
+            print(benchmark.run(rate, benchmark_config['edges']))
+    finally:
+        benchmark.close()
+        app.shutdown()
+
+
+if __name__ == '__main__':
+    main([float(rate) for rate in sys.argv[1:]])
@@ -1,4 +1,150 @@
-from threading import Timer
+import threading
+import time
+import math
+import logging
+from utils import event_trace
+
+
+class TimerHandle(object):
+    """ An armed timeout in the timer wheel """
+    __slots__ = ('callback', 'deadline', 'slot', 'rounds', 'cancelled')
+
+    def __init__(self, callback, deadline, slot, rounds):
+        self.callback = callback
+        self.deadline = deadline        # requested expiry time, time.monotonic()
+        self.slot = slot
+        self.rounds = rounds
+        self.cancelled = False
+
+
+class TimerWheel(object):
+    """ Hashed timer wheel served by a single thread.
+        Arming and cancelling a timeout are O(1), the service thread only wakes up once per tick
+        while at least one timeout is armed. Callbacks are executed in the service thread. """
+
+    def __init__(self, name="TimerWheel", tick=0.01, slots=512):
+        self._name = name
+        self._tick = tick
+        self._slots = [dict() for _ in range(slots)]
+        self._cursor = 0                    # slot of the next tick to be processed
+        self._armed = 0
+        self._fired = 0
+        self._lock = threading.Condition()
+        self._origin = time.monotonic()     # time of tick 0
+        self._processed_ticks = 0
+        self._thread = None
+        self.logger = logging.getLogger(name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def tick(self):
+        return self._tick
+
+    @property
+    def armed_count(self):
+        """ Number of timeouts which are armed and did not expire yet """
+        return self._armed
+
+    @property
+    def fired_count(self):
+        return self._fired
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+            self._thread.trace_source = event_trace.SOURCE_TIMER
+            self._thread.start()
+
+    def schedule(self, delay, callback):
+        """ Arms a timeout, callback() is called after delay seconds. Returns the handle to cancel it. """
+        return self.schedule_at(time.monotonic() + delay, callback)
+
+    def schedule_at(self, deadline, callback):
+        """ Arms a timeout, callback() is called at the time deadline (time.monotonic()), as soon as possible if
+            it has passed. Returns the handle to cancel it. """
+        with self._lock:
+            self._ensure_started()
+            elapsed_ticks = int((time.monotonic() - self._origin) / self._tick)
+            if self._armed == 0:
+                # the wheel was idle, nothing to expire in the past ticks
+                idle_ticks = elapsed_ticks - self._processed_ticks
+                self._cursor = (self._cursor + idle_ticks) % len(self._slots)
+                self._processed_ticks = elapsed_ticks
+            # tick n expires at the end of the tick, origin + (n + 1) * tick, a timeout never expires earlier
+            # than requested; the epsilon keeps a deadline on a tick boundary from rounding up to the next tick
+            deadline_tick = math.ceil((deadline - self._origin) / self._tick - 1e-9) - 1
+            ticks = max(0, deadline_tick - self._processed_ticks)
+            slots_num = len(self._slots)
+            slot = (self._cursor + ticks) % slots_num
+            handle = TimerHandle(callback, deadline, slot, ticks // slots_num)
+            self._slots[slot][id(handle)] = handle
+            self._armed += 1
+            self._lock.notify()
+        return handle
+
+    def cancel(self, handle):
+        with self._lock:
+            if handle.cancelled:
+                return
+            handle.cancelled = True
+            if self._slots[handle.slot].pop(id(handle), None) is not None:
+                self._armed -= 1
+
+    def _expire_tick(self):
+        """ Processes the slot under the cursor, returns the expired handles. Must be called with the lock held. """
+        slot = self._slots[self._cursor]
+        expired = []
+        for key, handle in list(slot.items()):
+            if handle.rounds > 0:
+                handle.rounds -= 1
+            else:
+                del slot[key]
+                handle.cancelled = True     # fired timeouts can not be cancelled anymore
+                expired.append(handle)
+        self._armed -= len(expired)
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        self._processed_ticks += 1
+        return expired
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._armed == 0:
+                    self._lock.wait()
+
+                due_ticks = int((time.monotonic() - self._origin) / self._tick) - self._processed_ticks
+                if due_ticks <= 0:
+                    next_tick_time = self._origin + (self._processed_ticks + 1) * self._tick
+                    self._lock.wait(max(0.0, next_tick_time - time.monotonic()))
+                    continue
+
+                expired = []
+                for _ in range(due_ticks):
+                    expired.extend(self._expire_tick())
+
+            for handle in expired:
+                self._fired += 1
+                try:
+                    handle.callback()
+                except Exception:
+                    self.logger.exception("%s : a timer callback has failed.", self._name)
+
+
+_timer_wheel = None
+_timer_wheel_lock = threading.Lock()
+
+
+def get_timer_wheel():
+    """ The timer wheel shared by all monitoring timers of the station """
+    global _timer_wheel
+    with _timer_wheel_lock:
+        if _timer_wheel is None:
+            _timer_wheel = TimerWheel()
+    return _timer_wheel
+
 
 class MonitoringTimer(object):
 
@@ -12,6 +158,12 @@ class MonitoringTimer(object):
         self._logger = logger
 
         self._timer = None
+        self._wheel = get_timer_wheel()
+
+    @staticmethod
+    def armed_timers():
+        """ Number of monitoring timers which are currently armed """
+        return get_timer_wheel().armed_count
 
     @property
     def name(self):
@@ -51,25 +203,33 @@ class MonitoringTimer(object):
         else:
             return False
 
+    def is_armed(self):
+        return self._timer is not None and not self._timer.cancelled
+
     def _callback(self):
         if self._logger is not None:
             self._logger.debug("%s: Timeout. A callback function %s was called.", self.name, self.callback_fnc.__name__)
 
+        deadline = self._timer.deadline
         self.callback_fnc(*self.args, **self.kwargs)
 
         if self.repeatable:
-            self.start()
+            # re-armed from the deadline, the period doesn't drift by the tick and the callback's run time,
+            # missed periods are skipped
+            self._arm(max(deadline + self.interval, time.monotonic()))
 
     def cancel(self):
         if self._timer is not None:
-            self._timer.cancel()
+            self._wheel.cancel(self._timer)
         if self._logger is not None:
             self._logger.debug("%s was stopped.", self.name)
 
     def start(self):
-        if self._timer is not None:
-            self._timer.cancel()
-        self._timer = Timer(self.interval, self._callback)
-        self._timer.start()
+        self._arm(time.monotonic() + self.interval)
         if self._logger is not None:
             self._logger.debug("%s was started.", self.name)
+
+    def _arm(self, deadline):
+        if self._timer is not None:
+            self._wheel.cancel(self._timer)
+        self._timer = self._wheel.schedule_at(deadline, self._callback)
@@ -2,6 +2,7 @@ import abc
 from communication import events
 from utils.monitoring_timer import MonitoringTimer
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable
 import config
 
 class PressState(metaclass=abc.ABCMeta):
@@ -121,8 +122,8 @@ class NotInitialized(PressState):
         return self._super_sm
 
     def enter_action(self):
-        self._press.publisher.publish(topic="PressState", value="NotInitialized", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="NotInitialized", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "NotInitialized"),
+                                            ("State", "NotInitialized")], sender=self._press.name)
 
     def initialize(self):
         self._press_sm.set_state(self._press_sm.initialization_state)
@@ -195,8 +196,8 @@ class Initialization(PressState):
         return self._super_sm
 
     def enter_action(self):
-        self._press.publisher.publish(topic="PressState", value="Initialized", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="Initialized", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "Initialized"),
+                                            ("State", "Initialized")], sender=self._press.name)
         self._press_sm.set_state(self._press_sm.checkpresspos_state)
 
     def initialize(self):
@@ -270,8 +271,8 @@ class CheckPressPosition(PressState):
 
     def enter_action(self):
         self._press.motor.handle_event(event=self._press_sm.motor_stop_event)
-        self._press.publisher.publish(topic="PressState", value="CheckPressPosition", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="CheckPressPosition", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "CheckPressPosition"),
+                                            ("State", "CheckPressPosition")], sender=self._press.name)
 
         self._press_sm.movedown_future = False
         self._press_sm.moveup_future = False
@@ -352,8 +353,8 @@ class UnknownPosition(PressState):
 
     def enter_action(self):
         self._press.uppos_sensor.handle_event(event=self._press_sm.sensor_update_event)
-        self._press.publisher.publish(topic="PressState", value="CheckPressPos : UnknownPos", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="CheckPressPos : UnknownPos", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "CheckPressPos : UnknownPos"),
+                                            ("State", "CheckPressPos : UnknownPos")], sender=self._press.name)
 
     def initialize(self):
         self._press.logger.debug("%s event in %s state", self.initialize.__name__, self.name)
@@ -435,8 +436,8 @@ class UpSensorOff(PressState):
 
     def enter_action(self):
         self._press.endswitch_sensor.handle_event(event=self._press_sm.sensor_update_event)
-        self._press.publisher.publish(topic="PressState", value="CheckPressPos : UpSensorOff", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="CheckPressPos : UpSensorOff", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "CheckPressPos : UpSensorOff"),
+                                            ("State", "CheckPressPos : UpSensorOff")], sender=self._press.name)
 
     def initialize(self):
         self._press.logger.debug("%s event in %s state", self.initialize.__name__, self.name)
@@ -518,8 +519,8 @@ class DownSensorOff(PressState):
 
     def enter_action(self):
         self._press.force_sensor.handle_event(event=self._press_sm.sensor_update_event)
-        self._press.publisher.publish(topic="PressState", value="CheckPressPos : DownSensorOff", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="CheckPressPos : DownSensorOff", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "CheckPressPos : DownSensorOff"),
+                                            ("State", "CheckPressPos : DownSensorOff")], sender=self._press.name)
 
     def initialize(self):
         self._press.logger.debug("%s event in %s state", self.initialize.__name__, self.name)
@@ -600,8 +601,8 @@ class OutOfPosition(PressState):
         return self._super_sm
 
     def enter_action(self):
-        self._press.publisher.publish(topic="PressState", value="OutOfPosition", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="OutOfPosition", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "OutOfPosition"),
+                                            ("State", "OutOfPosition")], sender=self._press.name)
 
         if self._press_sm.movedown_future and not self._press_sm.moveup_future:
             self._press_sm.movedown_future = False
@@ -762,8 +763,8 @@ class InUpperPosition(PressState):
         return self._super_sm
 
     def enter_action(self):
-        self._press.publisher.publish(topic="PressState", value="InUpperPosition", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="InUpperPosition", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "InUpperPosition"),
+                                            ("State", "InUpperPosition")], sender=self._press.name)
 
         self._press_sm.move_up = False
 
@@ -891,8 +892,8 @@ class InBottomPosition(PressState):
         return self._super_sm
 
     def enter_action(self):
-        self._press.publisher.publish(topic="PressState", value="OnEndSwitch", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="OnEndSwitch", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "OnEndSwitch"),
+                                            ("State", "OnEndSwitch")], sender=self._press.name)
 
         self._press_sm.move_down = False
 
@@ -1019,8 +1020,8 @@ class InPressingPosition(PressState):
 
     def enter_action(self):
         self._press.logger.debug("Entering the %s state", self.name)
-        self._press.publisher.publish(topic="PressState", value="InPressingPosition", sender=self._press.name)
-        self._press.publisher.publish(topic="State", value="InPressingPosition", sender=self._press.name)
+        self._press.publisher.publish_many([("PressState", "InPressingPosition"),
+                                            ("State", "InPressingPosition")], sender=self._press.name)
 
     def initialize(self):
         self._press.logger.debug("%s event in %s state", self.initialize.__name__, self.name)
@@ -1199,6 +1200,8 @@ class PressStateMachine(object):
                                                         sender=self._press.name)
 
 
+        self._dispatch_table = self._build_dispatch_table()
+
         # state objects
         self._notinit_state = NotInitialized(self, self._press)        # rack's states instances
         self._initialization_state = Initialization(self, self._press)
@@ -1321,118 +1324,30 @@ class PressStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._press.name)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._press.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "SensorSafetyPressAtMaxLength":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.down_sensor_posedge()
-                    else:
-                        self._current_state.down_sensor_negedge()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "SensorLinearPosOfPress":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.up_sensor_posedge()
-                    else:
-                        self._current_state.up_sensor_negedge()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "SensorForceAtPressing":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.force_sensor_posedge()
-                    else:
-                        self._current_state.force_sensor_negedge()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "MotorPress":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.motor_on()
-                    else:
-                        self._current_state.motor_off()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "Estop":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-
-        except KeyError:
-
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-
-            if eventID == events.PressInputEvents.Initialize:  # this a part of the service generic interface
-                self._current_state.initialize()
-            elif eventID == events.PressInputEvents.Ack:
-                self._current_state.acknowledge()
-            elif eventID == events.PressInputEvents.MoveUp:
-                self._current_state.move_up()
-            elif eventID == events.PressInputEvents.MoveDown:
-                self._current_state.move_down()
-            elif eventID == events.PressInputEvents.Stop:
-                self._current_state.stop()
-            elif eventID == events.PressInputEvents.Error:
-                self._current_state.error()
-            elif eventID == events.PressInputEvents.Timeout:
-                self._current_state.timeout()
-            elif eventID == events.PressInputEvents.Update:
-                self._current_state.update()
-            else:
-                self._press.logger.debug("Unknown event : %s", event)
-
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._press.logger)
+
+        for sensor, on_posedge, on_negedge in (("SensorSafetyPressAtMaxLength", "down_sensor_posedge", "down_sensor_negedge"),
+                                               ("SensorLinearPosOfPress", "up_sensor_posedge", "up_sensor_negedge"),
+                                               ("SensorForceAtPressing", "force_sensor_posedge", "force_sensor_negedge"),
+                                               ("MotorPress", "motor_on", "motor_off")):
+            table.flag(sensor, "Value", on_posedge, on_negedge)
+            table.message(sensor, "State", "Error", "error")
+            table.message(sensor, "State", "NotInitialized", "error")
+            table.message(sensor, "State", "Initialized", None)
+        table.message("MotorPress", "State", "Estop", "error")
+
+        table.flag("Station", "Ack", "acknowledge", None)
+
+        table.event(events.PressInputEvents.Initialize, "initialize")  # this a part of the service generic interface
+        table.event(events.PressInputEvents.Ack, "acknowledge")
+        table.event(events.PressInputEvents.MoveUp, "move_up")
+        table.event(events.PressInputEvents.MoveDown, "move_down")
+        table.event(events.PressInputEvents.Stop, "stop")
+        table.event(events.PressInputEvents.Error, "error")
+        table.event(events.PressInputEvents.Timeout, "timeout")
+        table.event(events.PressInputEvents.Update, "update")
+        return table
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
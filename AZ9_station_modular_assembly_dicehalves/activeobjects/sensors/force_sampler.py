@@ -0,0 +1,255 @@
+import threading
+import time
+import bisect
+import logging
+from array import array
+
+
+class ForceRingBuffer(object):
+    """ Preallocated ring buffer of (timestamp, value) samples """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("The ring buffer needs a capacity of at least one sample")
+        self._capacity = capacity
+        self._times = array('d', bytes(8 * capacity))
+        self._values = array('d', bytes(8 * capacity))
+        self._written = 0       # number of samples written since the start, the next index is written % capacity
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def written(self):
+        return self._written
+
+    def __len__(self):
+        return min(self._written, self._capacity)
+
+    def append(self, timestamp, value):
+        index = self._written % self._capacity
+        self._times[index] = timestamp
+        self._values[index] = value
+        self._written += 1
+
+    def overwritten(self, position):
+        """ Number of the samples written since the position which are no longer in the buffer """
+        return max(0, self._written - self._capacity - position)
+
+    def since(self, position):
+        """ Samples written since the position (a value of written), oldest first, at most capacity samples """
+        position = max(position, self._written - self._capacity)
+        if position >= self._written:
+            return array('d'), array('d')
+        start = position % self._capacity
+        end = self._written % self._capacity
+        if start < end:
+            return self._times[start:end], self._values[start:end]
+        return self._times[start:] + self._times[:end], self._values[start:] + self._values[:end]
+
+    def last(self, seconds):
+        """ Samples of the last seconds, oldest first """
+        times, values = self.since(0)
+        if not times:
+            return times, values
+        first = bisect.bisect_left(times, times[-1] - seconds)
+        return times[first:], values[first:]
+
+
+class ForceSampler(object):
+    """ Samples the analog force input at a fixed rate in its own thread.
+
+    Every sample goes into a preallocated ring buffer and to on_sample(value), which evaluates the stop
+    condition of the press. A pressing cycle is delimited by begin_cycle() and end_cycle() or, if
+    cycle_threshold is set, lasts while the force is above it. At the end of a cycle
+    on_cycle(cycle_index, times, values, aborted, truncated) gets its force curve: at most the last history
+    seconds, truncated is True if the cycle was longer.
+    """
+
+    def __init__(self, name, inputobj, rate, history, cycle_threshold, on_sample=None, on_cycle=None):
+        self._name = name
+        self.inputobj = inputobj        # reference to the revpi driver input object
+        self._period = 1.0 / rate
+        self._history = history
+        self.cycle_threshold = cycle_threshold
+        self.on_sample = on_sample
+        self.on_cycle = on_cycle
+
+        self._buffer = ForceRingBuffer(int(rate * history) + 1)
+        self._cycle_start = None        # buffer position of the first sample of the running cycle
+        self._lock = threading.Lock()   # the cycles can be delimited from other threads
+        self._cycle_index = 0
+        self._last_cycle = None         # (cycle_index, times, values) of the last completed cycle
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(name)
+
+        # statistics
+        self.overruns = 0               # samples which were taken late by more than one period
+        self.max_lateness = 0.0
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def period(self):
+        return self._period
+
+    @property
+    def buffer(self):
+        return self._buffer
+
+    @property
+    def in_cycle(self):
+        return self._cycle_start is not None
+
+    @property
+    def last_cycle(self):
+        return self._last_cycle
+
+    def last(self, seconds):
+        """ Force curve of the last seconds: (times, values) """
+        return self._buffer.last(seconds)
+
+    def current_cycle(self):
+        """ Force curve of the running pressing cycle so far, None outside of a cycle """
+        with self._lock:
+            if self._cycle_start is None:
+                return None
+            return self._buffer.since(self._cycle_start)
+
+    def begin_cycle(self):
+        with self._lock:
+            self._cycle_start = self._buffer.written
+
+    def end_cycle(self, aborted=False):
+        with self._lock:
+            if self._cycle_start is None:
+                return
+            cycle = self._end_cycle(aborted)
+        self._notify_cycle(cycle)
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        self.logger.info("%s has been started with a sampling period of %s s.", self._name, self._period)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.logger.info("%s has been stopped. Overruns: %s, max. lateness: %.4f s",
+                         self._name, self.overruns, self.max_lateness)
+
+    def sample(self, timestamp=None):
+        """ Takes one sample """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        value = self.inputobj.value
+        cycle = None
+        with self._lock:
+            self._buffer.append(timestamp, value)
+            if self.cycle_threshold is not None:
+                if self._cycle_start is None:
+                    if value > self.cycle_threshold:
+                        self._cycle_start = self._buffer.written - 1
+                elif value < self.cycle_threshold:
+                    cycle = self._end_cycle(aborted=False)
+
+        if self.on_sample is not None:
+            self.on_sample(value)
+        if cycle is not None:
+            self._notify_cycle(cycle)
+        return value
+
+    def _end_cycle(self, aborted):
+        """ Must be called with the lock held """
+        times, values = self._buffer.since(self._cycle_start)
+        truncated = self._buffer.overwritten(self._cycle_start) > 0
+        self._cycle_start = None
+        self._cycle_index += 1
+        self._last_cycle = (self._cycle_index, times, values)
+        return self._cycle_index, times, values, aborted, truncated
+
+    def _notify_cycle(self, cycle):
+        cycle_index, times, values, aborted, truncated = cycle
+        if values:
+            self.logger.debug("%s : pressing cycle %s, %s samples, peak force %s",
+                              self._name, cycle_index, len(values), max(values))
+        if truncated:
+            self.logger.warning("%s : pressing cycle %s was longer than the history of %s s, its beginning is "
+                                "missing.", self._name, cycle_index, self._history)
+        if self.on_cycle is not None:
+            try:
+                self.on_cycle(cycle_index, times, values, aborted, truncated)
+            except Exception:
+                self.logger.exception("%s : the cycle callback has failed.", self._name)
+
+    def _run(self):
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            lateness = now - next_time
+            if lateness > self.max_lateness:
+                self.max_lateness = lateness
+            if lateness > self._period:
+                # don't try to catch up, a burst of samples wouldn't tell anything new
+                self.overruns += 1
+                next_time = now
+
+            try:
+                self.sample(now)
+            except Exception:
+                self.logger.exception("%s : sampling has failed.", self._name)
+
+            next_time += self._period
+            self._stop_event.wait(max(0.0, next_time - time.monotonic()))
+
+
+class ForceCycleRecorder(object):
+    """ Subscriber of the press's State topic, delimits the pressing cycles of the force sampler:
+        a cycle starts when the press leaves its upper position and ends when it is back or in error.
+        The force curves of the cycles are appended to the archive. """
+
+    def __init__(self, sampler, archive, upper_state="InUpperPosition", error_states=("Error", "ErrorWithInit")):
+        self._name = sampler.name + "Recorder"
+        self.sampler = sampler
+        self.archive = archive
+        self.upper_state = upper_state
+        self.error_states = error_states
+        self._in_upper_position = False
+        self.logger = logging.getLogger(self._name)
+
+        self.sampler.on_cycle = self._store_cycle
+
+    @property
+    def name(self):
+        return self._name
+
+    def update(self, *args, **kwargs):
+        value = kwargs["value"]
+        if value == self.upper_state:
+            if self.sampler.in_cycle:
+                self.sampler.end_cycle()
+            self._in_upper_position = True
+        elif value in self.error_states:
+            if self.sampler.in_cycle:
+                self.sampler.end_cycle(aborted=True)
+            self._in_upper_position = False
+        elif self._in_upper_position:
+            self._in_upper_position = False
+            self.sampler.begin_cycle()
+
+    def _store_cycle(self, cycle_index, times, values, aborted, truncated):
+        if not times:
+            return
+        # the sampler's time stamps are monotonic, the archive stores the wall clock time of the start
+        timestamp = time.time() - (time.monotonic() - times[0])
+        record = self.archive.append(timestamp, times, values, aborted=aborted, truncated=truncated)
+        self.logger.info("Pressing cycle %s was archived: %s samples, peak force %s",
+                         record.cycle_id, record.samples, record.peak_force)
@@ -8,7 +8,8 @@ import struct
 
 class ForceSwitch(Actor):
     """ Force sensor class as an active object """
-    def __init__(self, name, id, topics, inputobj, outputobj, motor,  force_limit, monitor_interval, auto_init=False,):
+    def __init__(self, name, id, topics, inputobj, outputobj, motor,  force_limit, monitor_interval, auto_init=False,
+                 publish_filter=None):
         super(ForceSwitch, self).__init__(name=name)
         self._name = name
         self._id = id
@@ -40,6 +41,8 @@ class ForceSwitch(Actor):
         self.publisher = Publisher(self.topics, logger=self.logger,  name=name)           # publisher's instance
 
         self.inputobj = inputobj  # reference to the revpi driver input object
+        self.publish_filter = publish_filter  # deadband / rate limit of the published AnalogValue, None: every sample
+        self._analog_value = None  # the last raw sample
         self.outputobj = outputobj  # reference to the revpi driver output object
 
         # self.sensor_sm = ForceSwitchStateMachine(self)
@@ -89,15 +92,28 @@ class ForceSwitch(Actor):
     def id(self):
         return self._id
 
+    @property
+    def analog_value(self):
+        """ The last raw sample, not affected by the publish filter """
+        return self._analog_value
+
     def register_subscribers(self, topic, who, callback=None):
         if topic not in self.allowed_topics:
             raise ValueError("Unknown topic")
         self.publisher.register(topic, who, callback)
+        if topic == "AnalogValue" and self.publish_filter is not None:
+            self.publish_filter.reset()     # the new subscriber gets the next sample
+
+    def publish_analog_value(self, value):
+        """ Keeps the raw sample and publishes it as AnalogValue if it passes the publish filter """
+        self._analog_value = value
+        if self.publish_filter is None or self.publish_filter.accept(value):
+            self.publisher.publish(topic="AnalogValue", value=value, sender=self.name)
 
     def update_input(self):
         current_value = self.inputobj.value
 
-        self.publisher.publish(topic="AnalogValue", value=current_value, sender=self.name)
+        self.publish_analog_value(current_value)
         if current_value >= self.force_limit:
             self._inputpos_cb()
         else:
@@ -105,7 +121,7 @@ class ForceSwitch(Actor):
 
     def is_greater_then_setpoint(self):
         current_value = self.inputobj.value
-        self.publisher.publish(topic="AnalogValue", value=current_value, sender=self.name)
+        self.publish_analog_value(current_value)
         if current_value >= self.force_limit:
             return True
         else:
@@ -0,0 +1,96 @@
+""" Simple sensor state machines, compiled from a declarative model (see utils/sm_compiler.py)
+
+The NO (normally open) and the NC (normally closed) sensor have the same states, the NC sensor swaps the edges:
+its positive edge switches the sensor off. An event without a transition in the current state, e.g. a second
+positive edge in SensorOn, is dropped by a single dict lookup, without a method call or a log record.
+"""
+
+from communication import events
+
+# event ID of the sensor -> event of the model
+SENSOR_EVENTS = {
+    events.SimpleSensorInputEvents.Initialize: 'initialize',
+    events.SimpleSensorInputEvents.PosEdge: 'positive_edge',
+    events.SimpleSensorInputEvents.NegEdge: 'negative_edge',
+    events.SimpleSensorInputEvents.Error: 'error',
+    events.SimpleSensorInputEvents.Ack: 'acknowledge',
+    events.SimpleSensorInputEvents.Update: 'update',
+}
+
+
+def simple_sensor_model(name, switch_on, switch_off):
+    """ The model of a simple sensor, switch_on and switch_off are the edges which switch the sensor on and off """
+    return {
+        'name': name,
+        'initial': 'NotInitialized',
+        'events': ('initialize', 'positive_edge', 'negative_edge', 'error', 'acknowledge', 'update'),
+        'states': {
+            'NotInitialized': {'enter': ('publish_not_initialized',),
+                               'transitions': {'initialize': 'Initialized',
+                                               'error': 'Error'}},
+            'Initialized': {'enter': ('publish_initialized', 'update_input'),
+                            'transitions': {'initialize': 'Initialized',
+                                            switch_on: ('SensorOn', 'publish_on'),
+                                            switch_off: ('SensorOff', 'publish_off'),
+                                            'error': 'Error'}},
+            'SensorOn': {'transitions': {'initialize': 'Initialized',
+                                         switch_off: ('SensorOff', 'publish_off'),
+                                         'error': 'Error',
+                                         'update': 'Update'}},
+            'SensorOff': {'transitions': {'initialize': 'Initialized',
+                                          switch_on: ('SensorOn', 'publish_on'),
+                                          'error': 'Error',
+                                          'update': 'Update'}},
+            'Error': {'enter': ('publish_error_state',),
+                      'transitions': {'initialize': 'Initialized',
+                                      'acknowledge': 'Initialized'}},
+            'Update': {'enter': ('update_input',),
+                       'transitions': {'initialize': 'Initialized',
+                                       switch_on: ('SensorOn', 'publish_on'),
+                                       switch_off: ('SensorOff', 'publish_off'),
+                                       'error': 'Error'}},
+        },
+    }
+
+
+class SimpleSensorSM(object):
+    """ Actions and dispatching of the compiled simple sensor state machines, mixed into NOSensorSM and
+        NCSensorSM """
+
+    def __init__(self, sensor):
+        self._sensor = sensor
+        super(SimpleSensorSM, self).__init__(logger=sensor.logger)
+        # the sensors of AZ8 have no auto_init
+        if getattr(sensor, 'auto_init', False):
+            self.fire('initialize')
+
+    def publish_not_initialized(self):
+        self._sensor.publisher.publish(topic="State", value="NotInitialized", sender=self._sensor.name)
+
+    def publish_initialized(self):
+        self._sensor.publisher.publish(topic="State", value="Initialized", sender=self._sensor.name)
+
+    def publish_error_state(self):
+        self._sensor.publisher.publish(topic="State", value="Error", sender=self._sensor.name)
+
+    def publish_on(self):
+        self._sensor.publisher.publish(topic="Value", value=True, sender=self._sensor.name)
+
+    def publish_off(self):
+        self._sensor.publisher.publish(topic="Value", value=False, sender=self._sensor.name)
+
+    def update_input(self):
+        self._sensor.update_input()
+
+    def dispatch(self, *args, **kwargs):
+        event = kwargs.get("event")
+        if event is None:  # topics coming from the publishers
+            if kwargs.get("sender") == "Station" and kwargs.get("topic") == "Ack" and kwargs.get("value"):
+                self.fire('acknowledge')
+            return
+
+        sensor_event = SENSOR_EVENTS.get(event.eventID)
+        if sensor_event is None:
+            self._sensor.logger.debug("Unknown event : %s", event)
+        else:
+            self.fire(sensor_event)
@@ -2,6 +2,7 @@ import abc
 from utils.monitoring_timer import MonitoringTimer
 from communication import events
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 
 class HomeServiceState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Homing Service SM """
@@ -74,8 +75,8 @@ class WaitForJob(HomeServiceState):
     def enter_action(self):
         self._home_service.logger.debug("Entering the %s state", self.name)
         self._home_service.serviceState = "Ready"
-        self._home_service.publisher.publish(topic="eventID", value="Ready", sender=self._home_service.name)
-        self._home_service.publisher.publish(topic="HomeServiceState", value="Ready", sender=self._home_service.name)
+        self._home_service.publisher.publish_many([("eventID", "Ready"),
+                                                   ("HomeServiceState", "Ready")], sender=self._home_service.name)
 
         if self._home_service_sm.service_timeout_timer is not None:
             self._home_service_sm.service_timeout_timer.cancel()
@@ -335,6 +336,8 @@ class HomeServiceStateMachine(object):
         self.update_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.Update,
                                                      sender=self._home_service.name)
 
+        self._dispatch_table = self._build_dispatch_table()
+
         # state objects
         self._waitforjob_state = WaitForJob(self, self._home_service)
         self._movingup_state = MovingUp(self, self._home_service)
@@ -412,72 +415,30 @@ class HomeServiceStateMachine(object):
     def timeout_handler(self):
         self._home_service.handle_event(event=self.timeout_event)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._home_service.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "Press":
-
-                if topic == "Value":
-                    pass
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._home_service.logger)
 
-                elif topic == "State":
+        table.message("Press", "Value", ANY, None)
+        table.message("Press", "State", "Error", "error")
+        table.message("Press", "State", "NotInitialized", "error")
+        table.message("Press", "State", "InUpperPosition", "press_uppperpos")
 
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "InUpperPosition":
-                        self._current_state.press_uppperpos()
+        table.flag("SensorDiceCarriageAtHome", "Value", "carriage_in_frontpos", None)
+        table.message("SensorDiceCarriageAtHome", "State", "Error", "error")
+        table.message("SensorDiceCarriageAtHome", "State", "NotInitialized", "error")
 
-            elif sender == "SensorDiceCarriageAtHome":
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", "error")
 
-                if topic == "Value":
-                    if value:
-                        self._current_state.carriage_in_frontpos()
-                    else:
-                        pass
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
 
-                elif topic == "State":
+    def _execute(self, event):
+        self._current_state.start_service()
+        self._current_service_user = event.service_index
 
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState" and value == "Error":
-                    self._current_state.error()
-
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.start_service()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
-            else:
-                self._home_service.logger.debug("Unknown event : %s", event)
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -1,6 +1,7 @@
 import abc
 from communication import events
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 from utils.monitoring_timer import MonitoringTimer
 
 
@@ -284,6 +285,8 @@ class InitServiceStateMachine(object):
         self.devices_list_length = len(self.devices_list)
         self.current_dev_index = 0
 
+        self._dispatch_table = self._build_dispatch_table()
+
         self._notinitialized_state = NotInitialized(self, self._initservice)  # rack's states instances
         self._initialization_state = Initialization(self, self._initservice)
         self._initdone_state = InitializationDone(self, self._initservice)
@@ -359,50 +362,28 @@ class InitServiceStateMachine(object):
         self.init_required = True
         self.dispatch(event=self.timeout_event)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._initservice.logger.debug("%s has received a message: %s", self.name, kwargs)
-
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if topic == "Value":
-                pass
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._initservice.logger)
 
-            elif topic == "State":
+        # the init service doesn't care about the sender
+        table.message(ANY, "Value", ANY, None)
+        table.message(ANY, "State", "Error", "error")
+        table.message(ANY, "State", "Initialized", "device_is_initialized")
+        table.flag(ANY, "Ack", "acknowledge", None)
+        table.message(ANY, "StationState", "Error", "error")
 
-                if value == "Error":
-                    self._current_state.error()
-                elif value == "Initialized":
-                    self._current_state.device_is_initialized()
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, self._cancel)
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
 
-            elif topic == "Ack":
+    def _execute(self, event):
+        self._current_state.initialize()
+        self._current_service_user = event.service_index
 
-                if value:
-                    self._current_state.acknowledge()
-                else:
-                    pass
-            elif topic == "StationState" and value == "Error":
-                self._current_state.error()
-
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.initialize()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._initservice.logger.debug("Cancel service was not implemented for the %s service", self._initservice.name)
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+    def _cancel(self, event):
+        self._initservice.logger.debug("Cancel service was not implemented for the %s service", self._initservice.name)
 
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
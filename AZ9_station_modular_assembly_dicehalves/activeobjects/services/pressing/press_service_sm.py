@@ -3,6 +3,7 @@ from threading import Timer
 from communication import events
 from utils.monitoring_timer import MonitoringTimer
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 import config
 
 class PressServiceState(metaclass=abc.ABCMeta):
@@ -100,8 +101,8 @@ class NotReady(PressServiceState):
     def enter_action(self):
         self._press_service.logger.debug("Entering the %s state", self.name)
         self._press_service.serviceState = "NotInFrontPos"
-        self._press_service.publisher.publish(topic="eventID", value="NotReady", sender=self._press_service.name)
-        self._press_service.publisher.publish(topic="PressServiceState", value="NotReady", sender=self._press_service.name)
+        self._press_service.publisher.publish_many([("eventID", "NotReady"),
+                                                    ("PressServiceState", "NotReady")], sender=self._press_service.name)
 
         # blinking
         self._press_service.blinker.handle_event(event=self._press_service_sm.blinking_start_event)
@@ -779,6 +780,8 @@ class PressServiceStateMachine(object):
         self.sensors_update = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.Update,
                                                             sender=self._press_service.name)
 
+        self._dispatch_table = self._build_dispatch_table()
+
         # state objects
         self._waitforjob_state = WaitForJob(self, self._press_service)
         self._not_ready_state = NotReady(self, self._press_service)
@@ -885,97 +888,46 @@ class PressServiceStateMachine(object):
     def timeout_pressing(self):
         self.set_state(self.movingup_state)
 
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._press_service.logger)
 
-        self._press_service.logger.debug("%s has received a message: %s", self.name, kwargs)
+        table.message("Press", "Value", ANY, None)
+        table.message("Press", "State", "Error", "error")
+        table.message("Press", "State", "NotInitialized", "error")
+        table.message("Press", "State", "InUpperPosition", "in_uppper_pos")
+        table.message("Press", "State", "InPressingPosition", "in_pressing_pos")
 
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "Press":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "InUpperPosition":
-                        self._current_state.in_uppper_pos()
-                    elif value == "InPressingPosition":
-                        self._current_state.in_pressing_pos()
-
-            elif sender == "SensorDiceAtPressPos":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.carriage_in_clamppos()
-                    else:
-                        self._current_state.carriage_outof_clamppos()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "SensorDiceCarriageAtHome":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.carriage_in_frontpos()
-                    else:
-                        self._current_state.carriage_outof_frontpos()
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "Initialized":
-                        pass
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState":
-                    if value == "Error":
-                        self.station_ready = False
-                        self._current_state.error()
-                    elif value == "Ready":
-                        self.station_ready = True
-                    else:
-                        self.station_ready = False
+        for sensor, on_posedge, on_negedge in (("SensorDiceAtPressPos", "carriage_in_clamppos", "carriage_outof_clamppos"),
+                                               ("SensorDiceCarriageAtHome", "carriage_in_frontpos", "carriage_outof_frontpos")):
+            table.flag(sensor, "Value", on_posedge, on_negedge)
+            table.message(sensor, "State", "Error", "error")
+            table.message(sensor, "State", "NotInitialized", "error")
+            table.message(sensor, "State", "Initialized", None)
 
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.start_service()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", self._station_error)
+        table.message("Station", "StationState", "Ready", self._station_ready)
+        table.message("Station", "StationState", ANY, self._station_not_ready)
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _execute(self, event):
+        self._current_state.start_service()
+        self._current_service_user = event.service_index
+
+    def _station_error(self, value):
+        self.station_ready = False
+        self._current_state.error()
+
+    def _station_ready(self, value):
+        self.station_ready = True
+
+    def _station_not_ready(self, value):
+        self.station_ready = False
+
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
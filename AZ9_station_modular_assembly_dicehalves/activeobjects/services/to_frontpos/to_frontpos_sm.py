@@ -1,6 +1,7 @@
 import abc
 from utils.monitoring_timer import MonitoringTimer
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 from communication import events
 
 class ToFrontPosServiceState(metaclass=abc.ABCMeta):
@@ -78,8 +79,8 @@ class NotReady(ToFrontPosServiceState):
     def enter_action(self):
         self._tofront_service.logger.debug("Entering the %s state", self.name)
         self._tofront_service.serviceState = "PressNotUp"
-        self._tofront_service.publisher.publish(topic="eventID", value="NotReady", sender=self._tofront_service.name)
-        self._tofront_service.publisher.publish(topic="ToFrontPosServiceState", value="NotReady", sender=self._tofront_service.name)
+        self._tofront_service.publisher.publish_many([("eventID", "NotReady"),
+                                                      ("ToFrontPosServiceState", "NotReady")], sender=self._tofront_service.name)
 
         # blinking
         self._tofront_service.blinker.handle_event(event=self._tofront_service_sm.blinking_start_event)
@@ -352,6 +353,8 @@ class ToFrontPosServiceStateMachine(object):
         self.blinking_stop_event = events.BlinkerEvent(eventID=events.BlinkerEvents.Stop,
                                                        sender=self._tofrontpos_service.name)
 
+        self._dispatch_table = self._build_dispatch_table()
+
         # state objects
         self._waitforjob_state = WaitForJob(self, self._tofrontpos_service)
         self._not_ready_state = NotReady(self, self._tofrontpos_service)
@@ -431,75 +434,44 @@ class ToFrontPosServiceStateMachine(object):
                                              value=message_codes.code_to_text[message_code],
                                              sender=self._tofrontpos_service.name)
 
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._tofrontpos_service.logger)
 
-        self._tofrontpos_service.logger.debug("%s has received a message: %s", self.name, kwargs)
+        table.message("Press", "Value", ANY, None)
+        table.message("Press", "State", "NotInitialized", "error")
+        table.message("Press", "State", "InUpperPosition", "press_uppperpos")
+        table.message("Press", "State", "OutOfPosition", "press_not_upperpos")
+        table.message("Press", "State", "OnEndSwitch", "press_not_upperpos")
+        table.message("Press", "State", "InPressingPosition", "press_not_upperpos")
 
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "Press":
-
-                if topic == "Value":
-                    pass
-
-                elif topic == "State":
-
-                    if value == "NotInitialized":
-                        self._current_state.error()
-                    elif value == "InUpperPosition":
-                        self._current_state.press_uppperpos()
-                    elif (value == "OutOfPosition") or (value == "OnEndSwitch") or (value == "InPressingPosition"):
-                        self._current_state.press_not_upperpos()
-
-            elif sender == "SensorDiceCarriageAtHome":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.carriage_in_frontpos()
-                    else:
-                        pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-
-            elif sender == "Station":
-
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState":
-                    if value == "Error":
-                        self.station_ready = False
-                        self._current_state.error()
-                    elif value == "Ready":
-                        self.station_ready = True
-                    else:
-                        self.station_ready = False
+        table.flag("SensorDiceCarriageAtHome", "Value", "carriage_in_frontpos", None)
+        table.message("SensorDiceCarriageAtHome", "State", "Error", "error")
+        table.message("SensorDiceCarriageAtHome", "State", "NotInitialized", "error")
 
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.start_service()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", self._station_error)
+        table.message("Station", "StationState", "Ready", self._station_ready)
+        table.message("Station", "StationState", ANY, self._station_not_ready)
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _execute(self, event):
+        self._current_state.start_service()
+        self._current_service_user = event.service_index
+
+    def _station_error(self, value):
+        self.station_ready = False
+        self._current_state.error()
+
+    def _station_ready(self, value):
+        self.station_ready = True
+
+    def _station_not_ready(self, value):
+        self.station_ready = False
+
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
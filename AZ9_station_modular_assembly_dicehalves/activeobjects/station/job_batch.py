@@ -0,0 +1,212 @@
+import json
+import logging
+import threading
+from activeobjects.actor import Actor, event_decorator
+from communication.pubsub import Publisher
+from utils.monitoring_timer import MonitoringTimer
+
+
+def parse_jobs(text):
+    """ The jobs of a batch from its JSON text: [[service, argument, ...], ...], a job without arguments can also
+        be given as "service". Returns a list of (service, arguments), raises ValueError. """
+    try:
+        jobs = json.loads(text)
+    except (TypeError, ValueError):
+        raise ValueError("The job batch is not valid JSON")
+    if not isinstance(jobs, list) or not jobs:
+        raise ValueError("The job batch is not a list of jobs")
+    parsed_jobs = []
+    for job in jobs:
+        if isinstance(job, str):
+            job = [job]
+        if not isinstance(job, list) or not job or not isinstance(job[0], str):
+            raise ValueError("Invalid job: {0}".format(job))
+        parsed_jobs.append((job[0], tuple(job[1:])))
+    return parsed_jobs
+
+
+# station states besides Ready in which a batch can start with the service
+START_STATES = {'ServiceAutoInitializeStation': ('Standby', 'NotInitialized')}
+
+
+class JobBatch(Actor):
+    """ Runs a batch of station services one after the other as an active object
+
+    A job is started by call_service(service, arguments), i.e. the OPC UA method of the service, which checks the
+    service state and hands the job to the station. The services in station_jobs run the station: their job is done
+    when the station has left Ready and is Ready again, it fails if the station hasn't left Ready start_timeout
+    seconds after the call. The jobs of the other services (e.g. ServiceAckAllErrors) are done when their method
+    returns Good. Only the first job is checked against the station state: a batch can start with
+    ServiceAutoInitializeStation while the station is not initialized, with any service that doesn't run the station
+    (e.g. ServiceAckAllErrors in Error) and with the other services in station_jobs while the station is Ready. The
+    later jobs are checked by their methods when they are started. The progress is published as JobBatchResult:
+    'Idle', 'Running 2/3 <service>', 'Done 3/3', 'Failed 2/3 <service>: <reason>' or 'Refused: <reason>'.
+    """
+
+    def __init__(self, name, station, services, call_service, station_jobs, start_timeout=5.0, job_timeout=900.0,
+                 topics=None):
+        super(JobBatch, self).__init__(name=name)
+        self._name = name
+        self._station = station
+        self._services = services               # service -> number of arguments
+        self._call_service = call_service       # call_service(service, arguments) -> True if the service accepted
+        # service which runs the station -> its service active object, which has to be Ready when a batch is
+        # submitted, or None if the service has no state
+        self._station_jobs = station_jobs
+
+        self.allowed_topics = ('JobBatchResult',)
+        if topics is None:
+            self.topics = self.allowed_topics
+        else:
+            self.topics = topics
+
+        self.logger = logging.getLogger(self._name)
+        self.publisher = Publisher(self.topics, logger=self.logger, name=self._name)          # publisher instance
+
+        self._lock = threading.Lock()
+        self._active = False            # set from the submission of a batch until it is done or has failed
+        self._jobs = ()
+        self._job_index = 0
+        self._job_number = 0            # counts all started jobs, identifies the job of a timeout
+        self._job_running = False       # the station has left Ready since the current job was started
+
+        self.start_timer = MonitoringTimer(name="JobStartTimer", interval=start_timeout,
+                                           callback_fnc=self.start_timeout, logger=self.logger)
+        self.job_timer = MonitoringTimer(name="JobTimeoutTimer", interval=job_timeout,
+                                         callback_fnc=self.job_timeout, logger=self.logger)
+
+        self._station.register_subscribers(topic="StationState", who=self, callback=self.station_state_changed)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def active(self):
+        return self._active
+
+    def register_subscribers(self, topic, who, callback=None):
+        if topic not in self.allowed_topics:
+            raise ValueError("Unknown topic")
+        self.publisher.register(topic, who, callback)
+
+    def submit(self, jobs):
+        """ Checks the jobs and the station once and queues the batch. Returns None or the reason why the batch
+            was refused. Can be called from any thread. """
+        reason = None
+        station_ready = self._station.stationState == 'Ready'
+        for service, arguments in jobs:
+            if service not in self._services:
+                reason = "unknown service {0}".format(service)
+            elif len(arguments) != self._services[service]:
+                reason = "{0} takes {1} arguments".format(service, self._services[service])
+            elif station_ready and self._station_jobs.get(service) is not None and \
+                    self._station_jobs[service].serviceState != 'Ready':
+                reason = "{0} is {1}".format(service, self._station_jobs[service].serviceState)
+            if reason is not None:
+                break
+
+        with self._lock:
+            if self._active:
+                return "a job batch is running"
+            if reason is None:
+                reason = self._check_station(jobs[0][0])
+            if reason is None:
+                self._active = True
+
+        if reason is not None:
+            self.publisher.publish(topic="JobBatchResult", value="Refused: " + reason, sender=self._name)
+            return reason
+        self.run_batch(jobs)
+        return None
+
+    def _check_station(self, service):
+        """ Returns None if a batch can start with the service in the current station state, else the reason. """
+        state = self._station.stationState
+        if service not in self._station_jobs or state == 'Ready' or state in START_STATES.get(service, ()):
+            return None
+        return "the station is {0}".format(state)
+
+    @event_decorator
+    def run_batch(self, jobs):
+        self._jobs = tuple(jobs)
+        self._job_index = 0
+        self.logger.info("%s : Job batch of %s jobs has been started.", self._name, len(self._jobs))
+        self._start_job()
+
+    @event_decorator
+    def station_state_changed(self, topic, value, sender=None):
+        if not self._active:
+            return
+        if value in ('Error', 'NoConnection'):
+            self._fail("the station is {0}".format(value))
+        elif value == 'Ready':
+            if self._job_running:
+                self._job_done()
+        elif not self._job_running:
+            # Running, or Standby while the station is initialized
+            self._job_running = True
+            self.start_timer.cancel()
+            self.job_timer.set_callback(None, self._job_number)
+            self.job_timer.start()
+
+    @event_decorator
+    def start_timeout(self, job_number):
+        if not self._active or job_number != self._job_number or self._job_running:
+            return
+        self._fail("the station has not started the service")
+
+    @event_decorator
+    def job_timeout(self, job_number):
+        if not self._active or job_number != self._job_number:
+            return
+        self._fail("timeout")
+
+    def _start_job(self):
+        service, arguments = self._jobs[self._job_index]
+        self._job_number += 1
+        self._job_running = False
+        self.publisher.publish(topic="JobBatchResult",
+                               value="Running {0}/{1} {2}".format(self._job_index + 1, len(self._jobs), service),
+                               sender=self._name)
+        try:
+            accepted = self._call_service(service, arguments)
+        except Exception as error:
+            self.logger.exception("%s : Calling %s has failed.", self._name, service)
+            self._fail(str(error))
+            return
+        if not accepted:
+            self._fail("the service was refused")
+            return
+        if service not in self._station_jobs:
+            self._job_done()
+            return
+        if self._station.stationState != 'Ready':
+            # e.g. initializing from Standby, the station doesn't have to leave Ready
+            self._job_running = True
+            self.job_timer.set_callback(None, self._job_number)
+            self.job_timer.start()
+            return
+        self.start_timer.set_callback(None, self._job_number)
+        self.start_timer.start()
+
+    def _job_done(self):
+        self.start_timer.cancel()
+        self.job_timer.cancel()
+        self._job_index += 1
+        if self._job_index < len(self._jobs):
+            self._start_job()
+        else:
+            self._finish("Done {0}/{0}".format(len(self._jobs)))
+
+    def _fail(self, reason):
+        service = self._jobs[self._job_index][0]
+        self._finish("Failed {0}/{1} {2}: {3}".format(self._job_index + 1, len(self._jobs), service, reason))
+
+    def _finish(self, result):
+        self.start_timer.cancel()
+        self.job_timer.cancel()
+        self.logger.info("%s : Job batch : %s", self._name, result)
+        with self._lock:
+            self._active = False
+        self.publisher.publish(topic="JobBatchResult", value=result, sender=self._name)
@@ -1,5 +1,33 @@
-import subprocess
+""" IPv4 address of the device
+
+The addresses are queried in the process: an RTM_GETADDR dump of an rtnetlink socket on Linux, a connected UDP
+socket elsewhere (no packet is sent). If the device has no address yet, get_ipv4() waits for the address
+notifications of the kernel (RTMGRP_IPV4_IFADDR) instead of polling.
+"""
+
 import time
+import select
+import socket
+import struct
+import subprocess
+
+# rtnetlink, see linux/rtnetlink.h and linux/if_addr.h
+RTMGRP_IPV4_IFADDR = 0x10
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_HEADER = struct.Struct('=IHHII')      # length, type, flags, sequence, port id
+IFADDR = struct.Struct('=BBBBI')            # family, prefix length, flags, scope, interface index
+RTATTR = struct.Struct('=HH')               # length, type
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+RT_SCOPE_HOST = 254
+
+# polling interval without address notifications
+POLL_INTERVAL = 0.1
 
 
 class ShellCommand:
@@ -11,43 +39,143 @@ class ShellCommand:
         return subprocess.check_output(cmd, shell=True).decode('utf-8')
 
 
-class NetworkUtil:
-    """ NetworkUtil includes util methods to interact with the OS Network """
+def _align(length):
+    return (length + 3) & ~3
 
-    @staticmethod
-    def get_ipv4():
-        """ Return the IPv4 from the Network configuration via the `hostname -I` command """
-        GET_IPV4_CMD = 'hostname -I'
 
-        retry_limit = 60
-        ips_list = []
-        while not ips_list and retry_limit > 0:
+def parse_addresses(data):
+    """ (interface index, IPv4) of the RTM_NEWADDR messages in a datagram of a rtnetlink socket, without the
+        host scope (loopback) addresses. The second value is True if the data contains NLMSG_DONE. """
+    addresses = []
+    done = False
+    offset = 0
+    while offset + NLMSG_HEADER.size <= len(data):
+        length, message_type, flags, sequence, port_id = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size or offset + length > len(data):
+            break
+        if message_type in (NLMSG_DONE, NLMSG_ERROR):
+            done = True
+        elif message_type == RTM_NEWADDR:
+            position = offset + NLMSG_HEADER.size
+            family, prefix_length, if_flags, scope, index = IFADDR.unpack_from(data, position)
+            position += IFADDR.size
+            local, address = None, None
+            while position + RTATTR.size <= offset + length:
+                attr_length, attr_type = RTATTR.unpack_from(data, position)
+                if attr_length < RTATTR.size:
+                    break
+                value = data[position + RTATTR.size:position + attr_length]
+                if attr_type == IFA_LOCAL and len(value) == 4:
+                    local = socket.inet_ntoa(value)
+                elif attr_type == IFA_ADDRESS and len(value) == 4:
+                    address = socket.inet_ntoa(value)
+                position += _align(attr_length)
+            # IFA_LOCAL is the own address of a point-to-point link, IFA_ADDRESS is the peer's
+            ip = local if local is not None else address
+            if family == socket.AF_INET and scope != RT_SCOPE_HOST and ip is not None:
+                addresses.append((index, ip))
+        offset += _align(length)
+    return addresses, done
+
 
-            output = ShellCommand.run(GET_IPV4_CMD)
-            ips_list = output.split()
+def _netlink_socket(groups=0):
+    netlink = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    try:
+        netlink.bind((0, groups))
+    except OSError:
+        netlink.close()
+        raise
+    return netlink
 
-            time.sleep(1)
-            retry_limit -= 1
 
-        if retry_limit == 0:
-            raise ValueError("Number of retries exceeded, check the device's network configuration")
+def netlink_addresses(timeout=1.0):
+    """ The IPv4 addresses of the interfaces in the order of the interface indexes, like `hostname -I`.
+        Raises OSError without rtnetlink. """
+    netlink = _netlink_socket()
+    try:
+        netlink.settimeout(timeout)
+        request = NLMSG_HEADER.pack(NLMSG_HEADER.size + IFADDR.size, RTM_GETADDR, NLM_F_REQUEST | NLM_F_DUMP, 1, 0) \
+            + IFADDR.pack(socket.AF_INET, 0, 0, 0, 0)
+        netlink.send(request)
+        addresses = []
+        done = False
+        while not done:
+            found, done = parse_addresses(netlink.recv(65536))
+            addresses.extend(found)
+    finally:
+        netlink.close()
+    return [ip for index, ip in sorted(addresses, key=lambda address: address[0])]
+
+
+def route_address():
+    """ The source address of the default route, None if there is no route. No packet is sent. """
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        udp.connect(('10.255.255.255', 1))
+        ip = udp.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        udp.close()
+    return ip if ip != '0.0.0.0' and not ip.startswith('127.') else None
+
+
+def ipv4_addresses():
+    """ The IPv4 addresses of the device without the loopback addresses """
+    try:
+        return netlink_addresses()
+    except (AttributeError, OSError):
+        ip = route_address()
+        return [ip] if ip is not None else []
+
+
+class NetworkUtil:
+    """ NetworkUtil includes util methods to interact with the OS Network """
+
+    @staticmethod
+    def get_ipv4(timeout=60.0):
+        """ Return the first IPv4 of the device. Without an address it waits up to timeout seconds for one,
+            raises ValueError afterwards. """
+        deadline = time.monotonic() + timeout
+        try:
+            # subscribed before the query, an address which comes up in between isn't missed
+            notifications = _netlink_socket(RTMGRP_IPV4_IFADDR)
+        except (AttributeError, OSError):
+            notifications = None
 
-        return ips_list[0]
+        try:
+            while True:
+                ips_list = ipv4_addresses()
+                if ips_list:
+                    return ips_list[0]
 
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ValueError("No IPv4 address within {0} s, check the device's network "
+                                     "configuration".format(timeout))
+                if notifications is None:
+                    time.sleep(min(POLL_INTERVAL, remaining))
+                    continue
+                readable, _, _ = select.select([notifications], [], [], remaining)
+                if readable:
+                    # the notifications only wake up the query
+                    try:
+                        notifications.recv(65536)
+                    except OSError:
+                        pass
+        finally:
+            if notifications is not None:
+                notifications.close()
 
-##############################
-#                            #
-#      Example of usage      #
-#                            #
-##############################
 
-# In order to get the connected IPv4
-try:
-    ipv4 = NetworkUtil.get_ipv4()
-except ValueError as e:
-    # In case the method is not able to recognize the IPv4, or the device is not connected to any
-    # network it is possible to make a fallback solution or reboot the device
-    print(e)
-    ipv4 = 'error'
+if __name__ == '__main__':
+    # In order to get the connected IPv4
+    try:
+        ipv4 = NetworkUtil.get_ipv4()
+    except ValueError as e:
+        # In case the method is not able to recognize the IPv4, or the device is not connected to any
+        # network it is possible to make a fallback solution or reboot the device
+        print(e)
+        ipv4 = 'error'
 
-print(ipv4)
+    print(ipv4)
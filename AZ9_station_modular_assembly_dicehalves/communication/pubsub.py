@@ -1,28 +1,69 @@
 from utils.logger import Logger
+from utils import event_trace
+
+
+def positional(callback):
+    """ Marks a subscriber method which is called as callback(topic, value, sender) instead of
+        callback(topic=..., value=..., sender=...) """
+    callback.positional = True
+    return callback
+
 
 class Publisher(object,):
-    """ Simple publisher class for the observer pattern"""
+    """ Simple publisher class for the observer pattern
+
+    The subscribers are collected per topic while the station is wired. With the first publish (or freeze())
+    they are frozen into a tuple of (callback, positional) per topic, a later register() drops the frozen
+    tuples and they are built again.
+    """
     def __init__(self, topics, logger, name=None):
         # creating an empty subscribers dict for every topic
         self.topics = {topic: dict() for topic in topics}
         self._name = name
         self._logger = logger
+        self._frozen = None         # topic -> tuple of (callback, positional), None: not frozen yet
 
-    def register(self, topic, who, callback=None):
+    def register(self, topic, who, callback=None, positional=None):
+        """ positional : call the callback with (topic, value, sender), None: if the callback is marked with
+            the positional decorator """
         if callback is None:
             callback = who.update
+        if positional is None:
+            positional = getattr(callback, "positional", False)
         self._logger.debug("%s is subscribed on topic: %s, from %s", who.name, topic, self._name)
         subscribers = self.topics[topic]
-        subscribers[who] = callback
-
-    def publish(self, *args, **kwargs):
-        # ToDo error handling with try ?
-        # self._logger.debug("%s publishes %s", self._name,  kwargs)
-        topic = kwargs["topic"]
-        subscribers = self.topics[topic]
-        for subscriber, callback in subscribers.items():
-            callback(*args, **kwargs)
-
+        subscribers[who] = (callback, positional)
+        self._frozen = None
 
+    def freeze(self):
+        frozen = {topic: tuple(subscribers.values()) for topic, subscribers in self.topics.items()}
+        self._frozen = frozen
+        return frozen
 
+    def publish(self, *args, **kwargs):
+        if event_trace.recorder is not None:
+            event_trace.recorder.record_publish(self._name, kwargs)
+        frozen = self._frozen
+        if frozen is None:
+            frozen = self.freeze()
+        for callback, positional in frozen[kwargs["topic"]]:
+            if positional:
+                callback(kwargs["topic"], kwargs.get("value"), kwargs.get("sender"))
+            else:
+                callback(*args, **kwargs)
 
+    def publish_many(self, messages, sender=None):
+        """ Publishes the (topic, value) pairs in their order, e.g. the messages of an enter action """
+        frozen = self._frozen
+        if frozen is None:
+            frozen = self.freeze()
+        recorder = event_trace.recorder
+        for topic, value in messages:
+            subscribers = frozen[topic]
+            if recorder is not None:
+                recorder.record_publish(self._name, {"topic": topic, "value": value, "sender": sender})
+            for callback, positional in subscribers:
+                if positional:
+                    callback(topic, value, sender)
+                else:
+                    callback(topic=topic, value=value, sender=sender)
@@ -1,6 +1,6 @@
 SERVER_CONFIG = {
     'uri': 'http://basicstation.edukitv2.smartfactorykl.de',
-    'servername': 'AZ9_OPCUA_Server'
+    'servername': 'AZ9_OPCUA_Server',
 }
 
 STATION_CONFIG = {
@@ -13,14 +13,80 @@ STATION_CONFIG = {
     'pressMoveTimeout': 9.0,               # press movement to the front/rack monitoring time
     'waitForClampDelay': 1.0,               # clamping waiting time when pressing
     'pressingTime': 0.5,                    # pressing time
-    'pressingSetpoint': 200                 # pressing setpoint presumably in gramms
+    'pressingSetpoint': 200,                # pressing setpoint presumably in gramms
+    'forceRange': 400,                      # range of the force sensor value
+    'forceDeadband': 2,                     # published force value: absolute deadband
+    'forceDeadbandPercent': 0.0,            # published force value: deadband in percent of the force range
+    'forceMaxPublishRate': 5.0,             # published force value: max. updates per second, None: unlimited
+    'forceSampleRate': 100.0,               # samples per second of the force sampler
+    'procimgCycleTime': 10,                 # refresh cycle of the RevPi process image in milliseconds
+    'forceHistory': None,                   # seconds of force curve kept in the ring buffer, None: the longest
+                                            # pressing cycle, 2 x pressMoveTimeout + waitForClampDelay + pressingTime
+    'forceCycleThreshold': None,            # a pressing cycle lasts while the force is above this value,
+                                            # None: the press movements delimit the cycles
+    'forceArchiveDir': 'force_archive'      # directory of the force curve archive, relative to the station
 }
 
 DATABASE_CONFIG = {
+    'backend': 'mongodb',               # endpoint registry: 'mongodb' or 'sqlite' (a local stand-in without a database server)
     'database_url': 'mongodb://192.168.1.123:27017',
     'database_name': 'myapp',
     'database_collection': 'opcua_servers',
-    'check_connection_address': 'http://192.168.1.123:3000',
-    #''check_connection_address': 'http://216.58.192.142',  # a url to check the internet connection (is needed for mongodb)
-    'check_connection_timeout': 5
-}
\ No newline at end of file
+    'sqlite_path': 'endpoint_registry.sqlite',  # database file of the sqlite backend, relative to the station
+    'connect_timeout': 5,               # seconds until a registration attempt fails
+    'retry_delay': 1.0,                 # seconds until a failed registration is retried, doubles with every retry
+    'max_retry_delay': 60.0,            # maximum delay between the retries in seconds
+}
+
+NETWORK_CONFIG = {
+    'interfaces': ('eth0',),        # monitored network interfaces, the connection is alive while one of them is up
+    'linkEvents': True,             # True: link notifications of the kernel (rtnetlink), False: the links are polled
+    'linkPollInterval': 1.0,        # poll interval of the links in seconds, without link notifications
+    'linkDebounce': 0.05,           # seconds a changed link has to be stable until the station is notified
+}
+
+RUNTIME_CONFIG = {
+    'actorRuntime': 'thread',       # 'thread': one thread per active object, 'pool': a shared pool of worker threads,
+                                    # 'asyncio': one event loop for active objects and connection monitor
+    'actorWorkerThreads': 2,        # number of worker threads of the 'pool' runtime
+    'uaWriteWindow': 0.05,          # coalescing window of the OPC UA node writes in seconds, None: synchronous writes
+    'uaWriteMaxPending': 1000,      # nodes waiting for the OPC UA writer, updates of further nodes are dropped
+    'eventTrace': None,             # file of the event trace recording, None: no recording, replay without
+                                    # hardware: python3 -m utils.event_trace replay <file>
+    'actorStats': False,            # mailbox statistics of the active objects in the OPC UA Monitoring folder
+    'actorStatsInterval': 1.0,      # update interval of the published mailbox statistics in seconds
+}
+
+LOGGING_CONFIG = {
+    'asyncLogging': True,           # the handlers of logging.json run in a listener thread, logging never blocks
+    'logQueueSize': 10000,          # queued log records, further records are dropped and counted
+    'logSampling': {},              # logger name -> n: only every n-th DEBUG record is logged, e.g. {'Press': 10}
+    'binaryLog': None,              # file of the compact binary log (python3 -m utils.binary_log), None: no binary log
+}
+
+SIMULATION_CONFIG = {
+    'enabled': False,               # True: the station runs on a simulated RevPi process image instead of the hardware
+    'speed': 10.0,                  # simulated seconds per second of the sensor physics, None: as fast as possible
+    'inputs': {'input13': True},    # initial values of the inputs: the dice carriage is at home
+    'axes': [                       # motor driven axes, position 0.0: upper position, 1.0: max. length
+        {'name': 'Press', 'forward': 'output5', 'backward': 'output4', 'travelTime': 3.0, 'position': 0.0,
+         'sensors': {'input12': (0.0, 0.02, False),     # SensorLinearPosOfPress, normally closed
+                     'input14': (0.98, 1.0, False)}},   # SensorSafetyPressAtMaxLength, normally closed
+    ],
+    'forceRamps': [                 # force on InputValue_1 after the press has reached the dicehalves
+        {'axis': 'Press', 'input': 'InputValue_1', 'contact': 0.6, 'stiffness': 1000.0, 'maximum': 400},
+    ],
+    'script': [],                   # (simulated time in s, io name, value), e.g. (5.0, 'input11', True), (5.5,
+                                    # 'input13', False): the dice carriage is moved to the press position
+}
+
+BENCHMARK_CONFIG = {                # python3 -m utils.latency_bench, see there
+    'rates': [10.0, 50.0, 200.0, 1000.0],   # injected input edges per second
+    'edges': 500,                   # input edges per rate
+    'settle': 1.0,                  # seconds for the station to settle after a probe's edge and after a run
+    'initTimeout': 60.0,            # seconds for the station to become Ready after ServiceAutoInitializeStation
+    'probes': [                     # (input, path of the OPC UA variable below Objects) which follows the input
+        ('input11', ['Sensor', 'PresenceSensor3', 'Value']),    # dice carriage at home
+        ('input13', ['Sensor', 'PresenceSensor1', 'Value']),    # dice at press position
+    ],
+}
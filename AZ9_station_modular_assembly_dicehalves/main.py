@@ -1,5 +1,11 @@
 import definitions
 from communication.server import UAServer, UaObjectSubscriber
+from activeobjects.actor import ActorScheduler, AsyncioScheduler, set_default_scheduler
+from communication.ua_writer import UaWriteBehind, set_default_writer
+from utils import event_trace
+from utils import actor_stats
+from utils import log_pipeline
+from communication.ua_monitoring import UaActorMonitor
 from activeobjects.sensors.presencesensor import PresenceSensor
 from activeobjects.sensors.safetyswitch import SafetySwitch
 from activeobjects.actuators.rgb_led import RGB_LED
@@ -8,6 +14,9 @@ from activeobjects.actuators.motor import Motor
 from activeobjects.actuators.blinker import Blinker
 from activeobjects.actuators.blinker_led_adapter import BlinkerLedAdapter
 from activeobjects.sensors.forceswitch import ForceSwitch
+from activeobjects.sensors.force_sampler import ForceSampler, ForceCycleRecorder
+from utils.force_archive import ForceCurveArchive
+from utils.analog_filter import DeadbandFilter
 from activeobjects.press.press import Press
 from activeobjects.station.station import Station
 from activeobjects.services.initialization.init_service import InitService
@@ -17,18 +26,35 @@ from activeobjects.services.to_frontpos.to_frontpos import ToFrontPosService
 from activeobjects.services.interface import ServiceInterface
 from communication import events, conn_monitor, network_util
 
-import revpimodio2
 import config
+
+# on a workstation the station runs on a simulated process image, see SIMULATION_CONFIG
+if config.SIMULATION_CONFIG['enabled']:
+    from utils import revpi_sim as revpimodio2
+    revpimodio2.set_default_simulation(config.SIMULATION_CONFIG)
+else:
+    import revpimodio2
+
 import logging.config
 import json
+import os
 import socket
-from communication.server_publisher import ServerPublisher
+from communication.server_publisher import ServerPublisher, create_backend
+import time
 
 
 with open(definitions.LOGCONFIG_PATH, 'r') as logging_config_file:
     config_dict = json.load(logging_config_file)
 logging.config.dictConfig(config_dict)
 
+# the log handlers run in a listener thread, logging never blocks an active object
+if config.LOGGING_CONFIG['asyncLogging']:
+    log_listener = log_pipeline.install(queue_size=config.LOGGING_CONFIG['logQueueSize'],
+                                        sampling=config.LOGGING_CONFIG['logSampling'],
+                                        binary_log=config.LOGGING_CONFIG['binaryLog'])
+else:
+    log_listener = None
+
 
 class StationApp(object):
     """ Main application for the station """
@@ -37,14 +63,57 @@ class StationApp(object):
         self._name = name
         self.logger = logging.getLogger(self._name)
 
+        # active objects runtime: one thread per active object, a shared pool of worker threads or one event loop
+        self.actorRuntime = config.RUNTIME_CONFIG['actorRuntime']
+        if self.actorRuntime == 'pool':
+            self.actorScheduler = ActorScheduler(name='ActorScheduler',
+                                                 workers=config.RUNTIME_CONFIG['actorWorkerThreads'])
+        elif self.actorRuntime == 'asyncio':
+            self.actorScheduler = AsyncioScheduler(name='ActorLoop')
+        else:
+            self.actorScheduler = None
+
+        if self.actorScheduler is not None:
+            self.actorScheduler.start()
+            set_default_scheduler(self.actorScheduler)
+
+        # OPC UA nodes are written behind the publishers: unchanged values are dropped, bursts are coalesced
+        if config.RUNTIME_CONFIG['uaWriteWindow'] is not None:
+            self.uaWriter = UaWriteBehind(name='UaWriter', window=config.RUNTIME_CONFIG['uaWriteWindow'],
+                                          max_pending=config.RUNTIME_CONFIG['uaWriteMaxPending'])
+            self.uaWriter.start()
+        else:
+            self.uaWriter = None
+        set_default_writer(self.uaWriter)
+
+        # optional recording of the events of all active objects, e.g. to replay an incident without hardware
+        if config.RUNTIME_CONFIG['eventTrace'] is not None:
+            event_trace.install(event_trace.TraceRecorder(config.RUNTIME_CONFIG['eventTrace']))
+
+        # optional mailbox statistics of all active objects, published in the Monitoring folder
+        if config.RUNTIME_CONFIG['actorStats']:
+            actor_stats.install(actor_stats.StatsCollector())
+
         self.pressing_setpoint = config.STATION_CONFIG['pressingSetpoint']
+        self.force_triggered = False    # the force limit was reached, the motor was stopped
 
         self.revpiioDriver = revpimodio2.RevPiModIO(autorefresh=True)
+        # the process image has to be refreshed at least as often as the force is sampled
+        self.revpiioDriver.cycletime = config.STATION_CONFIG['procimgCycleTime']
 
         self.connMonitor = conn_monitor.ConnMonitor(name='ConnMonitor',
                                                     logger=self.logger,
                                                     conn_alive_cb=self.conn_alive_event,
-                                                    conn_broken_cb=self.conn_broken_event)
+                                                    conn_broken_cb=self.conn_broken_event,
+                                                    loop=self.actorScheduler if self.actorRuntime == 'asyncio' else None,
+                                                    interval=config.NETWORK_CONFIG['linkPollInterval'],
+                                                    interfaces=config.NETWORK_CONFIG['interfaces'],
+                                                    debounce=config.NETWORK_CONFIG['linkDebounce'],
+                                                    link_events=config.NETWORK_CONFIG['linkEvents'],
+                                                    # simulated station: the links are up
+                                                    source=conn_monitor.FakeLinkSource(
+                                                        config.NETWORK_CONFIG['interfaces'])
+                                                    if config.SIMULATION_CONFIG['enabled'] else None)
 
         self.logger.debug("Buiding the station's active objects...")
 
@@ -81,9 +150,31 @@ class StationApp(object):
                                                 outputobj=self.revpiioDriver.io['OutputValue_1'],
                                                 force_limit=200.0,
                                                 monitor_interval=0.25,  # not used in this version
-                                                motor=self.pressMotor)
+                                                motor=self.pressMotor,
+                                                publish_filter=DeadbandFilter(
+                                                    deadband=config.STATION_CONFIG['forceDeadband'],
+                                                    deadband_percent=config.STATION_CONFIG['forceDeadbandPercent'],
+                                                    value_range=config.STATION_CONFIG['forceRange'],
+                                                    max_rate=config.STATION_CONFIG['forceMaxPublishRate']))
         # ToDo : set the real force limit
 
+        # the ring buffer holds a whole pressing cycle: the press moves down and up, each movement is monitored
+        # with pressMoveTimeout, shorter histories archive the cycles truncated
+        force_history = config.STATION_CONFIG['forceHistory']
+        if force_history is None:
+            force_history = (2 * config.STATION_CONFIG['pressMoveTimeout'] + config.STATION_CONFIG['waitForClampDelay']
+                             + config.STATION_CONFIG['pressingTime'])
+        self.forceSampler = ForceSampler("ForceSampler",
+                                         inputobj=self.revpiioDriver.io['InputValue_1'],
+                                         rate=config.STATION_CONFIG['forceSampleRate'],
+                                         history=force_history,
+                                         cycle_threshold=config.STATION_CONFIG['forceCycleThreshold'],
+                                         on_sample=self.force_sample)
+        self.forceArchive = ForceCurveArchive(os.path.join(definitions.ROOT_DIR,
+                                                           config.STATION_CONFIG['forceArchiveDir']),
+                                              logger=self.logger)
+        self.forceCycleRecorder = ForceCycleRecorder(self.forceSampler, self.forceArchive)
+
 
         self.atPressPosSensor = PresenceSensor("SensorDiceAtPressPos", "-BG2",
                                                 topics=["State", "Value", 'StationErrorCode', 'StationErrorDescription',
@@ -260,18 +351,17 @@ class StationApp(object):
 
 
         self.logger.debug("Building an OPCUA server: %s ", servername)
+        started = time.perf_counter()
         self.server = UAServer(endpoint=endpoint,
                                name=servername,
                                uri=uri,
                                station_app=self).server
+        self.logger.info("OPCUA server %s built in %.3f s", servername, time.perf_counter() - started)
 
-        # self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger)
-        # self.server_publisher.publish()
-        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger)
-        if self.server_publisher.check_connection():
-            self.server_publisher.publish()
-        else:
-            self.logger.info("No connection to the database. OPCUA server was not registered.")
+        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger,
+                                                backend=create_backend(config.DATABASE_CONFIG, definitions.ROOT_DIR))
+        # registers the server in the background, the station doesn't wait for the database
+        self.server_publisher.start()
 
         # setting pub-sub system ---------------------------------------------------------
         self.logger.info("Setting events pub-sub system...")
@@ -545,6 +635,11 @@ class StationApp(object):
                                         who=self.assemblyStation,
                                         callback=self.assemblyStation.handle_event)
 
+        # the press movements delimit the pressing cycles of the force curve archive
+        self.press.register_subscribers(topic="State",
+                                        who=self.forceCycleRecorder,
+                                        callback=self.forceCycleRecorder.update)
+
 
 
         # clamp subscribers :
@@ -773,6 +868,11 @@ class StationApp(object):
         self.logger.info("OutputVoltage: %sV", j/1000)
 
         self.logger.info("Registering handlers for inputs events...")
+        # the events of the input edges are sent again and again, they are allocated once and never changed
+        self.posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
+                                                           sender=self._name)
+        self.negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
+                                                           sender=self._name)
 
         self.revpiioDriver.io.input11.reg_event(self.input1_posedge_event, edge=revpimodio2.RISING)
         self.revpiioDriver.io.input11.reg_event(self.input1_negedge_event, edge=revpimodio2.FALLING)
@@ -790,6 +890,14 @@ class StationApp(object):
         # starting everything ------------------------------------------------------------
         self.server.start()
         self.logger.info("OPCUA server %s at %s has started", servername, endpoint)
+
+        if actor_stats.collector is not None:
+            self.actorMonitor = UaActorMonitor('ActorMonitor', self.server.nodes.objects.get_child(["2:Monitoring"]),
+                                               actor_stats.collector,
+                                               interval=config.RUNTIME_CONFIG['actorStatsInterval'])
+            self.actorMonitor.start()
+        else:
+            self.actorMonitor = None
         self.safetySwitch.start()
         self.forceSwitch.start()
         self.atPressPosSensor.start()
@@ -845,87 +953,80 @@ class StationApp(object):
         self.toFrontPosService.stop()
         self.assemblyStation.stop()
         self.connMonitor.stop()
+        self.server_publisher.stop()
         self.blinker.stop()
 
+        if self.actorMonitor is not None:
+            self.actorMonitor.stop()
+            for stats in actor_stats.collector.bottlenecks():
+                self.logger.info("Actor statistics: %s", stats)
+        if self.uaWriter is not None:
+            self.uaWriter.stop()
         self.server.stop()
 
         self.revpiioDriver.exit()
 
+        if self.actorScheduler is not None:
+            self.actorScheduler.stop()
+
+        if event_trace.recorder is not None:
+            event_trace.recorder.close()
+            event_trace.install(None)
+
+        if log_listener is not None:
+            log_listener.stop()
+
     def input1_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                         sender=self._name)
-        self.atFrontPosSensor.handle_event(event=posedge_event)
+        self.atFrontPosSensor.handle_event(event=self.posedge_event)
 
     def input1_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.atFrontPosSensor.handle_event(event=negedge_event)
+        self.atFrontPosSensor.handle_event(event=self.negedge_event)
 
     def input2_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.upPosPress.handle_event(event=posedge_event)
+        self.upPosPress.handle_event(event=self.posedge_event)
 
     def input2_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
 
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.upPosPress.handle_event(event=negedge_event)
+        self.upPosPress.handle_event(event=self.negedge_event)
 
     def input3_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.atPressPosSensor.handle_event(event=posedge_event)
+        self.atPressPosSensor.handle_event(event=self.posedge_event)
 
     def input3_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
 
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.atPressPosSensor.handle_event(event=negedge_event)
+        self.atPressPosSensor.handle_event(event=self.negedge_event)
 
     def input4_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.endSwitchPress.handle_event(event=posedge_event)
+        self.endSwitchPress.handle_event(event=self.posedge_event)
 
     def input4_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.endSwitchPress.handle_event(event=negedge_event)
+        self.endSwitchPress.handle_event(event=self.negedge_event)
 
     def input5_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.safetySwitch.handle_event(event=posedge_event)
+        self.safetySwitch.handle_event(event=self.posedge_event)
 
     def input5_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.safetySwitch.handle_event(event=negedge_event)
+        self.safetySwitch.handle_event(event=self.negedge_event)
 
     def input6_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.forceSwitch.handle_event(event=posedge_event)
+        self.forceSwitch.handle_event(event=self.posedge_event)
 
     def input6_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.forceSwitch.handle_event(event=negedge_event)
+        self.forceSwitch.handle_event(event=self.negedge_event)
 
     def conn_broken_event(self):
         self.assemblyStation.handle_event(event=self.noconn_event)
@@ -933,37 +1034,36 @@ class StationApp(object):
     def conn_alive_event(self):
         self.assemblyStation.handle_event(event=self.connok_event)
 
+    def force_sample(self, i):
+        """ Stop condition of the press, evaluated for every sample of the force sampler """
+        limit = self.pressing_setpoint
+
+        # the press control below works on the raw samples, only the published value is filtered
+        self.forceSwitch.publish_analog_value(i)
+        # force reached and stop triggered
+        if (i > limit and self.force_triggered == False):
+            self.force_triggered = True
+            # stop the motor
+            self.revpiioDriver.io['output4'].set_value(False)
+            self.revpiioDriver.io['output5'].set_value(False)
+            self.logger.info("-------------------- Force limit was reached: %s. The motor was stopped. ---------------- ", i)
+            self.input6_posedge_event('force_sensor', True)
+        # if stop already triggered and force under limit
+        # stop can get triggered again
+        elif (i < limit and self.force_triggered == True):
+            self.input6_negedge_event('force_sensor', False)
+            self.force_triggered = False
+
     def start(self):
         self.revpiioDriver.mainloop(blocking=False)
         self.logger.debug("RevPi driver has been started.")
 
-        # Loop to do some work next to the event system. E.g. Switch on / off green part of LED A1
-
-        triggered = False
-        # measured force limit
-
-        while not self.revpiioDriver.exitsignal.is_set():
-            # self.revpiioDriver.core.a1green.value = not self.revpiioDriver.core.a1green.value
-            limit = self.pressing_setpoint
-            # read sensor input (force)
-            i = self.revpiioDriver.io.InputValue_1.value
-
-            self.forceSwitch.publisher.publish(topic="AnalogValue", value=i, sender=self.forceSwitch.name)
-            # force reached and stop triggered
-            if (i > limit and triggered == False):
-                triggered = True
-                # stop the motor
-                self.revpiioDriver.io['output4'].set_value(False)
-                self.revpiioDriver.io['output5'].set_value(False)
-                self.logger.info("-------------------- Force limit was reached: %s. The motor was stopped. ---------------- ", i)
-                self.input6_posedge_event('force_sensor', True)
-            # if stop already triggered and force under limit
-            # stop can get triggered again
-            elif (i < limit and triggered == True):
-                self.input6_negedge_event('force_sensor', False)
-                triggered = False
-
-            self.revpiioDriver.exitsignal.wait(0.05)
+        # the force is sampled and checked against the limit in the force sampler's thread, also with the asyncio
+        # runtime: the sampler stops the press motor, it must not wait behind the actors' handlers on the loop
+        self.forceSampler.start()
+        self.revpiioDriver.exitsignal.wait()
+        self.forceSampler.stop()
+        self.forceArchive.close()
 
 
 def main():
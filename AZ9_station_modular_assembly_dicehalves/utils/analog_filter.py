@@ -0,0 +1,56 @@
+import time
+
+
+class DeadbandFilter(object):
+    """ Decides which samples of an analog value are worth publishing.
+
+    A sample is published if it differs from the last published value by more than the deadband and the
+    last publication is at least 1 / max_rate seconds ago. The deadband is the greater of the absolute
+    deadband and deadband_percent of the value range. A change which is held back by the rate limit is
+    published with the next sample after the interval, so the last published value never stays stale.
+    """
+
+    def __init__(self, deadband=0.0, deadband_percent=0.0, value_range=None, max_rate=None):
+        self._deadband = max(0.0, deadband)
+        if deadband_percent and value_range:
+            self._deadband = max(self._deadband, abs(value_range) * deadband_percent / 100.0)
+        self._min_interval = 1.0 / max_rate if max_rate else 0.0
+        self._last_value = None
+        self._last_time = None
+
+        self.samples = 0
+        self.published = 0
+
+    @property
+    def deadband(self):
+        return self._deadband
+
+    @property
+    def min_interval(self):
+        return self._min_interval
+
+    @property
+    def last_value(self):
+        """ The last published value """
+        return self._last_value
+
+    def reset(self):
+        """ The next sample is published regardless of the deadband, e.g. after a subscriber was added """
+        self._last_value = None
+
+    def accept(self, value, now=None):
+        """ Returns True if the sample should be published """
+        self.samples += 1
+        if now is None:
+            now = time.monotonic()
+
+        if self._last_value is not None:
+            if abs(value - self._last_value) <= self._deadband:
+                return False
+            if now - self._last_time < self._min_interval:
+                return False
+
+        self._last_value = value
+        self._last_time = now
+        self.published += 1
+        return True
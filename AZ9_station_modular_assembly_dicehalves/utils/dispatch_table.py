@@ -0,0 +1,89 @@
+import time
+
+ANY = object()      # matches any sender or any value
+
+
+class DispatchTable(object):
+    """ Precompiled dispatching of the messages and events of a state machine.
+
+    Messages published by other active objects are looked up by (sender, topic, value), input events by
+    their eventID. An entry is either the name of an event method of the current state, which is called
+    without arguments, a callable of the state machine, which gets the value or the event object, or None
+    to ignore the message on purpose. The table is built once in the constructor of the state machine,
+    the lookup of an entry is O(1).
+    """
+
+    def __init__(self, state_machine, logger, measure=False):
+        self._state_machine = state_machine
+        self._logger = logger
+        self._messages = dict()
+        self._flags = set()         # (sender, topic) of messages with boolean values
+        self._events = dict()
+        self.measure = measure      # collect the dispatch cost per entry
+        self.stats = dict()         # entry name -> [calls, total time in seconds]
+
+    def message(self, sender, topic, value, entry):
+        """ Register an entry for the message (sender, topic, value). sender or value can be ANY. """
+        self._messages[(sender, topic, value)] = entry
+
+    def flag(self, sender, topic, on_true, on_false=None):
+        """ Register the entries for a message with a boolean value, e.g. 'Value' of a sensor """
+        self._flags.add((sender, topic))
+        self._messages[(sender, topic, True)] = on_true
+        self._messages[(sender, topic, False)] = on_false
+
+    def event(self, eventID, entry):
+        self._events[eventID] = entry
+
+    def lookup_message(self, sender, topic, value):
+        """ Returns (found, entry) of a published message """
+        messages = self._messages
+        for key_sender in (sender, ANY):
+            if (key_sender, topic) in self._flags:
+                return True, messages[(key_sender, topic, bool(value))]
+            try:
+                key = (key_sender, topic, value)
+                if key in messages:
+                    return True, messages[key]
+            except TypeError:   # unhashable value
+                pass
+            key = (key_sender, topic, ANY)
+            if key in messages:
+                return True, messages[key]
+        return False, None
+
+    def dispatch(self, kwargs):
+        """ Dispatches the kwargs of a published message or an input event.
+            Returns False if there is no entry for them. """
+        if "topic" in kwargs:
+            payload = kwargs["value"]
+            found, entry = self.lookup_message(kwargs["sender"], kwargs["topic"], payload)
+        elif "event" in kwargs:
+            payload = kwargs["event"]
+            found = payload.eventID in self._events
+            entry = self._events.get(payload.eventID)
+            if not found:
+                self._logger.debug("Unknown event : %s", payload)
+        else:
+            self._logger.debug("Unknown event : %s", kwargs)
+            return False
+
+        if entry is None:
+            return found
+
+        if self.measure:
+            started = time.perf_counter()
+            self._call(entry, payload)
+            name = entry if isinstance(entry, str) else getattr(entry, "__name__", repr(entry))
+            stat = self.stats.setdefault(name, [0, 0.0])
+            stat[0] += 1
+            stat[1] += time.perf_counter() - started
+        else:
+            self._call(entry, payload)
+        return True
+
+    def _call(self, entry, payload):
+        if isinstance(entry, str):
+            getattr(self._state_machine.current_state, entry)()
+        else:
+            entry(payload)
@@ -0,0 +1,196 @@
+""" Compact on-disk archive of the force curves of the pressing cycles
+
+The archive is a directory with two append-only files:
+
+    force_curves.dat    curves, per cycle: time offsets in seconds since the start of the cycle (float32),
+                        followed by the force values (float32), little endian
+    force_curves.idx    one fixed-size record per cycle, see INDEX_RECORD
+
+Both files can be memory mapped. Queries on the cycles (peak forces, cycles in a time range) only read the
+index, a curve is decoded when it is requested.
+"""
+
+import os
+import sys
+import struct
+import threading
+import mmap
+import bisect
+import logging
+from array import array
+
+# cycle id, start time (epoch seconds), offset of the curve in the data file, number of samples,
+# peak force, time offset of the peak force, duration in seconds, flags
+INDEX_RECORD = struct.Struct('<IdQIfffI')
+
+DATA_FILE = 'force_curves.dat'
+INDEX_FILE = 'force_curves.idx'
+
+FLAG_ABORTED = 0x1      # the cycle ended with an error of the press
+FLAG_TRUNCATED = 0x2    # the cycle was longer than the force history of the sampler, its beginning is missing
+
+
+class CycleRecord(object):
+    """ Index entry of a pressing cycle """
+    __slots__ = ('cycle_id', 'timestamp', 'offset', 'samples', 'peak_force', 'peak_time', 'duration', 'flags')
+
+    def __init__(self, cycle_id, timestamp, offset, samples, peak_force, peak_time, duration, flags):
+        self.cycle_id = cycle_id
+        self.timestamp = timestamp
+        self.offset = offset
+        self.samples = samples
+        self.peak_force = peak_force
+        self.peak_time = peak_time
+        self.duration = duration
+        self.flags = flags
+
+    @property
+    def aborted(self):
+        return bool(self.flags & FLAG_ABORTED)
+
+    @property
+    def truncated(self):
+        return bool(self.flags & FLAG_TRUNCATED)
+
+    def __repr__(self):
+        return "CycleRecord(cycle_id=%s, timestamp=%s, samples=%s, peak_force=%s)" % (
+            self.cycle_id, self.timestamp, self.samples, self.peak_force)
+
+
+class ForceCurveArchive(object):
+    """ Append-only archive of force curves with an index by cycle id and timestamp """
+
+    def __init__(self, directory, logger=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self.logger = logger if logger is not None else logging.getLogger("ForceCurveArchive")
+
+        os.makedirs(directory, exist_ok=True)
+        self._data_path = os.path.join(directory, DATA_FILE)
+        self._index_path = os.path.join(directory, INDEX_FILE)
+
+        self._data_file = open(self._data_path, 'ab')
+        self._index_file = open(self._index_path, 'ab')
+        self._repair()
+
+        self._records = self._read_index()
+        self._timestamps = [record.timestamp for record in self._records]
+        self._positions = {record.cycle_id: position for position, record in enumerate(self._records)}
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def next_cycle_id(self):
+        return self._records[-1].cycle_id + 1 if self._records else 1
+
+    def _repair(self):
+        """ An interrupted append leaves a partial index record or curve data without an index record """
+        index_size = os.path.getsize(self._index_path)
+        if index_size % INDEX_RECORD.size:
+            self._index_file.truncate(index_size - index_size % INDEX_RECORD.size)
+            self.logger.warning("%s : a partial index record was removed.", self._index_path)
+
+        data_end = 0
+        if index_size >= INDEX_RECORD.size:
+            with open(self._index_path, 'rb') as index_file:
+                index_file.seek((index_size // INDEX_RECORD.size - 1) * INDEX_RECORD.size)
+                record = CycleRecord(*INDEX_RECORD.unpack(index_file.read(INDEX_RECORD.size)))
+            data_end = record.offset + 8 * record.samples
+        if os.path.getsize(self._data_path) > data_end:
+            self._data_file.truncate(data_end)
+            self.logger.warning("%s : curve data without an index record was removed.", self._data_path)
+
+    def _read_index(self):
+        with open(self._index_path, 'rb') as index_file:
+            content = index_file.read()
+        return [CycleRecord(*fields) for fields in INDEX_RECORD.iter_unpack(content)]
+
+    def append(self, timestamp, times, values, aborted=False, cycle_id=None, truncated=False):
+        """ Appends the curve of a cycle. times are in seconds, timestamp is the start time of the cycle
+            in epoch seconds. Returns the index record. """
+        if len(times) != len(values):
+            raise ValueError("A force curve needs as many time stamps as values")
+
+        offsets = array('f', (t - times[0] for t in times)) if len(times) else array('f')
+        forces = array('f', values)
+        if len(forces):
+            peak_index = max(range(len(forces)), key=forces.__getitem__)
+            peak_force, peak_time, duration = forces[peak_index], offsets[peak_index], offsets[-1]
+        else:
+            peak_force = peak_time = duration = 0.0
+
+        with self._lock:
+            if cycle_id is None:
+                cycle_id = self.next_cycle_id
+            offset = self._data_file.seek(0, os.SEEK_END)
+            self._data_file.write(self._little_endian(offsets))
+            self._data_file.write(self._little_endian(forces))
+            self._data_file.flush()
+
+            flags = (FLAG_ABORTED if aborted else 0) | (FLAG_TRUNCATED if truncated else 0)
+            record = CycleRecord(cycle_id, timestamp, offset, len(forces), peak_force, peak_time, duration, flags)
+            # the index record is written after the curve, the index never points to missing data
+            self._index_file.write(INDEX_RECORD.pack(record.cycle_id, record.timestamp, record.offset,
+                                                     record.samples, record.peak_force, record.peak_time,
+                                                     record.duration, record.flags))
+            self._index_file.flush()
+
+            self._records.append(record)
+            self._timestamps.append(timestamp)
+            self._positions[cycle_id] = len(self._records) - 1
+        return record
+
+    @staticmethod
+    def _little_endian(data):
+        if sys.byteorder != 'little':
+            data = array(data.typecode, data)
+            data.byteswap()
+        return data.tobytes()
+
+    def records(self, last=None):
+        """ Index records, oldest first. last limits them to the last cycles. """
+        with self._lock:
+            return list(self._records[-last:]) if last else list(self._records)
+
+    def record(self, cycle_id):
+        with self._lock:
+            if cycle_id not in self._positions:
+                raise KeyError("Unknown cycle: {0}".format(cycle_id))
+            return self._records[self._positions[cycle_id]]
+
+    def peak_forces(self, last=None):
+        """ (cycle id, peak force) of the last cycles, served from the index """
+        return [(record.cycle_id, record.peak_force) for record in self.records(last)]
+
+    def between(self, start_time, end_time):
+        """ Index records of the cycles started in [start_time, end_time) """
+        with self._lock:
+            first = bisect.bisect_left(self._timestamps, start_time)
+            end = bisect.bisect_left(self._timestamps, end_time)
+            return self._records[first:end]
+
+    def curve(self, cycle_id):
+        """ (time offsets, force values) of a cycle """
+        record = self.record(cycle_id)
+        size = 4 * record.samples
+        offsets, forces = array('f'), array('f')
+        if not record.samples:
+            return offsets, forces
+        with open(self._data_path, 'rb') as data_file:
+            with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offsets.frombytes(data[record.offset:record.offset + size])
+                forces.frombytes(data[record.offset + size:record.offset + 2 * size])
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+            forces.byteswap()
+        return offsets, forces
+
+    def close(self):
+        with self._lock:
+            self._data_file.close()
+            self._index_file.close()
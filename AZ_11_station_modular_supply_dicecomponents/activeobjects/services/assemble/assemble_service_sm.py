@@ -1,6 +1,7 @@
 import abc
 from utils.monitoring_timer import MonitoringTimer
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable
 from communication import events
 
 class AssembleServiceState(metaclass=abc.ABCMeta):
@@ -70,8 +71,8 @@ class NotReady(AssembleServiceState):
     def enter_action(self):
         self._assemble_service.serviceState = "NotReady"
         self._assemble_service.logger.debug("Entering the %s state", self.name)
-        self._assemble_service.publisher.publish(topic="eventID", value="NotReady", sender=self._assemble_service.name)
-        self._assemble_service.publisher.publish(topic="AssembleServiceState", value="NotReady", sender=self._assemble_service.name)
+        self._assemble_service.publisher.publish_many([("eventID", "NotReady"),
+                                                       ("AssembleServiceState", "NotReady")], sender=self._assemble_service.name)
 
     def start_service(self):
         self._assemble_service.logger.debug("%s event in %s state", self.start_service.__name__, self.name)
@@ -320,6 +321,8 @@ class AssembleServiceStateMachine(object):
 
         self._current_state = self._waitforjob_state
 
+        self._dispatch_table = self._build_dispatch_table()
+
         self.init_required = False
 
     # properties
@@ -386,70 +389,32 @@ class AssembleServiceStateMachine(object):
     def timeout_handler(self):
         self._assemble_service.handle_event(event=self.timeout_event)
 
-    def dispatch(self, *args, **kwargs):
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._assemble_service.logger)
 
-        self._assemble_service.logger.debug("%s has received a message: %s", self.name, kwargs)
+        table.flag("ButtonProductionError", "Value", "abort_button_pressed", self._update_complete_button)
+        table.message("ButtonProductionError", "State", "Error", "error")
+        table.message("ButtonProductionError", "State", "NotInitialized", "error")
 
-        try:
-            # topics coming from the publishers
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "ButtonProductionError":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.abort_button_pressed()
-                    else:
-                        # update complete button
-                        self._assemble_service.complete_button.handle_event(event=self.update_event)
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-
-            elif sender == "ButtonProductionDone":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.complete_button_pressed()
-                    else:
-                        pass
-
-                elif topic == "State":
-
-                    if value == "Error":
-                        self._current_state.error()
-                    elif value == "NotInitialized":
-                        self._current_state.error()
-
-            elif sender == "Station":
-                if topic == "Ack":
-                    if value:
-                        self._current_state.acknowledge()
-                    else:
-                        pass
-                elif topic == "StationState" and value == "Error":
-                    self._current_state.error()
+        table.flag("ButtonProductionDone", "Value", "complete_button_pressed", None)
+        table.message("ButtonProductionDone", "State", "Error", "error")
+        table.message("ButtonProductionDone", "State", "NotInitialized", "error")
 
-        except KeyError:
-            event = kwargs["event"]
-
-            eventID = event.eventID
-            sender = event.sender
-            service_index = event.service_index
-
-            if eventID == events.GenericServiceEvents.Execute:  # this a part of the service generic interface
-                self._current_state.start_service()
-                self._current_service_user = service_index
-            elif eventID == events.GenericServiceEvents.Cancel:
-                self._current_state.resetjob()
-            elif eventID == events.GenericServiceEvents.Done:  # for callable services
-                pass
-
-            elif eventID == events.GenericServiceEvents.Timeout:  # timeout event comes from the service itself ???
-                self._current_state.timeout()
\ No newline at end of file
+        table.flag("Station", "Ack", "acknowledge", None)
+        table.message("Station", "StationState", "Error", "error")
+
+        table.event(events.GenericServiceEvents.Execute, self._execute)   # this a part of the service generic interface
+        table.event(events.GenericServiceEvents.Cancel, "resetjob")
+        table.event(events.GenericServiceEvents.Done, None)               # for callable services
+        table.event(events.GenericServiceEvents.Timeout, "timeout")
+        return table
+
+    def _update_complete_button(self, value):
+        self._assemble_service.complete_button.handle_event(event=self.update_event)
+
+    def _execute(self, event):
+        self._current_state.start_service()
+        self._current_service_user = event.service_index
+
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -1,6 +1,7 @@
 import abc, time
 from communication import events
 from utils import error_codes, message_codes
+from utils.dispatch_table import DispatchTable, ANY
 
 class StationState(metaclass=abc.ABCMeta):
     """ Abstract State class for a Station SM """
@@ -931,8 +932,8 @@ class Estop(StationState):
     def enter_action(self):
         self._station.stationState = "Error"
         self._station.logger.debug("Entering the %s state", self.name)
-        self._station.publisher.publish(topic="StationState", value=self._station.stationState, sender=self._station.name)
-        self._station.publisher.publish(topic="StationSafetyState", value="safetySwitchActivated", sender=self._station.name)
+        self._station.publisher.publish_many([("StationState", self._station.stationState),
+                                              ("StationSafetyState", "safetySwitchActivated")], sender=self._station.name)
         self._station.publisher.publish(topic='StationStateMaintenance', value="Error : E-Stop",
                                         sender=self._station.name)
 
@@ -1169,6 +1170,9 @@ class StationStateMachine(object):
 
         self.init_required = False  # to show that an estop has happened and init is needed
 
+        self._done_events = {0: "initialize_done", 1: "service1_done"}
+        self._dispatch_table = self._build_dispatch_table()
+
     # properties
     @property
     def current_state(self):
@@ -1274,74 +1278,54 @@ class StationStateMachine(object):
                                                 value=message_codes.code_to_text[message_code],
                                                 sender=self._station.name)
 
-    def dispatch(self, *args, **kwargs):
-
-        self._station.logger.debug("%s has received a message: %s", self.name, kwargs)
+    def _build_dispatch_table(self):
+        table = DispatchTable(self, self._station.logger)
+
+        table.flag("SafetySwitch", "Value", "estop", "estop_ok")
+        table.message("SafetySwitch", "State", ANY, None)
+
+        table.message(ANY, "State", "Error", "error")
+        table.message(ANY, "State", "ErrorWithInit", self._error_with_init)
+        table.message(ANY, "State", "NotInitialized", None)
+        table.message(ANY, "State", "Initialized", None)
+
+        table.event(events.StationEvents.Initialize, "initialize")   # this a part of the service generic interface
+        table.event(events.StationEvents.Assemble, "service1")
+        table.event(events.StationEvents.Ack, self._acknowledge)
+        table.event(events.StationEvents.Done, self._service_done)
+        table.event(events.StationEvents.Error, self._error)
+        table.event(events.StationEvents.NoConn, "noconn")
+        table.event(events.StationEvents.ConnOk, "conn_ok")
+        table.event(events.StationEvents.FatalError, self._fatal_error)
+        table.event(events.StationEvents.NoEvent, self._no_event)
+        return table
+
+    def _error_with_init(self, value):
+        self.init_required = True
+        self._current_state.error()
+
+    def _acknowledge(self, event):
+        self._current_state.acknowledge()
+        self.ack_error()
+        self.ack_message()
+
+    def _service_done(self, event):
+        # service index -> done event of the state, the services 2 to 6 are not used
+        done = self._done_events.get(event.service_index)
+        if done is not None:
+            getattr(self._current_state, done)()
+
+    def _error(self, event):
+        if event.init_required:
+            self.init_required = True
+        self._current_state.error()
+
+    def _fatal_error(self, event):
+        self.publish_error(error_code=error_codes.StationErrorCodes.FatalError)
+        self._current_state.estop()
+
+    def _no_event(self, event):
+        self._station.logger.debug("Empty event : %s", event)
 
-        try:
-            topic = kwargs["topic"]
-            value = kwargs["value"]
-            sender = kwargs["sender"]
-
-            if sender == "SafetySwitch":
-
-                if topic == "Value":
-                    if value:
-                        self._current_state.estop()
-                    else:
-                        self._current_state.estop_ok()
-
-            elif topic == "State":
-                if value == "Error":
-                    self._current_state.error()
-                elif value == "ErrorWithInit":
-                    self.init_required = True
-                    self._current_state.error()
-                elif value == "NotInitialized":
-                    pass
-                    # self._current_state.error()
-                elif value == "Initialized":
-                    pass
-
-        except KeyError:
-            event = kwargs["event"]
-
-            if event.eventID == events.StationEvents.Initialize:  # this a part of the service generic interface
-                self._current_state.initialize()
-            elif event.eventID == events.StationEvents.Assemble:
-                self._current_state.service1()
-            elif event.eventID == events.StationEvents.Ack:
-                self._current_state.acknowledge()
-                self.ack_error()
-                self.ack_message()
-            elif event.eventID == events.StationEvents.Done:
-                if event.service_index == 0:
-                    self._current_state.initialize_done()
-                elif event.service_index == 1:
-                    self._current_state.service1_done()
-                elif event.service_index == 2:
-                    pass
-                elif event.service_index == 3:
-                    pass
-                elif event.service_index == 4:
-                    pass
-                elif event.service_index == 5:
-                    pass
-                elif event.service_index == 6:
-                    pass
-
-            elif event.eventID == events.StationEvents.Error:
-                if event.init_required:
-                    self.init_required = True
-                self._current_state.error()
-            elif event.eventID == events.StationEvents.NoConn:
-                self._current_state.noconn()
-            elif event.eventID == events.StationEvents.ConnOk:
-                self._current_state.conn_ok()
-            elif event.eventID == events.StationEvents.FatalError:
-                self.publish_error(error_code=error_codes.StationErrorCodes.FatalError)
-                self._current_state.estop()
-            elif event.eventID == events.StationEvents.NoEvent:
-                self._station.logger.debug("Empty event : %s", event)
-            else:
-                self._station.logger.debug("Unknown event : %s", event)
+    def dispatch(self, *args, **kwargs):
+        self._dispatch_table.dispatch(kwargs)
@@ -1,89 +1,152 @@
-import pymongo
-import logging
-import config
-import urllib.error
-import urllib.request
-import sys
-
-
-class Database:
-    """ Database Singleton class """
-
-    class __impl:
-        """ Implementation of the database class """
-
-        def __init__(self):
-            mongo_client = pymongo.MongoClient(config.DATABASE_CONFIG['database_url'])
-            self.database = mongo_client
-            self.collections = mongo_client[config.DATABASE_CONFIG['database_name']]
-
-        def get_collection(self, collection):
-            """ Returns a reference to a collection identified by name
-
-            Arguments:
-                collection {string} -- the collection name on the database
-
-            Returns:
-                [pymongo.collection.Collection] -- [collection reference for API usage]
-            """
-            print("### SEARCHING FOR " + collection)
-            return self.collections[collection]
+""" Registration of the OPC UA endpoint in the endpoint registry
 
-        def close_connection(self):
-            self.database.close()
+The ServerPublisher thread registers the endpoint in the background, so the station doesn't wait for the
+database. A registration is a single upsert of {'name': short name, 'endpoint': endpoint}, a failed attempt is
+retried with a doubling delay. The backend is chosen by DATABASE_CONFIG['backend']:
 
-    # The private class attribute holding the "one and only instance"
-    __instance = __impl()
-
-    def __getattr__(self, attr):
-        return getattr(self.__instance, attr)
-
-    def __setattr__(self, attr, value):
-        return setattr(self.__instance, attr, value)
+    'mongodb'   MongoBackend, the registry of the production (the collection the HMI reads)
+    'sqlite'    SqliteBackend, a local stand-in, e.g. for tests without a database server
+"""
 
+import os
+import sqlite3
+import threading
+import config
 
-class ServerPublisher:
 
-    def __init__(self, server_name, endpoint, logger):
+class MongoBackend(object):
+    """ Endpoint registry in a MongoDB collection. The client (a connection pool) is created with the first
+        upsert and kept for the retries. """
+
+    def __init__(self, url, database_name, collection, timeout=5.0):
+        self._url = url
+        self._database_name = database_name
+        self._collection_name = collection
+        self._timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _collection(self):
+        with self._lock:
+            if self._client is None:
+                # pymongo is only needed by the stations which register in MongoDB
+                import pymongo
+                timeout_ms = int(self._timeout * 1000)
+                self._client = pymongo.MongoClient(self._url, connect=False, serverSelectionTimeoutMS=timeout_ms,
+                                                   connectTimeoutMS=timeout_ms, socketTimeoutMS=timeout_ms)
+            return self._client[self._database_name][self._collection_name]
+
+    def upsert(self, name, endpoint):
+        self._collection().replace_one({'name': name}, {'endpoint': endpoint, 'name': name}, upsert=True)
+
+    def find(self, name):
+        document = self._collection().find_one({'name': name})
+        return document['endpoint'] if document is not None else None
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+class SqliteBackend(object):
+    """ Endpoint registry in a table of a local SQLite file """
+
+    def __init__(self, path, table='opcua_servers', timeout=5.0):
+        self._path = path
+        self._table = table
+        self._timeout = timeout
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, timeout=self._timeout, check_same_thread=False)
+            with self._connection:
+                self._connection.execute('CREATE TABLE IF NOT EXISTS "{0}" (name TEXT PRIMARY KEY, '
+                                         'endpoint TEXT NOT NULL)'.format(self._table))
+        return self._connection
+
+    def upsert(self, name, endpoint):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute('INSERT OR REPLACE INTO "{0}" (name, endpoint) VALUES (?, ?)'.format(self._table),
+                                   (name, endpoint))
+
+    def find(self, name):
+        with self._lock:
+            row = self._connect().execute('SELECT endpoint FROM "{0}" WHERE name = ?'.format(self._table),
+                                          (name,)).fetchone()
+        return row[0] if row is not None else None
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def create_backend(database_config, root_dir=None):
+    """ The backend of the database configuration, a relative sqlite_path is taken relative to root_dir """
+    backend = database_config.get('backend', 'mongodb')
+    timeout = database_config.get('connect_timeout', 5.0)
+    if backend == 'mongodb':
+        return MongoBackend(database_config['database_url'], database_config['database_name'],
+                            database_config['database_collection'], timeout=timeout)
+    if backend == 'sqlite':
+        path = database_config['sqlite_path']
+        if root_dir is not None:
+            path = os.path.join(root_dir, path)
+        return SqliteBackend(path, database_config['database_collection'], timeout=timeout)
+    raise ValueError("Unknown endpoint registry backend: {0}".format(backend))
+
+
+class ServerPublisher(threading.Thread):
+    """ Registers the OPC UA server in the endpoint registry, start() runs the registration in the background """
+
+    def __init__(self, server_name, endpoint, logger, backend=None, retry_delay=None, max_retry_delay=None):
+        threading.Thread.__init__(self, name="ServerPublisher", daemon=True)
         self.endpoint = endpoint
         self.server_name = server_name
         self.server_short_name = self.server_name.split('_')[0]
-        self.name = self.__class__.__name__
         self.logger = logger
 
-        self.database = Database()
-        self.collection = self.database.collections.get_collection(config.DATABASE_CONFIG['database_collection'])
-
-    def check_connection(self):
-        try:
-            urllib.request.urlopen(url=config.DATABASE_CONFIG['check_connection_address'],
-                                   timeout=config.DATABASE_CONFIG['check_connection_timeout'])
-            return True
-        except:
-            self.logger.info("### Unexpected error: %s", sys.exc_info()[0])
-            return False
+        self._backend = backend if backend is not None else create_backend(config.DATABASE_CONFIG)
+        self._retry_delay = retry_delay if retry_delay is not None else \
+            config.DATABASE_CONFIG.get('retry_delay', 1.0)
+        self._max_retry_delay = max_retry_delay if max_retry_delay is not None else \
+            config.DATABASE_CONFIG.get('max_retry_delay', 60.0)
+        self._stopped = threading.Event()
+        self.published = threading.Event()         # set when the endpoint is registered
 
     def publish(self):
-        """
-        Publish the OPCUA Server information to mLab
-        """
-        result = None
+        """ One registration attempt, returns True if the endpoint has been registered """
         try:
-            result = self.collection.find_one({'name': self.server_short_name})
-        except:
-            self.logger.info("### Unexpected error: %s", sys.exc_info()[0])
-            self.logger.info("Cannot connect to the DB. Check the connection.")
-            return result
-
-        if result is None:
-            result = self.collection.insert_one({'endpoint': self.endpoint, 'name': self.server_short_name})
-            self.logger.info("### OPCUA Server %s has been included: %s ", self.server_name, self.endpoint)
-        else:
-            result = self.collection.find_one_and_replace(
-                {'name': self.server_short_name},
-                {'endpoint': self.endpoint, 'name': self.server_short_name})
-            self.logger.info("### OPCUA Server %s has been updated: %s ", self.server_name, self.endpoint)
-
-        self.database.close_connection()
-
-        return result
\ No newline at end of file
+            self._backend.upsert(self.server_short_name, self.endpoint)
+        except Exception as error:
+            self.logger.info("Cannot register the OPCUA server %s in the database: %s", self.server_name, error)
+            return False
+        self.published.set()
+        self.logger.info("OPCUA Server %s has been registered: %s ", self.server_name, self.endpoint)
+        return True
+
+    def run(self):
+        delay = self._retry_delay
+        while not self._stopped.is_set():
+            if self.publish():
+                break
+            self.logger.info("Registering the OPCUA server %s again in %s s.", self.server_name, delay)
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, self._max_retry_delay)
+        self._backend.close()
+
+    def stop(self):
+        self._stopped.set()
+        if not self.is_alive():
+            self._backend.close()
@@ -1,6 +1,6 @@
 SERVER_CONFIG = {
     'uri': 'http://basicstation.edukitv2.smartfactorykl.de',
-    'servername': 'AZ11_OPCUA_Server'
+    'servername': 'AZ11_OPCUA_Server',
 }
 
 STATION_CONFIG = {
@@ -10,9 +10,60 @@ STATION_CONFIG = {
 }
 
 DATABASE_CONFIG = {
+    'backend': 'mongodb',               # endpoint registry: 'mongodb' or 'sqlite' (a local stand-in without a database server)
     'database_url': 'mongodb://192.168.1.123:27017',
     'database_name': 'myapp',
     'database_collection': 'opcua_servers',
-    'check_connection_address': 'http://192.168.1.123:3000',
-    'check_connection_timeout': 5
+    'sqlite_path': 'endpoint_registry.sqlite',  # database file of the sqlite backend, relative to the station
+    'connect_timeout': 5,               # seconds until a registration attempt fails
+    'retry_delay': 1.0,                 # seconds until a failed registration is retried, doubles with every retry
+    'max_retry_delay': 60.0,            # maximum delay between the retries in seconds
+}
+
+NETWORK_CONFIG = {
+    'interfaces': ('eth0',),        # monitored network interfaces, the connection is alive while one of them is up
+    'linkEvents': True,             # True: link notifications of the kernel (rtnetlink), False: the links are polled
+    'linkPollInterval': 1.0,        # poll interval of the links in seconds, without link notifications
+    'linkDebounce': 0.05,           # seconds a changed link has to be stable until the station is notified
+}
+
+RUNTIME_CONFIG = {
+    'actorRuntime': 'thread',       # 'thread': one thread per active object, 'pool': a shared pool of worker threads,
+                                    # 'asyncio': one event loop for active objects and connection monitor
+    'actorWorkerThreads': 2,        # number of worker threads of the 'pool' runtime
+    'uaWriteWindow': 0.05,          # coalescing window of the OPC UA node writes in seconds, None: synchronous writes
+    'uaWriteMaxPending': 1000,      # nodes waiting for the OPC UA writer, updates of further nodes are dropped
+    'eventTrace': None,             # file of the event trace recording, None: no recording, replay without
+                                    # hardware: python3 -m utils.event_trace replay <file>
+    'actorStats': False,            # mailbox statistics of the active objects in the OPC UA Monitoring folder
+    'actorStatsInterval': 1.0,      # update interval of the published mailbox statistics in seconds
+}
+
+LOGGING_CONFIG = {
+    'asyncLogging': True,           # the handlers of logging.json run in a listener thread, logging never blocks
+    'logQueueSize': 10000,          # queued log records, further records are dropped and counted
+    'logSampling': {},              # logger name -> n: only every n-th DEBUG record is logged, e.g. {'Press': 10}
+    'binaryLog': None,              # file of the compact binary log (python3 -m utils.binary_log), None: no binary log
+}
+
+SIMULATION_CONFIG = {
+    'enabled': False,               # True: the station runs on a simulated RevPi process image instead of the hardware
+    'speed': 10.0,                  # simulated seconds per second of the sensor physics, None: as fast as possible
+    'inputs': {},                   # initial values of the inputs
+    'axes': [],                     # none: the station has no motor driven axis, the buttons (input4, input5) are
+                                    # set by 'inputs' and 'script'
+    'forceRamps': [],               # none: no analog force input
+    'script': [],                   # (simulated time in s, io name, value), e.g. (5.0, 'input4', True),
+                                    # (5.2, 'input4', False): the production done button is pushed
+}
+
+BENCHMARK_CONFIG = {                # python3 -m utils.latency_bench, see there
+    'rates': [10.0, 50.0, 200.0, 1000.0],   # injected input edges per second
+    'edges': 500,                   # input edges per rate
+    'settle': 1.0,                  # seconds for the station to settle after a probe's edge and after a run
+    'initTimeout': 60.0,            # seconds for the station to become Ready after ServiceAutoInitializeStation
+    'probes': [                     # (input, path of the OPC UA variable below Objects) which follows the input
+        ('input4', ['Sensor', 'InteractionSensor1', 'Value']),  # production done button
+        ('input5', ['Sensor', 'InteractionSensor2', 'Value']),  # production error button
+    ],
 }
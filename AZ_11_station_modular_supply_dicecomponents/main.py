@@ -1,5 +1,11 @@
 import definitions
 from communication.server import UAServer, UaObjectSubscriber
+from activeobjects.actor import ActorScheduler, AsyncioScheduler, set_default_scheduler
+from communication.ua_writer import UaWriteBehind, set_default_writer
+from utils import event_trace
+from utils import actor_stats
+from utils import log_pipeline
+from communication.ua_monitoring import UaActorMonitor
 from activeobjects.sensors.presencesensor import PresenceSensor
 from activeobjects.sensors.safetyswitch import SafetySwitch
 from activeobjects.actuators.rgb_led import RGB_LED
@@ -11,18 +17,34 @@ from activeobjects.services.assemble.assemble_service import AssembleService
 from activeobjects.services.interface import ServiceInterface
 from communication import events, conn_monitor, network_util
 
-import revpimodio2
 import config
+
+# on a workstation the station runs on a simulated process image, see SIMULATION_CONFIG
+if config.SIMULATION_CONFIG['enabled']:
+    from utils import revpi_sim as revpimodio2
+    revpimodio2.set_default_simulation(config.SIMULATION_CONFIG)
+else:
+    import revpimodio2
+
 import logging.config
 import json
 import socket
-from communication.server_publisher import ServerPublisher
+from communication.server_publisher import ServerPublisher, create_backend
+import time
 
 
 with open(definitions.LOGCONFIG_PATH, 'r') as logging_config_file:
     config_dict = json.load(logging_config_file)
 logging.config.dictConfig(config_dict)
 
+# the log handlers run in a listener thread, logging never blocks an active object
+if config.LOGGING_CONFIG['asyncLogging']:
+    log_listener = log_pipeline.install(queue_size=config.LOGGING_CONFIG['logQueueSize'],
+                                        sampling=config.LOGGING_CONFIG['logSampling'],
+                                        binary_log=config.LOGGING_CONFIG['binaryLog'])
+else:
+    log_listener = None
+
 try:
     from IPython import embed
 except ImportError:
@@ -42,6 +64,37 @@ class StationApp(object):
     def __init__(self, name):
         self._name = name
         self.logger = logging.getLogger(self._name)
+
+        # active objects runtime: one thread per active object, a shared pool of worker threads or one event loop
+        self.actorRuntime = config.RUNTIME_CONFIG['actorRuntime']
+        if self.actorRuntime == 'pool':
+            self.actorScheduler = ActorScheduler(name='ActorScheduler',
+                                                 workers=config.RUNTIME_CONFIG['actorWorkerThreads'])
+        elif self.actorRuntime == 'asyncio':
+            self.actorScheduler = AsyncioScheduler(name='ActorLoop')
+        else:
+            self.actorScheduler = None
+
+        if self.actorScheduler is not None:
+            self.actorScheduler.start()
+            set_default_scheduler(self.actorScheduler)
+
+        # OPC UA nodes are written behind the publishers: unchanged values are dropped, bursts are coalesced
+        if config.RUNTIME_CONFIG['uaWriteWindow'] is not None:
+            self.uaWriter = UaWriteBehind(name='UaWriter', window=config.RUNTIME_CONFIG['uaWriteWindow'],
+                                          max_pending=config.RUNTIME_CONFIG['uaWriteMaxPending'])
+            self.uaWriter.start()
+        else:
+            self.uaWriter = None
+        set_default_writer(self.uaWriter)
+
+        # optional recording of the events of all active objects, e.g. to replay an incident without hardware
+        if config.RUNTIME_CONFIG['eventTrace'] is not None:
+            event_trace.install(event_trace.TraceRecorder(config.RUNTIME_CONFIG['eventTrace']))
+
+        # optional mailbox statistics of all active objects, published in the Monitoring folder
+        if config.RUNTIME_CONFIG['actorStats']:
+            actor_stats.install(actor_stats.StatsCollector())
         self.active_objects = list()
 
 
@@ -50,7 +103,16 @@ class StationApp(object):
         self.connMonitor = conn_monitor.ConnMonitor(name='ConnMonitor',
                                                     logger=self.logger,
                                                     conn_alive_cb=self.conn_alive_event,
-                                                    conn_broken_cb=self.conn_broken_event)
+                                                    conn_broken_cb=self.conn_broken_event,
+                                                    loop=self.actorScheduler if self.actorRuntime == 'asyncio' else None,
+                                                    interval=config.NETWORK_CONFIG['linkPollInterval'],
+                                                    interfaces=config.NETWORK_CONFIG['interfaces'],
+                                                    debounce=config.NETWORK_CONFIG['linkDebounce'],
+                                                    link_events=config.NETWORK_CONFIG['linkEvents'],
+                                                    # simulated station: the links are up
+                                                    source=conn_monitor.FakeLinkSource(
+                                                        config.NETWORK_CONFIG['interfaces'])
+                                                    if config.SIMULATION_CONFIG['enabled'] else None)
 
         self.logger.debug("Buiding the station's active objects...")
 
@@ -154,16 +216,17 @@ class StationApp(object):
 
 
         self.logger.debug("Building an OPCUA server: %s ", servername)
+        started = time.perf_counter()
         self.server = UAServer(endpoint=endpoint,
                                name=servername,
                                uri=uri,
                                station_app=self).server
+        self.logger.info("OPCUA server %s built in %.3f s", servername, time.perf_counter() - started)
 
-        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger)
-        if self.server_publisher.check_connection():
-            self.server_publisher.publish()
-        else:
-            self.logger.info("No connection to the database. OPCUA server was not registered.")
+        self.server_publisher = ServerPublisher(server_name=servername, endpoint=endpoint, logger=self.logger,
+                                                backend=create_backend(config.DATABASE_CONFIG, definitions.ROOT_DIR))
+        # registers the server in the background, the station doesn't wait for the database
+        self.server_publisher.start()
 
         # setting pub-sub system ---------------------------------------------------------
         self.logger.info("Setting events pub-sub system...")
@@ -325,6 +388,11 @@ class StationApp(object):
         self.revpiioDriver.handlesignalend(self.shutdown)
 
         self.logger.info("Registering handlers for inputs events...")
+        # the events of the input edges are sent again and again, they are allocated once and never changed
+        self.posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
+                                                           sender=self._name)
+        self.negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
+                                                           sender=self._name)
         self.revpiioDriver.io.input4.reg_event(self.input4_posedge_event, edge=revpimodio2.RISING)
         self.revpiioDriver.io.input4.reg_event(self.input4_negedge_event, edge=revpimodio2.FALLING)
         self.revpiioDriver.io.input5.reg_event(self.input5_posedge_event, edge=revpimodio2.RISING)
@@ -333,6 +401,14 @@ class StationApp(object):
         self.server.start()
         self.logger.info("OPCUA server %s at %s has started", servername, endpoint)
 
+        if actor_stats.collector is not None:
+            self.actorMonitor = UaActorMonitor('ActorMonitor', self.server.nodes.objects.get_child(["2:Monitoring"]),
+                                               actor_stats.collector,
+                                               interval=config.RUNTIME_CONFIG['actorStatsInterval'])
+            self.actorMonitor.start()
+        else:
+            self.actorMonitor = None
+
         self.completeButton.start()
         self.active_objects.append(self.completeButton)
         self.abortButton.start()
@@ -375,35 +451,44 @@ class StationApp(object):
         self.assembleService.stop()
         self.assemblyStation.stop()
         self.connMonitor.stop()
+        self.server_publisher.stop()
         self.blinker.stop()
+        if self.actorMonitor is not None:
+            self.actorMonitor.stop()
+            for stats in actor_stats.collector.bottlenecks():
+                self.logger.info("Actor statistics: %s", stats)
+        if self.uaWriter is not None:
+            self.uaWriter.stop()
         self.server.stop()
         self.revpiioDriver.exit()
 
+        if self.actorScheduler is not None:
+            self.actorScheduler.stop()
+
+        if event_trace.recorder is not None:
+            event_trace.recorder.close()
+            event_trace.install(None)
+
+        if log_listener is not None:
+            log_listener.stop()
+
     def input4_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.completeButton.handle_event(event=posedge_event)
+        self.completeButton.handle_event(event=self.posedge_event)
 
     def input4_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
 
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.completeButton.handle_event(event=negedge_event)
+        self.completeButton.handle_event(event=self.negedge_event)
 
     def input5_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        posedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.PosEdge,
-                                                      sender=self._name)
-        self.abortButton.handle_event(event=posedge_event)
+        self.abortButton.handle_event(event=self.posedge_event)
 
     def input5_negedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
-        negedge_event = events.SimpleSensorInputEvent(eventID=events.SimpleSensorInputEvents.NegEdge,
-                                                      sender=self._name)
-        self.abortButton.handle_event(event=negedge_event)
+        self.abortButton.handle_event(event=self.negedge_event)
 
     def input6_posedge_event(self, ioname, iovalue):
         self.logger.debug("Input %s : Value %s", ioname, iovalue)
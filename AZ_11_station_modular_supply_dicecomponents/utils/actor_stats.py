@@ -0,0 +1,135 @@
+""" Mailbox statistics of the active objects
+
+With an installed collector every actor created afterwards keeps the current and the peak depth of its
+mailbox and histograms of the wait time (enqueue to start of the handler) and the handler time. Without
+a collector the actors don't measure anything, the cost is one check per enqueued call.
+"""
+
+import time
+import bisect
+import collections
+import threading
+
+collector = None        # the installed stats collector, None: the statistics are disabled
+
+# upper bounds of the histogram buckets in seconds: 1 us ... ~8 s, doubling, plus an overflow bucket
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** exponent for exponent in range(24))
+
+
+def install(stats_collector):
+    """ Actors created after this call are measured by the given collector. None disables the statistics. """
+    global collector
+    collector = stats_collector
+
+
+class Histogram(object):
+    """ Histogram of durations in logarithmic buckets """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """ Upper bound of the bucket which contains the percentile, at most the max. value """
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index == len(BUCKET_BOUNDS):
+                    return self.max
+                return min(BUCKET_BOUNDS[index], self.max)
+        return self.max
+
+
+class ActorStats(object):
+    """ Statistics of one actor's mailbox """
+
+    def __init__(self, name):
+        self._name = name
+        self._pending = collections.deque()     # enqueue time stamps of the calls in the mailbox
+        self.peak_depth = 0
+        self.enqueued = 0
+        self.handled = 0
+        self.wait_time = Histogram()
+        self.handler_time = Histogram()
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def depth(self):
+        return len(self._pending)
+
+    def enqueue(self):
+        self._pending.append(time.perf_counter())
+        self.enqueued += 1
+        depth = len(self._pending)
+        if depth > self.peak_depth:
+            self.peak_depth = depth
+
+    def execute(self, cmd, args, kwargs):
+        """ Runs a command of the mailbox and measures it """
+        started = time.perf_counter()
+        try:
+            enqueued = self._pending.popleft()
+        except IndexError:
+            enqueued = started
+        self.wait_time.record(started - enqueued)
+        try:
+            return cmd(*args, **kwargs)
+        finally:
+            self.handler_time.record(time.perf_counter() - started)
+            self.handled += 1
+
+    def reset_peak(self):
+        self.peak_depth = len(self._pending)
+
+    def __repr__(self):
+        return ("%s: depth %s (peak %s), handled %s, wait p99 %.3f ms, handler p99 %.3f ms, busy %.3f s" %
+                (self._name, self.depth, self.peak_depth, self.handled, self.wait_time.percentile(99) * 1000,
+                 self.handler_time.percentile(99) * 1000, self.handler_time.total))
+
+
+class StatsCollector(object):
+    """ The statistics of all measured actors """
+
+    def __init__(self):
+        self._actors = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, name):
+        """ New statistics of an actor, actors with the same name get a numbered name """
+        with self._lock:
+            unique_name = name
+            number = 1
+            while unique_name in self._actors:
+                number += 1
+                unique_name = "{0}#{1}".format(name, number)
+            stats = ActorStats(unique_name)
+            self._actors[unique_name] = stats
+            return stats
+
+    def actors(self):
+        with self._lock:
+            return list(self._actors.values())
+
+    def bottlenecks(self, count=5):
+        """ The actors which spent the most time in their handlers """
+        return sorted(self.actors(), key=lambda stats: stats.handler_time.total, reverse=True)[:count]